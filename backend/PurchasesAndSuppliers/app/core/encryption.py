@@ -6,14 +6,21 @@ import base64
 import binascii
 import hashlib
 import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Final, Optional
+from typing import Dict, Final, List, Optional, Sequence, Tuple
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from sqlalchemy import literal
+from sqlalchemy import Column, and_, event, inspect, literal, or_, type_coerce
+from sqlalchemy.orm import Mapper, object_session
+from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.types import String, TypeDecorator
 
 from app.core.config import settings
@@ -23,6 +30,11 @@ DIGEST_SEPARATOR: Final[str] = ":"
 HKDF_INFO: Final[bytes] = b"app-field-encryption"
 HKDF_SALT: Final[bytes] = b"field-digest-v1"
 DERIVED_KEY_LENGTH: Final[int] = 64
+BLIND_INDEX_SUFFIX: Final[str] = "_digest"
+BLIND_INDEX_LENGTH: Final[int] = 44  # urlsafe base64 of a SHA-256 HMAC
+BULK_DECRYPT_CHUNK_SIZE: Final[int] = 64
+SEARCH_TOKEN_INFO: Final[bytes] = b"search-token-v1"
+SEARCH_TOKEN_LENGTH: Final[int] = 22  # unpadded urlsafe base64 of 16 bytes
 
 
 def _decode_master_key(encoded_key: str) -> bytes:
@@ -36,28 +48,54 @@ def _decode_master_key(encoded_key: str) -> bytes:
         ) from exc
 
 
+def _derive_key_material(encoded_key: str) -> Tuple[bytes, bytes]:
+    """Return the ``(fernet_key, digest_key)`` pair derived from ``encoded_key``."""
+
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=DERIVED_KEY_LENGTH,
+        salt=HKDF_SALT,
+        info=HKDF_INFO,
+    )
+    derived_key = hkdf.derive(_decode_master_key(encoded_key))
+    return base64.urlsafe_b64encode(derived_key[:32]), derived_key[32:]
+
+
 @dataclass(frozen=True)
 class FieldCipher:
-    """Encapsulates encryption and deterministic digest helpers."""
+    """Encapsulates encryption and deterministic digest helpers.
 
-    fernet: Fernet
+    Values are encrypted with the primary (first) key and decrypted with any
+    configured key, so a rotation can re-encrypt rows while they stay
+    readable (see ``app.core.key_rotation``).
+    """
+
+    fernet: MultiFernet
     digest_key: bytes
+    primary: Fernet
 
     @classmethod
     def from_key(cls, encoded_key: str) -> "FieldCipher":
         """Build a cipher from the configured Fernet key."""
 
-        raw_key = _decode_master_key(encoded_key)
-        hkdf = HKDF(
-            algorithm=hashes.SHA256(),
-            length=DERIVED_KEY_LENGTH,
-            salt=HKDF_SALT,
-            info=HKDF_INFO,
-        )
-        derived_key = hkdf.derive(raw_key)
-        encryption_key = base64.urlsafe_b64encode(derived_key[:32])
-        digest_key = derived_key[32:]
-        return cls(Fernet(encryption_key), digest_key)
+        return cls.from_keys([encoded_key])
+
+    @classmethod
+    def from_keys(
+        cls, encoded_keys: Sequence[str], digest_key: Optional[str] = None
+    ) -> "FieldCipher":
+        """Build a cipher from versioned keys, newest first.
+
+        Digests, and the blind indexes built from them, are derived from
+        ``digest_key`` (the primary key by default) and must not change when
+        the encryption keys rotate.
+        """
+
+        if not encoded_keys:
+            raise ValueError("At least one field encryption key is required")
+        fernets = [Fernet(_derive_key_material(key)[0]) for key in encoded_keys]
+        _, derived_digest_key = _derive_key_material(digest_key or encoded_keys[0])
+        return cls(MultiFernet(fernets), derived_digest_key, fernets[0])
 
     def encrypt(self, value: str) -> str:
         token = self.fernet.encrypt(value.encode("utf-8")).decode("utf-8")
@@ -65,11 +103,7 @@ class FieldCipher:
         return f"{digest}{DIGEST_SEPARATOR}{token}"
 
     def decrypt(self, value: str) -> str:
-        try:
-            stored_digest, token = value.split(DIGEST_SEPARATOR, 1)
-        except ValueError as exc:
-            raise ValueError("Stored value does not contain a digest separator") from exc
-
+        stored_digest, token = self._split(value)
         try:
             plaintext = self.fernet.decrypt(token.encode("utf-8")).decode("utf-8")
         except InvalidToken as exc:
@@ -82,6 +116,34 @@ class FieldCipher:
 
         return plaintext
 
+    def rotate(self, value: str) -> Optional[str]:
+        """Return ``value`` re-encrypted with the primary key, or ``None`` if it already is.
+
+        The digest prefix is kept as is, since the plaintext does not change.
+        """
+
+        stored_digest, token = self._split(value)
+        try:
+            self.primary.decrypt(token.encode("utf-8"))
+            return None
+        except InvalidToken:
+            pass
+        try:
+            rotated = self.fernet.rotate(token.encode("utf-8")).decode("utf-8")
+        except InvalidToken as exc:
+            raise ValueError(
+                "Unable to decrypt the stored value with the configured keys"
+            ) from exc
+        return f"{stored_digest}{DIGEST_SEPARATOR}{rotated}"
+
+    @staticmethod
+    def _split(value: str) -> Tuple[str, str]:
+        try:
+            stored_digest, token = value.split(DIGEST_SEPARATOR, 1)
+        except ValueError as exc:
+            raise ValueError("Stored value does not contain a digest separator") from exc
+        return stored_digest, token
+
     def digest(self, value: str) -> str:
         mac = hmac.new(self.digest_key, value.encode("utf-8"), hashlib.sha256)
         return base64.urlsafe_b64encode(mac.digest()).decode("utf-8")
@@ -90,11 +152,26 @@ class FieldCipher:
         return f"{self.digest(value)}{DIGEST_SEPARATOR}%"
 
 
+def configured_encryption_keys() -> List[str]:
+    """Return the configured Fernet keys, primary first."""
+
+    previous = settings.field_encryption_previous_keys.split(",")
+    return [settings.field_encryption_key, *(key.strip() for key in previous if key.strip())]
+
+
 @lru_cache
 def _get_field_cipher() -> FieldCipher:
     """Return a cached :class:`FieldCipher` instance from the settings."""
 
-    return FieldCipher.from_key(settings.field_encryption_key)
+    keys = configured_encryption_keys()
+    if len(keys) > 1 and not settings.field_digest_key:
+        # Deriving digests from the new primary key would orphan every
+        # stored digest and blind index
+        raise ValueError(
+            "FIELD_DIGEST_KEY must be set to the key the stored digests were "
+            "derived from when FIELD_ENCRYPTION_PREVIOUS_KEYS is used"
+        )
+    return FieldCipher.from_keys(keys, digest_key=settings.field_digest_key or None)
 
 
 def encrypt_sensitive_value(value: Optional[str]) -> Optional[str]:
@@ -103,20 +180,162 @@ def encrypt_sensitive_value(value: Optional[str]) -> Optional[str]:
     return _get_field_cipher().encrypt(value)
 
 
+class DecryptionCache:
+    """Bounded LRU of ciphertext -> plaintext with a short time to live.
+
+    Fernet tokens are unique per write, so a cached entry can never be
+    served for a different value; the TTL only bounds how long plaintext
+    stays in memory.
+
+    The cache is process-wide, not per request: every entry is decrypted
+    personal data readable from the process memory until it expires or is
+    evicted, so ``max_entries`` should stay close to a few listing pages.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ciphertext: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(ciphertext)
+            if entry is None:
+                return None
+            expires_at, plaintext = entry
+            if expires_at <= time.monotonic():
+                del self._entries[ciphertext]
+                return None
+            self._entries.move_to_end(ciphertext)
+            return plaintext
+
+    def put(self, ciphertext: str, plaintext: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[ciphertext] = (time.monotonic() + self.ttl, plaintext)
+            self._entries.move_to_end(ciphertext)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def get_decryption_cache() -> DecryptionCache:
+    """Return the process-wide :class:`DecryptionCache`."""
+
+    return DecryptionCache(
+        settings.field_decryption_cache_size, settings.field_decryption_cache_ttl
+    )
+
+
+@lru_cache
+def _get_decryption_executor() -> ThreadPoolExecutor:
+    workers = settings.field_decryption_workers or min(4, os.cpu_count() or 1)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="field-decrypt")
+
+
 def decrypt_sensitive_value(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
-    return _get_field_cipher().decrypt(value)
+    cache = get_decryption_cache()
+    plaintext = cache.get(value)
+    if plaintext is None:
+        plaintext = _get_field_cipher().decrypt(value)
+        cache.put(value, plaintext)
+    return plaintext
+
+
+def decrypt_many(values: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """Decrypt a page of values, in order, with one cache pass.
+
+    Repeated ciphertexts are decrypted once and misses are split in chunks
+    across a small thread pool.
+    """
+
+    cache = get_decryption_cache()
+    resolved: Dict[str, str] = {}
+    missing = []
+    for value in dict.fromkeys(value for value in values if value is not None):
+        plaintext = cache.get(value)
+        if plaintext is None:
+            missing.append(value)
+        else:
+            resolved[value] = plaintext
+
+    if missing:
+        cipher = _get_field_cipher()
+        chunks = [
+            missing[start:start + BULK_DECRYPT_CHUNK_SIZE]
+            for start in range(0, len(missing), BULK_DECRYPT_CHUNK_SIZE)
+        ]
+        if len(chunks) > 1:
+            decrypted = _get_decryption_executor().map(
+                lambda chunk: [cipher.decrypt(value) for value in chunk], chunks
+            )
+        else:
+            decrypted = [[cipher.decrypt(value) for value in chunks[0]]]
+        for chunk, plaintexts in zip(chunks, decrypted):
+            for value, plaintext in zip(chunk, plaintexts):
+                cache.put(value, plaintext)
+                resolved[value] = plaintext
+
+    return [None if value is None else resolved[value] for value in values]
+
+
+def raw_ciphertext(column):
+    """Select ``column`` as stored, without decrypting it.
+
+    For listings that only show a few encrypted fields: select them raw and
+    decrypt the whole page with one :func:`decrypt_many` call.
+    """
+
+    return type_coerce(column, String).label(column.key)
+
+
+def blind_index_value(value: Optional[str]) -> Optional[str]:
+    """Return the keyed digest stored in the blind-index column for ``value``."""
+
+    if value is None:
+        return None
+    return _get_field_cipher().digest(value)
+
+
+def search_token(term: str) -> str:
+    """Return the keyed token stored for a normalized search ``term``.
+
+    Tokens use the digest key (so they survive key rotations) but are domain
+    separated from the blind-index digests.
+    """
+
+    message = SEARCH_TOKEN_INFO + DIGEST_SEPARATOR.encode("utf-8") + term.encode("utf-8")
+    mac = hmac.new(_get_field_cipher().digest_key, message, hashlib.sha256)
+    return base64.urlsafe_b64encode(mac.digest()[:16]).decode("utf-8").rstrip("=")
+
+
+def blind_index_column_name(column_name: str) -> str:
+    return f"{column_name}{BLIND_INDEX_SUFFIX}"
 
 
 class EncryptedString(TypeDecorator):
-    """SQLAlchemy column type that keeps supplier data encrypted at rest."""
+    """SQLAlchemy column type that keeps supplier data encrypted at rest.
+
+    With ``searchable=True`` the owning table gets an indexed
+    ``<column>_digest`` column holding the HMAC of the plaintext. Equality
+    filters compare against it, and ``unique``/``index`` flags declared on
+    the encrypted column are moved to it.
+    """
 
     impl = String
     cache_ok = True
 
-    def __init__(self, length: Optional[int] = None) -> None:
+    def __init__(self, length: Optional[int] = None, searchable: bool = False) -> None:
         super().__init__(length)
+        self.searchable = searchable
 
     def process_bind_param(self, value: Optional[str], dialect):  # type: ignore[override]
         return encrypt_sensitive_value(value)
@@ -130,5 +349,139 @@ class EncryptedString(TypeDecorator):
         def __eq__(self, other):  # type: ignore[override]
             if other is None:
                 return self.expr.is_(None)
-            return self.expr.like(literal(_get_field_cipher().lookup_pattern(other)))
+            digest_column = _blind_index_column_for(self.expr)
+            by_prefix = self.expr.like(literal(_get_field_cipher().lookup_pattern(other)))
+            if digest_column is not None:
+                # Rows the backfill has not reached yet have no digest: match
+                # those on the digest prefix of the stored ciphertext
+                return or_(
+                    digest_column == blind_index_value(other),
+                    and_(digest_column.is_(None), by_prefix),
+                )
+            return by_prefix
+
+
+def _is_searchable(column: Column) -> bool:
+    return isinstance(column.type, EncryptedString) and column.type.searchable
+
+
+def _blind_index_column_for(expr):
+    table = getattr(expr, "table", None)
+    name = getattr(expr, "name", None)
+    if table is None or name is None:
+        return None
+    return table.c.get(blind_index_column_name(name))
+
+
+@event.listens_for(Column, "before_parent_attach")
+def _move_constraints_to_blind_index(column, table):
+    # A Fernet token is different on every write, so uniqueness and indexes
+    # on the ciphertext are useless; they belong on the digest column
+    if _is_searchable(column):
+        column.info["blind_index_unique"] = bool(column.unique)
+        column.unique = None
+        column.index = None
+
+
+def _blind_index_default(column: Column):
+    """Context-sensitive default and onupdate of the digest column of ``column``.
+
+    Digests the plaintext a Core or ORM ``INSERT``/``UPDATE`` writes to
+    ``column`` (under its own key). An ``UPDATE`` that does not write
+    ``column`` cannot leave the digest alone, so it must write it itself,
+    e.g. with :func:`keep_blind_indexes`; the mapper hook below does that for
+    flushes.
+    """
+
+    def digest(context):
+        parameters = context.get_current_parameters()
+        if column.key in parameters:
+            return blind_index_value(parameters[column.key])
+        if context.isinsert:
+            return None
+        raise ValueError(
+            f"An UPDATE of {column.table.name} that does not write {column.name} "
+            "must keep its digest; add keep_blind_indexes(table) to its values"
+        )
+
+    return digest
+
+
+@event.listens_for(Column, "after_parent_attach")
+def _add_blind_index_column(column, table):
+    if _is_searchable(column):
+        digest = _blind_index_default(column)
+        table.append_column(
+            Column(
+                blind_index_column_name(column.name),
+                String(BLIND_INDEX_LENGTH),
+                nullable=True,
+                index=True,
+                unique=column.info["blind_index_unique"] or None,
+                default=digest,
+                onupdate=digest,
+            )
+        )
+
+
+def iter_encrypted_columns(metadata):
+    """Yield ``(table, encrypted_columns)`` for the tables of ``metadata``."""
+
+    for table in metadata.sorted_tables:
+        columns = [column for column in table.columns if isinstance(column.type, EncryptedString)]
+        if columns:
+            yield table, columns
+
+
+def iter_blind_indexes(metadata):
+    """Yield ``(table, encrypted_column, digest_column)`` for ``metadata``."""
+
+    for table in metadata.sorted_tables:
+        for column in table.columns:
+            if _is_searchable(column):
+                yield table, column, table.c[blind_index_column_name(column.name)]
+
+
+def keep_blind_indexes(table) -> Dict[str, Column]:
+    """``UPDATE`` values that keep every digest column of ``table`` as stored.
+
+    For Core updates that write stored ciphertext or other columns, e.g.
+    ``update(table).values({**keep_blind_indexes(table), "status": ...})``.
+    """
+
+    return {
+        blind_index_column_name(column.name): table.c[blind_index_column_name(column.name)]
+        for column in table.columns
+        if _is_searchable(column)
+    }
+
+
+_blind_index_attributes_by_mapper: Dict[Mapper, List[Tuple[str, str]]] = {}
+
+
+def _blind_index_attributes(mapper: Mapper) -> List[Tuple[str, str]]:
+    pairs = _blind_index_attributes_by_mapper.get(mapper)
+    if pairs is None:
+        pairs = []
+        for prop in mapper.column_attrs:
+            column = prop.columns[0]
+            if isinstance(column, Column) and _is_searchable(column):
+                digest_column = column.table.c[blind_index_column_name(column.name)]
+                digest_key = mapper.get_property_by_column(digest_column).key
+                pairs.append((prop.key, digest_key))
+        _blind_index_attributes_by_mapper[mapper] = pairs
+    return pairs
+
 
+@event.listens_for(Mapper, "before_update")
+def _keep_blind_indexes_on_update(mapper, connection, target):
+    # A flush that does not change an encrypted column writes its stored
+    # digest back; otherwise the onupdate default would reject the UPDATE
+    pairs = _blind_index_attributes(mapper)
+    if not pairs or not object_session(target).is_modified(target, include_collections=False):
+        return
+    state = inspect(target)
+    for key, digest_key in pairs:
+        if not state.attrs[key].history.has_changes():
+            getattr(target, digest_key)  # loads it if expired
+            flag_modified(target, digest_key)
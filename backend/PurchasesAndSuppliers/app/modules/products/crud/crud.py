@@ -1,9 +1,16 @@
-
 import csv
 import io
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from ..models.bulk_products import UploadFileProduct, UploadLogProduct, Product, TechnicalSheet, Specification
-from decimal import Decimal
+
+# Rows parsed, validated and inserted together, in one savepoint
+CSV_CHUNK_ROWS = 1000
 
 def create_upload_file_record(db: Session, file_name: str, file_path: str, status: str) -> UploadFileProduct:
     db_upload_file = UploadFileProduct(
@@ -32,74 +39,146 @@ def create_log_entry(db: Session, file_id: str, row_number: int, status: str, er
     )
     db.add(db_log)
 
-def process_csv_file(db: Session, file_id: str, csv_content: bytes):
+def _iter_csv_chunks(csv_content: bytes, chunk_rows: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Yield ``(row_number, product_data)`` lists of up to ``chunk_rows`` rows, decoding as it reads."""
+    reader = csv.reader(io.TextIOWrapper(io.BytesIO(csv_content), encoding="utf-8", newline=""))
+    header = next(reader)  # Skip header row
+    numbered = enumerate(reader, start=1)
+    while chunk := list(islice(numbered, chunk_rows)):
+        yield [(row_number, dict(zip(header, row))) for row_number, row in chunk]
+
+def _prepare_row(product_data: Dict[str, str]) -> dict:
+    """Values of the product, its technical sheet and its specs (``spec_<name>`` columns)."""
+    price = Decimal(product_data.get("precio", 0))
+    return {
+        "product": {
+            "nombre": product_data.get("nombre"),
+            "descripcion": product_data.get("descripcion"),
+            "sku": product_data["sku"],
+            # precio is an integer column: round like the database casts numerics
+            "precio": int(price.to_integral_value(rounding=ROUND_HALF_UP)),
+            "activo": product_data.get("is_active", 'true').lower() == 'true',
+        },
+        "sheet": {
+            "user_manual_url": product_data.get("urlManual"),
+            "installation_guide_url": product_data.get("urlHojaInstalacion"),
+            "certifications": product_data.get("certificaciones"),
+        },
+        "specs": [
+            {"name": key.replace("spec_", "").replace("_", " "), "value": value}
+            for key, value in product_data.items()
+            if key.startswith("spec_") and value
+        ],
+    }
+
+def _validate_chunk(
+    chunk: List[Tuple[int, Dict[str, str]]], existing_skus: Set[str], file_skus: Set[str]
+) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    """
+    Split a chunk into prepared rows and ``(row_number, error)`` failures,
+    with the same checks and messages as importing row by row. SKUs earlier
+    in the file count as existing.
+    """
+    prepared, failures = [], []
+    for row_number, product_data in chunk:
+        try:
+            sku = product_data.get("sku")
+            if not sku:
+                raise ValueError("SKU is a required field.")
+            if sku in existing_skus or sku in file_skus:
+                raise ValueError(f"Product with SKU '{sku}' already exists.")
+            prepared.append((row_number, _prepare_row(product_data)))
+            file_skus.add(sku)
+        except Exception as e:
+            failures.append((row_number, str(e)))
+    return prepared, failures
+
+def _insert_rows(db: Session, file_id: str, rows: List[Tuple[int, dict]]) -> None:
+    """
+    Bulk insert the products (RETURNING their ids), then their sheets, specs
+    and success logs, as plain table inserts.
+    """
+    products = Product.__table__
+    product_ids = {
+        sku: product_id
+        for product_id, sku in db.execute(
+            insert(products).returning(products.c.id, products.c.sku), [row["product"] for _, row in rows]
+        )
+    }
+    sheets, specs, logs = [], [], []
+    for row_number, row in rows:
+        product_id = product_ids[row["product"]["sku"]]
+        sheets.append({"product_id": product_id, **row["sheet"]})
+        specs.extend({"product_id": product_id, **spec} for spec in row["specs"])
+        logs.append(
+            {"file_id": file_id, "product_id": product_id, "row_number": row_number, "row_status": "SUCCESS"}
+        )
+    db.execute(insert(TechnicalSheet.__table__), sheets)
+    if specs:
+        db.execute(insert(Specification.__table__), specs)
+    db.execute(insert(UploadLogProduct.__table__), logs)
+
+def _insert_chunk(db: Session, file_id: str, rows: List[Tuple[int, dict]]) -> List[Tuple[int, str]]:
+    """
+    Insert a chunk in one savepoint. If the database rejects it (e.g. a
+    missing required column), retry row by row, each in its own savepoint,
+    so only the offending rows fail; return those with their errors.
+    """
+    if not rows:
+        return []
+    try:
+        with db.begin_nested():
+            _insert_rows(db, file_id, rows)
+        return []
+    except SQLAlchemyError:
+        pass
+    failures = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                _insert_rows(db, file_id, [row])
+        except SQLAlchemyError as e:
+            failures.append((row[0], str(e)))
+    return failures
+
+def process_csv_file(db: Session, file_id: str, csv_content: bytes, chunk_rows: int = CSV_CHUNK_ROWS):
+    """
+    Import the products of a CSV upload, logging the outcome of every row.
+
+    The file is parsed in chunks of ``chunk_rows`` rows. The SKUs of each
+    chunk are checked against the database in one ``IN`` query and against
+    the rows already seen in the file, then the valid rows are bulk inserted
+    in a savepoint and the chunk is committed with its logs.
+    """
     total_rows = 0
     successful_rows = 0
     failed_rows = 0
-    
+    file_skus: Set[str] = set()
+
     try:
-        # Decode bytes to string and read with csv.reader
-        content_str = csv_content.decode('utf-8')
-        reader = csv.reader(io.StringIO(content_str))
-        
-        header = next(reader) # Skip header row
-        total_rows = 0
-
-        for i, row in enumerate(reader, start=1):
-            total_rows += 1
-            row_number = i
-            product_data = dict(zip(header, row))
-
-            try:
-                # Check for existing SKU
-                sku = product_data.get("sku")
-                if not sku:
-                    raise ValueError("SKU is a required field.")
-                
-                existing_product = db.query(Product).filter(Product.sku == sku).first()
-                if existing_product:
-                    raise ValueError(f"Product with SKU '{sku}' already exists.")
-
-                # Create Product
-                new_product = Product(
-                    product_name=product_data.get("nombre"),
-                    description=product_data.get("descripcion"),
-                    sku=sku,
-                    price=Decimal(product_data.get("precio", 0)),
-                    is_active=product_data.get("is_active", 'true').lower() == 'true'
-                )
-                db.add(new_product)
-                db.flush() # Use flush to get the ID before committing
-
-                # Create Technical Sheet
-                new_sheet = TechnicalSheet(
-                    product_id=new_product.id,
-                    user_manual_url=product_data.get("urlManual"),
-                    installation_guide_url=product_data.get("urlHojaInstalacion"),
-                    certifications=product_data.get("certificaciones")
+        for chunk in _iter_csv_chunks(csv_content, chunk_rows):
+            total_rows += len(chunk)
+            chunk_skus = {product_data.get("sku") for _, product_data in chunk} - {None, ""}
+            sku_column = Product.__table__.c.sku
+            existing_skus = set(db.scalars(select(sku_column).where(sku_column.in_(chunk_skus))))
+
+            prepared, failures = _validate_chunk(chunk, existing_skus, file_skus)
+            insert_failures = _insert_chunk(db, file_id, prepared)
+            rejected = {row_number for row_number, _ in insert_failures}
+            # A rejected row frees its SKU for a later row, as it was never created
+            file_skus -= {row["product"]["sku"] for row_number, row in prepared if row_number in rejected}
+            failures += insert_failures
+            if failures:
+                db.execute(
+                    insert(UploadLogProduct.__table__),
+                    [
+                        {"file_id": file_id, "row_number": row_number, "row_status": "FAILED", "error_message": error}
+                        for row_number, error in sorted(failures)
+                    ],
                 )
-                db.add(new_sheet)
-
-                # Create Specifications (assuming they are in the format spec_name:spec_value)
-                for key, value in product_data.items():
-                    if key.startswith("spec_") and value:
-                        spec_name = key.replace("spec_", "").replace("_", " ")
-                        new_spec = Specification(
-                            product_id=new_product.id,
-                            name=spec_name,
-                            value=value
-                        )
-                        db.add(new_spec)
-
-                create_log_entry(db, file_id, row_number, "SUCCESS", product_id=new_product.id)
-                successful_rows += 1
-                db.commit()
-
-            except Exception as e:
-                db.rollback()
-                create_log_entry(db, file_id, row_number, "FAILED", error_message=str(e))
-                failed_rows += 1
-                db.commit()
+            db.commit()
+            successful_rows += len(prepared) - len(insert_failures)
+            failed_rows += len(failures)
 
         # Final status update
         final_status = "COMPLETED"
@@ -107,12 +186,12 @@ def process_csv_file(db: Session, file_id: str, csv_content: bytes):
             final_status = "FAILED"
         elif failed_rows > 0:
             final_status = "COMPLETED_WITH_ERRORS"
-        
+
         update_upload_file_status(db, file_id, final_status)
 
     except Exception as e:
         db.rollback()
         update_upload_file_status(db, file_id, "ERROR_PROCESSING_FILE")
         # Log a general file processing error if needed
-    
+
     return total_rows, successful_rows, failed_rows
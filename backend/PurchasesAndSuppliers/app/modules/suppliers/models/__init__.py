@@ -1,7 +1,7 @@
 """Data models for supplier domain."""
 
 from .supplier import SupplierCertificate, SupplierCreate
-from .orm import Supplier
+from .orm import Supplier, SupplierSearchToken
 from .bulk_upload import (
     SupplierBulkUploadError,
     SupplierBulkUploadFile,
@@ -15,6 +15,7 @@ __all__ = [
     "SupplierCertificate",
     "SupplierCreate",
     "Supplier",
+    "SupplierSearchToken",
     "SupplierBulkUploadRow",
     "SupplierBulkUploadError",
     "SupplierBulkUploadSummary",
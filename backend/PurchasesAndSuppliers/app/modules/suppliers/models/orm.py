@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
 
 from app.core.database import Base
-from app.core.encryption import EncryptedString
+from app.core.encryption import SEARCH_TOKEN_LENGTH, EncryptedString
 
 
 class Supplier(Base):
@@ -15,7 +16,7 @@ class Supplier(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(EncryptedString(512), nullable=False)
-    id_tax = Column(EncryptedString(255), nullable=False)
+    id_tax = Column(EncryptedString(255, searchable=True), nullable=False)
     direccion = Column(EncryptedString(512), nullable=False)
     telefono = Column(EncryptedString(255), nullable=False)
     correo = Column(EncryptedString(512), nullable=False)
@@ -27,5 +28,21 @@ class Supplier(Base):
     certificado_fecha_vencimiento = Column(EncryptedString(255), nullable=True)
     certificado_url = Column(EncryptedString(512), nullable=True)
 
+    search_tokens = relationship(
+        "SupplierSearchToken", cascade="all, delete-orphan", passive_deletes=True
+    )
 
-__all__ = ["Supplier"]
+
+class SupplierSearchToken(Base):
+    """Keyed n-gram or prefix token of a supplier's searchable fields."""
+
+    __tablename__ = "supplier_search_tokens"
+    __table_args__ = (Index("ix_supplier_search_tokens_token", "token", "supplier_id"),)
+
+    supplier_id = Column(
+        Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True
+    )
+    token = Column(String(SEARCH_TOKEN_LENGTH), primary_key=True)
+
+
+__all__ = ["Supplier", "SupplierSearchToken"]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import (
     Depends,
@@ -13,13 +13,15 @@ from fastapi import (
     UploadFile,
     status,
 )
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 
 from ..models.orm import Supplier
 from ..services.bulk_upload import process_bulk_upload
-from ..services.serializers import supplier_to_dict
+from ..services.search_index import search_supplier_ids
+from ..services.serializers import supplier_page_to_dicts
 from .shared import router
 
 
@@ -52,14 +54,28 @@ async def bulk_upload_suppliers(
 def list_suppliers(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    q: Optional[str] = Query(
+        None,
+        max_length=100,
+        description=(
+            "Busca por nombre, contacto, correo o id_tax (prefijo o subcadena); "
+            "requiere una palabra de al menos 3 caracteres"
+        ),
+    ),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    query = db.query(Supplier).order_by(Supplier.id)
-    total = query.count()
     offset = (page - 1) * limit
-    suppliers = query.offset(offset).limit(limit).all()
+    if q and q.strip():
+        try:
+            page_ids, total = search_supplier_ids(db, q, offset=offset, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        selected = select(Supplier).where(Supplier.id.in_(page_ids)).order_by(Supplier.id)
+    else:
+        total = db.scalar(select(func.count()).select_from(Supplier))
+        selected = select(Supplier).order_by(Supplier.id).offset(offset).limit(limit)
 
-    data = [supplier_to_dict(supplier) for supplier in suppliers]
+    data = supplier_page_to_dicts(db, selected) if total else []
     total_pages = math.ceil(total / limit) if total else 0
 
     return {
@@ -9,6 +9,7 @@ from app.core.database import get_db
 
 from ..models.orm import Supplier
 from ..models.supplier import SupplierCreate
+from ..services.search_index import index_supplier
 from ..services.serializers import supplier_to_dict
 from .shared import router
 
@@ -30,6 +31,7 @@ def register_supplier(payload: SupplierCreate, db: Session = Depends(get_db)):
         )
 
     supplier = Supplier(**payload.to_orm_kwargs())
+    index_supplier(supplier)
     db.add(supplier)
     db.commit()
     db.refresh(supplier)
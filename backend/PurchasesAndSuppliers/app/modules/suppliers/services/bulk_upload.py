@@ -20,6 +20,7 @@ from ..models import (
     aggregate_bulk_upload_rows,
 )
 from ..models.orm import Supplier
+from .search_index import index_supplier
 from .serializers import supplier_to_dict
 
 
@@ -109,6 +110,7 @@ def persist_suppliers(
     for row in rows:
         supplier_payload = row.to_supplier_create()
         supplier = Supplier(**supplier_payload.to_orm_kwargs())
+        index_supplier(supplier)
         db.add(supplier)
         try:
             db.commit()
@@ -0,0 +1,200 @@
+"""Keyed token index used to search the encrypted supplier fields.
+
+Every searchable field is normalized (lowercase, no accents, alphanumeric
+words) and split into the 3-grams of each word plus its 1 and 2 character
+prefixes. Only an HMAC of each term is stored, in ``supplier_search_tokens``.
+A query resolves its candidates by token in SQL and walks them by id, a
+batch at a time, decrypting only the searched fields to confirm the match
+until the page is full. A query needs a word of at least 3 characters: a
+lone 1-2 character prefix would make nearly every supplier a candidate. The
+index reveals how often terms repeat, never the terms themselves.
+
+Rebuild it for suppliers created before it existed with::
+
+    python -m app.modules.suppliers.services.search_index
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import unicodedata
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.encryption import decrypt_many, raw_ciphertext, search_token
+
+from ..models.orm import Supplier, SupplierSearchToken
+
+logger = logging.getLogger(__name__)
+
+SEARCHABLE_FIELDS = ("nombre", "contacto", "correo", "id_tax")
+NGRAM_SIZE = 3
+CONFIRM_BATCH_SIZE = 100
+NON_ALPHANUMERIC_REGEX = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """Lowercase ``value``, drop accents and keep alphanumeric words."""
+
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC_REGEX.sub(" ", stripped.lower()).strip()
+
+
+def _ngrams(word: str) -> Set[str]:
+    return {f"g:{word[i:i + NGRAM_SIZE]}" for i in range(len(word) - NGRAM_SIZE + 1)}
+
+
+def _indexed_terms(word: str) -> Set[str]:
+    prefixes = {f"p:{word[:size]}" for size in range(1, min(len(word), NGRAM_SIZE - 1) + 1)}
+    return prefixes | _ngrams(word)
+
+
+def _query_terms(word: str) -> Set[str]:
+    # Short words match word prefixes; longer ones any substring of a word
+    if len(word) < NGRAM_SIZE:
+        return {f"p:{word}"}
+    return _ngrams(word)
+
+
+def supplier_search_tokens(supplier: Supplier) -> Set[str]:
+    """Return the keyed tokens of every searchable field of ``supplier``."""
+
+    terms: Set[str] = set()
+    for field in SEARCHABLE_FIELDS:
+        for word in normalize_search_text(getattr(supplier, field)).split():
+            terms |= _indexed_terms(word)
+    return {search_token(term) for term in terms}
+
+
+def index_supplier(supplier: Supplier) -> None:
+    """Sync the search tokens of ``supplier``; they are written on its next flush."""
+
+    current = {token.token: token for token in supplier.search_tokens}
+    supplier.search_tokens = [
+        current.get(token) or SupplierSearchToken(token=token)
+        for token in sorted(supplier_search_tokens(supplier))
+    ]
+
+
+def _matches(values: List[Optional[str]], words: List[str]) -> bool:
+    candidates = [word for value in values for word in normalize_search_text(value).split()]
+    return all(
+        any(
+            candidate.startswith(word) if len(word) < NGRAM_SIZE else word in candidate
+            for candidate in candidates
+        )
+        for word in words
+    )
+
+
+def search_suppliers(
+    db: Session, q: str, offset: int = 0, limit: int = 10
+) -> Tuple[List[Supplier], int]:
+    """Return one page of suppliers matching every word of ``q`` and the total.
+
+    See :func:`search_supplier_ids`, which this loads as entities.
+    """
+
+    page_ids, total = search_supplier_ids(db, q, offset=offset, limit=limit)
+    if not page_ids:
+        return [], total
+    suppliers = db.query(Supplier).filter(Supplier.id.in_(page_ids)).order_by(Supplier.id).all()
+    return suppliers, total
+
+
+def search_supplier_ids(
+    db: Session, q: str, offset: int = 0, limit: int = 10
+) -> Tuple[List[int], int]:
+    """Return the ids of one page of suppliers matching every word of ``q`` and the total.
+
+    The total counts the candidates; it is exact once the last page has been
+    reached, otherwise a rare candidate that fails confirmation is included.
+    Raises ``ValueError`` when ``q`` has no word of ``NGRAM_SIZE`` characters.
+    """
+
+    words = normalize_search_text(q).split()
+    if not words:
+        return [], 0
+    if all(len(word) < NGRAM_SIZE for word in words):
+        raise ValueError(f"La búsqueda debe incluir una palabra de al menos {NGRAM_SIZE} caracteres.")
+
+    candidates = select(Supplier.id)
+    for word in words:
+        tokens = {search_token(term) for term in _query_terms(word)}
+        candidates = candidates.where(
+            Supplier.id.in_(
+                select(SupplierSearchToken.supplier_id)
+                .where(SupplierSearchToken.token.in_(tokens))
+                .group_by(SupplierSearchToken.supplier_id)
+                .having(func.count(distinct(SupplierSearchToken.token)) == len(tokens))
+            )
+        )
+    total = db.scalar(select(func.count()).select_from(candidates.subquery()))
+
+    # Candidates share every n-gram of the query; confirm on the plaintext
+    fields = [raw_ciphertext(getattr(Supplier, field)) for field in SEARCHABLE_FIELDS]
+    page_ids: List[int] = []
+    confirmed, last_id = 0, None
+    while len(page_ids) < limit:
+        batch = select(Supplier.id, *fields).where(Supplier.id.in_(candidates))
+        if last_id is not None:
+            batch = batch.where(Supplier.id > last_id)
+        rows = db.execute(batch.order_by(Supplier.id).limit(CONFIRM_BATCH_SIZE)).all()
+        if not rows:
+            total = confirmed  # every candidate was checked
+            break
+        values = decrypt_many([value for row in rows for value in row[1:]])
+        for position, row in enumerate(rows):
+            start = position * len(fields)
+            if not _matches(values[start:start + len(fields)], words):
+                continue
+            if confirmed >= offset and len(page_ids) < limit:
+                page_ids.append(row.id)
+            confirmed += 1
+        last_id = rows[-1].id
+
+    return page_ids, total
+
+
+def reindex_suppliers(db: Session, batch_size: int = 200) -> int:
+    """Rebuild the search tokens of every supplier, one batch per commit."""
+
+    indexed, last_id = 0, 0
+    while True:
+        suppliers = (
+            db.query(Supplier)
+            .filter(Supplier.id > last_id)
+            .order_by(Supplier.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not suppliers:
+            return indexed
+        for supplier in suppliers:
+            index_supplier(supplier)
+        db.commit()
+        indexed += len(suppliers)
+        last_id = suppliers[-1].id
+        db.expunge_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the supplier search index")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    database.Base.metadata.create_all(bind=database.engine, tables=[SupplierSearchToken.__table__])
+    with database.SessionLocal() as db:
+        indexed = reindex_suppliers(db, batch_size=args.batch_size)
+    logger.info("Supplier search index rebuilt for %s suppliers", indexed)
+
+
+if __name__ == "__main__":
+    main()
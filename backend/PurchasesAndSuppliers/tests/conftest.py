@@ -40,7 +40,7 @@ SessionLocal = db_module.SessionLocal
 engine = db_module.engine
 from app.main import app  # noqa: E402
 from tests.products_test_app import Product, router as product_router  # noqa: E402
-from app.modules.suppliers.models.orm import Supplier  # noqa: E402
+from app.modules.suppliers.models.orm import Supplier, SupplierSearchToken  # noqa: E402
 
 
 def _include_router_once() -> None:
@@ -72,6 +72,7 @@ def configure_database() -> Generator[None, None, None]:
 def clean_tables() -> Generator[None, None, None]:
     yield
     with SessionLocal() as session:
+        session.query(SupplierSearchToken).delete()
         session.query(Supplier).delete()
         session.query(Product).delete()
         session.commit()
@@ -0,0 +1,108 @@
+"""Unit tests for the re-encryption of supplier columns with a new key."""
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import String, create_engine, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core import encryption, key_rotation
+from app.core.database import Base
+from app.core.encryption import blind_index_value
+from app.core.key_rotation import run_rotation
+from app.modules.suppliers.models.orm import Supplier
+
+OLD_KEY = encryption.settings.field_encryption_key
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture()
+def use_keys(monkeypatch):
+    def configure(primary, previous="", digest=""):
+        monkeypatch.setattr(encryption.settings, "field_encryption_key", primary)
+        monkeypatch.setattr(encryption.settings, "field_encryption_previous_keys", previous)
+        monkeypatch.setattr(encryption.settings, "field_digest_key", digest)
+        encryption._get_field_cipher.cache_clear()
+        encryption.get_decryption_cache().clear()
+
+    yield configure
+    encryption._get_field_cipher.cache_clear()
+    encryption.get_decryption_cache().clear()
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rotation.db'}")
+    Base.metadata.create_all(engine, tables=[Supplier.__table__])
+    with Session(engine) as session:
+        session.add_all(
+            Supplier(
+                id=number,
+                nombre=f"Proveedor {number}",
+                id_tax=f"900{number}",
+                direccion="Calle 1",
+                telefono="3000000000",
+                correo=f"proveedor{number}@example.com",
+                contacto="Ana",
+            )
+            for number in range(1, 6)
+        )
+        session.commit()
+    return engine
+
+
+def _stored_values(engine):
+    columns = [
+        type_coerce(column, String())
+        for column in Supplier.__table__.columns
+        if isinstance(column.type, encryption.EncryptedString)
+    ]
+    with engine.connect() as connection:
+        return [value for row in connection.execute(select(*columns)) for value in row if value is not None]
+
+
+def test_rotation_resumes_from_its_checkpoint(engine, use_keys, monkeypatch) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY, digest=OLD_KEY)
+    rotate_rows, calls = key_rotation._rotate_rows, []
+
+    def interrupted(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return rotate_rows(*args)
+
+    monkeypatch.setattr(key_rotation, "_rotate_rows", interrupted)
+    with pytest.raises(RuntimeError):
+        run_rotation(engine, Base.metadata, batch_size=2, workers=1)
+    monkeypatch.setattr(key_rotation, "_rotate_rows", rotate_rows)
+
+    resumed = []
+    monkeypatch.setattr(
+        key_rotation, "_rotate_rows", lambda *args: resumed.append(args[3]) or rotate_rows(*args)
+    )
+    # 5 suppliers with 6 non-null encrypted values each
+    assert run_rotation(engine, Base.metadata, batch_size=2, workers=1) == {"suppliers": 30}
+    assert [row[0] for rows in resumed for row in rows] == [3, 4, 5]  # the first batch is not redone
+
+    use_keys(NEW_KEY, digest=OLD_KEY)
+    assert all(encryption._get_field_cipher().rotate(value) is None for value in _stored_values(engine))
+    with Session(engine) as session:
+        found = session.query(Supplier).filter(Supplier.id_tax == "9004").one()
+        assert (found.nombre, found.id_tax_digest) == ("Proveedor 4", blind_index_value("9004"))
+
+
+def test_rotation_skips_values_changed_after_they_were_read(engine, use_keys, monkeypatch) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY, digest=OLD_KEY)
+    rotate_rows = key_rotation._rotate_rows
+
+    def edited_meanwhile(*args):
+        with Session(engine) as session:  # the application saves a new name under the new key
+            session.get(Supplier, 2).nombre = "Proveedor renombrado"
+            session.commit()
+        return rotate_rows(*args)
+
+    monkeypatch.setattr(key_rotation, "_rotate_rows", edited_meanwhile)
+
+    assert run_rotation(engine, Base.metadata, batch_size=10, workers=1) == {"suppliers": 29}
+    encryption.get_decryption_cache().clear()
+    with Session(engine) as session:
+        assert session.get(Supplier, 2).nombre == "Proveedor renombrado"
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Generator
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.modules.products.crud import crud
+from app.modules.products.models.bulk_products import (
+    Product,
+    Specification,
+    TechnicalSheet,
+    UploadFileProduct,
+    UploadLogProduct,
+)
+
+# The product registration tests remap the products table, so it is used directly
+PRODUCTS = Product.__table__
+HEADER = "sku,nombre,descripcion,precio,is_active,urlManual,spec_color,spec_peso_neto\n"
+
+
+@pytest.fixture(autouse=True)
+def clean_bulk_tables(db_session: Session) -> Generator[None, None, None]:
+    yield
+    for model in (UploadLogProduct, UploadFileProduct, Specification, TechnicalSheet, Product):
+        db_session.execute(model.__table__.delete())
+    db_session.commit()
+
+
+def _upload(db_session: Session) -> str:
+    return crud.create_upload_file_record(db_session, "productos.csv", "uploads/productos.csv", "PENDING").id
+
+
+def test_csv_is_imported_in_chunks_with_a_per_row_report(db_session: Session) -> None:
+    db_session.execute(
+        insert(PRODUCTS).values(sku="EXIST-1", nombre="Guantes", descripcion="Nitrilo", precio=1000, activo=True)
+    )
+    db_session.commit()
+    rows = [
+        "SKU-1,Jeringa,Desechable,1200.5,true,http://manual/1,azul,10 g",
+        ",Sin SKU,Fila inválida,100,true,,,",
+        "EXIST-1,Guantes,Repetido en la base,100,true,,,",
+        "SKU-2,Gasa,Estéril,abc,true,,,",
+        "SKU-3,Alcohol,,300,false,,,",
+        "SKU-1,Jeringa,Repetida en el archivo,100,true,,,",
+        "SKU-4,Tapabocas,Caja x 50,450,TRUE,,blanco,",
+    ]
+    content = (HEADER + "\n".join(rows) + "\n").encode("utf-8")
+    file_id = _upload(db_session)
+
+    totals = crud.process_csv_file(db_session, file_id, content, chunk_rows=3)
+
+    assert totals == (7, 3, 4)
+    logs = {
+        log.row_number: log
+        for log in db_session.query(UploadLogProduct).filter(UploadLogProduct.file_id == file_id)
+    }
+    assert {number: log.row_status for number, log in logs.items()} == {
+        1: "SUCCESS",
+        2: "FAILED",
+        3: "FAILED",
+        4: "FAILED",
+        5: "SUCCESS",
+        6: "FAILED",
+        7: "SUCCESS",
+    }
+    assert logs[2].error_message == "SKU is a required field."
+    assert logs[3].error_message == "Product with SKU 'EXIST-1' already exists."
+    assert logs[6].error_message == "Product with SKU 'SKU-1' already exists."
+
+    products = {product.sku: product for product in db_session.execute(select(PRODUCTS))}
+    assert set(products) == {"EXIST-1", "SKU-1", "SKU-3", "SKU-4"}
+    assert products["SKU-1"].precio == 1201
+    assert products["SKU-3"].activo is False and products["SKU-4"].activo is True
+    assert logs[1].product_id == products["SKU-1"].id
+    specs = {(spec.product_id, spec.name, spec.value) for spec in db_session.query(Specification)}
+    assert specs == {
+        (products["SKU-1"].id, "color", "azul"),
+        (products["SKU-1"].id, "peso neto", "10 g"),
+        (products["SKU-4"].id, "color", "blanco"),
+    }
+    sheet = db_session.query(TechnicalSheet).filter_by(product_id=products["SKU-1"].id).one()
+    assert sheet.user_manual_url == "http://manual/1"
+    assert db_session.get(UploadFileProduct, file_id).upload_status == "COMPLETED_WITH_ERRORS"
+
+
+def test_database_rejections_fail_only_their_rows(db_session: Session, monkeypatch) -> None:
+    content = (HEADER + "SKU-1,Jeringa,Desechable,100,true,,,\nSKU-2,Gasa,Estéril,200,true,,,\n").encode()
+    file_id = _upload(db_session)
+    original_insert_rows = crud._insert_rows
+
+    def reject_gasa(db, upload_id, rows):
+        for _, row in rows:
+            if row["product"]["sku"] == "SKU-2":
+                row["product"]["nombre"] = None  # violates NOT NULL
+        return original_insert_rows(db, upload_id, rows)
+
+    monkeypatch.setattr(crud, "_insert_rows", reject_gasa)
+
+    assert crud.process_csv_file(db_session, file_id, content) == (2, 1, 1)
+    failed = db_session.query(UploadLogProduct).filter_by(file_id=file_id, row_status="FAILED").one()
+    assert failed.row_number == 2
+    assert "NOT NULL" in failed.error_message
+    assert list(db_session.scalars(select(PRODUCTS.c.sku))) == ["SKU-1"]
@@ -3,7 +3,13 @@ from typing import Any
 import pytest
 from faker import Faker
 from pydantic import ValidationError
+from sqlalchemy import select
 
+from app.core import encryption
+from app.core.encryption import blind_index_value, raw_ciphertext
+from app.modules.suppliers.services import serializers
+from app.modules.suppliers.services.serializers import supplier_page_to_dicts, supplier_to_dict
+from app.modules.suppliers.models.orm import Supplier
 from app.modules.suppliers.models.supplier import (
     SupplierCertificate,
     SupplierCreate,
@@ -30,3 +36,61 @@ def test_supplier_certificate_normalization(supplier_certificate_payload: dict[s
     assert certificate.to_response() == supplier_certificate_payload
     blank_certificate = SupplierCertificate()
     assert blank_certificate.to_response() is None
+
+
+def test_supplier_id_tax_lookup_uses_the_blind_index(
+    db_session, valid_supplier_payload: dict[str, Any]
+) -> None:
+    supplier = Supplier(**SupplierCreate(**valid_supplier_payload).to_orm_kwargs())
+    db_session.add(supplier)
+    db_session.commit()
+
+    query = db_session.query(Supplier).filter(Supplier.id_tax == supplier.id_tax)
+
+    assert "suppliers.id_tax_digest = " in str(query.statement)
+    assert supplier.id_tax_digest == blind_index_value(valid_supplier_payload["id_tax"])
+    assert query.one().id == supplier.id
+
+
+def test_supplier_listing_loads_plaintext_and_names_decrypt_in_one_batch(
+    db_session, valid_supplier_payload: dict[str, Any], monkeypatch
+) -> None:
+    for number in range(3):
+        payload = {**valid_supplier_payload, "id_tax": f"900{number}", "nombre": f"Proveedor {number}"}
+        db_session.add(Supplier(**SupplierCreate(**payload).to_orm_kwargs()))
+    db_session.commit()
+    db_session.expunge_all()
+
+    data = [supplier_to_dict(supplier) for supplier in db_session.query(Supplier).order_by(Supplier.id)]
+    assert sorted(item["id_tax"] for item in data) == ["9000", "9001", "9002"]
+    assert all(item["certificado"] is None for item in data)
+    assert {type(nombre) for (nombre,) in db_session.query(Supplier.nombre)} == {str}
+
+    batches = []
+    decrypt_many = encryption.decrypt_many
+    monkeypatch.setattr(encryption, "decrypt_many", lambda values: batches.append(len(values)) or decrypt_many(values))
+    page = db_session.execute(select(Supplier.id, raw_ciphertext(Supplier.nombre))).all()
+    names = encryption.decrypt_many([row.nombre for row in page])
+    assert sorted(names) == [f"Proveedor {n}" for n in range(3)]
+    assert batches == [3]
+
+def test_supplier_page_decrypts_every_listed_field_in_one_batch(
+    db_session, valid_supplier_payload: dict[str, Any], supplier_certificate_payload: dict[str, Any], monkeypatch
+) -> None:
+    for number in range(3):
+        payload = {**valid_supplier_payload, "id_tax": f"900{number}", "nombre": f"Proveedor {number}"}
+        if number == 1:
+            payload["certificado"] = supplier_certificate_payload
+        db_session.add(Supplier(**SupplierCreate(**payload).to_orm_kwargs()))
+    db_session.commit()
+    db_session.expunge_all()
+    expected = [supplier_to_dict(supplier) for supplier in db_session.query(Supplier).order_by(Supplier.id)]
+
+    batches = []
+    decrypt_many = serializers.decrypt_many
+    monkeypatch.setattr(serializers, "decrypt_many", lambda values: batches.append(len(values)) or decrypt_many(values))
+    page = supplier_page_to_dicts(db_session, select(Supplier).order_by(Supplier.id).limit(2))
+
+    assert page == expected[:2]
+    assert page[1]["certificado"] == supplier_certificate_payload
+    assert batches == [2 * len(serializers.ENCRYPTED_FIELDS)]
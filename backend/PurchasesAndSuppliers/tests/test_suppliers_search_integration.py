@@ -0,0 +1,47 @@
+from textwrap import dedent
+
+from backend.test_client import TestClient
+
+
+def test_registered_and_uploaded_suppliers_are_searchable(
+    client: TestClient, valid_supplier_payload: dict
+) -> None:
+    registered = {
+        **valid_supplier_payload,
+        "nombre": "Suministros Médicos del Norte",
+        "contacto": "Lucía Gómez",
+        "id_tax": "900123456",
+    }
+    assert client.post("/proveedores", json=registered).status_code == 201
+
+    csv_content = dedent(
+        """
+        nombre,id_tax,direccion,telefono,correo,contacto,estado
+        Farmacéutica Andina,800555111,Calle 1,3001234567,ventas@andina.co,Pedro Ruiz,Activo
+        Médica Sur,800555222,Calle 2,3007654321,info@medicasur.co,Marta Díaz,Inactivo
+        """
+    ).strip()
+    response = client.post(
+        "/proveedores/bulk-upload",
+        files={"file": ("proveedores.csv", csv_content, "text/csv")},
+    )
+    assert response.status_code == 201
+
+    response = client.get("/proveedores", params={"q": "medic"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 2
+    assert [item["nombre"] for item in payload["data"]] == [
+        "Suministros Médicos del Norte",
+        "Médica Sur",
+    ]
+
+    by_contact = client.get("/proveedores", params={"q": "ruiz andina", "limit": 1}).json()
+    assert (by_contact["total"], by_contact["data"][0]["id_tax"]) == (1, "800555111")
+
+    by_prefix = client.get("/proveedores", params={"q": "lu norte"}).json()
+    assert [item["contacto"] for item in by_prefix["data"]] == ["Lucía Gómez"]
+    assert client.get("/proveedores", params={"q": "lu"}).status_code == 400
+
+    assert client.get("/proveedores", params={"q": "inexistente"}).json()["total"] == 0
+    assert client.get("/proveedores", params={"q": "  "}).json()["total"] == 3
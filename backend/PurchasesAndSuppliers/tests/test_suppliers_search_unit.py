@@ -0,0 +1,87 @@
+from typing import Any
+
+import pytest
+
+from app.core import encryption
+from app.core.encryption import search_token
+from app.modules.suppliers.services import search_index
+from app.modules.suppliers.models.orm import Supplier, SupplierSearchToken
+from app.modules.suppliers.models.supplier import SupplierCreate
+from app.modules.suppliers.services.search_index import (
+    normalize_search_text,
+    reindex_suppliers,
+    search_suppliers,
+    supplier_search_tokens,
+)
+
+
+def _supplier(payload: dict[str, Any], **overrides: str) -> Supplier:
+    return Supplier(**SupplierCreate(**{**payload, **overrides}).to_orm_kwargs())
+
+
+def test_normalize_search_text_drops_accents_case_and_punctuation() -> None:
+    assert normalize_search_text("  Médica-Andina S.A.S ") == "medica andina s a s"
+    assert normalize_search_text("Ana.Pérez@Ejemplo.co") == "ana perez ejemplo co"
+
+
+def test_search_tokens_are_keyed_hashes_of_prefixes_and_trigrams(
+    valid_supplier_payload: dict[str, Any]
+) -> None:
+    supplier = _supplier(valid_supplier_payload, nombre="Acme", contacto="Jo", correo="x@y.co", id_tax="1")
+
+    tokens = supplier_search_tokens(supplier)
+
+    assert {search_token("p:a"), search_token("p:ac"), search_token("g:acm"), search_token("g:cme")} <= tokens
+    assert search_token("p:jo") in tokens and search_token("g:acme") not in tokens
+    assert not any("acm" in token for token in tokens)
+
+
+def test_search_confirms_candidates_and_reindex_fills_legacy_rows(
+    db_session, valid_supplier_payload: dict[str, Any]
+) -> None:
+    # The first supplier has every trigram of "bcda" but split across fields
+    legacy = [
+        _supplier(valid_supplier_payload, nombre="Distribuidora Andina Cdab", contacto="abcd", id_tax="1"),
+        _supplier(valid_supplier_payload, nombre="Bcdab Ltda", contacto="Ana", id_tax="2"),
+        _supplier(valid_supplier_payload, nombre="Cdab", contacto="Luis", id_tax="3"),
+    ]
+    db_session.add_all(legacy)
+    db_session.commit()
+    assert search_suppliers(db_session, "andina") == ([], 0)
+
+    assert reindex_suppliers(db_session, batch_size=2) == 3
+    assert db_session.query(SupplierSearchToken).count() > 0
+
+    found, total = search_suppliers(db_session, "andin")
+    assert (total, [supplier.id_tax for supplier in found]) == (1, ["1"])
+    assert [s.id_tax for s in search_suppliers(db_session, "bcda")[0]] == ["2"]
+    assert search_suppliers(db_session, "dist luis") == ([], 0)
+    assert reindex_suppliers(db_session) == 3  # idempotent
+
+
+def test_search_pages_candidates_before_decrypting_and_rejects_short_queries(
+    db_session, client, valid_supplier_payload: dict[str, Any], monkeypatch
+) -> None:
+    db_session.add_all(
+        _supplier(valid_supplier_payload, nombre=f"Droguería {number}", contacto="Ana", id_tax=str(number))
+        for number in range(1, 26)
+    )
+    db_session.commit()
+    reindex_suppliers(db_session)
+    decrypted = []
+    decrypt_many = encryption.decrypt_many
+    monkeypatch.setattr(
+        search_index, "decrypt_many", lambda values: decrypted.extend(values) or decrypt_many(values)
+    )
+    monkeypatch.setattr(search_index, "CONFIRM_BATCH_SIZE", 4)
+
+    found, total = search_suppliers(db_session, "drogueria", offset=5, limit=5)
+
+    assert ([supplier.id_tax for supplier in found], total) == (["6", "7", "8", "9", "10"], 25)
+    assert len(decrypted) == 12 * len(search_index.SEARCHABLE_FIELDS)  # 3 batches, not 25 suppliers
+    last_page, total = search_suppliers(db_session, "drogueria ana", offset=20, limit=10)
+    assert (len(last_page), total) == (5, 25)
+
+    with pytest.raises(ValueError):
+        search_suppliers(db_session, "a dr")
+    assert client.get("/proveedores", params={"q": "a"}).status_code == 400
@@ -0,0 +1,185 @@
+"""Online backfill of the blind-index digest columns of encrypted fields.
+
+Adds any missing ``<column>_digest`` column, fills it for existing rows in
+small primary-key ordered batches (one short transaction each, so the table
+stays writable) and finally creates the digest indexes, concurrently on
+PostgreSQL::
+
+    python -m app.core.blind_index_backfill --batch-size 500 --pause 0.05
+
+The digest is the prefix already stored in front of every ciphertext, so no
+value needs to be decrypted. Re-running the command only touches rows whose
+digest is still missing. Until it has run, equality lookups match the rows
+without a digest on that stored prefix, which scans them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from typing import Dict
+
+from sqlalchemy import String, bindparam, inspect, select, text, type_coerce, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.core import database
+from app.core.encryption import DIGEST_SEPARATOR, iter_blind_indexes, keep_blind_indexes
+
+logger = logging.getLogger(__name__)
+
+
+def _existing_blind_indexes(engine: Engine, metadata):
+    inspector = inspect(engine)
+    return [
+        entry for entry in iter_blind_indexes(metadata) if inspector.has_table(entry[0].name)
+    ]
+
+
+def ensure_blind_index_columns(engine: Engine, metadata) -> list[str]:
+    """Add digest columns missing from tables created before they existed."""
+
+    added = []
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    for table, _, digest_column in _existing_blind_indexes(engine, metadata):
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        if digest_column.name in existing:
+            continue
+        column_type = digest_column.type.compile(dialect=engine.dialect)
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"ALTER TABLE {quote(table.name)} "
+                    f"ADD COLUMN {quote(digest_column.name)} {column_type}"
+                )
+            )
+        added.append(f"{table.name}.{digest_column.name}")
+    return added
+
+
+def backfill_blind_indexes(
+    engine: Engine, metadata, batch_size: int = 500, pause: float = 0.0
+) -> Dict[str, int]:
+    """Fill every empty digest column and return the rows updated per column."""
+
+    stats: Dict[str, int] = {}
+    for table, column, digest_column in _existing_blind_indexes(engine, metadata):
+        (primary_key,) = table.primary_key.columns
+        raw_value = type_coerce(column, String())  # the stored ciphertext, undecrypted
+        statement = (
+            update(table)
+            .where(primary_key == bindparam("_pk"))
+            .values({**keep_blind_indexes(table), digest_column.name: bindparam("_digest")})
+        )
+        updated, last_key = 0, None
+        while True:
+            query = (
+                select(primary_key, raw_value)
+                .where(digest_column.is_(None), column.is_not(None))
+                .order_by(primary_key)
+                .limit(batch_size)
+            )
+            if last_key is not None:
+                query = query.where(primary_key > last_key)
+            with engine.begin() as connection:
+                rows = connection.execute(query).all()
+                if not rows:
+                    break
+                digests = [
+                    {"_pk": key, "_digest": stored.split(DIGEST_SEPARATOR, 1)[0]}
+                    for key, stored in rows
+                    if DIGEST_SEPARATOR in stored
+                ]
+                if digests:
+                    connection.execute(statement, digests)
+            updated += len(digests)
+            last_key = rows[-1][0]
+            if pause:
+                time.sleep(pause)
+        stats[f"{table.name}.{digest_column.name}"] = updated
+    return stats
+
+
+def _index_is_invalid(connection, name: str) -> bool:
+    """Whether an interrupted ``CREATE INDEX CONCURRENTLY`` left ``name`` unusable."""
+    return bool(
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+    )
+
+
+def create_blind_index_indexes(engine: Engine, metadata) -> None:
+    """Create the digest indexes that do not exist yet.
+
+    On PostgreSQL they are built with ``CREATE INDEX CONCURRENTLY`` so writes
+    to the table are not blocked. That cannot run inside a transaction, so it
+    uses an autocommit connection. An invalid index left by an interrupted
+    build is dropped and built again.
+    """
+
+    if engine.dialect.name != "postgresql":
+        inspector = inspect(engine)
+        for table, _, digest_column in _existing_blind_indexes(engine, metadata):
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if digest_column.name in index.columns and index.name not in existing:
+                    with engine.begin() as connection:
+                        connection.execute(CreateIndex(index))
+        return
+
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table, _, digest_column in _existing_blind_indexes(engine, metadata):
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if digest_column.name not in index.columns:
+                    continue
+                if index.name in existing:
+                    if not _index_is_invalid(connection, index.name):
+                        continue
+                    connection.execute(text(f"DROP INDEX CONCURRENTLY {quote(index.name)}"))
+                columns = ", ".join(quote(column.name) for column in index.columns)
+                unique = "UNIQUE " if index.unique else ""
+                connection.execute(
+                    text(
+                        f"CREATE {unique}INDEX CONCURRENTLY {quote(index.name)} "
+                        f"ON {quote(table.name)} ({columns})"
+                    )
+                )
+
+
+def run_backfill(engine: Engine, metadata, batch_size: int = 500, pause: float = 0.0) -> Dict[str, int]:
+    added = ensure_blind_index_columns(engine, metadata)
+    if added:
+        logger.info("Added blind-index columns: %s", ", ".join(added))
+    stats = backfill_blind_indexes(engine, metadata, batch_size=batch_size, pause=pause)
+    create_blind_index_indexes(engine, metadata)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill blind-index digest columns")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    # Registers the tables that have searchable encrypted columns
+    from app.modules.salespeople.models import salespeople_model  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    stats = run_backfill(
+        database.engine, database.Base.metadata, batch_size=args.batch_size, pause=args.pause
+    )
+    logger.info("Blind-index backfill finished: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
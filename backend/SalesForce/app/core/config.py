@@ -20,6 +20,23 @@ class Settings(BaseSettings):
         "AAgM6AyfPJuvK2pFJu8KLd43NcSixmzKBf2eMS8kynk=",
         alias="FIELD_ENCRYPTION_KEY",
     )
+    # Comma separated keys being rotated out, still accepted for decryption
+    field_encryption_previous_keys: str = Field("", alias="FIELD_ENCRYPTION_PREVIOUS_KEYS")
+    # Key the digests and blind indexes derive from; pinned once keys rotate
+    field_digest_key: str = Field("", alias="FIELD_DIGEST_KEY")
+    # Plaintext cache shared by every request of the process: up to SIZE
+    # decrypted values (PII) stay in memory, and in any heap dump, for TTL
+    # seconds. Size it to a few listing pages; 0 disables it.
+    field_decryption_cache_size: int = Field(2000, alias="FIELD_DECRYPTION_CACHE_SIZE")
+    field_decryption_cache_ttl: float = Field(60.0, alias="FIELD_DECRYPTION_CACHE_TTL")
+    field_decryption_workers: int = Field(0, alias="FIELD_DECRYPTION_WORKERS")
+    # Blob storage for visit media; see app.modules.media.services.blob_store
+    media_storage_backend: str = Field("local", alias="MEDIA_STORAGE_BACKEND")
+    media_storage_path: str = Field("./media_store", alias="MEDIA_STORAGE_PATH")
+    # Largest file accepted by the resumable visit media uploads
+    media_upload_max_bytes: int = Field(2 * 1024**3, alias="MEDIA_UPLOAD_MAX_BYTES")
+    # Processes rendering media previews; 0 picks one per CPU, up to 4
+    media_preview_workers: int = Field(0, alias="MEDIA_PREVIEW_WORKERS")
 
     @property
     def DATABASE_URL(self) -> str:  # noqa: N802 - preserve public attribute name
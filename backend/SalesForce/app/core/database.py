@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
@@ -28,3 +30,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def database_now(db: Session) -> datetime:
+    """Return the database clock as the naive time ``server_default=func.now()`` stores.
+
+    ``TIMESTAMP`` columns keep the wall time of the database session, which is
+    not necessarily UTC, so cutoffs against them are taken from the same clock.
+    """
+
+    return db.scalar(select(func.now())).replace(tzinfo=None)
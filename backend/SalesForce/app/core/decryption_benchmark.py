@@ -0,0 +1,140 @@
+"""Throughput benchmark for the decryption of encrypted columns.
+
+Seeds a throwaway SQLite database with salespeople and times the paginated
+listing (``salespeople_service.read``) under each decryption mode::
+
+    python -m app.core.decryption_benchmark --rows 2000 --page-size 100
+
+* ``entities``: ``Salespeople`` entities loaded with the ORM, every
+  encrypted column decrypted as rows load and no decryption cache, i.e.
+  the listing before it was batched.
+* ``uncached``: the listing, which decrypts each page with one
+  ``decrypt_many`` call, with the decryption cache disabled.
+* ``cold``: the same listing with an empty cache.
+* ``warm``: the same listing again, served by the decryption cache (size it
+  with ``--cache-size``; a cache smaller than the listed values thrashes
+  and gains nothing).
+* ``names``: a view that only shows ``full_name``, selected raw and
+  decrypted a page at a time with ``decrypt_many``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import encryption
+from app.core.config import settings
+from app.core.database import Base
+from app.core.encryption import raw_ciphertext
+from app.modules.salespeople.models.salespeople_model import Salespeople
+from app.modules.salespeople.services import salespeople_service
+
+
+def _seed(session_factory, rows: int) -> None:
+    with session_factory() as db:
+        db.add_all(
+            Salespeople(
+                full_name=f"Vendedor {number}",
+                email=f"vendedor{number}@example.com",
+                hire_date=date(2024, 1, 1),
+                status="active",
+            )
+            for number in range(rows)
+        )
+        db.commit()
+
+
+def _list_all(session_factory, page_size: int) -> int:
+    listed, page = 0, 1
+    with session_factory() as db:
+        while True:
+            result = salespeople_service.read(db, page=page, limit=page_size)
+            for salesperson in result["data"]:
+                (salesperson["id"], salesperson["full_name"], salesperson["email"], salesperson["status"])
+                listed += 1
+            if page >= result["total_pages"]:
+                return listed
+            page += 1
+
+
+def _list_entities(session_factory, page_size: int) -> int:
+    listed = 0
+    with session_factory() as db:
+        query = db.query(Salespeople).order_by(Salespeople.id)
+        for offset in range(0, query.count(), page_size):
+            for salesperson in query.offset(offset).limit(page_size).all():
+                (salesperson.id, salesperson.full_name, salesperson.email, salesperson.status)
+                listed += 1
+            db.expunge_all()
+    return listed
+
+
+def _list_names(session_factory, page_size: int) -> int:
+    listed = 0
+    with session_factory() as db:
+        query = select(Salespeople.id, raw_ciphertext(Salespeople.full_name)).order_by(Salespeople.id)
+        total = db.scalar(select(func.count()).select_from(Salespeople))
+        for offset in range(0, total, page_size):
+            page = db.execute(query.offset(offset).limit(page_size)).all()
+            listed += len(encryption.decrypt_many([row.full_name for row in page]))
+    return listed
+
+
+def run_benchmark(
+    rows: int = 2000, page_size: int = 100, cache_size: Optional[int] = None
+) -> Dict[str, float]:
+    """Return the listed rows per second of every mode."""
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    _seed(session_factory, rows)
+
+    cache = encryption.get_decryption_cache()
+    cache_size = settings.field_decryption_cache_size if cache_size is None else cache_size
+    modes = [
+        ("entities", 0, _list_entities),
+        ("uncached", 0, _list_all),
+        ("cold", cache_size, _list_all),
+        ("warm", cache_size, _list_all),
+        ("names", cache_size, _list_names),
+    ]
+    results = {}
+    try:
+        for name, cache.max_entries, listing in modes:
+            if name != "warm":
+                cache.clear()
+            started = time.perf_counter()
+            listed = listing(session_factory, page_size)
+            results[name] = listed / (time.perf_counter() - started)
+    finally:
+        cache.max_entries = settings.field_decryption_cache_size
+        cache.clear()
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark encrypted salespeople listings")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--cache-size", type=int, default=None, help="defaults to FIELD_DECRYPTION_CACHE_SIZE")
+    args = parser.parse_args()
+
+    results = run_benchmark(rows=args.rows, page_size=args.page_size, cache_size=args.cache_size)
+    baseline = results["entities"]
+    for name, rows_per_second in results.items():
+        print(f"{name:<12} {rows_per_second:>10.0f} rows/s  x{rows_per_second / baseline:.1f}")
+
+
+if __name__ == "__main__":
+    main()
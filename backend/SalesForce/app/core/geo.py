@@ -0,0 +1,102 @@
+"""Geographic helpers shared by geocoding and day-route planning."""
+
+from __future__ import annotations
+
+import base64
+import math
+import os
+import re
+import threading
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+
+import googlemaps
+
+EARTH_RADIUS_METERS = 6_371_000
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+_google_client: Optional[googlemaps.Client] = None
+_google_client_lock = threading.Lock()
+
+
+def get_google_maps_client() -> googlemaps.Client:
+    """Return a process-wide Google Maps client (the key is decoded once)."""
+
+    global _google_client
+    with _google_client_lock:
+        if _google_client is None:
+            encoded_key = os.environ.get("API_KEY_GOOGLE")
+            if not encoded_key:
+                raise RuntimeError(
+                    "El servidor no está configurado correctamente (falta API Key)."
+                )
+            api_key = base64.b64decode(encoded_key).decode("utf-8")
+            _google_client = googlemaps.Client(key=api_key)
+        return _google_client
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 7) -> str:
+    """Encode a coordinate as a geohash (precision 7 is a ~150 m cell)."""
+
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def normalize_address(address: str) -> str:
+    """Lowercase, strip accents and punctuation and collapse whitespace."""
+
+    text = unicodedata.normalize("NFKD", address or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[^\w#]+", " ", text)
+    return " ".join(text.split())[:255]
+
+
+def haversine_distances(
+    origin: Tuple[float, float], points: Sequence[Tuple[float, float]]
+) -> List[float]:
+    """Great-circle distance in meters from ``origin`` to every point.
+
+    The origin terms are computed once and each point costs a handful of
+    float operations, so a full day of destinations takes microseconds.
+    """
+
+    lat0 = math.radians(origin[0])
+    lon0 = math.radians(origin[1])
+    cos_lat0 = math.cos(lat0)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+
+    distances = []
+    for latitude, longitude in points:
+        lat = radians(latitude)
+        half_dlat = (lat - lat0) / 2
+        half_dlon = (radians(longitude) - lon0) / 2
+        h = sin(half_dlat) ** 2 + cos_lat0 * cos(lat) * sin(half_dlon) ** 2
+        distances.append(2 * EARTH_RADIUS_METERS * asin(min(1.0, sqrt(h))))
+    return distances
+
+
+def format_distance(meters: int) -> str:
+    return f"{meters / 1000:.1f} km" if meters >= 1000 else f"{meters} m"
+
+
+def format_duration(seconds: int) -> str:
+    minutes = max(1, round(seconds / 60))
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} hour{'s' if hours > 1 else ''} {minutes} mins"
+    return f"{minutes} min{'s' if minutes > 1 else ''}"
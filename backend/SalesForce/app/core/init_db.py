@@ -1,4 +1,4 @@
-from app.core.database import Base, engine
+from app.core.database import Base, SessionLocal, engine
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +18,7 @@ def init_db():
     # Al importarlos, se registran en Base.metadata.
     try:
         # Importamos los modelos que tu seed_db.py utiliza
-        from app.modules.territories.models.territories_model import Territorio
+        from app.modules.territories.models.territories_model import Territorio, TerritorioClosure
         from app.modules.institutional_clients.models import InstitutionalClient
         from app.modules.salespeople.models.salespeople_model import Salespeople, Route
         from app.modules.visits.models import Visit, VisitMultimedia
@@ -39,6 +39,18 @@ def init_db():
     Base.metadata.create_all(bind=engine)
     log.info("Tablas creadas exitosamente (o ya existían).")
 
+    # La tabla de clausura se mantiene con eventos del ORM; al arrancar solo
+    # se puebla si está vacía (bases creadas antes de que existiera). Para
+    # repararla a mano: python -m app.modules.territories.services.closure_rebuild
+    from app.modules.territories.crud.territories_crud import ensure_territorios_closure
+
+    db = SessionLocal()
+    try:
+        rows = ensure_territorios_closure(db)
+        if rows:
+            log.info(f"Clausura de territorios poblada ({rows} filas).")
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     log.info("Ejecutando script de inicialización de BD directamente...")
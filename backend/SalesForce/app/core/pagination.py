@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
 import math
-from typing import Dict
+from datetime import datetime
+from typing import Dict, Tuple
 
 from fastapi import HTTPException, status
 
@@ -29,3 +32,24 @@ def build_pagination_metadata(total: int, page: int, limit: int) -> Dict[str, in
         "limit": limit,
         "total_pages": total_pages,
     }
+
+
+def encode_keyset_cursor(created_at: datetime, item_id: str) -> str:
+    """Encode the last ``(created_at, id)`` pair of a page as an opaque cursor."""
+
+    raw = f"{created_at.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by :func:`encode_keyset_cursor`."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), item_id
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor is not valid",
+        ) from exc
@@ -11,6 +11,7 @@ from app.modules.visits.routes import router as visits_router
 from app.modules.institutional_clients.routes import router as institutional_clients_router
 from app.modules.territories.routes import territories_routes
 from app.modules.orders.routes import router as orders_router
+from app.modules.orders.services import alert_dispatcher, order_event_broadcaster
 
 app = FastAPI()
 
@@ -36,6 +37,15 @@ def healthcheck():
         return {"status": "error", "db": False}
 
 
+@app.get("/metrics", tags=["health"])
+def metrics():
+    """Expose in-process queue depths for monitoring."""
+    return {
+        "security_alerts": alert_dispatcher.stats(),
+        "order_events": order_event_broadcaster.stats(),
+    }
+
+
 @app.get("/")
 def read_root():
     return {"message": "Hello from FastAPI on Cloud Run!"}
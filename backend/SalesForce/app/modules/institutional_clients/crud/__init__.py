@@ -7,6 +7,12 @@ from .crud_institutional_client import (
     update_institutional_client,
     list_clients_by_territories_paginated,
     list_clients_by_list_id_paginated,
+    list_clients_by_territory_subtree,
+    count_clients_by_territory_subtree,
+    list_clients_pending_geocoding,
+    get_geocode_cache_entries,
+    save_geocoding_results,
+    get_client_route_inputs,
 )
 
 __all__ = [
@@ -18,4 +24,10 @@ __all__ = [
     "update_institutional_client",
     "list_clients_by_territories_paginated",
     "list_clients_by_list_id_paginated",
+    "list_clients_by_territory_subtree",
+    "count_clients_by_territory_subtree",
+    "list_clients_pending_geocoding",
+    "get_geocode_cache_entries",
+    "save_geocoding_results",
+    "get_client_route_inputs",
 ]
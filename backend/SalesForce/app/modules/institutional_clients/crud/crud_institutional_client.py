@@ -1,12 +1,16 @@
-from typing import List,Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session, aliased
 
-from app.modules.institutional_clients.models import InstitutionalClient
+from app.modules.institutional_clients.models import GeocodeCache, InstitutionalClient
 from app.modules.institutional_clients.schemas import (
     InstitutionalClientCreate,
     InstitutionalClientUpdate,
 )
+from app.modules.territories.models.territories_model import TerritorioClosure
+from app.modules.territories.schemas.territories_schemas import TerritoryType
 
 
 def list_institutional_clients_paginated(
@@ -61,6 +65,8 @@ def create_institutional_client(db: Session, client: InstitutionalClientCreate):
         justificacion_acceso=client.justificacion_acceso,
         certificado_camara=client.certificado_camara,
         territory_id=client.territory_id,
+        latitude=client.latitude,
+        longitude=client.longitude,
     )
     db.add(db_client)
     db.commit()
@@ -77,6 +83,13 @@ def update_institutional_client(
         return None
 
     update_data = client_update.model_dump(exclude_unset=True)
+    address_changed = any(
+        field in update_data and update_data[field] != getattr(db_client, field)
+        for field in ("direccion", "territory_id")
+    )
+    if address_changed and "latitude" not in update_data:
+        # Stale coordinates: the geocoding job will resolve the new address
+        update_data.update(latitude=None, longitude=None)
     for field, value in update_data.items():
         setattr(db_client, field, value)
 
@@ -132,3 +145,163 @@ def list_clients_by_list_id_paginated(
     items = query.offset(skip).limit(limit).all()
 
     return {"items": items, "total": total}
+
+
+def list_clients_by_territory_subtree(
+    db: Session,
+    territory_id: str,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None,
+):
+    """List clients located anywhere under a territory using keyset pagination.
+
+    The subtree is resolved through the territory closure table, so the cost
+    does not depend on how many descendants the territory has.
+    """
+    query = (
+        db.query(InstitutionalClient)
+        .join(
+            TerritorioClosure,
+            TerritorioClosure.descendant_id == InstitutionalClient.territory_id,
+        )
+        .filter(TerritorioClosure.ancestor_id == territory_id)
+    )
+
+    if after is not None:
+        created_at, client_id = after
+        query = query.filter(
+            or_(
+                InstitutionalClient.created_at < created_at,
+                and_(
+                    InstitutionalClient.created_at == created_at,
+                    InstitutionalClient.id < client_id,
+                ),
+            )
+        )
+
+    items = (
+        query.order_by(
+            InstitutionalClient.created_at.desc(), InstitutionalClient.id.desc()
+        )
+        .limit(limit + 1)
+        .all()
+    )
+
+    return {"items": items[:limit], "has_more": len(items) > limit}
+
+
+def count_clients_by_territory_subtree(db: Session, territory_id: str):
+    """Count clients under a territory, in total and per direct child territory."""
+    total = (
+        db.query(func.count(InstitutionalClient.id))
+        .join(
+            TerritorioClosure,
+            TerritorioClosure.descendant_id == InstitutionalClient.territory_id,
+        )
+        .filter(TerritorioClosure.ancestor_id == territory_id)
+        .scalar()
+    )
+
+    child = aliased(TerritorioClosure)
+    member = aliased(TerritorioClosure)
+    rows = (
+        db.query(child.descendant_id, func.count(InstitutionalClient.id))
+        .select_from(child)
+        .join(member, member.ancestor_id == child.descendant_id)
+        .join(
+            InstitutionalClient,
+            InstitutionalClient.territory_id == member.descendant_id,
+        )
+        .filter(child.ancestor_id == territory_id, child.depth == 1)
+        .group_by(child.descendant_id)
+        .all()
+    )
+
+    by_child: Dict[str, int] = {child_id: count for child_id, count in rows}
+    return {"total": total or 0, "by_child": by_child}
+
+
+def list_clients_pending_geocoding(
+    db: Session, limit: int, after_id: Optional[str] = None
+):
+    """
+    List clients without coordinates, ordered by id, together with the city
+    and country names resolved from the territory closure table.
+    """
+    country = aliased(TerritorioClosure)
+    city = aliased(TerritorioClosure)
+    query = (
+        db.query(
+            InstitutionalClient.id,
+            InstitutionalClient.direccion,
+            city.ancestor_name.label("city"),
+            country.ancestor_name.label("country"),
+        )
+        .outerjoin(
+            city,
+            and_(
+                city.descendant_id == InstitutionalClient.territory_id,
+                city.ancestor_type == TerritoryType.CITY.value,
+            ),
+        )
+        .outerjoin(
+            country,
+            and_(
+                country.descendant_id == InstitutionalClient.territory_id,
+                country.ancestor_type == TerritoryType.COUNTRY.value,
+            ),
+        )
+        .filter(InstitutionalClient.latitude.is_(None))
+    )
+    if after_id is not None:
+        query = query.filter(InstitutionalClient.id > after_id)
+    return query.order_by(InstitutionalClient.id).limit(limit).all()
+
+
+def get_geocode_cache_entries(
+    db: Session, address_keys: List[str]
+) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Return cached geocoding results for the given normalized addresses."""
+    if not address_keys:
+        return {}
+    rows = (
+        db.query(GeocodeCache)
+        .filter(GeocodeCache.address_key.in_(address_keys))
+        .all()
+    )
+    return {row.address_key: (row.latitude, row.longitude) for row in rows}
+
+
+def save_geocoding_results(
+    db: Session, cache_entries: List[dict], client_coordinates: List[dict]
+) -> None:
+    """
+    Store new geocode cache entries and the coordinates of a batch of clients
+    in one transaction (one bulk UPDATE by primary key).
+    """
+    if cache_entries:
+        db.execute(GeocodeCache.__table__.insert(), cache_entries)
+    if client_coordinates:
+        db.execute(update(InstitutionalClient), client_coordinates)
+    db.commit()
+
+
+
+def get_client_route_inputs(db: Session, client_ids: List[str]):
+    """
+    Return the fields a day route depends on (address, territory and
+    coordinates) for the given clients, without loading whole rows.
+    """
+    if not client_ids:
+        return []
+    return (
+        db.query(
+            InstitutionalClient.id,
+            InstitutionalClient.direccion,
+            InstitutionalClient.territory_id,
+            InstitutionalClient.latitude,
+            InstitutionalClient.longitude,
+        )
+        .filter(InstitutionalClient.id.in_(client_ids))
+        .all()
+    )
@@ -1,3 +1,4 @@
 from .institutional_client_model import InstitutionalClient
+from .geocode_cache_model import GeocodeCache
 
-__all__ = ["InstitutionalClient"]
+__all__ = ["InstitutionalClient", "GeocodeCache"]
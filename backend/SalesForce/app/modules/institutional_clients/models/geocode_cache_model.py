@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, String, TIMESTAMP, func
+
+from app.core.database import Base
+
+
+class GeocodeCache(Base):
+    """Geocoding results keyed by normalized address (shared by all clients)."""
+
+    __tablename__ = "geocode_cache"
+
+    address_key = Column(String(255), primary_key=True)
+    latitude = Column(Float, nullable=True)  # NULL: the provider found no match
+    longitude = Column(Float, nullable=True)
+    geocoded_at = Column(TIMESTAMP, server_default=func.now())
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, TIMESTAMP, func
+from sqlalchemy import Column, Float, Index, String, Text, TIMESTAMP, func
 
 from app.core.database import Base
 
@@ -17,5 +17,16 @@ class InstitutionalClient(Base):
     justificacion_acceso = Column(Text, nullable=True)
     certificado_camara = Column(Text, nullable=True)  # base64 or file path
     territory_id = Column(String(36), nullable=True, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index(
+            "ix_institutional_clients_territory_created",
+            "territory_id",
+            "created_at",
+            "id",
+        ),
+    )
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import Optional, Union
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
@@ -8,6 +9,7 @@ from app.modules.institutional_clients.schemas import (
     InstitutionalClient,
     InstitutionalClientCreate,
     InstitutionalClientsResponse,
+    InstitutionalClientsSubtreeResponse,
     InstitutionalClientUpdate,
     TerritoriesQuery,
     InstitutionalContactClientResponse,
@@ -21,6 +23,7 @@ from app.modules.institutional_clients.services import (
     update,
     list_clients_by_territories,
     list_clients_territories,
+    list_clients_by_territory_subtree_service,
     verify_tax_identification,
 )
 
@@ -35,14 +38,28 @@ def create_institutional_client_endpoint(
     return create(db, payload)
 
 
-@router.get("/", response_model=InstitutionalClientsResponse)
+@router.get(
+    "/",
+    response_model=Union[InstitutionalClientsResponse, InstitutionalClientsSubtreeResponse],
+)
 def list_institutional_clients_endpoint(
     page: int = 1,
     limit: int = 10,
     search: Optional[str] = None,
+    territory_subtree: Optional[UUID] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """List all institutional clients with pagination and optional search."""
+    """List all institutional clients with pagination and optional search.
+
+    With ``territory_subtree`` only clients located in that territory or any
+    of its descendants are returned, paginated with ``cursor`` instead of
+    ``page`` and with client counts per direct child territory.
+    """
+    if territory_subtree is not None:
+        return list_clients_by_territory_subtree_service(
+            db, territory_id=territory_subtree, cursor=cursor, limit=limit
+        )
     return list_clients(db, page=page, limit=limit, search=search)
 
 @router.get("/cartera", response_model=InstitutionalContactClientResponse)
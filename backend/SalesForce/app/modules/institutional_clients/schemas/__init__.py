@@ -3,6 +3,8 @@ from .institutional_client import (
     InstitutionalClientCreate,
     InstitutionalClientUpdate,
     InstitutionalClientsResponse,
+    InstitutionalClientsSubtreeResponse,
+    TerritoryClientCount,
     TerritoriesQuery,
     InstitutionalContactClient,
     InstitutionalContactClientResponse,
@@ -14,6 +16,8 @@ __all__ = [
     "InstitutionalClientCreate",
     "InstitutionalClientUpdate",
     "InstitutionalClientsResponse",
+    "InstitutionalClientsSubtreeResponse",
+    "TerritoryClientCount",
     "TerritoriesQuery",
     "InstitutionalContactClient",
     "InstitutionalContactClientResponse",
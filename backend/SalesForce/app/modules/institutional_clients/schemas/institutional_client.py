@@ -14,6 +14,8 @@ class InstitutionalClientBase(BaseModel):
     justificacion_acceso: Optional[str] = None
     certificado_camara: Optional[str] = None  # base64 encoded or file path
     territory_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class InstitutionalClientCreate(InstitutionalClientBase):
@@ -29,6 +31,8 @@ class InstitutionalClientUpdate(BaseModel):
     justificacion_acceso: Optional[str] = None
     certificado_camara: Optional[str] = None
     territory_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class InstitutionalClient(InstitutionalClientBase):
@@ -46,6 +50,24 @@ class InstitutionalClientsResponse(BaseModel):
     limit: int
     total_pages: int
 
+class TerritoryClientCount(BaseModel):
+    """Number of clients located under one direct child territory."""
+
+    territory_id: str
+    name: str
+    total: int
+
+
+class InstitutionalClientsSubtreeResponse(BaseModel):
+    """Cursor-paginated clients of a territory subtree."""
+
+    data: List[InstitutionalClient]
+    total: int
+    limit: int
+    next_cursor: Optional[str] = None
+    territory_counts: List[TerritoryClientCount] = []
+
+
 class TerritoriesQuery(BaseModel):
     territories: List[str]
 
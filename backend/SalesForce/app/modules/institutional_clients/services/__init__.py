@@ -6,6 +6,7 @@ from .institutional_client_service import (
     update,
     list_clients_by_territories,
     list_clients_territories,
+    list_clients_by_territory_subtree_service,
     verify_tax_identification,
 )
 
@@ -17,5 +18,6 @@ __all__ = [
     "update",
     "list_clients_by_territories",
     "list_clients_territories",
+    "list_clients_by_territory_subtree_service",
     "verify_tax_identification",
 ]
@@ -0,0 +1,173 @@
+"""Batch geocoding of institutional client addresses.
+
+Run it periodically (or after bulk imports) so day routes can work from
+stored coordinates instead of sending free-text addresses to Google:
+
+    python -m app.modules.institutional_clients.services.geocoding_service
+
+Results are cached by normalized address, so clients sharing an address and
+re-runs never spend provider quota twice.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+from typing import Dict, Optional, Protocol, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.geo import get_google_maps_client, normalize_address
+from app.modules.institutional_clients.crud import (
+    get_geocode_cache_entries,
+    list_clients_pending_geocoding,
+    save_geocoding_results,
+)
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+
+class GeocodingProvider(Protocol):
+    """Resolves one free-text address to coordinates (``None`` if not found)."""
+
+    def geocode(self, address: str) -> Optional[Coordinates]:
+        ...
+
+
+class GoogleGeocodingProvider:
+    """Geocoding through the Google Maps Geocoding API."""
+
+    def geocode(self, address: str) -> Optional[Coordinates]:
+        results = get_google_maps_client().geocode(address)
+        if not results:
+            return None
+        location = results[0]["geometry"]["location"]
+        return location["lat"], location["lng"]
+
+
+class StubGeocodingProvider:
+    """Offline provider for tests and local development.
+
+    Known addresses (matched after normalization) return their configured
+    coordinates; any other address gets a deterministic point near Bogotá.
+    """
+
+    def __init__(self, locations: Optional[Dict[str, Optional[Coordinates]]] = None):
+        self.locations = {normalize_address(k): v for k, v in (locations or {}).items()}
+        self.calls: list[str] = []
+
+    def geocode(self, address: str) -> Optional[Coordinates]:
+        self.calls.append(address)
+        key = normalize_address(address)
+        if key in self.locations:
+            return self.locations[key]
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        return (
+            4.60 + digest[0] / 255 * 0.15,
+            -74.15 + digest[1] / 255 * 0.10,
+        )
+
+
+def default_geocoding_provider() -> GeocodingProvider:
+    if os.environ.get("GEOCODING_PROVIDER", "google").lower() == "stub":
+        return StubGeocodingProvider()
+    return GoogleGeocodingProvider()
+
+
+def build_client_address(direccion: str, city: Optional[str], country: Optional[str]) -> str:
+    """Compose the address string sent to the provider."""
+    return ", ".join(part for part in (direccion, city, country) if part)
+
+
+def geocode_pending_clients(
+    db: Session,
+    provider: Optional[GeocodingProvider] = None,
+    batch_size: int = 100,
+) -> Dict[str, int]:
+    """
+    Fill in latitude/longitude for every client that has none.
+
+    Clients are read in id-ordered batches; each batch needs one cache lookup,
+    provider calls only for unseen addresses and one bulk update.
+    """
+    provider = provider or default_geocoding_provider()
+    stats = {
+        "clients": 0,
+        "geocoded": 0,
+        "cache_hits": 0,
+        "provider_calls": 0,
+        "not_found": 0,
+        "failed": 0,
+    }
+    after_id = None
+
+    while True:
+        clients = list_clients_pending_geocoding(db, limit=batch_size, after_id=after_id)
+        if not clients:
+            break
+        after_id = clients[-1].id
+        stats["clients"] += len(clients)
+
+        addresses = {
+            client.id: build_client_address(client.direccion, client.city, client.country)
+            for client in clients
+        }
+        keys = {client_id: normalize_address(address) for client_id, address in addresses.items()}
+        known = get_geocode_cache_entries(db, list(set(keys.values())))
+        stats["cache_hits"] += sum(1 for key in keys.values() if key in known)
+
+        cache_entries = []
+        for client_id, key in keys.items():
+            if key in known:
+                continue
+            try:
+                coordinates = provider.geocode(addresses[client_id])
+            except Exception:
+                # Leave it pending; the next run retries it
+                logger.exception("Geocoding failed for client %s", client_id)
+                stats["failed"] += 1
+                continue
+            stats["provider_calls"] += 1
+            known[key] = coordinates or (None, None)
+            cache_entries.append(
+                {"address_key": key, "latitude": known[key][0], "longitude": known[key][1]}
+            )
+
+        client_coordinates = []
+        for client_id, key in keys.items():
+            if key not in known:
+                continue
+            latitude, longitude = known[key]
+            if latitude is None:
+                stats["not_found"] += 1
+                continue
+            client_coordinates.append(
+                {"id": client_id, "latitude": latitude, "longitude": longitude}
+            )
+        stats["geocoded"] += len(client_coordinates)
+        save_geocoding_results(db, cache_entries, client_coordinates)
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Geocode institutional clients")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = database.SessionLocal()
+    try:
+        stats = geocode_pending_clients(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    logger.info("Geocoding finished: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import re
 from typing import List, Dict, Any, Optional
+from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 import httpx
 
-from app.core.pagination import build_pagination_metadata, get_pagination_offset
+from app.core.pagination import (
+    build_pagination_metadata,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    get_pagination_offset,
+)
 from app.modules.institutional_clients.crud import (
     create_institutional_client,
     delete_institutional_client,
@@ -15,16 +21,21 @@ from app.modules.institutional_clients.crud import (
     update_institutional_client,
     list_clients_by_territories_paginated,
     list_clients_by_list_id_paginated,
+    list_clients_by_territory_subtree,
+    count_clients_by_territory_subtree,
 )
 from app.modules.institutional_clients.schemas import (
     InstitutionalClient,
     InstitutionalClientCreate,
     InstitutionalClientsResponse,
+    InstitutionalClientsSubtreeResponse,
+    TerritoryClientCount,
     InstitutionalClientUpdate,
     InstitutionalContactClient,
     InstitutionalContactClientResponse,
     TaxIdVerificationResponse,
 )
+from app.modules.territories.crud.territories_crud import get_territorio
 
 TERRITORY_SERVICE_URL = "http://localhost:8004"
 
@@ -177,6 +188,49 @@ def list_clients_by_territories(
     return InstitutionalClientsResponse(data=clients, **metadata)
 
 
+def list_clients_by_territory_subtree_service(
+    db: Session, territory_id: UUID, cursor: Optional[str] = None, limit: int = 10
+) -> InstitutionalClientsSubtreeResponse:
+    """List clients under a territory and all its descendants (cursor-paginated)."""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be greater than zero")
+
+    territory = get_territorio(db, territory_id)
+    if not territory:
+        raise HTTPException(
+            status_code=404, detail=f"Territory {territory_id} not found"
+        )
+
+    after = decode_keyset_cursor(cursor) if cursor else None
+    result = list_clients_by_territory_subtree(
+        db, territory_id=str(territory_id), limit=limit, after=after
+    )
+    counts = count_clients_by_territory_subtree(db, territory_id=str(territory_id))
+
+    items = result["items"]
+    next_cursor = None
+    if result["has_more"] and items:
+        last = items[-1]
+        next_cursor = encode_keyset_cursor(last.created_at, last.id)
+
+    territory_counts = [
+        TerritoryClientCount(
+            territory_id=str(child.id),
+            name=child.name,
+            total=counts["by_child"].get(str(child.id), 0),
+        )
+        for child in territory.children
+    ]
+
+    return InstitutionalClientsSubtreeResponse(
+        data=[InstitutionalClient.model_validate(item) for item in items],
+        total=counts["total"],
+        limit=limit,
+        next_cursor=next_cursor,
+        territory_counts=territory_counts,
+    )
+
+
 def verify_tax_identification(
     db: Session, tax_id: str
 ) -> TaxIdVerificationResponse:
@@ -0,0 +1,3 @@
+from .crud_derivatives import add_media_derivative, get_derivative_variants, get_media_derivative
+
+__all__ = ["add_media_derivative", "get_derivative_variants", "get_media_derivative"]
@@ -0,0 +1,35 @@
+from typing import Optional, Set
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.media.models import MediaDerivative
+
+
+def get_media_derivative(db: Session, source_hash: str, variant: str) -> Optional[MediaDerivative]:
+    return db.get(MediaDerivative, (source_hash, variant))
+
+
+def get_derivative_variants(db: Session, source_hash: str) -> Set[str]:
+    """Variants already rendered for an original."""
+    rows = db.query(MediaDerivative.variant).filter(MediaDerivative.source_hash == source_hash)
+    return {variant for (variant,) in rows}
+
+
+def add_media_derivative(
+    db: Session, source_hash: str, variant: str, content_hash: str, media_type: str, size: int
+) -> None:
+    """Record a rendered preview; a concurrent worker may have recorded it first."""
+    try:
+        with db.begin_nested():
+            db.add(
+                MediaDerivative(
+                    source_hash=source_hash,
+                    variant=variant,
+                    content_hash=content_hash,
+                    media_type=media_type,
+                    size=size,
+                )
+            )
+    except IntegrityError:
+        pass  # same content, same preview
@@ -0,0 +1,3 @@
+from .media_derivative_model import MediaDerivative
+
+__all__ = ["MediaDerivative"]
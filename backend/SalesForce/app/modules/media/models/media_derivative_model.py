@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, func
+
+from app.core.database import Base
+
+
+class MediaDerivative(Base):
+    """Preview of a stored media file, shared by every row with the same content."""
+
+    __tablename__ = "media_derivatives"
+
+    source_hash = Column(String(64), primary_key=True)  # content hash of the original
+    variant = Column(String(20), primary_key=True)  # key of PREVIEW_SIZES
+    content_hash = Column(String(64), nullable=False)  # the preview in the media store
+    media_type = Column(String(100), nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
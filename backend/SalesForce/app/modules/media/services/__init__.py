@@ -0,0 +1,22 @@
+from .blob_store import (
+    BLOB_STORE_BACKENDS,
+    BlobStore,
+    BlobWriter,
+    LocalBlobStore,
+    StoredBlob,
+    get_blob_store,
+)
+from .streaming import media_response, parse_byte_range
+from .uploads import save_upload
+
+__all__ = [
+    "BLOB_STORE_BACKENDS",
+    "BlobStore",
+    "BlobWriter",
+    "LocalBlobStore",
+    "StoredBlob",
+    "get_blob_store",
+    "media_response",
+    "parse_byte_range",
+    "save_upload",
+]
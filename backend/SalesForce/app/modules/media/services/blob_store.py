@@ -0,0 +1,172 @@
+"""Content-addressed blob storage for visit media.
+
+Blobs are addressed by the SHA-256 of their content, so identical uploads
+share one stored copy and the database only keeps the hash. Writes go to a
+temporary file, hashing each chunk as it is written, and are moved into
+place once complete, so readers never see a partial blob and memory stays
+bounded by the chunk size.
+
+The backend is chosen with ``MEDIA_STORAGE_BACKEND``; new backends register
+a factory in ``BLOB_STORE_BACKENDS``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, NamedTuple, Optional
+
+from app.core.config import settings
+
+CONTENT_HASH_REGEX = re.compile(r"^[0-9a-f]{64}$")
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredBlob(NamedTuple):
+    content_hash: str
+    size: int
+
+
+class BlobWriter(ABC):
+    """Receives a blob chunk by chunk; ``commit`` stores it and returns its address."""
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    def commit(self) -> StoredBlob: ...
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.abort()  # no-op once committed
+
+
+class BlobStore(ABC):
+    """Storage backend interface."""
+
+    @abstractmethod
+    def writer(self) -> BlobWriter: ...
+
+    @abstractmethod
+    def open(self, content_hash: str) -> BinaryIO:
+        """Open a stored blob for binary reading."""
+
+    @abstractmethod
+    def exists(self, content_hash: str) -> bool: ...
+
+    @abstractmethod
+    def size(self, content_hash: str) -> int: ...
+
+    @abstractmethod
+    def delete(self, content_hash: str) -> None: ...
+
+    def put_chunks(self, chunks: Iterable[bytes]) -> StoredBlob:
+        with self.writer() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+            return writer.commit()
+
+    def put_bytes(self, data: bytes) -> StoredBlob:
+        return self.put_chunks([data])
+
+    def read_bytes(self, content_hash: str) -> bytes:
+        with self.open(content_hash) as handle:
+            return handle.read()
+
+
+def validate_content_hash(content_hash: str) -> str:
+    if not CONTENT_HASH_REGEX.match(content_hash or ""):
+        raise ValueError(f"Invalid content hash: {content_hash!r}")
+    return content_hash
+
+
+class _LocalBlobWriter(BlobWriter):
+    def __init__(self, store: "LocalBlobStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._file = tempfile.NamedTemporaryFile(dir=store.tmp_dir, delete=False)
+        self._done = False
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self._size += len(chunk)
+
+    def commit(self) -> StoredBlob:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        content_hash = self._hash.hexdigest()
+        target = self._store.path(content_hash)
+        if target.exists():
+            os.unlink(self._file.name)  # same content already stored
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._file.name, target)
+        self._done = True
+        return StoredBlob(content_hash, self._size)
+
+    def abort(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        try:
+            os.unlink(self._file.name)
+        except FileNotFoundError:
+            pass
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under ``root``, fanned out as ``ab/cd/abcd...``."""
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, content_hash: str) -> Path:
+        validate_content_hash(content_hash)
+        return self.root / content_hash[:2] / content_hash[2:4] / content_hash
+
+    def writer(self) -> BlobWriter:
+        return _LocalBlobWriter(self)
+
+    def open(self, content_hash: str) -> BinaryIO:
+        return open(self.path(content_hash), "rb")
+
+    def exists(self, content_hash: str) -> bool:
+        return self.path(content_hash).is_file()
+
+    def size(self, content_hash: str) -> int:
+        return self.path(content_hash).stat().st_size
+
+    def delete(self, content_hash: str) -> None:
+        self.path(content_hash).unlink(missing_ok=True)
+
+
+BLOB_STORE_BACKENDS: Dict[str, Callable[[], BlobStore]] = {
+    "local": lambda: LocalBlobStore(settings.media_storage_path),
+}
+
+
+@lru_cache(maxsize=1)
+def get_blob_store(backend: Optional[str] = None) -> BlobStore:
+    """Return the configured blob store (cached; ``cache_clear`` after reconfiguring)."""
+    name = backend or settings.media_storage_backend
+    try:
+        factory = BLOB_STORE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown media storage backend: {name!r}") from None
+    return factory()
@@ -0,0 +1,252 @@
+"""
+Bulk export of visit media for audits.
+
+Exports every file of the visits in a date range, either to a directory::
+
+    python -m app.modules.media.services.media_export --from 2025-01-01 --to 2025-03-31 --output ./auditoria
+
+or as a single ZIP::
+
+    python -m app.modules.media.services.media_export --from 2025-01-01 --to 2025-03-31 --zip auditoria.zip
+
+The rows come through a server-side cursor, a batch at a time. Only legacy
+rows that still keep their bytes in the database carry file content in the
+query. In directory mode a thread pool copies the files out of the media
+store, with a bounded number in flight. Re-running over the same directory
+skips the files already there with the same SHA-256. ``manifest.csv``
+lists every file with its visit, path, size and hash.
+
+The ZIP is written entry by entry in chunks, never holding a whole file in
+memory. Photos and videos are already compressed, so entries are stored
+as is.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Set
+
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.modules.visits.models import Visit, VisitMultimedia
+from .blob_store import CHUNK_SIZE, BlobStore, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_FIELDS = [
+    "media_id", "visit_id", "visit_date", "file_name", "file_type", "path", "size", "sha256", "status",
+]
+# status of each manifest line
+EXPORTED, SKIPPED, MISSING = "exported", "skipped", "missing"
+
+UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def iter_visit_media(db: Session, date_from: date, date_to: date, batch_size: int = 200) -> Iterator:
+    """Stream the media of the visits held between ``date_from`` and ``date_to`` (inclusive)."""
+    stmt = (
+        select(
+            VisitMultimedia.id,
+            VisitMultimedia.visit_id,
+            VisitMultimedia.file_name,
+            VisitMultimedia.file_type,
+            VisitMultimedia.file_size,
+            VisitMultimedia.content_hash,
+            # Bytes only for legacy rows; the rest are read from the media store
+            case(
+                (VisitMultimedia.content_hash.is_(None), VisitMultimedia.inline_data), else_=None
+            ).label("inline_data"),
+            Visit.hora,
+        )
+        .join(Visit, Visit.id == VisitMultimedia.visit_id)
+        .where(
+            Visit.hora >= datetime.combine(date_from, time.min),
+            Visit.hora < datetime.combine(date_to + timedelta(days=1), time.min),
+        )
+        .order_by(Visit.hora, VisitMultimedia.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    yield from db.execute(stmt)
+
+
+def export_path(row) -> str:
+    """Relative path of a file in the export: ``<visit date>/<visit id>/<media id>-<name>``."""
+    name = UNSAFE_CHARACTERS.sub("", row.file_name or "").lstrip(".") or "archivo"
+    return f"{row.hora:%Y-%m-%d}/{row.visit_id}/{row.id}-{name}"
+
+
+def _manifest_line(row, path: str, size: int, sha256: Optional[str], status: str) -> dict:
+    return {
+        "media_id": row.id,
+        "visit_id": row.visit_id,
+        "visit_date": f"{row.hora:%Y-%m-%d}",
+        "file_name": row.file_name,
+        "file_type": row.file_type,
+        "path": path,
+        "size": size,
+        "sha256": sha256 or "",
+        "status": status,
+    }
+
+
+def _open_source(row, store: BlobStore) -> BinaryIO:
+    if row.content_hash is not None:
+        return store.open(row.content_hash)
+    return io.BytesIO(row.inline_data or b"")
+
+
+def _source_hash(row) -> str:
+    return row.content_hash or hashlib.sha256(row.inline_data or b"").hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(path: Path) -> Dict[str, str]:
+    """``path -> sha256`` of the files a previous export wrote."""
+    if not path.exists():
+        return {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        return {line["path"]: line["sha256"] for line in csv.DictReader(handle) if line["status"] != MISSING}
+
+
+def _export_file(row, output: Path, store: BlobStore, previous: Dict[str, str]) -> dict:
+    """Copy one file into ``output`` unless the same content is already there."""
+    relative = export_path(row)
+    target = output / relative
+    sha256 = _source_hash(row)
+    if target.exists() and (previous.get(relative) == sha256 or _file_sha256(target) == sha256):
+        return _manifest_line(row, relative, target.stat().st_size, sha256, SKIPPED)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        source = _open_source(row, store)
+    except FileNotFoundError:
+        logger.warning("Media %s is missing from the media store", row.id)
+        return _manifest_line(row, relative, 0, None, MISSING)
+    # Written next to the target and renamed, so an interrupted run leaves no partial file
+    with source, tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as partial:
+        try:
+            shutil.copyfileobj(source, partial, CHUNK_SIZE)
+        except BaseException:
+            os.unlink(partial.name)
+            raise
+    os.replace(partial.name, target)
+    return _manifest_line(row, relative, target.stat().st_size, sha256, EXPORTED)
+
+
+def export_media_to_directory(
+    db: Session,
+    output: Path,
+    date_from: date,
+    date_to: date,
+    workers: int = 8,
+    store: Optional[BlobStore] = None,
+) -> Counter:
+    """Export the media of the date range into ``output``; return the count per status."""
+    store = store or get_blob_store()
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_path = output / MANIFEST_NAME
+    previous = read_manifest(manifest_path)
+    totals: Counter = Counter()
+
+    partial_manifest = manifest_path.with_suffix(".csv.partial")
+    with open(partial_manifest, "w", newline="", encoding="utf-8") as handle:
+        manifest = csv.DictWriter(handle, fieldnames=MANIFEST_FIELDS)
+        manifest.writeheader()
+
+        def collect(done: Set[Future]) -> None:
+            for future in done:
+                line = future.result()
+                manifest.writerow(line)
+                totals[line["status"]] += 1
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-export") as pool:
+            in_flight: Set[Future] = set()
+            for row in iter_visit_media(db, date_from, date_to):
+                in_flight.add(pool.submit(_export_file, row, output, store, previous))
+                # Bounded, so the cursor is not drained into memory ahead of the writers
+                if len(in_flight) >= workers * 4:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(in_flight)
+    os.replace(partial_manifest, manifest_path)
+    return totals
+
+
+def export_media_to_zip(
+    db: Session,
+    zip_path: Path,
+    date_from: date,
+    date_to: date,
+    store: Optional[BlobStore] = None,
+) -> Counter:
+    """Write the media of the date range and its manifest into a ZIP; return the count per status."""
+    store = store or get_blob_store()
+    totals: Counter = Counter()
+    # Entries cannot be interleaved, so the manifest is spooled and added last
+    manifest_buffer = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE, mode="w+", newline="", encoding="utf-8")
+    manifest = csv.DictWriter(manifest_buffer, fieldnames=MANIFEST_FIELDS)
+    manifest.writeheader()
+
+    with manifest_buffer, zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for row in iter_visit_media(db, date_from, date_to):
+            relative = export_path(row)
+            try:
+                source = _open_source(row, store)
+            except FileNotFoundError:
+                logger.warning("Media %s is missing from the media store", row.id)
+                line = _manifest_line(row, relative, 0, None, MISSING)
+            else:
+                with source, archive.open(relative, "w", force_zip64=True) as entry:
+                    shutil.copyfileobj(source, entry, CHUNK_SIZE)
+                line = _manifest_line(row, relative, archive.getinfo(relative).file_size, _source_hash(row), EXPORTED)
+            manifest.writerow(line)
+            totals[line["status"]] += 1
+        manifest_buffer.seek(0)
+        with archive.open(MANIFEST_NAME, "w") as entry:
+            while text := manifest_buffer.read(CHUNK_SIZE):
+                entry.write(text.encode("utf-8"))
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the media of the visits in a date range")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, required=True)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, required=True)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", type=Path, help="directory to export to (re-runs skip exported files)")
+    target.add_argument("--zip", type=Path, help="ZIP file to write")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.SessionLocal() as db:
+        if args.zip:
+            totals = export_media_to_zip(db, args.zip, args.date_from, args.date_to)
+        else:
+            totals = export_media_to_directory(db, args.output, args.date_from, args.date_to, args.workers)
+    logger.info("Visit media exported: %s", dict(totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Background migration of visit media stored inline in the database.
+
+Moves ``visit_multimedia.file_data`` bytes into the media store and keeps
+only the content hash, a small batch per transaction so the table stays
+writable and memory stays bounded::
+
+    python -m app.modules.media.services.media_migration --batch-size 20 --pause 0.1
+
+Re-running it only touches rows that still have inline data. Once no such
+rows remain the ``file_data`` column can be dropped.
+"""
+
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.modules.visits.models import VisitMultimedia
+from .blob_store import BlobStore, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_inline_media(
+    db: Session, store: Optional[BlobStore] = None, batch_size: int = 20, pause: float = 0.0
+) -> int:
+    """Move every inline blob into ``store``; return the number of rows migrated."""
+    store = store or get_blob_store()
+    migrated, last_id = 0, ""
+    while True:
+        rows = (
+            db.query(VisitMultimedia.id, VisitMultimedia.inline_data)
+            .filter(
+                VisitMultimedia.content_hash.is_(None),
+                VisitMultimedia.inline_data.is_not(None),
+                VisitMultimedia.id > last_id,
+            )
+            .order_by(VisitMultimedia.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return migrated
+        for media_id, data in rows:
+            blob = store.put_bytes(data)
+            # Guarded so a row rewritten meanwhile is left alone
+            db.execute(
+                update(VisitMultimedia)
+                .where(VisitMultimedia.id == media_id, VisitMultimedia.content_hash.is_(None))
+                .values(content_hash=blob.content_hash, inline_data=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        migrated += len(rows)
+        last_id = rows[-1].id
+        if pause:
+            time.sleep(pause)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move inline visit media into the media store")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.SessionLocal() as db:
+        migrated = migrate_inline_media(db, batch_size=args.batch_size, pause=args.pause)
+    logger.info("Visit media migrated to the media store: %s files", migrated)
+
+
+if __name__ == "__main__":
+    main()
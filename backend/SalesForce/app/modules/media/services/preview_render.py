@@ -0,0 +1,68 @@
+"""
+Rendering of media previews, run inside the preview worker processes.
+
+Kept free of database and application imports so a freshly spawned worker
+only loads Pillow. Every function takes the path of the original file and
+returns the encoded JPEG of each requested variant.
+"""
+
+from __future__ import annotations
+
+import io
+import shutil
+import subprocess
+from typing import Dict
+
+# Longest side, in pixels, of each preview variant
+PREVIEW_SIZES: Dict[str, int] = {"thumb": 320, "web": 1280}
+PREVIEW_MEDIA_TYPE = "image/jpeg"
+PREVIEW_JPEG_QUALITY = 80
+POSTER_TIMEOUT_SECONDS = 60
+
+
+def video_decoder_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def _encode_variants(image, sizes: Dict[str, int]) -> Dict[str, bytes]:
+    from PIL import ImageOps
+
+    image = ImageOps.exif_transpose(image)  # phones store rotation in EXIF
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    previews = {}
+    # Largest first, each variant scaled down from the previous one
+    for variant, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((size, size))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=PREVIEW_JPEG_QUALITY, optimize=True, progressive=True)
+        previews[variant] = buffer.getvalue()
+    return previews
+
+
+def render_image_previews(path: str, sizes: Dict[str, int]) -> Dict[str, bytes]:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # Let the JPEG decoder downscale while decoding instead of at full size
+        image.draft("RGB", (max(sizes.values()),) * 2)
+        return _encode_variants(image, sizes)
+
+
+def render_video_previews(path: str, sizes: Dict[str, int]) -> Dict[str, bytes]:
+    """Poster frame of a video (a representative frame near the start)."""
+    from PIL import Image
+
+    frame = subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-i", path,
+            "-vf", "thumbnail", "-frames:v", "1",
+            "-f", "image2pipe", "-vcodec", "png", "-",
+        ],
+        capture_output=True,
+        check=True,
+        timeout=POSTER_TIMEOUT_SECONDS,
+    ).stdout
+    with Image.open(io.BytesIO(frame)) as image:
+        return _encode_variants(image, sizes)
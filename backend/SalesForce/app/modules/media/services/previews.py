@@ -0,0 +1,174 @@
+"""
+Background rendering of visit media previews.
+
+Once a visit is created its media ids go to ``generate_previews`` as a
+request background task. The decoding and resizing happen in a process
+pool, so they neither hold the GIL of the API workers nor delay the
+response. The calling thread only reads and writes the media store and the
+database.
+
+Previews are keyed by the content hash of the original and the variant
+(``PREVIEW_SIZES``), so a photo uploaded twice is rendered once. Images
+need Pillow. Videos get a poster frame only when ``ffmpeg`` is on the PATH;
+without it they are marked ``unsupported``. Rows left pending (media
+uploaded before previews existed, or a worker restart mid-way) are
+backfilled with::
+
+    python -m app.modules.media.services.previews --batch-size 50
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.modules.media.crud import add_media_derivative, get_derivative_variants
+from app.modules.media.models import MediaDerivative
+from app.modules.visits.models import (
+    PREVIEW_FAILED,
+    PREVIEW_PENDING,
+    PREVIEW_READY,
+    PREVIEW_UNSUPPORTED,
+    VisitMultimedia,
+)
+from .blob_store import CHUNK_SIZE, BlobStore, LocalBlobStore, get_blob_store
+from .preview_render import (
+    PREVIEW_MEDIA_TYPE,
+    PREVIEW_SIZES,
+    render_image_previews,
+    render_video_previews,
+    video_decoder_available,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _get_preview_executor() -> ProcessPoolExecutor:
+    workers = settings.media_preview_workers or min(4, os.cpu_count() or 1)
+    # Spawned rather than forked: the API process holds threads and DB connections
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _renderer(file_type: str) -> Optional[Callable[[str, Dict[str, int]], Dict[str, bytes]]]:
+    if file_type.startswith("image/"):
+        return render_image_previews
+    if file_type.startswith("video/") and video_decoder_available():
+        return render_video_previews
+    return None
+
+
+@contextmanager
+def _local_file(store: BlobStore, content_hash: str) -> Iterator[str]:
+    """Path of the original for the workers, spooled to a temp file for non-local stores."""
+    if isinstance(store, LocalBlobStore):
+        yield str(store.path(content_hash))
+        return
+    with tempfile.NamedTemporaryFile() as spool:
+        with store.open(content_hash) as source:
+            shutil.copyfileobj(source, spool, CHUNK_SIZE)
+        spool.flush()
+        yield spool.name
+
+
+def render_previews(db: Session, rows: Sequence[VisitMultimedia], store: Optional[BlobStore] = None) -> None:
+    """
+    Render the missing previews of ``rows`` and set their ``preview_status``.
+
+    Every render is submitted before any result is awaited, so the pool works
+    on the whole batch at once; originals shared by several rows are rendered
+    once.
+    """
+    store = store or get_blob_store()
+    executor = _get_preview_executor()
+    with ExitStack() as files:
+        renders: Dict[str, Optional[Future]] = {}
+        jobs: List[VisitMultimedia] = []
+        for media in rows:
+            render = _renderer(media.file_type or "")
+            if render is None:
+                media.preview_status = PREVIEW_UNSUPPORTED
+                continue
+            jobs.append(media)
+            if media.content_hash in renders:
+                continue
+            done = get_derivative_variants(db, media.content_hash)
+            missing = {variant: size for variant, size in PREVIEW_SIZES.items() if variant not in done}
+            future = None
+            if missing:
+                try:
+                    path = files.enter_context(_local_file(store, media.content_hash))
+                    future = executor.submit(render, path, missing)
+                except Exception as exc:  # e.g. the original is missing from the store
+                    future = Future()
+                    future.set_exception(exc)
+            renders[media.content_hash] = future
+
+        stored = set()
+        for media in jobs:
+            future = renders[media.content_hash]
+            try:
+                if future is not None and media.content_hash not in stored:
+                    for variant, data in future.result().items():
+                        blob = store.put_bytes(data)
+                        add_media_derivative(
+                            db, media.content_hash, variant, blob.content_hash, PREVIEW_MEDIA_TYPE, blob.size
+                        )
+                    stored.add(media.content_hash)
+                media.preview_status = PREVIEW_READY
+            except Exception:
+                logger.warning("Could not render the previews of media %s", media.id, exc_info=True)
+                media.preview_status = PREVIEW_FAILED
+    db.commit()
+
+
+def _pending_media(db: Session):
+    return db.query(VisitMultimedia).filter(
+        VisitMultimedia.preview_status == PREVIEW_PENDING,
+        VisitMultimedia.content_hash.is_not(None),
+    )
+
+
+def generate_previews(media_ids: Sequence[str]) -> None:
+    """Background task run after a visit is created."""
+    with database.SessionLocal() as db:
+        rows = _pending_media(db).filter(VisitMultimedia.id.in_(media_ids)).all()
+        if rows:
+            render_previews(db, rows)
+
+
+def backfill_previews(db: Session, store: Optional[BlobStore] = None, batch_size: int = 50) -> int:
+    """Render every pending row, a batch per transaction; return how many were processed."""
+    processed = 0
+    while True:
+        rows = _pending_media(db).order_by(VisitMultimedia.id).limit(batch_size).all()
+        if not rows:
+            return processed
+        render_previews(db, rows, store)  # leaves none of them pending
+        processed += len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render the pending visit media previews")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    MediaDerivative.__table__.create(bind=database.engine, checkfirst=True)
+    with database.SessionLocal() as db:
+        processed = backfill_previews(db, batch_size=args.batch_size)
+    logger.info("Visit media previews rendered for %s files", processed)
+
+
+if __name__ == "__main__":
+    main()
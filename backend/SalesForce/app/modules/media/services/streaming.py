@@ -0,0 +1,113 @@
+"""HTTP delivery of stored media with ``Range`` and ``ETag`` support."""
+
+from __future__ import annotations
+
+import re
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from .blob_store import CHUNK_SIZE
+
+RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Media URLs always serve the same bytes: a row never changes its content
+MEDIA_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Return the inclusive ``(start, end)`` requested by a single-range
+    ``Range`` header, or ``None`` to send the whole file (no header, multiple
+    ranges or a syntax the server may ignore). Raises ``RangeNotSatisfiable``
+    when the range lies outside the file.
+    """
+    match = RANGE_REGEX.match((header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        start, end = max(size - length, 0), size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _iter_file(opener: Callable[[], BinaryIO], start: int, length: int) -> Iterator[bytes]:
+    with opener() as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def media_response(
+    request: Request,
+    opener: Callable[[], BinaryIO],
+    size: int,
+    etag: str,
+    media_type: str,
+    filename: str,
+    cache_control: str = MEDIA_CACHE_CONTROL,
+) -> Response:
+    """
+    Stream a stored file in chunks: ``304`` on a matching ``If-None-Match``,
+    ``206`` for a satisfiable single ``Range`` (honouring ``If-Range``),
+    ``416`` when it is out of bounds, ``200`` otherwise.
+    """
+    etag = f'"{etag}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(filename)}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None  # the client's partial copy is stale
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(opener, start, end - start + 1),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
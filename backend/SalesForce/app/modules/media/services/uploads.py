@@ -0,0 +1,22 @@
+"""Streaming of uploaded files into the blob store."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from .blob_store import CHUNK_SIZE, BlobStore, StoredBlob, get_blob_store
+
+
+async def save_upload(upload: UploadFile, store: Optional[BlobStore] = None) -> StoredBlob:
+    """Copy ``upload`` into the blob store chunk by chunk, hashing as it goes."""
+    store = store or get_blob_store()
+    writer = await run_in_threadpool(store.writer)
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            await run_in_threadpool(writer.write, chunk)
+        return await run_in_threadpool(writer.commit)
+    finally:
+        writer.abort()
@@ -3,17 +3,33 @@ from .crud_order import (
     get_order_by_id,
     list_orders_paginated,
     update_order_status,
+    list_order_events,
+    iter_orders_for_export,
+    get_last_order_event_id,
+    get_order_event_resume_cursor,
     get_most_purchased_products,
     get_top_institution_buyer_products,
     get_scheduled_deliveries_by_date,
 )
+from .crud_forecast import (
+    get_product_forecast,
+    iter_daily_product_quantities,
+    replace_product_forecasts,
+)
 
 __all__ = [
     "create_order_with_items",
     "get_order_by_id",
     "list_orders_paginated",
     "update_order_status",
+    "list_order_events",
+    "iter_orders_for_export",
+    "get_last_order_event_id",
+    "get_order_event_resume_cursor",
     "get_most_purchased_products",
     "get_top_institution_buyer_products",
     "get_scheduled_deliveries_by_date",
+    "get_product_forecast",
+    "iter_daily_product_quantities",
+    "replace_product_forecasts",
 ]
@@ -0,0 +1,67 @@
+import json
+from datetime import date
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.modules.orders.models import (
+    NON_COUNTING_ORDER_STATUSES,
+    Order,
+    OrderItem,
+    ProductDemandForecast,
+)
+
+
+def iter_daily_product_quantities(
+    db: Session, date_from: date, date_to: date, chunk_size: int = 5000
+) -> Iterator[Any]:
+    """
+    Stream ``(product_id, order_date, quantity)`` for every product and day with
+    sales in ``[date_from, date_to)``, ordered by product then day.
+
+    A single aggregate query; cancelled and rejected orders are left out.
+    """
+    stmt = (
+        select(
+            OrderItem.product_id,
+            Order.order_date,
+            func.sum(OrderItem.quantity).label("quantity"),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(
+            Order.order_date >= date_from,
+            Order.order_date < date_to,
+            Order.status.not_in(NON_COUNTING_ORDER_STATUSES),
+        )
+        .group_by(OrderItem.product_id, Order.order_date)
+        .order_by(OrderItem.product_id, Order.order_date)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    yield from db.execute(stmt)
+
+
+def replace_product_forecasts(
+    db: Session, forecasts: Iterable[dict], batch_size: int = 1000
+) -> int:
+    """
+    Replace every stored forecast with ``forecasts`` in the caller's
+    transaction, so readers see either the old or the new set.
+    """
+    db.execute(delete(ProductDemandForecast))
+    written, batch = 0, []
+    for forecast in forecasts:
+        batch.append({**forecast, "daily": json.dumps(forecast["daily"])})
+        if len(batch) == batch_size:
+            db.execute(insert(ProductDemandForecast), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(ProductDemandForecast), batch)
+        written += len(batch)
+    return written
+
+
+def get_product_forecast(db: Session, product_id: int):
+    """Get the stored forecast of a product."""
+    return db.get(ProductDemandForecast, product_id)
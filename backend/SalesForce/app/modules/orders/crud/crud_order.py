@@ -1,11 +1,21 @@
-from typing import Optional, List, Dict, Any
-from datetime import date
-
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, select
-
-from app.modules.orders.models import Order, OrderItem
+from typing import Collection, Optional, List, Dict, Any, Iterator
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy import and_, func, desc, or_, select
+
+from app.core.database import database_now
+from app.modules.orders.models import (
+    NON_COUNTING_ORDER_STATUSES,
+    Order,
+    OrderEvent,
+    OrderItem,
+)
 from app.modules.institutional_clients.models import InstitutionalClient
+from app.modules.reports.crud.sales_facts_crud import record_order_sales
+from app.modules.sales.crud.sales_plan import add_sales_plan_progress
+from app.modules.territories.models.territories_model import TerritorioClosure
+from app.modules.territories.schemas.territories_schemas import TerritoryType
 
 
 def list_orders_paginated(
@@ -49,11 +59,16 @@ def create_order_with_items(
     total_amount,
     status: str,
     items: list,
+    salespeople_id: Optional[str] = None,
 ):
     """Create a new order with items (called from service layer)."""
     # Create order
     db_order = Order(
         institutional_client_id=institutional_client_id,
+        territory_id=db.query(InstitutionalClient.territory_id)
+        .filter(InstitutionalClient.id == institutional_client_id)
+        .scalar(),
+        salespeople_id=salespeople_id,
         order_date=order_date,
         subtotal=subtotal,
         tax_amount=tax_amount,
@@ -75,23 +90,163 @@ def create_order_with_items(
         )
         db.add(db_item)
 
+    # Recorded in the same transaction so the feed never misses an order
+    db.add(
+        OrderEvent(order_id=db_order.id, event_type="order_created", status=status)
+    )
+    if status not in NON_COUNTING_ORDER_STATUSES:
+        lines = [
+            (item["product_id"], item["quantity"], item["subtotal"]) for item in items
+        ]
+        _record_sales(db, db_order, lines, sign=1)
+
     db.commit()
     db.refresh(db_order)
     return db_order
 
 
+def _record_sales(db: Session, order: Order, lines: list, sign: int) -> None:
+    """
+    Add (or with ``sign=-1`` remove) an order to the daily sales facts and to
+    its salesperson's plan progress.
+    """
+    record_order_sales(
+        db,
+        order.order_date,
+        order.institutional_client_id,
+        order.territory_id,
+        order.salespeople_id,
+        lines,
+        sign=sign,
+    )
+    if order.salespeople_id is not None:
+        add_sales_plan_progress(
+            db,
+            order.salespeople_id,
+            order.order_date,
+            sign * sum(quantity for _, quantity, _ in lines),
+            sign * float(order.subtotal),
+        )
+
+
 def update_order_status(db: Session, order_id: int, status: str):
     """Update order status."""
     db_order = get_order_by_id(db, order_id)
     if not db_order:
         return None
 
+    previous_status = db_order.status
     db_order.status = status
+    if previous_status != status:
+        db.add(
+            OrderEvent(
+                order_id=db_order.id,
+                event_type="status_changed",
+                status=status,
+                previous_status=previous_status,
+            )
+        )
+    counted_before = previous_status not in NON_COUNTING_ORDER_STATUSES
+    counted_after = status not in NON_COUNTING_ORDER_STATUSES
+    if counted_before != counted_after:
+        lines = [
+            (item.product_id, item.quantity, item.subtotal) for item in db_order.items
+        ]
+        _record_sales(db, db_order, lines, sign=1 if counted_after else -1)
     db.commit()
     db.refresh(db_order)
     return db_order
 
 
+def iter_orders_for_export(
+    db: Session, date_from: date, date_to: date, chunk_size: int = 1000
+) -> Iterator[Any]:
+    """
+    Stream one row per order item (orders without items yield a single row)
+    for orders dated within ``[date_from, date_to]``.
+
+    Rows come from a server-side cursor fetched ``chunk_size`` at a time and are
+    ordered by order so callers can regroup them without buffering the range.
+    """
+    stmt = (
+        select(
+            Order.id.label("order_id"),
+            Order.order_date,
+            Order.status,
+            Order.institutional_client_id,
+            InstitutionalClient.nombre_institucion.label("client_name"),
+            Order.subtotal,
+            Order.tax_amount,
+            Order.total_amount,
+            Order.created_at,
+            OrderItem.product_id,
+            OrderItem.product_name,
+            OrderItem.quantity,
+            OrderItem.unit_price,
+            OrderItem.subtotal.label("item_subtotal"),
+        )
+        .join(
+            InstitutionalClient,
+            InstitutionalClient.id == Order.institutional_client_id,
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.order_date >= date_from, Order.order_date <= date_to)
+        .order_by(Order.order_date, Order.id, OrderItem.id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    yield from db.execute(stmt)
+
+
+def list_order_events(
+    db: Session,
+    since: int = 0,
+    limit: int = 100,
+    order_id: Optional[int] = None,
+    include_ids: Collection[int] = (),
+) -> List[OrderEvent]:
+    """List order events recorded after the ``since`` cursor, oldest first.
+
+    ``include_ids`` also re-reads specific ids at or below the cursor, the
+    ones a reader skipped because they were not committed yet.
+    """
+    condition = OrderEvent.id > since
+    if include_ids:
+        condition = or_(condition, OrderEvent.id.in_(list(include_ids)))
+    query = db.query(OrderEvent).filter(condition)
+    if order_id is not None:
+        query = query.filter(OrderEvent.order_id == order_id)
+    return query.order_by(OrderEvent.id.asc()).limit(limit).all()
+
+
+def get_last_order_event_id(db: Session) -> int:
+    """Return the cursor of the most recent order event (0 when empty)."""
+    return db.query(func.max(OrderEvent.id)).scalar() or 0
+
+
+def get_order_event_resume_cursor(
+    db: Session, since: int, until: int, settle_seconds: float
+) -> int:
+    """Return the highest cursor in ``[since, until]`` that skips no event.
+
+    Event ids are assigned on insert but become visible on commit, so an id
+    missing between two visible ones may still show up. A gap counts as
+    settled (a rolled-back transaction) once the event after it is older than
+    ``settle_seconds``; the cursor stops before the first unsettled gap.
+    """
+    settled_before = database_now(db) - timedelta(seconds=settle_seconds)
+    rows = (
+        db.query(OrderEvent.id, OrderEvent.created_at)
+        .filter(OrderEvent.id > since, OrderEvent.id <= until)
+        .order_by(OrderEvent.id.asc())
+    )
+    expected = since + 1
+    for event_id, created_at in rows:
+        if event_id != expected and created_at is not None and created_at > settled_before:
+            return expected - 1
+        expected = event_id + 1
+    return until
+
+
 def get_most_purchased_products(db: Session, page: int, limit: int) -> Dict[str, Any]:
     """
     Obtiene los productos más comprados (paginado)
@@ -282,16 +437,57 @@ def get_scheduled_deliveries_by_date(
 ) -> Dict[str, Any]:
     """
     Obtiene las entregas programadas para una fecha específica con estado 'pending'.
+
+    Una sola consulta trae la página ya enriquecida: cliente, país y ciudad
+    (resueltos con la tabla de clausura de territorios) y el total mediante
+    ``count(*) over ()``.
     """
-    query = (
-        db.query(Order)
-        .options(joinedload(Order.institutional_client))
-        .filter(Order.order_date == delivery_date)
-        .filter(Order.status == "pending")
-        .order_by(Order.created_at.desc())
-    )
+    country = aliased(TerritorioClosure)
+    city = aliased(TerritorioClosure)
 
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+    filters = (Order.order_date == delivery_date, Order.status == "pending")
+    stmt = (
+        select(
+            Order.id.label("order_id"),
+            InstitutionalClient.nombre_institucion.label("client_name"),
+            InstitutionalClient.direccion.label("address"),
+            country.ancestor_name.label("country"),
+            city.ancestor_name.label("city"),
+            func.count().over().label("total"),
+        )
+        .join(
+            InstitutionalClient,
+            InstitutionalClient.id == Order.institutional_client_id,
+        )
+        .outerjoin(
+            country,
+            and_(
+                country.descendant_id == InstitutionalClient.territory_id,
+                country.ancestor_type == TerritoryType.COUNTRY.value,
+            ),
+        )
+        .outerjoin(
+            city,
+            and_(
+                city.descendant_id == InstitutionalClient.territory_id,
+                city.ancestor_type == TerritoryType.CITY.value,
+            ),
+        )
+        .where(*filters)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    items = db.execute(stmt).all()
+
+    if items:
+        total = items[0].total
+    elif skip > 0:
+        # Página fuera de rango: la ventana no devuelve filas, se cuenta aparte
+        total = db.execute(
+            select(func.count()).select_from(Order).where(*filters)
+        ).scalar_one()
+    else:
+        total = 0
 
     return {"items": items, "total": total}
@@ -1,4 +1,14 @@
-from .order_model import Order
+from .order_model import NON_COUNTING_ORDER_STATUSES, Order
 from .order_item_model import OrderItem
+from .order_event_model import OrderEvent
+from .product_forecast_model import ProductDemandForecast
+from .security_alert_outbox_model import SecurityAlertOutbox
 
-__all__ = ["Order", "OrderItem"]
+__all__ = [
+    "NON_COUNTING_ORDER_STATUSES",
+    "Order",
+    "OrderItem",
+    "OrderEvent",
+    "ProductDemandForecast",
+    "SecurityAlertOutbox",
+]
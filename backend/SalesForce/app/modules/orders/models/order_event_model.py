@@ -0,0 +1,21 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, TIMESTAMP, func
+
+from app.core.database import Base
+
+
+class OrderEvent(Base):
+    """Outbox of order lifecycle changes, written with the change itself.
+
+    The autoincrement ``id`` is the cursor subscribers resume from.
+    """
+
+    __tablename__ = "order_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    event_type = Column(String(50), nullable=False)  # order_created | status_changed
+    status = Column(String(50), nullable=False)
+    previous_status = Column(String(50), nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (Index("ix_order_events_order_id_id", "order_id", "id"),)
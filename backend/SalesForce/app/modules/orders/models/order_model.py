@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from datetime import date
 
 from app.core.database import Base
 
+# Orders in these statuses no longer count towards sales plans and reports
+NON_COUNTING_ORDER_STATUSES = frozenset({"cancelled", "rejected"})
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -14,6 +17,13 @@ class Order(Base):
         ForeignKey("institutional_clients.id"),
         nullable=False
     )
+    # Vendedor que tomó el pedido; sus planes de venta suman el avance
+    salespeople_id = Column(
+        String(36), ForeignKey("salespeople.id"), nullable=True, index=True
+    )
+    # Client territory when the order was taken; sales facts are bucketed and
+    # reversed by it even if the client later moves to another territory
+    territory_id = Column(String(36), nullable=True)
     order_date = Column(Date, nullable=False, default=date.today)
     subtotal = Column(DECIMAL(10, 2), nullable=False)
     tax_amount = Column(DECIMAL(10, 2), nullable=False)
@@ -25,3 +35,8 @@ class Order(Base):
     # Relationships
     institutional_client = relationship("InstitutionalClient")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Entregas programadas: filtra por fecha y estado, ordena por creación
+        Index("ix_orders_date_status_created", "order_date", "status", "created_at"),
+    )
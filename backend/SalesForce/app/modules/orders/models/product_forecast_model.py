@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, Float, Integer, Text, TIMESTAMP, func
+
+from app.core.database import Base
+
+
+class ProductDemandForecast(Base):
+    """Latest demand forecast of a product, written by the forecasting job."""
+
+    __tablename__ = "product_demand_forecasts"
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    start_date = Column(Date, nullable=False)  # first forecast day
+    daily = Column(Text, nullable=False)  # JSON list, one quantity per day
+    total = Column(Float, nullable=False)
+    history_days = Column(Integer, nullable=False)
+    alpha = Column(Float, nullable=False)  # smoothing factor chosen for the product
+    generated_at = Column(TIMESTAMP, server_default=func.now())
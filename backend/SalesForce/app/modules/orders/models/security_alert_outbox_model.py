@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, func
+
+from app.core.database import Base
+
+
+class SecurityAlertOutbox(Base):
+    """Alerts that could not be delivered to SecurityAndAudit yet."""
+
+    __tablename__ = "security_alert_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    payload = Column(Text, nullable=False)  # JSON body of a single alert
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(TIMESTAMP, server_default=func.now())
@@ -1,7 +1,8 @@
-from typing import Optional
-from datetime import datetime
+from typing import Literal, Optional
+from datetime import date, datetime
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -9,24 +10,64 @@ from app.modules.orders.crud import list_orders_paginated
 from app.modules.orders.schemas import (
     Order,
     OrderCreate,
+    OrderEventsResponse,
     OrderStatus,
     OrdersResponse,
     MostPurchasedProductPaginatedResponse,
+    ProductForecast,
     ScheduledDeliveriesResponse,
 )
 from app.modules.orders.services import (
     AUTHORIZED_ORDER_STATUS_ROLES,
+    EXPORT_MEDIA_TYPES,
     create_order_service,
     get_order_status,
     report_unauthorized_order_status_attempt,
     get_top_purchased_products,
     get_top_institution_buyers,
     get_scheduled_deliveries_service,
+    get_product_forecast_service,
+    list_order_events_service,
+    order_event_broadcaster,
+    stream_order_events,
+    stream_orders_export,
 )
 
 router = APIRouter(prefix="/pedidos", tags=["pedidos"])
 
 
+def _authorize_order_status_access(
+    request: Request,
+    order_id: int | str,
+    user_id: str | None,
+    user_role: str | None,
+) -> None:
+    """Reject (and report) callers whose role may not read order status."""
+
+    normalized_role = user_role.lower() if user_role else None
+    if normalized_role == "":
+        normalized_role = None
+
+    if normalized_role not in AUTHORIZED_ORDER_STATUS_ROLES:
+        source_ip = request.client.host if request.client else None
+        reason = (
+            "Rol de usuario no proporcionado"
+            if normalized_role is None
+            else "Rol sin permiso"
+        )
+        report_unauthorized_order_status_attempt(
+            order_id=order_id,
+            user_id=user_id,
+            user_role=user_role,
+            source_ip=source_ip,
+            reason=reason,
+        )
+        raise HTTPException(
+            status_code=403,
+            detail="No tiene permisos para consultar el estado del pedido.",
+        )
+
+
 @router.post("/", response_model=Order, status_code=201)
 async def create_order_endpoint(payload: OrderCreate, db: Session = Depends(get_db)):
     """Create a new order with validation."""
@@ -79,6 +120,20 @@ async def read_top_institution_buyers(
     return await get_top_institution_buyers(db=db, page=page, limit=limit)
 
 
+@router.get(
+    "/productos/{product_id}/pronostico",
+    response_model=ProductForecast,
+    summary="Pronóstico de demanda de un producto",
+)
+def get_product_forecast_endpoint(product_id: int, db: Session = Depends(get_db)):
+    """
+    Cantidades diarias pronosticadas para el producto a partir del historial
+    de pedidos. Las calcula el job nocturno
+    ``python -m app.modules.orders.services.demand_forecast``.
+    """
+    return get_product_forecast_service(db, product_id)
+
+
 @router.get(
     "/entregas-programadas",
     response_model=ScheduledDeliveriesResponse,
@@ -110,6 +165,73 @@ def get_scheduled_deliveries_endpoint(
     return get_scheduled_deliveries_service(db, delivery_date, page, limit)
 
 
+@router.get("/export", summary="Exportar pedidos por rango de fechas (NDJSON/CSV)")
+def export_orders_endpoint(
+    date_from: date = Query(..., alias="from", description="Fecha inicial (YYYY-MM-DD)"),
+    date_to: date = Query(..., alias="to", description="Fecha final inclusiva (YYYY-MM-DD)"),
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """
+    Exporta los pedidos del rango con sus ítems y el nombre del cliente.
+
+    La respuesta se transmite a medida que se leen las filas: NDJSON entrega
+    un pedido por línea con sus ítems anidados; CSV entrega una fila por ítem.
+    """
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="La fecha inicial no puede ser posterior a la fecha final",
+        )
+
+    filename = f"pedidos_{date_from.isoformat()}_{date_to.isoformat()}.{format}"
+    return StreamingResponse(
+        stream_orders_export(date_from, date_to, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/eventos",
+    response_model=OrderEventsResponse,
+    summary="Feed de cambios de estado de pedidos (SSE)",
+)
+def get_order_events_endpoint(
+    request: Request,
+    since: int = Query(0, ge=0, description="Cursor: next_cursor o id SSE de la última respuesta"),
+    order_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    accept: str | None = Header(default=None),
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    user_id: str | None = Header(default=None, alias="X-User-Id"),
+    user_role: str | None = Header(default=None, alias="X-User-Role"),
+):
+    """
+    Eventos de creación y cambio de estado de pedidos posteriores a ``since``.
+
+    - Con ``Accept: text/event-stream`` abre un stream SSE que entrega el
+      backlog y luego los eventos en vivo; los clientes se reanudan con
+      ``Last-Event-ID`` o ``since``.
+    - En otro caso retorna una página JSON con ``next_cursor`` para catch-up.
+    """
+    _authorize_order_status_access(
+        request, order_id if order_id is not None else "*", user_id, user_role
+    )
+
+    if accept and "text/event-stream" in accept:
+        cursor = since
+        if last_event_id and last_event_id.isdigit():
+            cursor = max(cursor, int(last_event_id))
+        return StreamingResponse(
+            stream_order_events(order_event_broadcaster, since=cursor, order_id=order_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return list_order_events_service(db, since, limit, order_id)
+
+
 @router.get("/{order_id}", response_model=OrderStatus)
 def get_order_endpoint(
     order_id: int,
@@ -120,27 +242,5 @@ def get_order_endpoint(
 ):
     """Get enriched order detail by ID with authorization and auditing."""
 
-    normalized_role = user_role.lower() if user_role else None
-    if normalized_role == "":
-        normalized_role = None
-
-    if normalized_role not in AUTHORIZED_ORDER_STATUS_ROLES:
-        source_ip = request.client.host if request.client else None
-        reason = (
-            "Rol de usuario no proporcionado"
-            if normalized_role is None
-            else "Rol sin permiso"
-        )
-        report_unauthorized_order_status_attempt(
-            order_id=order_id,
-            user_id=user_id,
-            user_role=user_role,
-            source_ip=source_ip,
-            reason=reason,
-        )
-        raise HTTPException(
-            status_code=403,
-            detail="No tiene permisos para consultar el estado del pedido.",
-        )
-
+    _authorize_order_status_access(request, order_id, user_id, user_role)
     return get_order_status(db, order_id)
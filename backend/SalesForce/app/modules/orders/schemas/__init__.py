@@ -1,11 +1,15 @@
 from .order import (
+    DailyForecast,
     Order,
     OrderCreate,
+    OrderEvent,
+    OrderEventsResponse,
     OrderItem,
     OrderItemCreate,
     OrderStatus,
     OrderStatusProduct,
     OrdersResponse,
+    ProductForecast,
     MostPurchasedProduct,
     MostPurchasedProductPaginatedResponse,
     ScheduledDelivery,
@@ -13,13 +17,17 @@ from .order import (
 )
 
 __all__ = [
+    "DailyForecast",
     "Order",
     "OrderCreate",
+    "OrderEvent",
+    "OrderEventsResponse",
     "OrderItem",
     "OrderItemCreate",
     "OrderStatus",
     "OrderStatusProduct",
     "OrdersResponse",
+    "ProductForecast",
     "MostPurchasedProduct",
     "MostPurchasedProductPaginatedResponse",
     "ScheduledDelivery",
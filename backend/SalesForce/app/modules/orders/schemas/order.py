@@ -27,6 +27,7 @@ class OrderItem(OrderItemBase):
 
 class OrderBase(BaseModel):
     institutional_client_id: str
+    salespeople_id: Optional[str] = None
     order_date: date
     subtotal: Decimal
     tax_amount: Decimal
@@ -36,6 +37,7 @@ class OrderBase(BaseModel):
 
 class OrderCreate(BaseModel):
     institutional_client_id: str
+    salespeople_id: Optional[str] = None
     items: List[OrderItemCreate]
 
 
@@ -133,3 +135,42 @@ class ScheduledDeliveriesResponse(BaseModel):
     page: int
     limit: int
     total_pages: int
+
+
+class OrderEvent(BaseModel):
+    """Cambio de estado de un pedido publicado en el feed de eventos."""
+
+    id: int
+    order_id: int
+    event_type: str
+    status: str
+    previous_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderEventsResponse(BaseModel):
+    """Página de eventos posteriores a un cursor; ``next_cursor`` reanuda la lectura."""
+
+    data: List[OrderEvent]
+    next_cursor: int
+    has_more: bool
+
+
+class DailyForecast(BaseModel):
+    """Cantidad pronosticada para un día."""
+
+    fecha: date
+    cantidad: float
+
+
+class ProductForecast(BaseModel):
+    """Pronóstico de demanda de un producto calculado por el job nocturno."""
+
+    product_id: int
+    generated_at: Optional[datetime] = None
+    history_days: int
+    alpha: float
+    total: float
+    daily: List[DailyForecast]
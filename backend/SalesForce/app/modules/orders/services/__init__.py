@@ -1,6 +1,7 @@
 from .order_service import (
     AUTHORIZED_ORDER_STATUS_ROLES,
     SECURITY_AUDIT_URL,
+    alert_dispatcher,
     create_order_service,
     get_order_status,
     get_top_purchased_products,
@@ -8,11 +9,16 @@ from .order_service import (
     report_unauthorized_order_status_attempt,
     summarize_order,
     get_scheduled_deliveries_service,
+    get_product_forecast_service,
+    list_order_events_service,
 )
+from .order_event_feed import order_event_broadcaster, stream_order_events
+from .order_export import EXPORT_MEDIA_TYPES, stream_orders_export
 
 __all__ = [
     "AUTHORIZED_ORDER_STATUS_ROLES",
     "SECURITY_AUDIT_URL",
+    "alert_dispatcher",
     "create_order_service",
     "get_order_status",
     "get_top_purchased_products",
@@ -20,4 +26,10 @@ __all__ = [
     "report_unauthorized_order_status_attempt",
     "summarize_order",
     "get_scheduled_deliveries_service",
+    "get_product_forecast_service",
+    "list_order_events_service",
+    "order_event_broadcaster",
+    "stream_order_events",
+    "EXPORT_MEDIA_TYPES",
+    "stream_orders_export",
 ]
@@ -0,0 +1,169 @@
+"""
+Demand forecast per product from the order history.
+
+The daily quantities of every product over the last ``history_days`` come
+from one aggregate query into a products x days array. Each row is fitted
+with simple exponential smoothing over a day-of-week seasonal profile,
+choosing per product the smoothing factor with the lowest one-step error.
+The forecasts for the next ``horizon_days`` replace the stored ones in a
+single transaction. Meant to run as a nightly job::
+
+    python -m app.modules.orders.services.demand_forecast --history-days 182
+
+Smoothing is sequential in time, so the job walks the days once and updates
+the level of every product under every candidate factor at each step.
+"""
+
+import argparse
+import logging
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.modules.orders.crud import iter_daily_product_quantities, replace_product_forecasts
+from app.modules.orders.models import ProductDemandForecast
+
+logger = logging.getLogger(__name__)
+
+SEASON_LENGTH = 7
+SMOOTHING_FACTORS = (0.1, 0.3, 0.5)
+
+
+def seasonal_profiles(quantities: np.ndarray, first_weekday: int) -> np.ndarray:
+    """
+    Mean quantity of each weekday relative to the overall mean of each row
+    (1.0 = average day), as a products x 7 array.
+    """
+    mean = quantities.mean(axis=1)
+    profiles = np.ones((quantities.shape[0], SEASON_LENGTH))
+    for weekday in range(SEASON_LENGTH):
+        days = quantities[:, (weekday - first_weekday) % SEASON_LENGTH :: SEASON_LENGTH]
+        if days.shape[1]:
+            np.divide(days.mean(axis=1), mean, out=profiles[:, weekday], where=mean != 0)
+    return profiles
+
+
+def seasonal_profile(series: Sequence[float], first_weekday: int) -> List[float]:
+    """Weekday profile of a single daily ``series``."""
+    return seasonal_profiles(np.asarray([series], dtype=float), first_weekday)[0].tolist()
+
+
+def forecast_quantities(
+    quantities: np.ndarray,
+    first_weekday: int,
+    horizon_days: int,
+    alphas: Sequence[float] = SMOOTHING_FACTORS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Forecast the ``horizon_days`` following each row of a products x days
+    array whose first day falls on ``first_weekday`` (Monday = 0). Returns
+    the products x horizon quantities and the index in ``alphas`` of the
+    smoothing factor chosen for each product.
+    """
+    profiles = seasonal_profiles(quantities, first_weekday)
+    # Seasonal factor of each day of each product
+    weekdays = (first_weekday + np.arange(quantities.shape[1])) % SEASON_LENGTH
+    factors = profiles[:, weekdays]
+    deseasonalized = np.divide(
+        quantities, factors, out=np.zeros_like(quantities), where=factors != 0
+    )
+
+    candidates = np.asarray(alphas, dtype=float)
+    # One level per product and candidate factor, all smoothed in the same pass
+    level = np.repeat(quantities[:, :SEASON_LENGTH].mean(axis=1)[:, None], len(candidates), axis=1)
+    squared_errors = np.zeros_like(level)
+    for day in range(quantities.shape[1]):
+        error = quantities[:, day, None] - level * factors[:, day, None]
+        squared_errors += error * error
+        # Weekdays that never sell say nothing about the level
+        sells = factors[:, day, None] != 0
+        level += np.where(sells, candidates * (deseasonalized[:, day, None] - level), 0.0)
+
+    best = squared_errors.argmin(axis=1)  # the first factor wins ties
+    best_level = level[np.arange(len(best)), best]
+    start_weekday = (first_weekday + quantities.shape[1]) % SEASON_LENGTH
+    horizon = profiles[:, (start_weekday + np.arange(horizon_days)) % SEASON_LENGTH]
+    return np.round(np.maximum(best_level[:, None] * horizon, 0.0), 3), best
+
+
+def forecast_series(
+    series: Sequence[float],
+    first_weekday: int,
+    horizon_days: int,
+    alphas: Sequence[float] = SMOOTHING_FACTORS,
+) -> Tuple[List[float], float]:
+    """
+    Forecast the ``horizon_days`` following a single daily ``series``.
+    Returns the daily quantities and the smoothing factor used.
+    """
+    daily, best = forecast_quantities(np.asarray([series], dtype=float), first_weekday, horizon_days, alphas)
+    return daily[0].tolist(), alphas[best[0]]
+
+
+def build_product_forecasts(
+    db: Session, today: date, history_days: int, horizon_days: int
+) -> List[dict]:
+    """Forecast every product sold in the ``history_days`` before ``today``."""
+    start = today - timedelta(days=history_days)
+    product_ids: List[int] = []
+    rows, days, sold = [], [], []
+    for row in iter_daily_product_quantities(db, start, today):
+        if not product_ids or product_ids[-1] != row.product_id:  # rows come ordered by product
+            product_ids.append(row.product_id)
+        rows.append(len(product_ids) - 1)
+        days.append((row.order_date - start).days)
+        sold.append(float(row.quantity))
+    if not product_ids:
+        return []
+
+    quantities = np.zeros((len(product_ids), history_days))
+    quantities[rows, days] = sold
+    daily, best = forecast_quantities(quantities, start.weekday(), horizon_days)
+
+    return [
+        {
+            "product_id": product_id,
+            "start_date": today,
+            "daily": product_daily.tolist(),
+            "total": round(float(product_daily.sum()), 3),
+            "history_days": history_days,
+            "alpha": SMOOTHING_FACTORS[alpha_index],
+        }
+        for product_id, product_daily, alpha_index in zip(product_ids, daily, best)
+    ]
+
+
+def refresh_product_forecasts(
+    db: Session,
+    today: Optional[date] = None,
+    history_days: int = 182,
+    horizon_days: int = 28,
+) -> int:
+    """Recompute and store the forecasts of every product; return how many were written."""
+    today = today or date.today()
+    forecasts = build_product_forecasts(db, today, history_days, horizon_days)
+    written = replace_product_forecasts(db, forecasts)
+    db.commit()
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute the product demand forecasts")
+    parser.add_argument("--history-days", type=int, default=182)
+    parser.add_argument("--horizon-days", type=int, default=28)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    ProductDemandForecast.__table__.create(bind=database.engine, checkfirst=True)
+    with database.SessionLocal() as db:
+        written = refresh_product_forecasts(
+            db, history_days=args.history_days, horizon_days=args.horizon_days
+        )
+    logger.info("Demand forecasts refreshed for %s products", written)
+
+
+if __name__ == "__main__":
+    main()
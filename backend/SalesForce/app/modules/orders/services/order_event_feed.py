@@ -0,0 +1,300 @@
+"""Order status change feed served over server-sent events.
+
+Order events are written to the ``order_events`` outbox in the same
+transaction as the change itself. A single :class:`OrderEventBroadcaster`
+per process tails that table and fans every new event out to all connected
+subscribers, so the number of listeners does not change the database load
+and nobody has to poll the orders table.
+
+Event ids come from a serial column: they are assigned on insert but become
+visible on commit, so a transaction that commits late exposes an id lower
+than others already read. The tail remembers the ids it skipped and re-reads
+them until they show up or ``ORDER_EVENT_SETTLE_SECONDS`` pass (the
+transaction rolled back). The SSE ``id`` sent to clients is therefore a
+resume cursor that never passes a pending id, not the event id; resuming
+from it may repeat events, which carry their own ``id`` for deduplication.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Collection, Dict, List, Optional, Set, Tuple
+
+from app.core import database
+from app.modules.orders.crud import get_last_order_event_id, list_order_events
+from app.modules.orders.schemas import OrderEvent as OrderEventSchema
+
+logger = logging.getLogger(__name__)
+
+# How long an id skipped by the cursor is waited for before it is given up
+ORDER_EVENT_SETTLE_SECONDS = 30.0
+
+
+def serialize_order_event(event) -> Dict[str, Any]:
+    """Convert an ``OrderEvent`` row into a JSON-ready dictionary."""
+
+    return OrderEventSchema.model_validate(event).model_dump(mode="json")
+
+
+def load_order_events(
+    since: int,
+    limit: int,
+    order_id: Optional[int] = None,
+    include_ids: Collection[int] = (),
+) -> List[Dict[str, Any]]:
+    """Read events after ``since`` with a short-lived session (runs in a thread)."""
+
+    db = database.SessionLocal()
+    try:
+        events = list_order_events(
+            db, since=since, limit=limit, order_id=order_id, include_ids=include_ids
+        )
+        return [serialize_order_event(event) for event in events]
+    finally:
+        db.close()
+
+
+def _load_tail_position(window: int) -> List[Dict[str, Any]]:
+    """Read the latest ``window`` events, to position the tail and spot pending ids."""
+
+    db = database.SessionLocal()
+    try:
+        last_id = get_last_order_event_id(db)
+    finally:
+        db.close()
+    return load_order_events(max(0, last_id - window), window)
+
+
+def format_sse(event: Dict[str, Any], cursor: Optional[int] = None) -> str:
+    """Render an event as a ``text/event-stream`` frame resumable from ``cursor``."""
+
+    return (
+        f"id: {event['id'] if cursor is None else cursor}\n"
+        f"event: {event['event_type']}\n"
+        f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+    )
+
+
+class OrderEventSubscription:
+    """Per-listener bounded queue fed by the broadcaster."""
+
+    def __init__(self, max_queue_size: int) -> None:
+        # (event, resume cursor once the event is delivered)
+        self.queue: "asyncio.Queue[Tuple[Dict[str, Any], int]]" = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        # Set when the queue overflowed; the listener re-reads the gap from the
+        # outbox instead of being disconnected.
+        self.lagging = False
+
+
+class OrderEventBroadcaster:
+    """Tails ``order_events`` once and fans new rows out to every subscriber.
+
+    The tail task starts with the first subscriber and stops when the last
+    one leaves, so an idle service issues no queries at all.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_interval: float = 0.5,
+        batch_size: int = 500,
+        max_queue_size: int = 1000,
+        settle_seconds: float = ORDER_EVENT_SETTLE_SECONDS,
+    ) -> None:
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._max_queue_size = max_queue_size
+        self._settle_seconds = settle_seconds
+        self._subscriptions: Set[OrderEventSubscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._last_id = 0
+        # Ids below ``_last_id`` not visible yet -> monotonic time to give up on them
+        self._pending: Dict[int, float] = {}
+
+    async def subscribe(self) -> OrderEventSubscription:
+        """Register a listener; returns once the tail is positioned.
+
+        Every event committed after this call returns is delivered through the
+        subscription queue, so callers can read their backlog from the outbox
+        afterwards without leaving gaps (duplicates are dropped by ``id``).
+        """
+
+        subscription = OrderEventSubscription(self._max_queue_size)
+        self._subscriptions.add(subscription)
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._ready = asyncio.Event()
+            self._task = loop.create_task(self._tail(self._ready))
+        await self._ready.wait()
+        return subscription
+
+    def unsubscribe(self, subscription: OrderEventSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    @property
+    def cursor(self) -> int:
+        """Highest id such that every event up to it has been published."""
+
+        return min(self._pending) - 1 if self._pending else self._last_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "cursor": self.cursor,
+            "pending_ids": len(self._pending),
+            "tailing": self._task is not None and not self._task.done(),
+        }
+
+    def _track(self, events: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], int]]:
+        """Advance the cursor over ``events``.
+
+        Returns the events not seen before, each with the cursor reached
+        right after it.
+        """
+
+        deadline = time.monotonic() + self._settle_seconds
+        fresh = []
+        for event in events:
+            event_id = event["id"]
+            if event_id > self._last_id:
+                # Ids skipped here may belong to transactions still open; a
+                # jump wider than a batch is a rollback or a sequence reset.
+                first_skipped = max(self._last_id + 1, event_id - self._batch_size)
+                for skipped in range(first_skipped, event_id):
+                    self._pending[skipped] = deadline
+                self._last_id = event_id
+            elif self._pending.pop(event_id, None) is None:
+                continue
+            fresh.append((event, self.cursor))
+        return fresh
+
+    def _expire_pending(self) -> None:
+        now = time.monotonic()
+        for event_id in [i for i, deadline in self._pending.items() if deadline <= now]:
+            del self._pending[event_id]
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        """Hand ``events`` to every subscriber without blocking the tail."""
+
+        for item in self._track(events):
+            for subscription in list(self._subscriptions):
+                if subscription.lagging:
+                    continue
+                try:
+                    subscription.queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    subscription.lagging = True
+
+    async def _tail(self, ready: asyncio.Event) -> None:
+        while not ready.is_set():
+            try:
+                recent = await asyncio.to_thread(_load_tail_position, self._batch_size)
+                self._last_id = recent[0]["id"] - 1 if recent else 0
+                self._pending.clear()
+                self._track(recent)
+                ready.set()
+            except Exception:  # pragma: no cover - depends on the database
+                logger.exception("Could not position the order events tail")
+                await asyncio.sleep(self._poll_interval)
+
+        while self._subscriptions:
+            self._expire_pending()
+            events: List[Dict[str, Any]] = []
+            try:
+                events = await asyncio.to_thread(
+                    load_order_events,
+                    self._last_id,
+                    self._batch_size,
+                    None,
+                    list(self._pending),
+                )
+            except Exception:  # pragma: no cover - depends on the database
+                logger.exception("Could not read new order events")
+            self.publish(events)
+            if len(events) < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+
+async def stream_order_events(
+    broadcaster: OrderEventBroadcaster,
+    since: int = 0,
+    order_id: Optional[int] = None,
+    *,
+    batch_size: int = 500,
+    heartbeat_interval: float = 15.0,
+) -> AsyncIterator[str]:
+    """Yield SSE frames: first the backlog after ``since``, then live events.
+
+    ``since`` is a resume cursor sent as the SSE ``id``: every event up to it
+    was delivered. Each frame carries the cursor to resume from after it.
+    """
+
+    subscription = await broadcaster.subscribe()
+    # Events up to ``floor`` were delivered; ``delivered`` holds the ids above it
+    floor = since
+    delivered: Set[int] = set()
+
+    def advance(cursor: int) -> None:
+        nonlocal floor
+        if cursor > floor:
+            floor = cursor
+            delivered.difference_update([i for i in delivered if i <= floor])
+
+    def deliver(event: Dict[str, Any], cursor: int) -> Optional[str]:
+        if event["id"] <= floor or event["id"] in delivered:
+            return None
+        delivered.add(event["id"])
+        advance(cursor)
+        return format_sse(event, floor)
+
+    async def catch_up() -> AsyncIterator[str]:
+        # Everything up to the broadcaster cursor is committed, so it is all
+        # in the reads below; past it a later commit may still fill a gap.
+        settled = broadcaster.cursor
+        read_from = floor
+        while True:
+            events = await asyncio.to_thread(load_order_events, read_from, batch_size, order_id)
+            for event in events:
+                read_from = event["id"]
+                frame = deliver(event, min(event["id"], settled))
+                if frame:
+                    yield frame
+            if len(events) < batch_size:
+                return
+
+    try:
+        yield "retry: 3000\n\n"
+        async for frame in catch_up():
+            yield frame
+
+        while True:
+            if subscription.lagging and subscription.queue.empty():
+                subscription.lagging = False
+                async for frame in catch_up():
+                    yield frame
+                continue
+            try:
+                event, cursor = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=heartbeat_interval
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if order_id is not None and event["order_id"] != order_id:
+                advance(cursor)
+                continue
+            frame = deliver(event, cursor)
+            if frame:
+                yield frame
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+order_event_broadcaster = OrderEventBroadcaster()
@@ -1,8 +1,9 @@
 """Order service layer for business logic."""
 
+import json
 import logging
 import os
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Dict, List
 
@@ -14,21 +15,29 @@ from sqlalchemy.orm import Session
 from app.modules.institutional_clients.crud import get_institutional_client_by_id
 from app.modules.orders.crud import (
     create_order_with_items,
+    get_product_forecast,
     get_most_purchased_products,
     get_order_by_id,
     get_top_institution_buyer_products,
     get_scheduled_deliveries_by_date,
+    get_order_event_resume_cursor,
+    list_order_events,
 )
 from app.modules.orders.schemas import (
     OrderCreate,
+    OrderEventsResponse,
     MostPurchasedProduct,
     MostPurchasedProductPaginatedResponse,
     OrderStatus,
     OrderStatusProduct,
+    ProductForecast,
     ScheduledDelivery,
     ScheduledDeliveriesResponse,
 )
-from app.modules.territories.crud.territories_crud import get_territorio
+from app.modules.orders.services.order_event_feed import ORDER_EVENT_SETTLE_SECONDS
+from app.modules.orders.services.security_alert_dispatcher import SecurityAlertDispatcher
+from app.modules.salespeople.crud.crud_sales_people import get_salespeople
+from app.modules.territories.crud.territories_crud import get_territorio_ancestry_labels
 from app.modules.territories.schemas.territories_schemas import TerritoryType
 
 
@@ -41,6 +50,9 @@ AUTHORIZED_ORDER_STATUS_ROLES = {"admin", "operator", "operador"}
 
 logger = logging.getLogger(__name__)
 
+# Read SECURITY_AUDIT_URL lazily so it can be reconfigured at runtime
+alert_dispatcher = SecurityAlertDispatcher(lambda: SECURITY_AUDIT_URL)
+
 # Tax rate (19% IVA for Colombia)
 TAX_RATE = Decimal("0.19")
 
@@ -131,7 +143,7 @@ async def create_order_service(db: Session, order_create: OrderCreate):
     """
     Create a new order with validation.
 
-    1. Validate institutional client exists
+    1. Validate institutional client (and salesperson, if given) exists
     2. Validate all products exist and get their details
     3. Validate sufficient inventory for all products
     4. Calculate totals
@@ -144,6 +156,11 @@ async def create_order_service(db: Session, order_create: OrderCreate):
             status_code=404,
             detail=f"Institutional client {order_create.institutional_client_id} not found",
         )
+    if order_create.salespeople_id and not get_salespeople(db, order_create.salespeople_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Salesperson {order_create.salespeople_id} not found",
+        )
 
     # 2. Validate products and get details
     validated_items = []
@@ -182,6 +199,7 @@ async def create_order_service(db: Session, order_create: OrderCreate):
         total_amount=totals["total_amount"],
         status="pending",
         items=validated_items,
+        salespeople_id=order_create.salespeople_id,
     )
 
     return order
@@ -231,12 +249,13 @@ def summarize_order(order) -> OrderStatus:
 
 
 def report_unauthorized_order_status_attempt(
-    order_id: int,
+    order_id: int | str,
     user_id: str | None,
     user_role: str | None,
     source_ip: str | None,
     reason: str,
 ):
+    """Queue an unauthorized-access alert; delivery happens in the background."""
     payload = {
         "order_id": str(order_id),
         "user_id": user_id,
@@ -245,14 +264,7 @@ def report_unauthorized_order_status_attempt(
         "reason": reason,
     }
 
-    audit_url = f"{SECURITY_AUDIT_URL.rstrip('/')}/audit/alerts/unauthorized-order-status"
-
-    try:
-        httpx.post(audit_url, json=payload, timeout=1.5)
-    except Exception as exc:  # noqa: BLE001 - we need to swallow all issues to avoid blocking
-        logger.warning(
-            "Failed to report unauthorized order status attempt: %s", exc,
-        )
+    alert_dispatcher.submit(payload)
 
 
 def get_order_status(db: Session, order_id: int) -> OrderStatus:
@@ -265,6 +277,33 @@ def get_order_status(db: Session, order_id: int) -> OrderStatus:
     return summarize_order(order)
 
 
+def list_order_events_service(
+    db: Session, since: int, limit: int, order_id: int | None = None
+) -> OrderEventsResponse:
+    """
+    Página de eventos de pedidos posteriores a ``since`` (catch-up del feed).
+
+    ``next_cursor`` no salta ids que aún pueden confirmarse (transacciones
+    abiertas), así que la página siguiente puede repetir eventos: el cliente
+    los descarta por ``id``.
+    """
+
+    events = list_order_events(db, since=since, limit=limit + 1, order_id=order_id)
+    has_more = len(events) > limit
+    events = events[:limit]
+    next_cursor = since
+    if events:
+        next_cursor = get_order_event_resume_cursor(
+            db, since, events[-1].id, ORDER_EVENT_SETTLE_SECONDS
+        )
+
+    return OrderEventsResponse(
+        data=events,
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
+
+
 async def get_top_purchased_products(
     db: Session, page: int, limit: int
 ) -> List[MostPurchasedProduct]:
@@ -438,53 +477,39 @@ def get_territory_hierarchy(db: Session, territory_id: str) -> Dict[str, str]:
     Obtiene la jerarquía de territorios (país y ciudad) a partir de un territory_id.
     Retorna un diccionario con 'country' y 'city'.
     """
-    from uuid import UUID
-
     result = {"country": "N/A", "city": "N/A"}
 
     if not territory_id:
         return result
 
-    try:
-        # Convertir territory_id a UUID
-        territory_uuid = UUID(territory_id)
-        current_territory = get_territorio(db, territory_uuid)
-
-        if not current_territory:
-            return result
-
-        # Identificar el tipo del territorio actual
-        if current_territory.type == TerritoryType.CITY:
-            result["city"] = current_territory.name
-            # Buscar el país (padre o abuelo)
-            if current_territory.id_parent:
-                parent = get_territorio(db, current_territory.id_parent)
-                if parent:
-                    if parent.type == TerritoryType.COUNTRY:
-                        result["country"] = parent.name
-                    elif parent.type == TerritoryType.STATE and parent.id_parent:
-                        # Buscar el abuelo (país)
-                        grandparent = get_territorio(db, parent.id_parent)
-                        if grandparent and grandparent.type == TerritoryType.COUNTRY:
-                            result["country"] = grandparent.name
-
-        elif current_territory.type == TerritoryType.STATE:
-            # Si es un estado, buscar el país (padre)
-            if current_territory.id_parent:
-                parent = get_territorio(db, current_territory.id_parent)
-                if parent and parent.type == TerritoryType.COUNTRY:
-                    result["country"] = parent.name
-
-        elif current_territory.type == TerritoryType.COUNTRY:
-            result["country"] = current_territory.name
-
-    except Exception:
-        # En caso de error, retornar valores por defecto
-        pass
-
+    labels = get_territorio_ancestry_labels(db, territory_id)
+    result["country"] = labels.get(TerritoryType.COUNTRY.value, result["country"])
+    result["city"] = labels.get(TerritoryType.CITY.value, result["city"])
     return result
 
 
+def get_product_forecast_service(db: Session, product_id: int) -> ProductForecast:
+    """Devuelve el último pronóstico de demanda guardado para el producto."""
+    forecast = get_product_forecast(db, product_id)
+    if forecast is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No hay pronóstico de demanda para el producto {product_id}",
+        )
+    daily = json.loads(forecast.daily)
+    return ProductForecast(
+        product_id=forecast.product_id,
+        generated_at=forecast.generated_at,
+        history_days=forecast.history_days,
+        alpha=forecast.alpha,
+        total=forecast.total,
+        daily=[
+            {"fecha": forecast.start_date + timedelta(days=offset), "cantidad": quantity}
+            for offset, quantity in enumerate(daily)
+        ],
+    )
+
+
 def get_scheduled_deliveries_service(
     db: Session, delivery_date: date, page: int, limit: int
 ) -> ScheduledDeliveriesResponse:
@@ -495,27 +520,17 @@ def get_scheduled_deliveries_service(
     skip = (page - 1) * limit
     crud_result = get_scheduled_deliveries_by_date(db, delivery_date, skip, limit)
 
-    orders = crud_result["items"]
     total = crud_result["total"]
-
-    # Enriquecer cada orden con información del cliente y territorio
-    deliveries = []
-    for order in orders:
-        client = order.institutional_client
-        if not client:
-            continue
-
-        # Obtener jerarquía de territorio (país y ciudad)
-        territory_info = get_territory_hierarchy(db, client.territory_id)
-
-        delivery = ScheduledDelivery(
-            order_id=order.id,
-            client_name=client.nombre_institucion,
-            country=territory_info["country"],
-            city=territory_info["city"],
-            address=client.direccion,
+    deliveries = [
+        ScheduledDelivery(
+            order_id=row.order_id,
+            client_name=row.client_name,
+            country=row.country or "N/A",
+            city=row.city or "N/A",
+            address=row.address,
         )
-        deliveries.append(delivery)
+        for row in crud_result["items"]
+    ]
 
     # Calcular total de páginas
     total_pages = 0
@@ -0,0 +1,275 @@
+"""Background delivery of security alerts to SecurityAndAudit (ASR-12)."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core import database
+from app.modules.orders.models import SecurityAlertOutbox
+
+logger = logging.getLogger(__name__)
+
+ALERT_BATCH_PATH = "/audit/alerts/unauthorized-order-status/batch"
+
+
+class SecurityAlertDispatcher:
+    """Bounded in-process alert queue drained by a background thread.
+
+    ``submit`` never blocks the caller: alerts are queued and a worker thread
+    groups them into batches that are posted through a pooled ``httpx.Client``
+    with retries. Batches that still fail are spilled to the local
+    ``security_alert_outbox`` table and retried periodically. Alerts that find
+    the queue full go to a bounded overflow list that the worker spills to the
+    outbox, so the caller never waits on the database either.
+
+    Every alert gets an ``alert_id`` when submitted and keeps it through
+    retries and the outbox, so SecurityAndAudit stores and emails it once
+    even when a response is lost and the batch is posted again.
+
+    The batch endpoint only inserts the alerts (emails are sent after it
+    responds), so a 2 second read timeout leaves ample room for a slow
+    database, while an unreachable service is detected by the 0.5 second
+    connect timeout and spilled to the outbox.
+    """
+
+    def __init__(
+        self,
+        base_url: Callable[[], str],
+        *,
+        max_queue_size: int = 1000,
+        max_overflow_size: int = 1000,
+        batch_size: int = 50,
+        batch_window: float = 0.05,
+        max_attempts: int = 3,
+        connect_timeout: float = 0.5,
+        request_timeout: float = 2.0,
+        retry_backoff: float = 0.1,
+        outbox_retry_interval: float = 5.0,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        self._base_url = base_url
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._overflow: List[Dict[str, Any]] = []
+        self._max_overflow_size = max_overflow_size
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._max_attempts = max_attempts
+        self._timeout = httpx.Timeout(request_timeout, connect=connect_timeout)
+        self._retry_backoff = retry_backoff
+        self._outbox_retry_interval = outbox_retry_interval
+        self._transport = transport
+
+        self._lock = threading.Lock()  # worker start/stop and the overflow list
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._atexit_registered = False
+        self._next_outbox_retry = 0.0
+        self._counters_lock = threading.Lock()
+        self._counters = {"submitted": 0, "delivered": 0, "spilled": 0, "dropped": 0}
+
+    # ------------------------------------------------------------------ API
+
+    def submit(self, alert: Dict[str, Any]) -> None:
+        """Queue an alert for delivery without waiting for the network."""
+
+        self._ensure_worker()
+        alert = {"alert_id": str(uuid.uuid4()), **alert}
+        self._count("submitted")
+        try:
+            self._queue.put_nowait(alert)
+            return
+        except queue.Full:
+            pass
+        with self._lock:
+            if len(self._overflow) < self._max_overflow_size:
+                self._overflow.append(alert)
+                logger.warning("Security alert queue is full; alert left for the outbox")
+                return
+        self._count("dropped")
+        logger.error("Security alert queue and overflow are full; alert dropped")
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until every queued alert was delivered or spilled."""
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks or self._overflow:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Deliver what is pending and stop the worker."""
+
+        with self._lock:
+            worker = self._worker
+            if worker is None:
+                return
+            self._stopping.set()
+        worker.join(timeout)
+        with self._lock:
+            self._worker = None
+            self._stopping.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and delivery counters for monitoring."""
+
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "overflow_depth": len(self._overflow),
+            "outbox_depth": self._outbox_depth(),
+            **counters,
+        }
+
+    # --------------------------------------------------------------- worker
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="security-alert-dispatcher", daemon=True
+            )
+            self._worker.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[counter] += amount
+
+    def _run(self) -> None:
+        with httpx.Client(
+            timeout=self._timeout,
+            transport=self._transport,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        ) as client:
+            while not (
+                self._stopping.is_set() and self._queue.empty() and not self._overflow
+            ):
+                self._spill_overflow()
+                batch = self._next_batch()
+                if batch:
+                    try:
+                        if self._post_with_retries(client, batch):
+                            self._count("delivered", len(batch))
+                        else:
+                            self._spill(batch)
+                    finally:
+                        for _ in batch:
+                            self._queue.task_done()
+                if time.monotonic() >= self._next_outbox_retry:
+                    self._drain_outbox(client)
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self._batch_window
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _post_with_retries(self, client: httpx.Client, batch: List[Dict[str, Any]]) -> bool:
+        url = f"{self._base_url().rstrip('/')}{ALERT_BATCH_PATH}"
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                response = client.post(url, json={"alerts": batch})
+                response.raise_for_status()
+                return True
+            except httpx.HTTPError as exc:
+                logger.warning(
+                    "Failed to deliver %d security alert(s) (attempt %d/%d): %s",
+                    len(batch),
+                    attempt,
+                    self._max_attempts,
+                    exc,
+                )
+                if attempt < self._max_attempts:
+                    time.sleep(self._retry_backoff * attempt)
+        return False
+
+    # --------------------------------------------------------------- outbox
+
+    def _spill_overflow(self) -> None:
+        with self._lock:
+            overflow = list(self._overflow)
+        if overflow:
+            self._spill(overflow)
+            with self._lock:  # submit only appends, so the spilled alerts are the head
+                del self._overflow[: len(overflow)]
+
+    def _spill(self, batch: List[Dict[str, Any]]) -> None:
+        db = database.SessionLocal()
+        try:
+            db.add_all(SecurityAlertOutbox(payload=json.dumps(alert)) for alert in batch)
+            db.commit()
+            self._count("spilled", len(batch))
+        except Exception:  # noqa: BLE001 - the worker must survive database errors
+            db.rollback()
+            self._count("dropped", len(batch))
+            logger.exception("Could not spill %d security alert(s) to outbox", len(batch))
+        finally:
+            db.close()
+        self._next_outbox_retry = time.monotonic() + self._outbox_retry_interval
+
+    def _drain_outbox(self, client: httpx.Client) -> None:
+        self._next_outbox_retry = time.monotonic() + self._outbox_retry_interval
+        db = database.SessionLocal()
+        try:
+            while True:
+                rows = (
+                    db.query(SecurityAlertOutbox)
+                    .order_by(SecurityAlertOutbox.id)
+                    .limit(self._batch_size)
+                    .all()
+                )
+                if not rows:
+                    return
+                batch = [json.loads(row.payload) for row in rows]
+                if not self._post_with_retries(client, batch):
+                    for row in rows:
+                        row.attempts += 1
+                    db.commit()
+                    return
+                for row in rows:
+                    db.delete(row)
+                db.commit()
+                self._count("delivered", len(rows))
+        except Exception:  # noqa: BLE001 - the worker must survive database errors
+            db.rollback()
+            logger.exception("Could not drain the security alert outbox")
+        finally:
+            db.close()
+
+    def _outbox_depth(self) -> int:
+        db = database.SessionLocal()
+        try:
+            return db.query(SecurityAlertOutbox).count()
+        except Exception:  # noqa: BLE001 - metrics must not fail
+            return -1
+        finally:
+            db.close()
@@ -5,9 +5,19 @@ from app.modules.reports.crud.informe_comercial_crud import (
     create_informe_comercial,
     list_informes_comerciales_paginated,
 )
+from app.modules.reports.crud.sales_facts_crud import (
+    REPORT_DIMENSIONS,
+    query_sales_report,
+    rebuild_daily_sales_facts,
+    record_order_sales,
+)
 
 __all__ = [
+    "REPORT_DIMENSIONS",
     "calculate_sales_indicators",
     "create_informe_comercial",
     "list_informes_comerciales_paginated",
+    "query_sales_report",
+    "rebuild_daily_sales_facts",
+    "record_order_sales",
 ]
@@ -0,0 +1,197 @@
+"""CRUD operations for the daily sales fact table."""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.modules.orders.models import NON_COUNTING_ORDER_STATUSES, Order, OrderItem
+from app.modules.reports.models import DailySalesFact
+from app.modules.territories.models.territories_model import TerritorioClosure
+
+# Report dimensions and the fact column each one groups by
+REPORT_DIMENSIONS = {
+    "producto": DailySalesFact.product_id,
+    "vendedor": DailySalesFact.salespeople_id,
+    "cliente": DailySalesFact.institutional_client_id,
+    "territorio": DailySalesFact.territory_id,
+    "dia": DailySalesFact.day,
+    "mes": DailySalesFact.month,
+}
+
+OrderLine = Tuple[int, float, Decimal]  # product_id, quantity, subtotal
+
+
+def _matches(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def record_order_sales(
+    db: Session,
+    order_date: date,
+    institutional_client_id: str,
+    territory_id: Optional[str],
+    salespeople_id: Optional[str],
+    lines: Iterable[OrderLine],
+    sign: int = 1,
+) -> None:
+    """
+    Add (or with ``sign=-1`` remove) the lines of an order to its daily buckets.
+
+    Each bucket is bumped with an atomic ``UPDATE ... SET x = x + :delta`` and
+    created when missing. ``territory_id`` is the one stored on the order, so a
+    cancellation reverses the bucket the order was added to even after the
+    client moved. The caller commits, so the buckets change in the same
+    transaction as the order.
+    """
+    totals: Dict[int, Tuple[float, Decimal]] = {}
+    for product_id, quantity, subtotal in lines:
+        unidades, monto = totals.get(product_id, (0.0, Decimal("0")))
+        totals[product_id] = (unidades + quantity, monto + Decimal(str(subtotal)))
+    if not totals:
+        return
+
+    for product_id, (unidades, monto) in totals.items():
+        fact_id = db.execute(
+            select(DailySalesFact.id)
+            .where(
+                DailySalesFact.day == order_date,
+                DailySalesFact.product_id == product_id,
+                DailySalesFact.institutional_client_id == institutional_client_id,
+                _matches(DailySalesFact.salespeople_id, salespeople_id),
+                _matches(DailySalesFact.territory_id, territory_id),
+            )
+            .order_by(DailySalesFact.id)
+            .limit(1)
+        ).scalar()
+        if fact_id is None:
+            db.execute(
+                insert(DailySalesFact).values(
+                    day=order_date,
+                    month=order_date.replace(day=1),
+                    product_id=product_id,
+                    salespeople_id=salespeople_id,
+                    institutional_client_id=institutional_client_id,
+                    territory_id=territory_id,
+                    unidades=sign * unidades,
+                    monto=sign * monto,
+                )
+            )
+        else:
+            db.execute(
+                update(DailySalesFact)
+                .where(DailySalesFact.id == fact_id)
+                .values(
+                    unidades=DailySalesFact.unidades + sign * unidades,
+                    monto=DailySalesFact.monto + sign * monto,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+
+def query_sales_report(
+    db: Session,
+    group_by: Sequence[str],
+    date_from: date,
+    date_to: date,
+    product_id: Optional[int] = None,
+    salespeople_id: Optional[str] = None,
+    institutional_client_id: Optional[str] = None,
+    territory_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Aggregate the daily buckets of ``[date_from, date_to]`` by ``group_by``.
+
+    ``territory_id`` includes its whole subtree through the territory closure
+    table. Groups whose orders were all cancelled are left out.
+    """
+    dimensions = [REPORT_DIMENSIONS[name].label(name) for name in group_by]
+    stmt = select(
+        *dimensions,
+        func.sum(DailySalesFact.unidades).label("unidades"),
+        func.sum(DailySalesFact.monto).label("monto"),
+    ).where(DailySalesFact.day >= date_from, DailySalesFact.day <= date_to)
+
+    if product_id is not None:
+        stmt = stmt.where(DailySalesFact.product_id == product_id)
+    if salespeople_id is not None:
+        stmt = stmt.where(DailySalesFact.salespeople_id == salespeople_id)
+    if institutional_client_id is not None:
+        stmt = stmt.where(DailySalesFact.institutional_client_id == institutional_client_id)
+    if territory_id is not None:
+        stmt = stmt.where(
+            DailySalesFact.territory_id.in_(
+                select(TerritorioClosure.descendant_id).where(
+                    TerritorioClosure.ancestor_id == territory_id
+                )
+            )
+        )
+
+    if dimensions:
+        stmt = stmt.group_by(*dimensions).order_by(*dimensions)
+    stmt = stmt.having(func.sum(DailySalesFact.unidades) != 0)
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def rebuild_daily_sales_facts(
+    db: Session, date_from: date, date_to: date, batch_size: int = 1000
+) -> int:
+    """
+    Recompute the buckets of ``[date_from, date_to]`` from the orders.
+
+    Used to backfill orders placed before the fact table existed or to repair
+    a range. Returns the number of buckets written; the caller commits.
+    """
+    db.execute(
+        delete(DailySalesFact).where(
+            DailySalesFact.day >= date_from, DailySalesFact.day <= date_to
+        )
+    )
+    buckets = (
+        select(
+            Order.order_date,
+            OrderItem.product_id,
+            Order.salespeople_id,
+            Order.institutional_client_id,
+            Order.territory_id,
+            func.sum(OrderItem.quantity).label("unidades"),
+            func.sum(OrderItem.subtotal).label("monto"),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(
+            Order.order_date >= date_from,
+            Order.order_date <= date_to,
+            Order.status.not_in(NON_COUNTING_ORDER_STATUSES),
+        )
+        .group_by(
+            Order.order_date,
+            OrderItem.product_id,
+            Order.salespeople_id,
+            Order.institutional_client_id,
+            Order.territory_id,
+        )
+    )
+
+    written = 0
+    result = db.execute(buckets)
+    while rows := result.fetchmany(batch_size):
+        db.execute(
+            insert(DailySalesFact),
+            [
+                {
+                    "day": row.order_date,
+                    "month": row.order_date.replace(day=1),
+                    "product_id": row.product_id,
+                    "salespeople_id": row.salespeople_id,
+                    "institutional_client_id": row.institutional_client_id,
+                    "territory_id": row.territory_id,
+                    "unidades": float(row.unidades),
+                    "monto": row.monto,
+                }
+                for row in rows
+            ],
+        )
+        written += len(rows)
+    return written
@@ -1,6 +1,6 @@
 """Reports models."""
 
+from app.modules.reports.models.daily_sales_fact_model import DailySalesFact
 from app.modules.reports.models.informe_comercial_model import InformeComercial
 
-__all__ = ["InformeComercial"]
-
+__all__ = ["DailySalesFact", "InformeComercial"]
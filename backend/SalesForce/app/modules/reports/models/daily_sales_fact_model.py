@@ -0,0 +1,42 @@
+"""Daily sales fact table backing the commercial report queries."""
+
+from sqlalchemy import Column, Date, Float, Index, Integer, Numeric, String
+
+from app.core.database import Base
+
+
+class DailySalesFact(Base):
+    """
+    Units and amount sold per day, product, salesperson, client and territory.
+
+    Rows are maintained incrementally from orders (see
+    ``record_order_sales``), so reports aggregate these buckets instead of
+    scanning orders. A bucket may be split across several rows when two
+    writers create it concurrently; every query sums them, so that is
+    harmless.
+    """
+    __tablename__ = "daily_sales_facts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)
+    month = Column(Date, nullable=False)  # first day of ``day``'s month
+    product_id = Column(Integer, nullable=False)
+    salespeople_id = Column(String(36), nullable=True)
+    institutional_client_id = Column(String(36), nullable=False)
+    territory_id = Column(String(36), nullable=True)
+    unidades = Column(Float, nullable=False, default=0)
+    # Exact, like the DECIMAL order subtotals it adds up: a cancelled bucket returns to 0
+    monto = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Bucket lookup on write and date-range scans on read
+        Index(
+            "ix_daily_sales_facts_bucket",
+            "day",
+            "product_id",
+            "institutional_client_id",
+            "salespeople_id",
+        ),
+        Index("ix_daily_sales_facts_salespeople_day", "salespeople_id", "day"),
+        Index("ix_daily_sales_facts_territory_day", "territory_id", "day"),
+    )
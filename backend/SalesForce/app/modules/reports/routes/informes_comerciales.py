@@ -1,6 +1,9 @@
 """API routes for Informes Comerciales."""
 
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -8,10 +11,13 @@ from app.modules.reports.schemas import (
     InformeComercial,
     InformeComercialCreate,
     InformeComercialPaginated,
+    SalesReport,
+    SalesReportDimension,
 )
 from app.modules.reports.services import (
     create as create_informe,
     list_informes_comerciales,
+    sales_report,
 )
 
 router = APIRouter(prefix="/informes-comerciales", tags=["informes-comerciales"])
@@ -44,3 +50,33 @@ def list_informes_comerciales_endpoint(
     Returns reports ordered by creation date (newest first).
     """
     return list_informes_comerciales(db, page=page, limit=limit)
+
+
+@router.get("/ventas", response_model=SalesReport, response_model_by_alias=True)
+def sales_report_endpoint(
+    date_from: date = Query(..., alias="from", description="Start date (YYYY-MM-DD)"),
+    date_to: date = Query(..., alias="to", description="Inclusive end date (YYYY-MM-DD)"),
+    group_by: List[SalesReportDimension] = Query(default=[]),
+    producto_id: Optional[int] = None,
+    vendedor_id: Optional[str] = None,
+    cliente_id: Optional[str] = None,
+    territorio_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Sales (units and amount) over a date range, grouped by any of
+    producto, vendedor, cliente, territorio, dia and mes.
+
+    Repeat ``group_by`` to group by several dimensions; without it the range
+    total is returned. ``territorio_id`` includes its sub-territories.
+    """
+    return sales_report(
+        db,
+        group_by,
+        date_from,
+        date_to,
+        product_id=producto_id,
+        salespeople_id=vendedor_id,
+        institutional_client_id=cliente_id,
+        territory_id=territorio_id,
+    )
@@ -5,9 +5,17 @@ from app.modules.reports.schemas.informe_comercial_schema import (
     InformeComercialCreate,
     InformeComercialPaginated,
 )
+from app.modules.reports.schemas.sales_report_schema import (
+    SalesReport,
+    SalesReportDimension,
+    SalesReportRow,
+)
 
 __all__ = [
     "InformeComercial",
     "InformeComercialCreate",
     "InformeComercialPaginated",
+    "SalesReport",
+    "SalesReportDimension",
+    "SalesReportRow",
 ]
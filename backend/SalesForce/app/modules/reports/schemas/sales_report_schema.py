@@ -0,0 +1,32 @@
+"""Schemas for the sales report API."""
+
+from datetime import date
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+SalesReportDimension = Literal["producto", "vendedor", "cliente", "territorio", "dia", "mes"]
+
+
+class SalesReportRow(BaseModel):
+    """One group of the report; only the grouped dimensions are set."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    producto: Optional[int] = None
+    vendedor: Optional[str] = None
+    cliente: Optional[str] = None
+    territorio: Optional[str] = None
+    dia: Optional[date] = None
+    mes: Optional[date] = None
+    unidades: float
+    monto: float
+
+
+class SalesReport(BaseModel):
+    """Sales aggregated over a date range."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    group_by: List[SalesReportDimension] = Field(alias="groupBy")
+    date_from: date = Field(alias="from")
+    date_to: date = Field(alias="to")
+    data: List[SalesReportRow]
@@ -4,8 +4,10 @@ from app.modules.reports.services.informe_comercial_service import (
     create,
     list_informes_comerciales,
 )
+from app.modules.reports.services.sales_report_service import sales_report
 
 __all__ = [
     "create",
     "list_informes_comerciales",
+    "sales_report",
 ]
@@ -0,0 +1,52 @@
+"""
+Rebuild the daily sales fact table from the orders.
+
+Orders keep the table up to date as they are created or change status; run
+this once to backfill orders placed before it existed, or to repair a range::
+
+    python -m app.modules.reports.services.sales_facts_rebuild --from 2024-01-01
+
+Each month is rebuilt in its own transaction, so reports stay available.
+"""
+
+import argparse
+import logging
+from datetime import date, timedelta
+
+from app.core import database
+from app.modules.reports.crud import rebuild_daily_sales_facts
+from app.modules.reports.models import DailySalesFact
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_range(date_from: date, date_to: date) -> int:
+    """Rebuild ``[date_from, date_to]`` one month at a time; return buckets written."""
+    written = 0
+    start = date_from
+    while start <= date_to:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        end = min(date_to, next_month - timedelta(days=1))
+        with database.SessionLocal() as db:
+            written += rebuild_daily_sales_facts(db, start, end)
+            db.commit()
+        start = next_month
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales fact table")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, required=True)
+    parser.add_argument(
+        "--to", dest="date_to", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD (default today)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    DailySalesFact.__table__.create(bind=database.engine, checkfirst=True)
+    written = rebuild_range(args.date_from, args.date_to)
+    logger.info("Daily sales facts rebuilt: %s buckets", written)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Business logic for the sales report queries."""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.modules.reports.crud import query_sales_report
+from app.modules.reports.schemas import SalesReport, SalesReportDimension, SalesReportRow
+
+
+def sales_report(
+    db: Session,
+    group_by: List[SalesReportDimension],
+    date_from: date,
+    date_to: date,
+    product_id: Optional[int] = None,
+    salespeople_id: Optional[str] = None,
+    institutional_client_id: Optional[str] = None,
+    territory_id: Optional[str] = None,
+) -> SalesReport:
+    """
+    Aggregate the sales of ``[date_from, date_to]`` by the requested dimensions.
+
+    Answered from the daily sales buckets, so the cost depends on the number
+    of buckets in the range rather than on the number of orders.
+    """
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400, detail="date_from cannot be later than date_to"
+        )
+    group_by = list(dict.fromkeys(group_by))  # drop repeated dimensions
+
+    rows = query_sales_report(
+        db,
+        group_by,
+        date_from,
+        date_to,
+        product_id=product_id,
+        salespeople_id=salespeople_id,
+        institutional_client_id=institutional_client_id,
+        territory_id=territory_id,
+    )
+    return SalesReport(
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        data=[SalesReportRow(**row) for row in rows],
+    )
@@ -1,3 +1,7 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session, joinedload
 
 from app.modules.salespeople.models.salespeople_model import SalesPlan
@@ -52,3 +56,37 @@ def list_sales_plans_paginated(db: Session, skip: int, limit: int):
     items = query.offset(skip).limit(limit).all()
 
     return {"items": items, "total": total}
+
+
+def sales_plan_periods(day: date) -> List[str]:
+    """Periodos que contienen ``day``: anual, trimestral y mensual."""
+    quarter = (day.month - 1) // 3 + 1
+    return [f"{day.year}", f"{day.year}-Q{quarter}", f"{day.year}-{day.month:02d}"]
+
+
+def add_sales_plan_progress(
+    db: Session, vendedor_id: str, day: date, unidades: float, monto: float
+) -> int:
+    """
+    Suma ``unidades`` y ``monto`` (negativos para descontar) al avance de los
+    planes del vendedor cuyo periodo contiene ``day``.
+
+    Es un único ``UPDATE ... SET x = x + :delta``: pedidos concurrentes no se
+    pisan entre sí. El ``avance`` (unidades sobre meta) que ordena el ranking
+    se recalcula en la misma sentencia. No confirma la transacción, así el avance se guarda junto
+    con el pedido que lo origina.
+    """
+    result = db.execute(
+        update(SalesPlan)
+        .where(
+            SalesPlan.vendedor_id == vendedor_id,
+            SalesPlan.periodo.in_(sales_plan_periods(day)),
+        )
+        .values(
+            unidades_vendidas=SalesPlan.unidades_vendidas + unidades,
+            monto_vendido=SalesPlan.monto_vendido + monto,
+            avance=(SalesPlan.unidades_vendidas + unidades) / SalesPlan.meta,
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    return result.rowcount
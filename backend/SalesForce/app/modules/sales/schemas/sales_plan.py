@@ -3,6 +3,10 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# Año, trimestre o mes ("2025", "2025-Q1", "2025-01"): el avance de los pedidos
+# solo llega a los planes con estos periodos (ver sales_plan_periods)
+PERIODO_PATTERN = r"^\d{4}(-Q[1-4]|-(0[1-9]|1[0-2]))?$"
+
 
 class SalesPlanCreate(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -10,7 +14,7 @@ class SalesPlanCreate(BaseModel):
     identificador: str = Field(..., min_length=1)
     nombre: str = Field(..., min_length=2)
     descripcion: str = Field(..., min_length=1)
-    periodo: str = Field(..., min_length=1)
+    periodo: str = Field(..., pattern=PERIODO_PATTERN)
     meta: float = Field(..., gt=0)
     vendedor_id: str = Field(..., min_length=1, alias="vendedorId")
 
@@ -19,7 +23,9 @@ class SalesPlan(SalesPlanCreate):
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
     id: str
+    periodo: str  # los planes guardados antes del formato pueden tener texto libre
     unidades_vendidas: float = Field(alias="unidadesVendidas")
+    monto_vendido: float = Field(default=0, alias="montoVendido")
     vendedor_nombre: Optional[str] = Field(default=None, alias="vendedorNombre")
     created_at: datetime = Field(alias="createdAt")
     updated_at: datetime = Field(alias="updatedAt")
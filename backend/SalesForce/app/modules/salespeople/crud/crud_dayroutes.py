@@ -1,8 +1,10 @@
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, joinedload
 
 from ..models import salespeople_model as models
 from ..schemas import dayroutes_schemas as schemas
 from typing import List, Optional
+from datetime import date, datetime
 
 
 def create_route(db: Session, route: schemas.RouteCreate) -> models.Route:
@@ -59,6 +61,29 @@ def get_all_missing_routes(db: Session, skip: int = 0, limit: int = 100) -> List
     """
     return db.query(models.Route).filter(models.Route.done == 0).offset(skip).limit(limit).all()
 
+def get_routes_for_day(db: Session, salespeople_id: str, day: date) -> List[models.Route]:
+    """
+    Obtiene todas las visitas (hechas o no) de un vendedor para un día,
+    usando el índice compuesto (salespeople_id, day, done).
+    """
+    return db.query(models.Route)\
+             .filter(models.Route.salespeople_id == salespeople_id)\
+             .filter(models.Route.day == day)\
+             .order_by(models.Route.id)\
+             .all()
+
+def get_salespeople_with_pending_routes(db: Session, day: date) -> List[str]:
+    """
+    Obtiene los ids de los vendedores con visitas pendientes en un día.
+    """
+    rows = db.query(models.Route.salespeople_id)\
+             .filter(models.Route.day == day)\
+             .filter(models.Route.done == 0)\
+             .distinct()\
+             .order_by(models.Route.salespeople_id)\
+             .all()
+    return [row.salespeople_id for row in rows]
+
 def update_route(db: Session, route_id: str, route_update: schemas.RouteUpdate) -> Optional[models.Route]:
     """
     Actualiza una ruta existente.
@@ -86,4 +111,101 @@ def delete_route(db: Session, route_id: str) -> Optional[models.Route]:
         db.delete(db_route)
         db.commit()
         return db_route
-    return None
\ No newline at end of file
+    return None
+
+def get_cached_distances(
+    db: Session, origin_cell: str, destination_keys: List[str], fresh_after: datetime
+) -> List[models.DistanceMatrixCache]:
+    """
+    Obtiene las distancias cacheadas vigentes (posteriores a 'fresh_after')
+    desde una celda de origen hacia los destinos indicados.
+    """
+    if not destination_keys:
+        return []
+    return db.query(models.DistanceMatrixCache)\
+             .filter(models.DistanceMatrixCache.origin_cell == origin_cell)\
+             .filter(models.DistanceMatrixCache.destination_key.in_(destination_keys))\
+             .filter(models.DistanceMatrixCache.fetched_at >= fresh_after)\
+             .all()
+
+def save_cached_distances(db: Session, origin_cell: str, entries: List[dict]) -> None:
+    """
+    Guarda (reemplazando las anteriores) las distancias obtenidas del proveedor
+    en una sola transacción.
+
+    Es un upsert: dos solicitudes que cachean la misma celda a la vez no
+    chocan con la clave primaria, gana la última escritura.
+    """
+    if not entries:
+        return
+    table = models.DistanceMatrixCache.__table__
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    # Una fila por destino (un mismo INSERT no puede actualizarla dos veces),
+    # en orden fijo para que dos upserts concurrentes no se bloqueen en cruz
+    by_key = {entry["destination_key"]: {"origin_cell": origin_cell, **entry} for entry in entries}
+    rows = [by_key[key] for key in sorted(by_key)]
+    stmt = dialect.insert(table)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.origin_cell, table.c.destination_key],
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "distance_meters",
+                    "duration_seconds",
+                    "distance_text",
+                    "duration_text",
+                    "fetched_at",
+                )
+            },
+        ),
+        rows,
+    )
+    db.commit()
+
+def get_day_route_plan(db: Session, salespeople_id: str, day: date) -> Optional[models.DayRoutePlan]:
+    """
+    Obtiene la ruta secuenciada guardada para un vendedor y un día.
+    """
+    return db.query(models.DayRoutePlan)\
+             .filter(models.DayRoutePlan.salespeople_id == salespeople_id)\
+             .filter(models.DayRoutePlan.day == day)\
+             .first()
+
+def save_day_route_plan(
+    db: Session,
+    salespeople_id: str,
+    day: date,
+    origin: tuple,
+    stops: str,
+    input_version: str,
+    computed_at: datetime,
+    estimated: bool = False,
+) -> models.DayRoutePlan:
+    """
+    Guarda (reemplazando la anterior) la ruta secuenciada de un vendedor y un día.
+    'estimated' indica que alguna distancia no vino del proveedor.
+    """
+    plan = get_day_route_plan(db, salespeople_id, day)
+    if plan is None:
+        plan = models.DayRoutePlan(salespeople_id=salespeople_id, day=day)
+        db.add(plan)
+    plan.origin_latitude, plan.origin_longitude = origin
+    plan.stops = stops
+    plan.input_version = input_version
+    plan.computed_at = computed_at
+    plan.estimated = estimated
+    db.commit()
+    return plan
+
+def get_last_plan_origin(db: Session, salespeople_id: str, before: date) -> Optional[tuple]:
+    """
+    Obtiene el punto de partida de la última ruta calculada de un vendedor
+    antes de 'before', o None si no tiene rutas previas.
+    """
+    row = db.query(models.DayRoutePlan.origin_latitude, models.DayRoutePlan.origin_longitude)\
+            .filter(models.DayRoutePlan.salespeople_id == salespeople_id)\
+            .filter(models.DayRoutePlan.day < before)\
+            .order_by(models.DayRoutePlan.day.desc())\
+            .first()
+    return (row.origin_latitude, row.origin_longitude) if row else None
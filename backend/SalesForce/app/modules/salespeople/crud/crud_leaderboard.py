@@ -0,0 +1,54 @@
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.modules.territories.models.territories_model import TerritorioClosure
+from ..models.salespeople_model import SalesPlan, Salespeople
+
+
+def _period_plans(db: Session, periodo: str, territory_id: Optional[str] = None):
+    """Planes del periodo, opcionalmente solo de vendedores del subárbol del territorio"""
+    query = db.query(SalesPlan).filter(SalesPlan.periodo == periodo)
+    if territory_id is not None:
+        query = query.join(Salespeople, Salespeople.id == SalesPlan.vendedor_id).filter(
+            Salespeople.territory_id.in_(
+                select(TerritorioClosure.descendant_id).where(
+                    TerritorioClosure.ancestor_id == territory_id
+                )
+            )
+        )
+    return query
+
+
+def get_leaderboard(
+    db: Session, periodo: str, limit: int = 10, territory_id: Optional[str] = None
+) -> List[SalesPlan]:
+    """Los ``limit`` planes del periodo con mayor avance, leídos en orden del índice
+    (periodo, avance). Solo se cargan (y descifran) los vendedores devueltos"""
+    return (
+        _period_plans(db, periodo, territory_id)
+        .options(joinedload(SalesPlan.vendedor))
+        .order_by(SalesPlan.avance.desc(), SalesPlan.vendedor_id)
+        .limit(limit)
+        .all()
+    )
+
+
+def count_leaderboard(db: Session, periodo: str, territory_id: Optional[str] = None) -> int:
+    """Cantidad de vendedores con plan en el periodo"""
+    return _period_plans(db, periodo, territory_id).count()
+
+
+def get_plan_rank(
+    db: Session, plan: SalesPlan, territory_id: Optional[str] = None
+) -> int:
+    """Posición del plan en el ranking de su periodo: 1 + planes con mayor avance
+    (empates comparten posición)"""
+    ahead = (
+        _period_plans(db, plan.periodo, territory_id)
+        .filter(SalesPlan.avance > plan.avance)
+        .with_entities(func.count(SalesPlan.id))
+        .scalar()
+    )
+    return ahead + 1
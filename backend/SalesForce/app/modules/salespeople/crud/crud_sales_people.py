@@ -1,5 +1,7 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
+from app.core.encryption import decrypt_many, raw_ciphertext
 from ..models.salespeople_model import Salespeople
 from ..schemas.salespeople import SalespeopleCreate, SalespeopleUpdate
 
@@ -13,12 +15,39 @@ def get_salespeople_with_plans(db: Session, salespeople_id: str):
         joinedload(Salespeople.sales_plans)
     ).filter(Salespeople.id == salespeople_id).first()
 
+def get_existing_salespeople_ids(db: Session, salespeople_ids):
+    """Devuelve, en una sola consulta IN, cuáles de los IDs dados existen"""
+    if not salespeople_ids:
+        return set()
+    rows = db.query(Salespeople.id).filter(Salespeople.id.in_(set(salespeople_ids))).all()
+    return {row.id for row in rows}
+
 def get_salespeople_by_email(db: Session, email: str):
     return db.query(Salespeople).filter(Salespeople.email == email).first()
 
 def get_salespeople_all(db: Session, skip: int = 0, limit: int = 10):
+    """
+    Página de vendedores como diccionarios. Los campos cifrados se leen tal
+    cual y se descifran juntos, en un solo lote por página.
+    """
     total = db.query(Salespeople).count()
-    salespeople = db.query(Salespeople).offset(skip).limit(limit).all()
+    rows = db.execute(
+        select(
+            Salespeople.id,
+            raw_ciphertext(Salespeople.full_name),
+            raw_ciphertext(Salespeople.email),
+            Salespeople.hire_date,
+            Salespeople.status,
+            Salespeople.territory_id,
+            Salespeople.user_id,
+            Salespeople.created_at,
+            Salespeople.updated_at,
+        ).offset(skip).limit(limit)
+    ).all()
+    plaintexts = iter(decrypt_many([value for row in rows for value in (row.full_name, row.email)]))
+    salespeople = [
+        {**row._asdict(), "full_name": next(plaintexts), "email": next(plaintexts)} for row in rows
+    ]
     return {"salespeople": salespeople, "total": total}
 
 def create_salespeople(db: Session, salespeople: SalespeopleCreate):
@@ -24,10 +24,13 @@ def get_salesplan_all(db: Session, skip: int = 0, limit: int = 10):
     return {"salesplans": salesplans, "total": total}
 
 
-def create_salesplan(db: Session, salesplan: SalesPlanCreate):
-    """Crea un nuevo plan de ventas"""
+def create_salesplan(db: Session, salesplan: SalesPlanCreate, commit: bool = True):
+    """Crea un nuevo plan de ventas; con ``commit=False`` solo lo inserta en la transacción actual"""
     db_salesplan = SalesPlan(**salesplan.model_dump())
     db.add(db_salesplan)
+    if not commit:
+        db.flush()
+        return db_salesplan
     db.commit()
     db.refresh(db_salesplan)
     return db_salesplan
@@ -1,3 +1,6 @@
+from typing import Iterable, Tuple
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
 from ..models.salespeople_model import SalespeopleGoal, Salespeople, SalesPlan
 from ..schemas.salespeoplegoal import SalespeopleGoalCreate, SalespeopleGoalUpdate
@@ -56,6 +59,20 @@ def create_salespeople_goal(db: Session, goal: SalespeopleGoalCreate):
     return db_goal
 
 
+def bulk_create_salespeople_goals(
+    db: Session, sales_plan_id: str, goals: Iterable[Tuple[str, float]]
+):
+    """Inserta los objetivos ``(salespeople_id, goal_value)`` de un plan en un solo
+    INSERT de varias filas, sin confirmar la transacción"""
+    rows = [
+        {"sales_plan_id": sales_plan_id, "salespeople_id": salespeople_id, "goal_value": goal_value}
+        for salespeople_id, goal_value in goals
+    ]
+    if rows:
+        db.execute(insert(SalespeopleGoal), rows)
+    return len(rows)
+
+
 def update_salespeople_goal(db: Session, goal_id: str, goal: SalespeopleGoalUpdate):
     """Actualiza un objetivo existente"""
     db_goal = db.query(SalespeopleGoal).filter(SalespeopleGoal.id == goal_id).first()
@@ -81,22 +98,18 @@ def delete_salespeople_goal(db: Session, goal_id: str):
 
 
 def delete_goals_by_sales_plan(db: Session, sales_plan_id: str):
-    """Elimina todos los objetivos asociados a un plan de ventas"""
-    goals = db.query(SalespeopleGoal).filter(
+    """Elimina todos los objetivos asociados a un plan de ventas con un solo DELETE"""
+    deleted = db.query(SalespeopleGoal).filter(
         SalespeopleGoal.sales_plan_id == sales_plan_id
-    ).all()
-    for goal in goals:
-        db.delete(goal)
+    ).delete(synchronize_session="fetch")
     db.commit()
-    return len(goals)
+    return deleted
 
 
 def delete_goals_by_salespeople(db: Session, salespeople_id: str):
-    """Elimina todos los objetivos de un vendedor"""
-    goals = db.query(SalespeopleGoal).filter(
+    """Elimina todos los objetivos de un vendedor con un solo DELETE"""
+    deleted = db.query(SalespeopleGoal).filter(
         SalespeopleGoal.salespeople_id == salespeople_id
-    ).all()
-    for goal in goals:
-        db.delete(goal)
+    ).delete(synchronize_session="fetch")
     db.commit()
-    return len(goals)
+    return deleted
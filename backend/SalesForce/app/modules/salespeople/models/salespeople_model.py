@@ -6,10 +6,13 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     TIMESTAMP,
+    Boolean,
     func,
     Numeric,
     Float,
-    Integer
+    Integer,
+    Index,
+    false,
 )
 from sqlalchemy.orm import relationship
 
@@ -22,7 +25,7 @@ class Salespeople(Base):
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     full_name = Column(EncryptedString(512), nullable=False)
-    email = Column(EncryptedString(512), unique=True, nullable=False, index=True)
+    email = Column(EncryptedString(512, searchable=True), unique=True, nullable=False, index=True)
     hire_date = Column(Date, nullable=False)
     status = Column(String(50), nullable=False)
     territory_id = Column(String(36), nullable=True, index=True)
@@ -49,12 +52,20 @@ class SalesPlan(Base):
     meta = Column(Float, nullable=False)
     vendedor_id = Column(String(36), ForeignKey("salespeople.id"), nullable=False)
     unidades_vendidas = Column(Float, nullable=False, default=0)
+    monto_vendido = Column(Float, nullable=False, default=0, server_default="0")
+    # unidades_vendidas / meta, mantenido junto con el avance para el ranking
+    avance = Column(Float, nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     vendedor = relationship("Salespeople", back_populates="sales_plans")
     goals = relationship("SalespeopleGoal", back_populates="sales_plan")
 
+    __table_args__ = (
+        # Ranking de un periodo: top-N y posición de un vendedor recorren el índice
+        Index("ix_sales_plans_periodo_avance", "periodo", "avance"),
+    )
+
     @property
     def vendedor_nombre(self):
         if self.vendedor:
@@ -83,3 +94,36 @@ class Route(Base):
     institution_id = Column(String(36), nullable=False, index=True)
     day = Column(Date, nullable=False)
     done = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Visitas pendientes de un vendedor en un día (planeación de la ruta diaria)
+        Index("ix_routes_salespeople_day_done", "salespeople_id", "day", "done"),
+    )
+
+
+class DistanceMatrixCache(Base):
+    """Distancia/duración cacheada desde una celda geohash hacia un destino normalizado."""
+
+    __tablename__ = "distance_matrix_cache"
+    origin_cell = Column(String(12), primary_key=True)
+    destination_key = Column(String(255), primary_key=True)
+    distance_meters = Column(Integer, nullable=False)
+    duration_seconds = Column(Integer, nullable=False)
+    distance_text = Column(String(50), nullable=False)
+    duration_text = Column(String(50), nullable=False)
+    fetched_at = Column(TIMESTAMP, nullable=False, index=True)
+
+
+class DayRoutePlan(Base):
+    """Ruta diaria ya secuenciada de un vendedor, para servir las recargas del día."""
+
+    __tablename__ = "day_route_plan"
+    salespeople_id = Column(String(36), primary_key=True)
+    day = Column(Date, primary_key=True)
+    origin_latitude = Column(Float, nullable=False)
+    origin_longitude = Column(Float, nullable=False)
+    stops = Column(Text, nullable=False)  # JSON: paradas en orden de visita
+    input_version = Column(String(64), nullable=False)  # hash de visitas y clientes del día
+    computed_at = Column(TIMESTAMP, nullable=False)
+    # Alguna distancia se estimó con haversine (proveedor lento o caído): no se sirve como vigente
+    estimated = Column(Boolean, nullable=False, default=False, server_default=false())
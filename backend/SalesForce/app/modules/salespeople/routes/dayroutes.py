@@ -1,4 +1,6 @@
 import logging
+from datetime import date
+from typing import Optional
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.core.database import get_db
@@ -10,8 +12,8 @@ logger = logging.getLogger("uvicorn")
 router = APIRouter(prefix="/daily-routes", tags=["routes"])
 
 @router.get("/salesperson", response_model=None)
-async def get_salespeople_route(salespeople_id: str, latitude: float, longitude: float, db: Session = Depends(get_db)):
-    """Crea un nuevo vendedor"""
+async def get_salespeople_route(salespeople_id: str, latitude: float, longitude: float, day: Optional[date] = None, db: Session = Depends(get_db)):
+    """Ruta del día (por defecto hoy) del vendedor, ordenada y con horas estimadas de llegada"""
     logger.info("Ingreso al servicio %s, y con al id de empleado %s para calcular la ruta desde: latitud %f, y longitud %f", "get_salespeople_route", salespeople_id, latitude, longitude)
-    filtros = await get_dayroute(db, salespeople_id, latitude, longitude)
+    filtros = await get_dayroute(db, salespeople_id, latitude, longitude, day)
     return filtros
\ No newline at end of file
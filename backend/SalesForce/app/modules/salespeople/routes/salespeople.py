@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from ..schemas.salespeople import (
@@ -8,6 +10,8 @@ from ..schemas.salespeople import (
     SalespersonPaginated,
     SalespeopleWithPlan,
 )
+from ..schemas.leaderboard import Leaderboard, LeaderboardPosition
+from ..services.leaderboard_service import read_leaderboard, read_salesperson_rank
 from ..services.salespeople_service import create, delete, read, read_one, update
 
 router = APIRouter(prefix="/vendedores", tags=["vendedores"])
@@ -22,6 +26,26 @@ def read_salespeople(page: int = 1, limit: int = 10, db: Session = Depends(get_d
     """Lista todos los vendedores con paginación"""
     return read(db, page=page, limit=limit)
 
+@router.get("/ranking", response_model=Leaderboard)
+def read_ranking(
+    periodo: str,
+    limit: int = Query(10, ge=1, le=100),
+    territorio_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Ranking de vendedores del periodo por avance de su plan de venta"""
+    return read_leaderboard(db, periodo, limit=limit, territory_id=territorio_id)
+
+@router.get("/{salespeople_id}/ranking", response_model=LeaderboardPosition)
+def read_salesperson_ranking(
+    salespeople_id: str,
+    periodo: str,
+    territorio_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Posición de un vendedor en el ranking del periodo"""
+    return read_salesperson_rank(db, salespeople_id, periodo, territory_id=territorio_id)
+
 @router.get("/{salespeople_id}", response_model=SalespeopleWithPlan)
 def read_salesperson(salespeople_id: str, db: Session = Depends(get_db)):
     """Obtiene un vendedor específico con su plan de venta"""
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 
 # --- Schema Base ---
@@ -40,6 +40,11 @@ class RouteResponse(BaseModel):
     pais: str
     ciudad: str
     direccion: str
+    # Secuencia de la ruta diaria: posición de visita, tiempo acumulado desde
+    # el inicio (traslados + visitas previas) y hora estimada de llegada
+    orden: Optional[int] = None
+    tiempoAcumulado: Optional[str] = None
+    llegadaEstimada: Optional[datetime] = None
 
 class RouteGoogleResponse(BaseModel):
     origin: str
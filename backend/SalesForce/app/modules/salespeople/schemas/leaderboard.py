@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LeaderboardEntry(BaseModel):
+    """Posición de un vendedor en el ranking de avance de un periodo"""
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    posicion: int
+    vendedor_id: str = Field(alias="vendedorId")
+    vendedor_nombre: Optional[str] = Field(default=None, alias="vendedorNombre")
+    identificador: str
+    meta: float
+    unidades_vendidas: float = Field(alias="unidadesVendidas")
+    monto_vendido: float = Field(alias="montoVendido")
+    avance: float
+
+
+class Leaderboard(BaseModel):
+    """Ranking de vendedores por avance (unidades vendidas sobre meta)"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    periodo: str
+    territorio_id: Optional[str] = Field(default=None, alias="territorioId")
+    total: int
+    data: List[LeaderboardEntry]
+
+
+class LeaderboardPosition(LeaderboardEntry):
+    """Posición de un vendedor y tamaño del ranking en que compite"""
+    periodo: str
+    total: int
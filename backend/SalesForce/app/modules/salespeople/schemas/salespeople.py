@@ -67,6 +67,7 @@ class PlanDeVentaInfo(BaseModel):
     periodo: str
     meta: float
     unidades_vendidas: float = Field(alias="unidadesVendidas")
+    monto_vendido: float = Field(default=0, alias="montoVendido")
 
 
 class SalespeopleWithPlan(SalespeopleBase):
@@ -0,0 +1,107 @@
+"""
+Precálculo nocturno de las rutas diarias.
+
+Calcula y guarda la ruta de mañana de cada vendedor con visitas pendientes,
+de modo que al abrir la app por la mañana ``get_dayroute`` la sirva desde la
+tabla ``day_route_plan`` sin llamar al proveedor. Pensado para programarse
+una vez por noche (cron, Cloud Scheduler, etc.):
+
+    python -m app.modules.salespeople.services.dayroute_precompute
+
+Es incremental: los vendedores cuya ruta guardada tiene la misma versión de
+entradas no se recalculan, así que relanzarlo solo procesa los cambios.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from app.core import database
+from ..crud import crud_dayroutes as crud_route
+from . import dayroute_service
+
+logger = logging.getLogger(__name__)
+
+# En el batch no hay un usuario esperando: se le da más tiempo al proveedor
+PRECOMPUTE_PROVIDER_TIMEOUT_SECONDS = float(
+    os.environ.get("DAYROUTE_PRECOMPUTE_PROVIDER_TIMEOUT_SECONDS", 30.0)
+)
+
+
+def precompute_salesperson(salespeople_id: str, day: date) -> str:
+    """
+    Calcula (si cambió) la ruta de un vendedor en una sesión propia y devuelve
+    el resultado: "computed", "unchanged", "empty" o "no_origin".
+
+    Como punto de partida se usa el de su última ruta calculada; sin rutas
+    previas no hay origen conocido y se deja para el cálculo en línea.
+    """
+    with database.SessionLocal() as db:
+        origin = crud_route.get_last_plan_origin(db, salespeople_id, before=day)
+        if origin is None:
+            return "no_origin"
+        stored = dayroute_service.get_stored_dayroute(db, salespeople_id, day, origin)
+        if stored == []:
+            return "empty"
+        if stored is not None:
+            return "unchanged"
+        routes = asyncio.run(
+            dayroute_service.get_dayroute(
+                db,
+                salespeople_id,
+                *origin,
+                day=day,
+                provider_timeout=PRECOMPUTE_PROVIDER_TIMEOUT_SECONDS,
+            )
+        )
+        return "computed" if routes else "empty"
+
+
+def precompute_day_routes(day: Optional[date] = None, max_workers: int = 4) -> Dict[str, int]:
+    """
+    Precalcula la ruta de ``day`` (por defecto mañana) de todos los vendedores
+    con visitas pendientes, en paralelo sobre un pool de ``max_workers`` hilos.
+    """
+    day = day or date.today() + timedelta(days=1)
+    with database.SessionLocal() as db:
+        salespeople_ids = crud_route.get_salespeople_with_pending_routes(db, day)
+
+    stats = {
+        "salespeople": len(salespeople_ids),
+        "computed": 0,
+        "unchanged": 0,
+        "empty": 0,
+        "no_origin": 0,
+        "failed": 0,
+    }
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dayroute-batch") as pool:
+        futures = {
+            salespeople_id: pool.submit(precompute_salesperson, salespeople_id, day)
+            for salespeople_id in salespeople_ids
+        }
+        for salespeople_id, future in futures.items():
+            try:
+                stats[future.result()] += 1
+            except Exception:
+                logger.exception("No se pudo precalcular la ruta del vendedor %s", salespeople_id)
+                stats["failed"] += 1
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precalcula las rutas diarias de los vendedores")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="YYYY-MM-DD (por defecto mañana)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("DAYROUTE_PRECOMPUTE_WORKERS", 4)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = precompute_day_routes(day=args.day, max_workers=args.workers)
+    logger.info("Precálculo de rutas terminado: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
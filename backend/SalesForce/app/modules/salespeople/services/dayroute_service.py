@@ -1,16 +1,28 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime
 import googlemaps
-import os
 from typing import List, Optional
-import base64
+from app.core import database
+from app.core.geo import format_distance, format_duration, haversine_distances
 from ..crud import crud_dayroutes as crud_route
+from .distance_matrix import DistanceMatrixProviderError, distance_matrix_cache
+from .route_sequencing import solve_visit_order
 from ..schemas.dayroutes_schemas import *
 from ..models.salespeople_model import Route
+from app.modules.institutional_clients.crud import get_client_route_inputs
 from app.modules.institutional_clients.services import institutional_client_service as ins_service
 from app.modules.institutional_clients.schemas import InstitutionalContactClientResponse
 
+logger = logging.getLogger(__name__)
+
 def create_route_service(db: Session, route: RouteCreate) -> Route:
     # Lógica de negocio iría aquí
     # ej: if not salesperson_exists(db, route.salespeople_id):
@@ -39,138 +51,283 @@ def delete_route_service(db: Session, route_id: str) -> Optional[Route]:
     return crud_route.delete_route(db=db, route_id=route_id)
 
 
-async def get_dayroute(db: Session, salespeople_id: str, latitud: float, longitud: float):
+# Sin respuesta del proveedor en este tiempo se usa la estimación local
+DISTANCE_LOOKUP_TIMEOUT_SECONDS = float(os.environ.get("DAYROUTE_PROVIDER_TIMEOUT_SECONDS", 2.0))
+# Factor de desvío vial sobre la distancia en línea recta y velocidad urbana media
+ROAD_DETOUR_FACTOR = 1.3
+AVERAGE_SPEED_MPS = 30 * 1000 / 3600
+# Duración de cada visita (para el tiempo acumulado) y presupuesto del 2-opt
+VISIT_DURATION_SECONDS = int(os.environ.get("DAYROUTE_VISIT_MINUTES", 30)) * 60
+SEQUENCING_TIME_BUDGET_SECONDS = float(os.environ.get("DAYROUTE_SEQUENCING_BUDGET_SECONDS", 0.2))
+# Inicio de la jornada en la zona horaria de los vendedores: las llegadas de
+# una ruta calculada antes de que empiece su día se estiman desde esa hora
+DAY_START = time.fromisoformat(os.environ.get("DAYROUTE_DAY_START", "08:00"))
+DAYROUTE_TIMEZONE = ZoneInfo(os.environ.get("DAYROUTE_TIMEZONE", "America/Bogota"))
+
+# Pool propio y acotado: la planeación de un vendedor no bloquea el event loop
+# ni agota el pool por defecto que usan los demás endpoints
+_DAYROUTE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("DAYROUTE_MAX_WORKERS", 8)),
+    thread_name_prefix="dayroute",
+)
+
+PROVIDER_UNAVAILABLE_ERRORS = (
+    asyncio.TimeoutError,
+    googlemaps.exceptions.ApiError,
+    googlemaps.exceptions.TransportError,
+    googlemaps.exceptions.Timeout,
+    RuntimeError,
+)
+
+
+def client_destination(client) -> str:
+    """Destino para el proveedor: coordenadas si existen, si no la dirección."""
+    if client.latitude is not None and client.longitude is not None:
+        return f"{client.latitude:.5f},{client.longitude:.5f}"
+    return ", ".join(part for part in (client.direccion, client.city, client.country) if part)
+
+
+def estimate_distances(origin: tuple, clients: list) -> list:
+    """
+    Estimación local (haversine) para los clientes con coordenadas; ``None``
+    para los que no tienen. Los textos llevan "~" para indicar que es aproximada.
+    """
+    located = [
+        (i, (client.latitude, client.longitude))
+        for i, client in enumerate(clients)
+        if client.latitude is not None and client.longitude is not None
+    ]
+    estimates = [None] * len(clients)
+    distances = haversine_distances(origin, [point for _, point in located])
+    for (i, _), straight_meters in zip(located, distances):
+        meters = max(1, round(straight_meters * ROAD_DETOUR_FACTOR))
+        seconds = round(meters / AVERAGE_SPEED_MPS)
+        estimates[i] = {
+            "distance_meters": meters,
+            "duration_seconds": seconds,
+            "distance_text": f"~{format_distance(meters)}",
+            "duration_text": f"~{format_duration(seconds)}",
+        }
+    return estimates
+
+
+def _lookup_distances(origin: tuple, destinations: list) -> list:
+    # Sesión propia: el hilo puede seguir llenando el cache tras un timeout
+    with database.SessionLocal() as session:
+        return distance_matrix_cache.get_many(session, origin, destinations)
+
+
+def build_leg_matrix(origin_legs: list, clients: list) -> list:
+    """
+    Matriz de tiempos (segundos) para secuenciar: el nodo 0 es el origen y su
+    fila son los tiempos del proveedor (o estimados) hacia cada parada. Entre
+    dos paradas con coordenadas se usa haversine; si a alguna le faltan, se
+    usa la cota de pasar por el origen (tiempo_i + tiempo_j).
+    """
+    size = len(clients) + 1
+    matrix = [[0.0] * size for _ in range(size)]
+    for i, seconds in enumerate(origin_legs, start=1):
+        matrix[0][i] = matrix[i][0] = float(seconds)
+
+    located = [
+        (i, (client.latitude, client.longitude))
+        for i, client in enumerate(clients, start=1)
+        if client.latitude is not None and client.longitude is not None
+    ]
+    points = [point for _, point in located]
+    for i in range(1, size):
+        for j in range(i + 1, size):
+            matrix[i][j] = matrix[j][i] = float(origin_legs[i - 1] + origin_legs[j - 1])
+    for i, point in located:
+        for (j, _), meters in zip(located, haversine_distances(point, points)):
+            if i != j:
+                matrix[i][j] = meters * ROAD_DETOUR_FACTOR / AVERAGE_SPEED_MPS
+    return matrix
+
+
+def day_route_input_version(routes: list, client_inputs: list, origin_cell: str) -> str:
+    """
+    Hash de las entradas de la ruta de un día: la celda del punto de partida,
+    las visitas (sin su estado) y la dirección, territorio y coordenadas de
+    cada cliente. Marcar visitas como hechas no lo cambia; agregar visitas,
+    mover un cliente o salir desde otra celda, sí.
+    """
+    clients = {
+        row.id: [row.direccion, row.territory_id, row.latitude, row.longitude]
+        for row in client_inputs
+    }
+    payload = sorted(
+        [route.id, route.institution_id, clients.get(route.institution_id)]
+        for route in routes
+    )
+    return hashlib.sha256(
+        json.dumps([origin_cell, payload], default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def route_start_time(day: date, now: Optional[datetime] = None) -> datetime:
+    """
+    Hora (UTC) desde la que se estiman las llegadas de la ruta de ``day``: el
+    inicio de la jornada de ese día, o el momento actual si ya empezó. Así la
+    ruta precalculada de noche no estima llegadas a la hora del batch.
+    """
+    now = now or datetime.now(timezone.utc)
+    day_start = datetime.combine(day, DAY_START, tzinfo=DAYROUTE_TIMEZONE)
+    return max(now, day_start.astimezone(timezone.utc)).replace(microsecond=0)
+
+
+def _serve_stored_plan(plan, pending_ids: set) -> Optional[list]:
+    """Paradas guardadas aún pendientes, o ``None`` si hay visitas nuevas."""
+    stops = [RouteResponse(**stop) for stop in json.loads(plan.stops)]
+    if not pending_ids <= {stop.id for stop in stops}:
+        return None
+    return [stop for stop in stops if stop.id in pending_ids]
+
+
+def _load_day_inputs(db: Session, salespeople_id: str, day: date, origin: tuple):
+    """Visitas pendientes del día, versión de sus entradas y ruta guardada vigente."""
+    day_routes = crud_route.get_routes_for_day(db, salespeople_id, day)
+    routes = [route for route in day_routes if route.done == 0]
+    if not routes:
+        return routes, None, []
+    input_version = day_route_input_version(
+        day_routes,
+        get_client_route_inputs(db, list({route.institution_id for route in day_routes})),
+        distance_matrix_cache.origin_cell(origin),
+    )
+    stored = crud_route.get_day_route_plan(db, salespeople_id, day)
+    served = None
+    # Una ruta con distancias estimadas no es vigente: se recalcula hasta que responda el proveedor
+    if stored is not None and stored.input_version == input_version and not stored.estimated:
+        served = _serve_stored_plan(stored, {route.id for route in routes})
+    return routes, input_version, served
+
+
+def get_stored_dayroute(
+    db: Session, salespeople_id: str, day: date, origin: tuple
+) -> Optional[list]:
+    """Ruta guardada del día desde ``origin`` si sigue vigente; ``None`` si hay que calcularla."""
+    routes, _, served = _load_day_inputs(db, salespeople_id, day, origin)
+    return served if routes else []
+
+
+async def get_dayroute(
+    db: Session,
+    salespeople_id: str,
+    latitud: float,
+    longitud: float,
+    day: Optional[date] = None,
+    provider_timeout: Optional[float] = None,
+):
+    """
+    Ruta del día de un vendedor: sus visitas pendientes en orden de recorrido,
+    con tiempo acumulado y hora estimada de llegada a cada una.
+
+    La ruta calculada (en línea o por el precálculo nocturno) se guarda con la
+    versión de sus entradas. Mientras la versión no cambie se sirve desde la
+    tabla (las visitas ya hechas desaparecen); solo se recalcula cuando cambian
+    las visitas del día, los datos de sus clientes o la celda del punto de
+    partida, o cuando se guardó con distancias estimadas porque el proveedor
+    no respondió.
+    """
     try:
-        routes = crud_route.get_all_missing_routes(db)
-        institution_ids = [route.institution_id for route in routes]
-        instituciones: InstitutionalContactClientResponse = await ins_service.list_clients_territories(db,territories=institution_ids)
-    
-        # 3. Itera sobre la lista '.data'
-        destino = [f"{client.direccion}, {client.city}, {client.country}" for client in instituciones.data]
-        
-        route_data_list_of_dicts = get_multiple_routes_data(
-            origin_lat=latitud,
-            origin_lon=longitud,
-            destination_addresses=destino
+        day = day or date.today()
+        origin = (latitud, longitud)
+        routes, input_version, served = _load_day_inputs(db, salespeople_id, day, origin)
+        if not routes:
+            return []
+        if served is not None:
+            return served
+
+        institution_ids = list(dict.fromkeys(route.institution_id for route in routes))
+        instituciones: InstitutionalContactClientResponse = await ins_service.list_clients_territories(
+            db, territories=institution_ids, limit=max(1, len(institution_ids))
         )
 
-        # 2. Construimos la lista de RouteResponse uniendo:
-        #    - id desde `routes` (resultado del CRUD)
-        #    - datos de la institución desde `instituciones.data`
-        #    - tiempo/distancia desde los resultados de la API (route_data_list_of_dicts)
+        # Cada ruta se une con su institución por id (no por posición)
+        clients_by_id = {client.id: client for client in instituciones.data}
+        planned = [
+            (route, clients_by_id[route.institution_id])
+            for route in routes
+            if route.institution_id in clients_by_id
+        ]
+        clients = [client for _, client in planned]
+        destino = [client_destination(client) for client in clients]
+
+        # Distancias desde el cache (LRU + tabla); solo los faltantes van a Google.
+        # Si el proveedor es lento o no está disponible se estima con haversine.
+        estimates = estimate_distances(origin, clients)
+        loop = asyncio.get_running_loop()
+        try:
+            provider_results = await asyncio.wait_for(
+                loop.run_in_executor(_DAYROUTE_EXECUTOR, _lookup_distances, origin, destino),
+                timeout=provider_timeout or DISTANCE_LOOKUP_TIMEOUT_SECONDS,
+            )
+        except PROVIDER_UNAVAILABLE_ERRORS as e:
+            logger.warning("Proveedor de distancias no disponible, usando estimación: %r", e)
+            provider_results = [None] * len(destino)
+
+        # Solo se planean las paradas con distancia válida (> 0)
+        stops = []
+        estimated = False
+        for (route_obj, client), provider_data, estimate in zip(planned, provider_results, estimates):
+            data = provider_data or estimate
+            if data and data.get("distance_meters", 0) > 0:
+                stops.append((route_obj, client, data))
+                estimated = estimated or not provider_data
+        if not stops:
+            return []
+
+        matrix = build_leg_matrix(
+            [data["duration_seconds"] for _, _, data in stops],
+            [client for _, client, _ in stops],
+        )
+        visit_order = await loop.run_in_executor(
+            _DAYROUTE_EXECUTOR, solve_visit_order, matrix, SEQUENCING_TIME_BUDGET_SECONDS
+        )
+
+        # Tiempo acumulado al llegar a cada parada: traslados + visitas previas
+        started_at = route_start_time(day)
         route_responses: list[RouteResponse] = []
-        for i, data in enumerate(route_data_list_of_dicts):
-            # Solo añadimos rutas con distancia válida (> 0)
-            if data.get("distance_meters", 0) > 0:
-                # Tomamos la entidad y el route asociado por índice
-                try:
-                    route_obj = routes[i]
-                except IndexError:
-                    # Si por alguna razón las listas no están alineadas, saltamos
-                    continue
-                client = instituciones.data[i]
-
-                route_resp = RouteResponse(
+        elapsed, previous = 0.0, 0
+        for position, node in enumerate(visit_order, start=1):
+            route_obj, client, data = stops[node - 1]
+            elapsed += matrix[previous][node]
+            arrival = round(elapsed)
+            route_responses.append(
+                RouteResponse(
                     id=getattr(route_obj, "id", ""),
                     nombreEntidad=getattr(client, "nombre_institucion", ""),
                     tiempo=data.get("duration_text", ""),
                     distancia=data.get("distance_text", ""),
                     pais=getattr(client, "country", "") or "",
                     ciudad=getattr(client, "city", "") or "",
-                    direccion=getattr(client, "direccion", "") or ""
+                    direccion=getattr(client, "direccion", "") or "",
+                    orden=position,
+                    tiempoAcumulado=format_duration(arrival),
+                    llegadaEstimada=started_at + timedelta(seconds=arrival),
                 )
-                route_responses.append(route_resp)
+            )
+            elapsed += VISIT_DURATION_SECONDS
+            previous = node
 
-        # 3. Devolvemos la respuesta estructurada con RouteResponse
+        crud_route.save_day_route_plan(
+            db,
+            salespeople_id,
+            day,
+            origin,
+            json.dumps([response.model_dump(mode="json") for response in route_responses]),
+            input_version,
+            datetime.now(timezone.utc).replace(tzinfo=None),
+            estimated=estimated,
+        )
         return route_responses
-        
+
+    except DistanceMatrixProviderError as e:
+        # Falla del proveedor externo, no del recurso pedido
+        logger.error("Respuesta inválida del proveedor de distancias: %r", e)
+        raise HTTPException(status_code=502, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except googlemaps.exceptions.ApiError as e:
-        raise HTTPException(status_code=400, detail=f"Error al contactar la API de Google: {e.message}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
-    
-
-def get_multiple_routes_data(origin_lat: float, origin_lon: float, destination_addresses: list[str]) -> list[dict]:
-    """
-    Función de lógica de negocio para calcular la ruta.
-    Devuelve un diccionario con los datos o lanza una excepción.
-    """
-    mi_key_bytes= os.environ.get("API_KEY_GOOGLE")
-    key_decodificada_bytes = base64.b64decode(mi_key_bytes)
-    API_KEY = key_decodificada_bytes.decode('utf-8')
-    try:
-        gmaps = googlemaps.Client(key=API_KEY)
-    except ValueError:
-        print("Error: La API Key no es válida o está ausente.")
-        # En un caso real, no deberías iniciar la app si la clave falta
-        # Para este ejemplo, la app iniciará pero fallará en las peticiones.
-        gmaps = None
-    if gmaps is None:
-        raise HTTPException(
-            status_code=500, 
-            detail="El servidor no está configurado correctamente (falta API Key)."
-        )
-
-    if gmaps is None:
-        # Esto es un error de configuración del servidor
-        raise ValueError("Error de servidor: Cliente de Google Maps no inicializado.")
-
-    origin = (origin_lat, origin_lon)
-    try:
-        # ¡Aquí está el cambio! Usamos distance_matrix
-        matrix_result = gmaps.distance_matrix(origins=[origin],
-                                              destinations=destination_addresses,
-                                              mode="driving",
-                                              departure_time=datetime.now())
-
-        # La respuesta es una matriz. Como solo tenemos 1 origen,
-        # solo nos interesa la primera (y única) "fila" (row).
-        
-        # 'rows' es una lista con 1 elemento (nuestro origen)
-        if not matrix_result or 'rows' not in matrix_result or not matrix_result['rows']:
-            raise ValueError("Respuesta inesperada de la API de Distance Matrix")
-
-        elements = matrix_result['rows'][0]['elements']
-        
-        # 'elements' es una lista que corresponde a cada destino
-        # Ejs: elements[0] es la ruta a destination_addresses[0]
-        #      elements[1] es la ruta a destination_addresses[1]
-        
-        results_list = []
-        
-        # Iteramos sobre los destinos y sus resultados
-        for i, element in enumerate(elements):
-            
-            # El "status" del elemento nos dice si se encontró esa ruta
-            if element['status'] == 'OK':
-                results_list.append({
-                    # Obtenemos la dirección original que enviamos
-                    "origin": matrix_result['origin_addresses'][0], 
-                    # Obtenemos la dirección que Google encontró (ya "geocodificada")
-                    "destination": matrix_result['destination_addresses'][i], 
-                    "distance_text": element['distance']['text'],
-                    "duration_text": element['duration']['text'],
-                    "distance_meters": element['distance']['value'],
-                    "duration_seconds": element['duration']['value']
-                })
-            else:
-                # Si no se encontró (ej: "NOT_FOUND"), guardamos un marcador
-                results_list.append({
-                    "origin": matrix_result['origin_addresses'][0],
-                    "destination": f"No se encontró ruta para: {destination_addresses[i]}",
-                    "distance_text": "N/A",
-                    "duration_text": "N/A",
-                    "distance_meters": 0,
-                    "duration_seconds": 0
-                })
-                
-        return results_list
-
-    except googlemaps.exceptions.ApiError as e:
-        print(f"Error de la API de Google (Matrix): {e}")
-        raise e
-    except Exception as e:
-        print(f"Error inesperado en get_multiple_routes_data: {e}")
-        raise e
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Cache de distancias/duraciones para la planeación de rutas diarias.
+
+Las consultas se indexan por la celda geohash del origen (los vendedores que
+planean desde el mismo vecindario comparten resultados) y por la dirección de
+destino normalizada. Los resultados viven en la tabla ``distance_matrix_cache``
+con un TTL y, por delante, en un LRU en memoria. Los faltantes se piden al
+proveedor en bloques del tamaño máximo que acepta por petición, en paralelo
+sobre un pool de hilos acotado y bajo un límite de peticiones por segundo.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.geo import (
+    format_distance,
+    format_duration,
+    geohash_encode,
+    get_google_maps_client,
+    normalize_address,
+)
+from ..crud import crud_dayroutes as crud_route
+
+logger = logging.getLogger(__name__)
+
+Origin = Tuple[float, float]
+
+# Límite de Distance Matrix para un origen: 25 destinos por petición
+PROVIDER_MAX_DESTINATIONS = 25
+
+
+class DistanceMatrixProviderError(Exception):
+    """El proveedor de distancias devolvió una respuesta que no se puede usar."""
+
+
+class RateLimiter:
+    """Espacia el inicio de las peticiones para no superar ``rate`` por segundo."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class DistanceMatrixProvider(Protocol):
+    """Proveedor de matrices de distancia (un origen, varios destinos)."""
+
+    def fetch(self, origin: Origin, destinations: Sequence[str]) -> List[Optional[dict]]:
+        """
+        Devuelve, en el mismo orden de ``destinations``, un diccionario con
+        distance_meters, duration_seconds, distance_text y duration_text, o
+        ``None`` cuando no hay ruta para ese destino.
+        """
+        ...
+
+
+class GoogleDistanceMatrixProvider:
+    """Proveedor sobre la API Distance Matrix de Google (cliente reutilizado)."""
+
+    def fetch(self, origin: Origin, destinations: Sequence[str]) -> List[Optional[dict]]:
+        matrix_result = get_google_maps_client().distance_matrix(
+            origins=[origin],
+            destinations=list(destinations),
+            mode="driving",
+            departure_time=datetime.now(),
+        )
+        if not matrix_result or not matrix_result.get("rows"):
+            raise DistanceMatrixProviderError("Respuesta inesperada de la API de Distance Matrix")
+
+        results: List[Optional[dict]] = []
+        for element in matrix_result["rows"][0]["elements"]:
+            if element.get("status") != "OK":
+                results.append(None)
+                continue
+            results.append(
+                {
+                    "distance_meters": element["distance"]["value"],
+                    "duration_seconds": element["duration"]["value"],
+                    "distance_text": element["distance"]["text"],
+                    "duration_text": element["duration"]["text"],
+                }
+            )
+        return results
+
+
+class StubDistanceMatrixProvider:
+    """
+    Proveedor local para pruebas y desarrollo sin API Key.
+
+    Usa las rutas conocidas (por destino normalizado) y, para el resto, una
+    distancia determinística derivada del texto; registra cada llamada en
+    ``calls`` para verificar el consumo de cuota.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.routes = {normalize_address(k): v for k, v in (routes or {}).items()}
+        self.calls: List[List[str]] = []
+
+    def fetch(self, origin: Origin, destinations: Sequence[str]) -> List[Optional[dict]]:
+        self.calls.append(list(destinations))
+        results: List[Optional[dict]] = []
+        for destination in destinations:
+            key = normalize_address(destination)
+            if key in self.routes:
+                meters, seconds = self.routes[key]
+            else:
+                meters = 1000 + sum(map(ord, key)) % 20000
+                seconds = meters * 60 // 500  # ~30 km/h
+            results.append(
+                {
+                    "distance_meters": meters,
+                    "duration_seconds": seconds,
+                    "distance_text": format_distance(meters),
+                    "duration_text": format_duration(seconds),
+                }
+            )
+        return results
+
+
+class DistanceMatrixCache:
+    """Cache de dos niveles (LRU en memoria + tabla con TTL) frente al proveedor."""
+
+    def __init__(
+        self,
+        provider: DistanceMatrixProvider,
+        ttl: timedelta = timedelta(hours=24),
+        max_entries: int = 10000,
+        geohash_precision: int = 7,
+        chunk_size: int = PROVIDER_MAX_DESTINATIONS,
+        max_workers: int = 4,
+        requests_per_second: float = 10.0,
+    ):
+        self.provider = provider
+        self.ttl = ttl
+        self.geohash_precision = geohash_precision
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="distance-matrix"
+        )
+        self._rate_limiter = RateLimiter(requests_per_second)
+        self._max_entries = max_entries
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[datetime, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def origin_cell(self, origin: Origin) -> str:
+        """Celda geohash que agrupa los orígenes que comparten distancias cacheadas."""
+        return geohash_encode(origin[0], origin[1], self.geohash_precision)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def _memory_get(self, key: Tuple[str, str], now: datetime) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key: Tuple[str, str], value: dict, fetched_at: datetime) -> None:
+        with self._lock:
+            self._memory[key] = (fetched_at + self.ttl, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_entries:
+                self._memory.popitem(last=False)
+
+    def _fetch_chunk(self, origin: Origin, destinations: List[str]) -> List[Optional[dict]]:
+        self._rate_limiter.acquire()
+        results = self.provider.fetch(origin, destinations)
+        if len(results) != len(destinations):
+            raise DistanceMatrixProviderError("Respuesta inesperada de la API de Distance Matrix")
+        return results
+
+    def fetch_missing(
+        self, origin: Origin, destinations: List[str]
+    ) -> List[Optional[dict]]:
+        """
+        Pide ``destinations`` al proveedor en bloques concurrentes y une los
+        resultados por posición. Un bloque fallido deja ``None`` en sus
+        posiciones; si fallan todos se propaga el primer error.
+        """
+        chunks = [
+            (start, destinations[start:start + self.chunk_size])
+            for start in range(0, len(destinations), self.chunk_size)
+        ]
+        futures = [
+            (start, len(chunk), self._executor.submit(self._fetch_chunk, origin, chunk))
+            for start, chunk in chunks
+        ]
+
+        merged: List[Optional[dict]] = [None] * len(destinations)
+        errors = []
+        for start, size, future in futures:
+            try:
+                merged[start:start + size] = future.result()
+            except Exception as e:
+                logger.warning("Falló un bloque de %d destinos: %r", size, e)
+                errors.append(e)
+        if errors and len(errors) == len(futures):
+            raise errors[0]
+        return merged
+
+    def get_many(
+        self, db: Session, origin: Origin, destinations: Sequence[str]
+    ) -> List[Optional[dict]]:
+        """
+        Resuelve las distancias desde ``origin`` hacia cada destino, en orden.
+
+        Primero el LRU, luego la tabla (una consulta) y finalmente el proveedor,
+        solo para los destinos faltantes (sin repetidos).
+        """
+        now = datetime.utcnow()
+        cell = self.origin_cell(origin)
+        keys = [normalize_address(destination) for destination in destinations]
+        resolved: Dict[str, Optional[dict]] = {}
+
+        for key in set(keys):
+            value = self._memory_get((cell, key), now)
+            if value is not None:
+                resolved[key] = value
+
+        pending = [key for key in dict.fromkeys(keys) if key not in resolved]
+        if pending:
+            for row in crud_route.get_cached_distances(db, cell, pending, now - self.ttl):
+                value = {
+                    "distance_meters": row.distance_meters,
+                    "duration_seconds": row.duration_seconds,
+                    "distance_text": row.distance_text,
+                    "duration_text": row.duration_text,
+                }
+                resolved[row.destination_key] = value
+                self._memory_put((cell, row.destination_key), value, row.fetched_at)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in resolved]
+        if missing:
+            # Se envía la dirección original del primer destino con esa clave
+            originals = {}
+            for destination, key in zip(destinations, keys):
+                originals.setdefault(key, destination)
+            fetched = self.fetch_missing(origin, [originals[key] for key in missing])
+
+            entries = []
+            for key, value in zip(missing, fetched):
+                resolved[key] = value
+                if value is None:
+                    continue
+                entries.append({"destination_key": key, "fetched_at": now, **value})
+                self._memory_put((cell, key), value, now)
+            crud_route.save_cached_distances(db, cell, entries)
+
+        return [resolved.get(key) for key in keys]
+
+
+def _default_provider() -> DistanceMatrixProvider:
+    if os.environ.get("DISTANCE_MATRIX_PROVIDER", "google").lower() == "stub":
+        return StubDistanceMatrixProvider()
+    return GoogleDistanceMatrixProvider()
+
+
+distance_matrix_cache = DistanceMatrixCache(
+    provider=_default_provider(),
+    ttl=timedelta(seconds=int(os.environ.get("DISTANCE_CACHE_TTL_SECONDS", 24 * 3600))),
+)
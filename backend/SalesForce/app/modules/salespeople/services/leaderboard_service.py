@@ -0,0 +1,62 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.modules.sales.crud.sales_plan import get_sales_plan_by_vendedor_and_period
+from ..crud import crud_leaderboard
+from ..schemas.leaderboard import Leaderboard, LeaderboardEntry, LeaderboardPosition
+
+
+def _entry(plan, posicion: int) -> dict:
+    return {
+        "posicion": posicion,
+        "vendedor_id": plan.vendedor_id,
+        "vendedor_nombre": plan.vendedor_nombre,
+        "identificador": plan.identificador,
+        "meta": plan.meta,
+        "unidades_vendidas": plan.unidades_vendidas,
+        "monto_vendido": plan.monto_vendido,
+        "avance": plan.avance,
+    }
+
+
+def read_leaderboard(
+    db: Session, periodo: str, limit: int = 10, territory_id: Optional[str] = None
+) -> Leaderboard:
+    """
+    Top ``limit`` de vendedores del periodo por avance, opcionalmente solo los
+    del territorio (y sus subterritorios). Los empates comparten posición.
+    """
+    plans = crud_leaderboard.get_leaderboard(db, periodo, limit=limit, territory_id=territory_id)
+    entries = []
+    for index, plan in enumerate(plans):
+        if index and plan.avance == plans[index - 1].avance:
+            posicion = entries[-1].posicion
+        else:
+            posicion = index + 1
+        entries.append(LeaderboardEntry(**_entry(plan, posicion)))
+
+    return Leaderboard(
+        periodo=periodo,
+        territorio_id=territory_id,
+        total=crud_leaderboard.count_leaderboard(db, periodo, territory_id),
+        data=entries,
+    )
+
+
+def read_salesperson_rank(
+    db: Session, salespeople_id: str, periodo: str, territory_id: Optional[str] = None
+) -> LeaderboardPosition:
+    """Posición de un vendedor en el ranking del periodo (o del territorio)"""
+    plan = get_sales_plan_by_vendedor_and_period(db, salespeople_id, periodo)
+    if plan is None:
+        raise HTTPException(
+            status_code=404, detail="El vendedor no tiene plan de venta en el periodo"
+        )
+    posicion = crud_leaderboard.get_plan_rank(db, plan, territory_id)
+    return LeaderboardPosition(
+        **_entry(plan, posicion),
+        periodo=periodo,
+        total=crud_leaderboard.count_leaderboard(db, periodo, territory_id),
+    )
@@ -0,0 +1,72 @@
+"""
+Secuenciación de las visitas de una ruta diaria.
+
+El problema es un TSP abierto: se parte de la ubicación del vendedor (nodo 0)
+y se recorren todas las paradas sin volver. Con las pocas decenas de visitas
+de un día basta una heurística rápida: vecino más cercano para la ruta
+inicial y luego mejoras 2-opt hasta que no haya ganancia o se agote el
+presupuesto de tiempo.
+"""
+
+import time
+from typing import List, Optional, Sequence
+
+Matrix = Sequence[Sequence[float]]
+
+
+def nearest_neighbour_order(matrix: Matrix) -> List[int]:
+    """Ruta inicial desde el nodo 0 tomando siempre la parada más cercana."""
+    pending = set(range(1, len(matrix)))
+    order = [0]
+    while pending:
+        row = matrix[order[-1]]
+        nearest = min(pending, key=lambda node: (row[node], node))
+        pending.remove(nearest)
+        order.append(nearest)
+    return order
+
+
+def path_cost(matrix: Matrix, order: Sequence[int]) -> float:
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def two_opt(matrix: Matrix, order: List[int], deadline: Optional[float] = None) -> List[int]:
+    """
+    Mejora ``order`` invirtiendo tramos mientras se acorte el recorrido.
+
+    El nodo 0 queda fijo al inicio y el final es abierto, así que invertir el
+    último tramo solo cambia la arista de entrada. Se detiene al llegar a
+    ``deadline`` (``time.monotonic()``) conservando la mejor ruta encontrada.
+    """
+    order = list(order)
+    last = len(order) - 1
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, last):
+            if deadline is not None and time.monotonic() >= deadline:
+                return order
+            before, first = order[i - 1], order[i]
+            for j in range(i + 1, last + 1):
+                end = order[j]
+                delta = matrix[before][end] - matrix[before][first]
+                if j < last:
+                    after = order[j + 1]
+                    delta += matrix[first][after] - matrix[end][after]
+                if delta < -1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+                    before, first = order[i - 1], order[i]
+    return order
+
+
+def solve_visit_order(matrix: Matrix, time_budget: float = 0.2) -> List[int]:
+    """
+    Orden de visita (índices de ``matrix`` sin el origen) que minimiza el costo
+    total partiendo del nodo 0, dentro de ``time_budget`` segundos.
+    """
+    if len(matrix) <= 2:
+        return list(range(1, len(matrix)))
+    deadline = time.monotonic() + time_budget
+    order = two_opt(matrix, nearest_neighbour_order(matrix), deadline)
+    return order[1:]
@@ -3,11 +3,11 @@
 from typing import List
 
 from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.pagination import build_pagination_metadata, get_pagination_offset
 from ..schemas.salesplan import SalesPlanCreate, SalesPlanUpdate
-from ..schemas.salespeoplegoal import SalespeopleGoalCreate
 from ..crud.crud_sales_plan import (
     get_salesplan_by_name,
     get_salesplan,
@@ -16,8 +16,8 @@ from ..crud.crud_sales_plan import (
     delete_salesplan,
     get_salesplan_all,
 )
-from ..crud.crud_salespeople_goal import create_salespeople_goal
-from ..crud.crud_sales_people import get_salespeople
+from ..crud.crud_salespeople_goal import bulk_create_salespeople_goals
+from ..crud.crud_sales_people import get_existing_salespeople_ids
 
 
 def create(
@@ -26,7 +26,13 @@ def create(
     salespeople_ids: List[str],
     goal_values: List[float],
 ):
-    """Crear un plan de ventas y asignar objetivos a los vendedores especificados."""
+    """
+    Crear un plan de ventas y asignar objetivos a los vendedores especificados.
+
+    Los vendedores se validan con una sola consulta y el plan se guarda junto
+    con todos sus objetivos (un INSERT de varias filas) en una transacción:
+    si algo falla no queda un plan a medio crear.
+    """
 
     if len(salespeople_ids) != len(goal_values):
         raise HTTPException(
@@ -38,23 +44,26 @@ def create(
     if db_salesplan:
         raise HTTPException(status_code=400, detail="Plan name already registered")
 
-    for salespeople_id in salespeople_ids:
-        if not get_salespeople(db, salespeople_id):
-            raise HTTPException(
-                status_code=404,
-                detail=f"Vendedor con ID {salespeople_id} no encontrado",
-            )
-
-    db_salesplan = create_salesplan(db, salesplan=salesplan)
-
-    for salespeople_id, goal_value in zip(salespeople_ids, goal_values):
-        goal_data = SalespeopleGoalCreate(
-            sales_plan_id=db_salesplan.id,
-            salespeople_id=salespeople_id,
-            goal_value=goal_value,
+    existing_ids = get_existing_salespeople_ids(db, salespeople_ids)
+    missing_ids = [
+        salespeople_id
+        for salespeople_id in dict.fromkeys(salespeople_ids)
+        if salespeople_id not in existing_ids
+    ]
+    if missing_ids:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Vendedores no encontrados: {', '.join(missing_ids)}",
         )
-        create_salespeople_goal(db, goal=goal_data)
 
+    try:
+        db_salesplan = create_salesplan(db, salesplan=salesplan, commit=False)
+        bulk_create_salespeople_goals(db, db_salesplan.id, zip(salespeople_ids, goal_values))
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    db.refresh(db_salesplan)
     return db_salesplan
 
 
@@ -157,4 +157,50 @@ def get_territorios_by_ids(db: Session, territorio_ids: List[UUID]) -> List[mode
 
     return db.query(models.Territorio).filter(
         models.Territorio.id.in_(territorio_ids)
-    ).all()
\ No newline at end of file
+    ).all()
+
+def rebuild_territorios_closure(db: Session) -> int:
+    """
+    Reconstruye la tabla de clausura de territorios desde cero.
+
+    Los territorios nuevos o movidos se mantienen al día con eventos del ORM;
+    esta función sirve para poblar datos existentes (siembra, bases previas).
+    Devuelve el número de filas de clausura generadas.
+    """
+    nodes = db.query(
+        models.Territorio.id,
+        models.Territorio.id_parent,
+        models.Territorio.name,
+        models.Territorio.type,
+    ).all()
+    rows = models.build_closure_rows(nodes)
+
+    db.query(models.TerritorioClosure).delete(synchronize_session=False)
+    if rows:
+        db.execute(models.TerritorioClosure.__table__.insert(), rows)
+    db.commit()
+    return len(rows)
+
+def ensure_territorios_closure(db: Session) -> int:
+    """
+    Puebla la tabla de clausura solo si está vacía y hay territorios.
+
+    Pensada para el arranque: con la tabla ya poblada no hace nada, porque
+    los eventos del ORM la mantienen al día. Devuelve las filas generadas.
+    """
+    if db.query(models.TerritorioClosure.descendant_id).first() is not None:
+        return 0
+    if db.query(models.Territorio.id).first() is None:
+        return 0
+    return rebuild_territorios_closure(db)
+
+def get_territorio_ancestry_labels(db: Session, territory_id: str) -> Dict[str, str]:
+    """
+    Devuelve {tipo: nombre} de los ancestros de un territorio (incluido él
+    mismo) usando la tabla de clausura, en una sola consulta.
+    """
+    rows = db.query(
+        models.TerritorioClosure.ancestor_type,
+        models.TerritorioClosure.ancestor_name,
+    ).filter(models.TerritorioClosure.descendant_id == str(territory_id)).all()
+    return {territory_type: name for territory_type, name in rows if territory_type}
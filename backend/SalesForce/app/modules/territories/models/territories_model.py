@@ -1,5 +1,20 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Enum as SAEnum, func
+from typing import Iterable
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    ForeignKey,
+    TIMESTAMP,
+    Enum as SAEnum,
+    Index,
+    event,
+    func,
+    inspect,
+    literal,
+    or_,
+    select,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -24,4 +39,156 @@ class Territorio(Base):
         "Territorio",
         back_populates="children",
         remote_side=[id]
-    )
\ No newline at end of file
+    )
+
+class TerritorioClosure(Base):
+    """
+    Tabla de clausura (closure table) de la jerarquía de territorios.
+
+    Guarda una fila por cada par (ancestro, descendiente), incluido el propio
+    territorio con profundidad 0, para resolver subárboles y linajes con un
+    único JOIN indexado en lugar de recorrer el árbol. Los IDs se guardan como
+    texto para unirse directamente con las columnas ``territory_id`` de los
+    demás módulos, y el nombre y tipo del ancestro se copian para resolver
+    país/ciudad de un territorio sin volver a ``territorios``.
+    """
+    __tablename__ = "territorios_closure"
+
+    ancestor_id = Column(String(36), primary_key=True)
+    descendant_id = Column(String(36), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+    ancestor_name = Column(String, nullable=True)
+    ancestor_type = Column(String(20), nullable=True)
+
+    __table_args__ = (
+        Index("ix_territorios_closure_ancestor_depth", "ancestor_id", "depth"),
+    )
+
+
+def _type_value(territory_type) -> str | None:
+    if territory_type is None:
+        return None
+    return TerritoryType(territory_type).value
+
+
+def build_closure_rows(
+    nodes: Iterable[tuple[str, str | None, str | None, object]]
+) -> list[dict]:
+    """
+    Calcula las filas de la tabla de clausura a partir de tuplas
+    (id, id_parent, name, type).
+    """
+    parents, labels = {}, {}
+    for node, parent, name, territory_type in nodes:
+        parents[str(node)] = str(parent) if parent else None
+        labels[str(node)] = (name, _type_value(territory_type))
+    rows = []
+    for node in parents:
+        current, depth, seen = node, 0, set()
+        while current is not None and current not in seen:
+            seen.add(current)
+            name, territory_type = labels.get(current, (None, None))
+            rows.append(
+                {
+                    "ancestor_id": current,
+                    "descendant_id": node,
+                    "depth": depth,
+                    "ancestor_name": name,
+                    "ancestor_type": territory_type,
+                }
+            )
+            current = parents.get(current)
+            depth += 1
+    return rows
+
+
+@event.listens_for(Territorio, "after_insert")
+def _closure_after_insert(mapper, connection, target):
+    """Registra el nuevo territorio bajo todos los ancestros de su padre."""
+    closure = TerritorioClosure.__table__
+    node_id = str(target.id)
+    connection.execute(
+        closure.insert().values(
+            ancestor_id=node_id,
+            descendant_id=node_id,
+            depth=0,
+            ancestor_name=target.name,
+            ancestor_type=_type_value(target.type),
+        )
+    )
+    if target.id_parent is not None:
+        ancestors = select(
+            closure.c.ancestor_id,
+            literal(node_id, String(36)),
+            closure.c.depth + 1,
+            closure.c.ancestor_name,
+            closure.c.ancestor_type,
+        ).where(closure.c.descendant_id == str(target.id_parent))
+        connection.execute(
+            closure.insert().from_select(
+                ["ancestor_id", "descendant_id", "depth", "ancestor_name", "ancestor_type"],
+                ancestors,
+            )
+        )
+
+
+@event.listens_for(Territorio, "after_update")
+def _closure_after_update(mapper, connection, target):
+    """
+    Propaga cambios de nombre/tipo y mueve el subárbol completo cuando cambia
+    el padre de un territorio.
+    """
+    state = inspect(target)
+    closure = TerritorioClosure.__table__
+    node_id = str(target.id)
+
+    if state.attrs.name.history.has_changes() or state.attrs.type.history.has_changes():
+        connection.execute(
+            closure.update()
+            .where(closure.c.ancestor_id == node_id)
+            .values(ancestor_name=target.name, ancestor_type=_type_value(target.type))
+        )
+
+    if not state.attrs.id_parent.history.has_changes():
+        return
+
+    subtree = select(closure.c.descendant_id).where(closure.c.ancestor_id == node_id)
+
+    # Desconecta el subárbol de sus ancestros anteriores (conserva los internos)
+    connection.execute(
+        closure.delete().where(
+            closure.c.descendant_id.in_(subtree),
+            closure.c.ancestor_id.not_in(subtree),
+        )
+    )
+
+    if target.id_parent is not None:
+        new_ancestors = closure.alias("new_ancestors")
+        moved = closure.alias("moved")
+        connection.execute(
+            closure.insert().from_select(
+                ["ancestor_id", "descendant_id", "depth", "ancestor_name", "ancestor_type"],
+                select(
+                    new_ancestors.c.ancestor_id,
+                    moved.c.descendant_id,
+                    new_ancestors.c.depth + moved.c.depth + 1,
+                    new_ancestors.c.ancestor_name,
+                    new_ancestors.c.ancestor_type,
+                )
+                .select_from(new_ancestors)
+                .join(moved, moved.c.ancestor_id == node_id)
+                .where(new_ancestors.c.descendant_id == str(target.id_parent)),
+            )
+        )
+
+
+@event.listens_for(Territorio, "after_delete")
+def _closure_after_delete(mapper, connection, target):
+    """Elimina las filas de clausura del territorio borrado."""
+    closure = TerritorioClosure.__table__
+    node_id = str(target.id)
+    connection.execute(
+        closure.delete().where(
+            or_(closure.c.descendant_id == node_id, closure.c.ancestor_id == node_id)
+        )
+    )
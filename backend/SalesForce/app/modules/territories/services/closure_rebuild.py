@@ -0,0 +1,31 @@
+"""
+Reconstruye la tabla de clausura de territorios.
+
+Los eventos del ORM mantienen la tabla al día y ``init_db`` solo la puebla
+cuando está vacía; este comando la regenera completa, por ejemplo tras
+cargar territorios con SQL directo::
+
+    python -m app.modules.territories.services.closure_rebuild
+"""
+
+import argparse
+import logging
+
+from app.core import database
+from app.modules.territories.crud.territories_crud import rebuild_territorios_closure
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla de clausura de territorios")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.SessionLocal() as db:
+        rows = rebuild_territorios_closure(db)
+    logger.info("Clausura de territorios reconstruida (%s filas)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,28 @@
-from .crud_visit import create_visit, list_visits_paginated
+from .crud_upload import (
+    advance_media_upload,
+    claim_media_upload,
+    complete_media_upload,
+    create_media_upload,
+    delete_media_upload,
+    get_media_upload,
+    list_stale_media_uploads,
+    release_media_upload,
+    restart_media_upload,
+)
+from .crud_visit import create_visit, get_visit, get_visit_media, list_visits_paginated
 
-__all__ = ["create_visit", "list_visits_paginated"]
+__all__ = [
+    "advance_media_upload",
+    "claim_media_upload",
+    "complete_media_upload",
+    "create_media_upload",
+    "create_visit",
+    "delete_media_upload",
+    "get_media_upload",
+    "get_visit",
+    "get_visit_media",
+    "list_stale_media_uploads",
+    "list_visits_paginated",
+    "release_media_upload",
+    "restart_media_upload",
+]
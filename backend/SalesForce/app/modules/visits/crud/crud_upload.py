@@ -0,0 +1,128 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.modules.visits.models import (
+    UPLOAD_COMPLETE,
+    UPLOAD_COMPLETING,
+    UPLOAD_OPEN,
+    VisitMediaUpload,
+    VisitMultimedia,
+)
+
+
+def create_media_upload(
+    db: Session, visit_id: str, file_name: str, file_type: str, file_size: int, sha256: str
+) -> VisitMediaUpload:
+    upload = VisitMediaUpload(
+        visit_id=visit_id,
+        file_name=file_name,
+        file_type=file_type,
+        file_size=file_size,
+        sha256=sha256,
+        received_bytes=0,
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def get_media_upload(db: Session, visit_id: str, upload_id: str) -> Optional[VisitMediaUpload]:
+    return (
+        db.query(VisitMediaUpload)
+        .filter(VisitMediaUpload.id == upload_id, VisitMediaUpload.visit_id == visit_id)
+        .first()
+    )
+
+
+def advance_media_upload(db: Session, upload_id: str, start: int, end: int) -> bool:
+    """
+    Move the received offset from ``start`` to ``end``. Only one of two
+    requests racing on the same chunk wins; returns whether this one did.
+    """
+    result = db.execute(
+        update(VisitMediaUpload)
+        .where(
+            VisitMediaUpload.id == upload_id,
+            VisitMediaUpload.status == UPLOAD_OPEN,
+            VisitMediaUpload.received_bytes == start,
+        )
+        .values(received_bytes=end)
+        .execution_options(synchronize_session="fetch")
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def claim_media_upload(db: Session, upload_id: str) -> bool:
+    """
+    Mark a fully received upload as being completed. Only one of two
+    requests completing it at once wins; returns whether this one did.
+    """
+    result = db.execute(
+        update(VisitMediaUpload)
+        .where(
+            VisitMediaUpload.id == upload_id,
+            VisitMediaUpload.status == UPLOAD_OPEN,
+            VisitMediaUpload.received_bytes == VisitMediaUpload.file_size,
+        )
+        .values(status=UPLOAD_COMPLETING)
+        .execution_options(synchronize_session="fetch")
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_media_upload(db: Session, upload_id: str) -> None:
+    """Reopen an upload whose completion failed, so it can be completed again."""
+    db.execute(
+        update(VisitMediaUpload)
+        .where(VisitMediaUpload.id == upload_id, VisitMediaUpload.status == UPLOAD_COMPLETING)
+        .values(status=UPLOAD_OPEN)
+        .execution_options(synchronize_session="fetch")
+    )
+    db.commit()
+
+
+def restart_media_upload(db: Session, upload: VisitMediaUpload) -> None:
+    upload.received_bytes = 0
+    upload.status = UPLOAD_OPEN
+    db.commit()
+
+
+def complete_media_upload(db: Session, upload: VisitMediaUpload, content_hash: str) -> VisitMultimedia:
+    """Attach the uploaded file to its visit."""
+    media = VisitMultimedia(
+        visit_id=upload.visit_id,
+        file_name=upload.file_name,
+        file_type=upload.file_type,
+        file_size=upload.file_size,
+        content_hash=content_hash,
+    )
+    db.add(media)
+    db.flush()
+    upload.status = UPLOAD_COMPLETE
+    upload.media_id = media.id
+    db.commit()
+    db.refresh(media)
+    return media
+
+
+def list_stale_media_uploads(db: Session, updated_before: datetime) -> List[VisitMediaUpload]:
+    return (
+        db.query(VisitMediaUpload)
+        # A completion left claimed that long died with its process
+        .filter(
+            VisitMediaUpload.status.in_((UPLOAD_OPEN, UPLOAD_COMPLETING)),
+            VisitMediaUpload.updated_at < updated_before,
+        )
+        .all()
+    )
+
+
+def delete_media_upload(db: Session, upload: VisitMediaUpload) -> None:
+    db.delete(upload)
+    db.commit()
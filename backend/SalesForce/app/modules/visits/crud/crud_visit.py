@@ -1,6 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
 
+from app.modules.media.services import get_blob_store
 from app.modules.visits.models import Visit, VisitMultimedia
 from app.modules.visits.schemas import VisitCreate
 
@@ -15,8 +16,26 @@ def list_visits_paginated(db: Session, skip: int, limit: int):
     return {"items": items, "total": total}
 
 
+def get_visit(db: Session, visit_id: str) -> Optional[Visit]:
+    return db.get(Visit, visit_id)
+
+
+def get_visit_media(db: Session, visit_id: str, media_id: str):
+    """Get the metadata of one media file of a visit (its bytes stay deferred)."""
+    return (
+        db.query(VisitMultimedia)
+        .filter(VisitMultimedia.id == media_id, VisitMultimedia.visit_id == visit_id)
+        .first()
+    )
+
+
 def create_visit(db: Session, visit: VisitCreate, multimedia_data: Optional[List[dict]] = None):
-    """Create a new visit with optional multimedia files."""
+    """
+    Create a new visit with optional multimedia files.
+
+    Each file is given either as ``content_hash`` of a blob already in the
+    media store or as raw ``file_data`` bytes, which are stored first.
+    """
     # Create the visit
     db_visit = Visit(
         nombre_institucion=visit.nombre_institucion,
@@ -33,12 +52,15 @@ def create_visit(db: Session, visit: VisitCreate, multimedia_data: Optional[List
     # Create multimedia records if files were provided
     if multimedia_data:
         for media in multimedia_data:
+            content_hash = media.get("content_hash")
+            if content_hash is None:
+                content_hash = get_blob_store().put_bytes(media["file_data"]).content_hash
             db_multimedia = VisitMultimedia(
                 visit_id=db_visit.id,
                 file_name=media["file_name"],
                 file_type=media["file_type"],
                 file_size=media["file_size"],
-                file_data=media["file_data"]
+                content_hash=content_hash,
             )
             db.add(db_multimedia)
 
@@ -1,3 +1,21 @@
+from .visit_media_upload_model import UPLOAD_COMPLETE, UPLOAD_COMPLETING, UPLOAD_OPEN, VisitMediaUpload
 from .visit_model import Visit
-from .visit_multimedia_model import VisitMultimedia
-__all__ = ["Visit", "VisitMultimedia"]
+from .visit_multimedia_model import (
+    PREVIEW_FAILED,
+    PREVIEW_PENDING,
+    PREVIEW_READY,
+    PREVIEW_UNSUPPORTED,
+    VisitMultimedia,
+)
+__all__ = [
+    "Visit",
+    "VisitMultimedia",
+    "VisitMediaUpload",
+    "PREVIEW_FAILED",
+    "PREVIEW_PENDING",
+    "PREVIEW_READY",
+    "PREVIEW_UNSUPPORTED",
+    "UPLOAD_COMPLETE",
+    "UPLOAD_COMPLETING",
+    "UPLOAD_OPEN",
+]
@@ -0,0 +1,27 @@
+import uuid
+from sqlalchemy import BigInteger, Column, ForeignKey, String, TIMESTAMP, func
+
+from app.core.database import Base
+
+# status values
+UPLOAD_OPEN = "open"
+UPLOAD_COMPLETING = "completing"  # claimed by the request storing the file
+UPLOAD_COMPLETE = "complete"
+
+
+class VisitMediaUpload(Base):
+    """Resumable upload of one media file of a visit, staged on disk until complete."""
+
+    __tablename__ = "visit_media_uploads"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    visit_id = Column(String(36), ForeignKey("visits.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_name = Column(String(255), nullable=False)
+    file_type = Column(String(100), nullable=False)
+    file_size = Column(BigInteger, nullable=False)  # declared by the client
+    sha256 = Column(String(64), nullable=False)  # declared by the client, checked on completion
+    received_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    status = Column(String(20), nullable=False, default=UPLOAD_OPEN, server_default=UPLOAD_OPEN)
+    media_id = Column(String(36), ForeignKey("visit_multimedia.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), index=True)
@@ -1,8 +1,15 @@
 import uuid
 from sqlalchemy import Column, String, LargeBinary, Integer, TIMESTAMP, func, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database import Base
+from app.modules.media.services.blob_store import get_blob_store
+
+# preview_status values; see app.modules.media.services.previews
+PREVIEW_PENDING = "pending"
+PREVIEW_READY = "ready"
+PREVIEW_FAILED = "failed"
+PREVIEW_UNSUPPORTED = "unsupported"  # no preview for this file type
 
 
 class VisitMultimedia(Base):
@@ -13,9 +20,26 @@ class VisitMultimedia(Base):
     file_name = Column(String(255), nullable=False)
     file_type = Column(String(100), nullable=False)  # MIME type (e.g., 'image/jpeg', 'video/mp4')
     file_size = Column[int](Integer, nullable=False)  # Size in bytes
-    file_data = Column(LargeBinary, nullable=False)  # Binary data of the file
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the blob in the media store
+    # Legacy inline bytes; media_migration moves them to the media store.
+    # Deferred so listings never load them.
+    inline_data = deferred(Column("file_data", LargeBinary, nullable=True))
+    preview_status = Column(
+        String(20), nullable=False, default=PREVIEW_PENDING, server_default=PREVIEW_PENDING, index=True
+    )
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     # Relationship to Visit
     visit = relationship("Visit", back_populates="multimedia")
+
+    @property
+    def file_data(self):
+        """Whole file content, read from the media store (or the legacy column)."""
+        if self.content_hash is not None:
+            return get_blob_store().read_bytes(self.content_hash)
+        return self.inline_data
+
+    @file_data.setter
+    def file_data(self, value):
+        self.inline_data = value
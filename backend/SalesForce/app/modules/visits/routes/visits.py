@@ -1,18 +1,37 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, File, UploadFile, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Header, UploadFile, Form, Request, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
 import json
 
 from app.core.database import get_db
-from app.modules.visits.schemas import Visit, VisitCreate, VisitsResponse
-from app.modules.visits.services import create as create_visit, list_visits
+from app.modules.media.services import save_upload
+from app.modules.media.services.previews import generate_previews
+from app.modules.visits.models import PREVIEW_PENDING
+from app.modules.visits.schemas import (
+    Visit,
+    VisitCreate,
+    VisitMediaUpload,
+    VisitMediaUploadCreate,
+    VisitMultimedia,
+    VisitsResponse,
+)
+from app.modules.visits.services import (
+    complete_upload,
+    create as create_visit,
+    create_upload,
+    get_upload,
+    list_visits,
+    stream_media,
+    write_chunk,
+)
 
 router = APIRouter(prefix="/visitas", tags=["visitas"])
 
 
 @router.post("/", response_model=Visit)
 async def create_visit_endpoint(
+    background_tasks: BackgroundTasks,
     nombre_institucion: str = Form(...),
     direccion: str = Form(...),
     hora: str = Form(...),  # ISO format datetime string
@@ -34,6 +53,9 @@ async def create_visit_endpoint(
     - **hora_salida**: Departure time (ISO format, optional)
     - **observacion**: Observations (optional)
     - **files**: Multiple files to upload (optional)
+
+    Previews of the files are rendered in the background once the visit is
+    stored; each file's ``preview_status`` tells when they are ready.
     """
     # Parse datetime strings
     hora_dt = datetime.fromisoformat(hora.replace('Z', '+00:00'))
@@ -50,19 +72,22 @@ async def create_visit_endpoint(
         observacion=observacion
     )
 
-    # Process files if provided
+    # Stream files into the media store; only their metadata goes to the DB
     multimedia_data = []
     if files:
         for file in files:
-            content = await file.read()
+            blob = await save_upload(file)
             multimedia_data.append({
                 "file_name": file.filename,
                 "file_type": file.content_type,
-                "file_size": len(content),
-                "file_data": content
+                "file_size": blob.size,
+                "content_hash": blob.content_hash
             })
 
-    return create_visit(db, visit_data, multimedia_data)
+    created = create_visit(db, visit_data, multimedia_data)
+    if created.multimedia:
+        background_tasks.add_task(generate_previews, [media.id for media in created.multimedia])
+    return created
 
 
 @router.get("/", response_model=VisitsResponse)
@@ -70,3 +95,74 @@ def list_visits_endpoint(
     page: int = 1, limit: int = 10, db: Session = Depends(get_db)
 ):
     return list_visits(db, page=page, limit=limit)
+
+
+@router.get("/{visit_id}/media/{media_id}")
+def get_visit_media_endpoint(
+    visit_id: str,
+    media_id: str,
+    request: Request,
+    variant: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Download a multimedia file of a visit in chunks. Supports a single
+    ``Range`` (``206 Partial Content``), ``If-Range`` and ``If-None-Match``
+    against the content ``ETag``.
+
+    - **variant**: a preview instead of the original (``thumb`` or ``web``)
+    """
+    return stream_media(db, request, visit_id, media_id, variant)
+
+
+@router.post("/{visit_id}/uploads", response_model=VisitMediaUpload, status_code=201)
+def create_upload_endpoint(
+    visit_id: str, payload: VisitMediaUploadCreate, response: Response, db: Session = Depends(get_db)
+):
+    """
+    Start a resumable upload of a file for the visit. Send the file with
+    ``PUT`` chunks and attach it with ``POST .../complete``.
+    """
+    upload = create_upload(db, visit_id, payload)
+    response.headers["Upload-Offset"] = str(upload.received_bytes)
+    return upload
+
+
+@router.get("/{visit_id}/uploads/{upload_id}", response_model=VisitMediaUpload)
+def get_upload_endpoint(
+    visit_id: str, upload_id: str, response: Response, db: Session = Depends(get_db)
+):
+    """Offset to resume the upload from (also in the ``Upload-Offset`` header)."""
+    upload = get_upload(db, visit_id, upload_id)
+    response.headers["Upload-Offset"] = str(upload.received_bytes)
+    return upload
+
+
+@router.put("/{visit_id}/uploads/{upload_id}", response_model=VisitMediaUpload)
+async def upload_chunk_endpoint(
+    visit_id: str,
+    upload_id: str,
+    request: Request,
+    response: Response,
+    content_range: str = Header(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Send a chunk of the file as the raw request body.
+
+    - **Content-Range**: ``bytes start-end/size``; ``start`` must be the current offset
+    """
+    upload = await write_chunk(db, visit_id, upload_id, content_range, request.stream())
+    response.headers["Upload-Offset"] = str(upload.received_bytes)
+    return upload
+
+
+@router.post("/{visit_id}/uploads/{upload_id}/complete", response_model=VisitMultimedia)
+def complete_upload_endpoint(
+    visit_id: str, upload_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Verify the whole file against its SHA-256 and attach it to the visit."""
+    media = complete_upload(db, visit_id, upload_id)
+    if media.preview_status == PREVIEW_PENDING:
+        background_tasks.add_task(generate_previews, [media.id])
+    return media
@@ -1,4 +1,14 @@
 from .visit import Visit, VisitCreate, VisitsResponse
+from .visit_media_upload import VisitMediaUpload, VisitMediaUploadCreate
 from .visit_multimedia import VisitMultimedia, VisitMultimediaCreate, VisitMultimediaResponse
 
-__all__ = ["Visit", "VisitCreate", "VisitsResponse", "VisitMultimedia", "VisitMultimediaCreate", "VisitMultimediaResponse"]
+__all__ = [
+    "Visit",
+    "VisitCreate",
+    "VisitsResponse",
+    "VisitMediaUpload",
+    "VisitMediaUploadCreate",
+    "VisitMultimedia",
+    "VisitMultimediaCreate",
+    "VisitMultimediaResponse",
+]
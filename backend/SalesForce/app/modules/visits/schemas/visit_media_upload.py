@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class VisitMediaUploadCreate(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    file_type: str = Field(..., min_length=1, max_length=100)
+    file_size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")  # of the whole file, checked on completion
+
+
+class VisitMediaUpload(BaseModel):
+    id: str
+    visit_id: str
+    file_name: str
+    file_type: str
+    file_size: int
+    sha256: str
+    received_bytes: int  # offset the next chunk must start at
+    status: str
+    media_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -17,6 +17,8 @@ class VisitMultimediaCreate(VisitMultimediaBase):
 class VisitMultimedia(VisitMultimediaBase):
     id: str
     visit_id: str
+    content_hash: Optional[str] = None
+    preview_status: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
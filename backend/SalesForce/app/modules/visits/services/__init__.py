@@ -1,3 +1,12 @@
-from .visit_service import create, list_visits
+from .upload_service import complete_upload, create_upload, get_upload, write_chunk
+from .visit_service import create, list_visits, stream_media
 
-__all__ = ["create", "list_visits"]
+__all__ = [
+    "complete_upload",
+    "create",
+    "create_upload",
+    "get_upload",
+    "list_visits",
+    "stream_media",
+    "write_chunk",
+]
@@ -0,0 +1,234 @@
+"""
+Resumable uploads of visit media.
+
+A mobile client creates an upload for a visit with the size and SHA-256 of
+the file, then sends it in chunks with ``PUT`` and a ``Content-Range``
+header. Each chunk is streamed to a staging file at its offset, flushed to
+disk, and only then is the received offset advanced. After a dropped
+connection the client asks for the offset and continues from there; the
+bytes that did arrive are kept. On completion the staged file is checked
+against the declared hash, moved into the media store and attached to the
+visit.
+
+Staging files live under ``<MEDIA_STORAGE_PATH>/uploads``, so every API
+instance must share that disk. Abandoned uploads are purged with::
+
+    python -m app.modules.visits.services.upload_service --max-age-hours 48
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from app.core import database
+from app.core.config import settings
+from app.modules.media.services import get_blob_store
+from app.modules.media.services.blob_store import CHUNK_SIZE
+from app.modules.visits.crud import (
+    advance_media_upload,
+    claim_media_upload,
+    complete_media_upload,
+    create_media_upload,
+    delete_media_upload,
+    get_media_upload,
+    get_visit,
+    get_visit_media,
+    list_stale_media_uploads,
+    release_media_upload,
+    restart_media_upload,
+)
+from app.modules.visits.models import UPLOAD_COMPLETE, VisitMediaUpload as VisitMediaUploadModel
+from app.modules.visits.schemas import VisitMediaUpload, VisitMediaUploadCreate, VisitMultimedia
+
+logger = logging.getLogger(__name__)
+
+CONTENT_RANGE_REGEX = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+def staging_path(upload_id: str) -> Path:
+    return Path(settings.media_storage_path) / "uploads" / upload_id
+
+
+def _get_upload(db: Session, visit_id: str, upload_id: str) -> VisitMediaUploadModel:
+    upload = get_media_upload(db, visit_id, upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return upload
+
+
+def _offset_conflict(upload: VisitMediaUploadModel, detail: str, status_code: int = 409) -> HTTPException:
+    """Error telling the client which offset to resume from."""
+    return HTTPException(
+        status_code=status_code, detail=detail, headers={"Upload-Offset": str(upload.received_bytes)}
+    )
+
+
+def create_upload(db: Session, visit_id: str, data: VisitMediaUploadCreate) -> VisitMediaUpload:
+    """Open an upload for a file of the visit; chunks start at offset 0."""
+    if get_visit(db, visit_id) is None:
+        raise HTTPException(status_code=404, detail=f"Visit {visit_id} not found")
+    if data.file_size > settings.media_upload_max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File larger than {settings.media_upload_max_bytes} bytes",
+        )
+    upload = create_media_upload(db, visit_id, **data.model_dump())
+    path = staging_path(upload.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return VisitMediaUpload.model_validate(upload)
+
+
+def get_upload(db: Session, visit_id: str, upload_id: str) -> VisitMediaUpload:
+    return VisitMediaUpload.model_validate(_get_upload(db, visit_id, upload_id))
+
+
+def _parse_content_range(header: str, upload: VisitMediaUploadModel):
+    match = CONTENT_RANGE_REGEX.match((header or "").strip())
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range must be 'bytes start-end/size'")
+    start, end, size = map(int, match.groups())
+    if size != upload.file_size or start > end or end >= size:
+        raise HTTPException(status_code=400, detail=f"Invalid Content-Range for a {upload.file_size} byte file")
+    return start, end
+
+
+def _write_at(path: Path, offset: int, chunks: list) -> None:
+    with open(path, "r+b") as part:
+        part.seek(offset)
+        for chunk in chunks:
+            part.write(chunk)
+        part.flush()
+        os.fsync(part.fileno())
+
+
+async def write_chunk(
+    db: Session, visit_id: str, upload_id: str, content_range: str, body: AsyncIterator[bytes]
+) -> VisitMediaUpload:
+    """
+    Stream one chunk to the staging file. The chunk must start at the
+    received offset (``409`` with ``Upload-Offset`` otherwise). If the body
+    ends early or the client disconnects, the bytes that arrived are kept.
+    """
+    upload = _get_upload(db, visit_id, upload_id)
+    if upload.status == UPLOAD_COMPLETE:
+        raise _offset_conflict(upload, "Upload already completed")
+    start, end = _parse_content_range(content_range, upload)
+    if start != upload.received_bytes:
+        raise _offset_conflict(upload, f"Chunk must start at byte {upload.received_bytes}")
+
+    path = staging_path(upload.id)
+    expected, offset = end - start + 1, start
+    buffered, buffered_size = [], 0
+    try:
+        async for chunk in body:
+            if offset + buffered_size + len(chunk) > end + 1:
+                raise HTTPException(status_code=400, detail=f"Chunk longer than the declared {expected} bytes")
+            buffered.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= CHUNK_SIZE:  # bounded memory: written at most 1 MiB at a time
+                await run_in_threadpool(_write_at, path, offset, buffered)
+                offset += buffered_size
+                buffered, buffered_size = [], 0
+    except ClientDisconnect:
+        logger.info("Upload %s interrupted at byte %s", upload.id, offset + buffered_size)
+    finally:
+        if buffered:
+            await run_in_threadpool(_write_at, path, offset, buffered)
+            offset += buffered_size
+        # Whatever reached the disk counts, even if the request failed half-way
+        if offset > start and not advance_media_upload(db, upload.id, start, offset):
+            logger.info("Upload %s: a concurrent request already wrote byte %s", upload.id, start)
+
+    db.refresh(upload)
+    return VisitMediaUpload.model_validate(upload)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as part:
+        while chunk := part.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _store_file(path: Path):
+    with open(path, "rb") as part:
+        return get_blob_store().put_chunks(iter(lambda: part.read(CHUNK_SIZE), b""))
+
+
+def _store_upload(db: Session, upload: VisitMediaUploadModel):
+    path = staging_path(upload.id)
+    if _file_sha256(path) != upload.sha256:
+        # Some chunk got corrupted on the way: start over
+        with open(path, "r+b") as part:
+            part.truncate(0)
+        restart_media_upload(db, upload)
+        raise _offset_conflict(upload, "SHA-256 mismatch, the upload was restarted", status_code=422)
+
+    blob = _store_file(path)
+    media = complete_media_upload(db, upload, blob.content_hash)
+    path.unlink(missing_ok=True)
+    return media
+
+
+def complete_upload(db: Session, visit_id: str, upload_id: str) -> VisitMultimedia:
+    """
+    Verify the staged file against the declared SHA-256, move it into the
+    media store and attach it to the visit. Repeating the call returns the
+    same media, so a client that lost the response can retry; a call made
+    while another one is still storing the file gets ``409``.
+    """
+    upload = _get_upload(db, visit_id, upload_id)
+    if upload.status != UPLOAD_COMPLETE and upload.received_bytes != upload.file_size:
+        raise _offset_conflict(
+            upload, f"Upload incomplete: {upload.received_bytes} of {upload.file_size} bytes received"
+        )
+    if upload.status == UPLOAD_COMPLETE or not claim_media_upload(db, upload.id):
+        db.refresh(upload)
+        if upload.status != UPLOAD_COMPLETE:
+            raise _offset_conflict(upload, "Upload is being completed by another request")
+        return VisitMultimedia.model_validate(get_visit_media(db, visit_id, upload.media_id))
+
+    try:
+        media = _store_upload(db, upload)
+    except BaseException:
+        db.rollback()
+        release_media_upload(db, upload.id)  # a retry can complete it
+        raise
+    return VisitMultimedia.model_validate(media)
+
+
+def purge_stale_uploads(db: Session, max_age: timedelta) -> int:
+    """Delete the open uploads untouched for ``max_age`` and their staging files."""
+    cutoff = database.database_now(db) - max_age
+    stale = list_stale_media_uploads(db, cutoff)
+    for upload in stale:
+        staging_path(upload.id).unlink(missing_ok=True)
+        delete_media_upload(db, upload)
+    return len(stale)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purge abandoned visit media uploads")
+    parser.add_argument("--max-age-hours", type=float, default=48)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.SessionLocal() as db:
+        purged = purge_stale_uploads(db, timedelta(hours=args.max_age_hours))
+    logger.info("Abandoned visit media uploads purged: %s", purged)
+
+
+if __name__ == "__main__":
+    main()
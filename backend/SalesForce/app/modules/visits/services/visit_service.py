@@ -1,8 +1,15 @@
+import hashlib
+import io
+from pathlib import PurePath
 from typing import List, Optional
+from fastapi import HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.core.pagination import build_pagination_metadata, get_pagination_offset
-from app.modules.visits.crud import create_visit, list_visits_paginated
+from app.modules.media.crud import get_media_derivative
+from app.modules.media.services import get_blob_store, media_response
+from app.modules.media.services.preview_render import PREVIEW_SIZES
+from app.modules.visits.crud import create_visit, get_visit_media, list_visits_paginated
 from app.modules.visits.schemas import Visit, VisitCreate, VisitsResponse
 
 
@@ -23,3 +30,45 @@ def list_visits(db: Session, page: int = 1, limit: int = 10) -> VisitsResponse:
     metadata = build_pagination_metadata(total=total, page=page, limit=limit)
 
     return VisitsResponse(data=visits, **metadata)
+
+
+def stream_media(
+    db: Session, request: Request, visit_id: str, media_id: str, variant: Optional[str] = None
+) -> Response:
+    """Stream one media file of a visit, or one of its previews, honouring ``Range`` and ``If-None-Match``."""
+    media = get_visit_media(db, visit_id, media_id)
+    if media is None:
+        raise HTTPException(status_code=404, detail=f"Media {media_id} not found")
+
+    if variant is not None:
+        if variant not in PREVIEW_SIZES:
+            raise HTTPException(status_code=400, detail=f"Unknown preview variant: {variant}")
+        preview = get_media_derivative(db, media.content_hash, variant) if media.content_hash else None
+        if preview is None:
+            raise HTTPException(status_code=404, detail=f"Preview {variant} of media {media_id} not available")
+        store = get_blob_store()
+        return media_response(
+            request,
+            lambda: store.open(preview.content_hash),
+            size=preview.size,
+            etag=preview.content_hash,
+            media_type=preview.media_type,
+            filename=f"{PurePath(media.file_name).stem}-{variant}.jpg",
+        )
+
+    if media.content_hash:
+        store = get_blob_store()
+        content_hash = media.content_hash
+        opener, size, etag = (lambda: store.open(content_hash)), store.size(content_hash), content_hash
+    else:  # legacy row not migrated yet: the bytes are still inline
+        data = media.inline_data or b""
+        opener, size, etag = (lambda: io.BytesIO(data)), len(data), hashlib.sha256(data).hexdigest()
+
+    return media_response(
+        request,
+        opener,
+        size=size,
+        etag=etag,
+        media_type=media.file_type or "application/octet-stream",
+        filename=media.file_name,
+    )
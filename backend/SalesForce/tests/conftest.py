@@ -34,6 +34,10 @@ test_engine = create_engine(
 )
 
 from app.core import database as db_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+# Keep uploaded media out of the working tree
+settings.media_storage_path = str(TMP_DB_DIR / "media")
 
 db_module.engine.dispose()
 db_module.engine = test_engine
@@ -42,6 +46,7 @@ db_module.SessionLocal = sessionmaker(
 )
 
 from app.main import app  # noqa: E402
+from app.modules.institutional_clients.models import InstitutionalClient  # noqa: E402
 
 
 @pytest.fixture()
@@ -91,3 +96,34 @@ def db_session(reset_database):
 def client(reset_database):
     with TestClient(app) as test_client:
         yield test_client
+
+
+@pytest.fixture()
+def institutional_client_factory(db_session, fake: Faker):
+    """Persist an institutional client with sensible defaults."""
+
+    def _create(**overrides) -> InstitutionalClient:
+        payload = {
+            "nombre_institucion": overrides.get("nombre_institucion", fake.company()),
+            "direccion": overrides.get("direccion", fake.street_address().replace("\n", " ")),
+            "direccion_institucional": overrides.get(
+                "direccion_institucional", fake.unique.company_email()
+            ),
+            "identificacion_tributaria": overrides.get(
+                "identificacion_tributaria", fake.unique.bothify(text="NIT##########")
+            ),
+            "representante_legal": overrides.get("representante_legal", fake.name()),
+            "telefono": overrides.get("telefono", fake.msisdn()),
+            "justificacion_acceso": overrides.get(
+                "justificacion_acceso", "Abastecimiento de insumos médicos"
+            ),
+            "certificado_camara": overrides.get("certificado_camara", "ZmFrZS1jZXJ0"),
+            "territory_id": overrides.get("territory_id"),
+        }
+        client = InstitutionalClient(**payload)
+        db_session.add(client)
+        db_session.commit()
+        db_session.refresh(client)
+        return client
+
+    return _create
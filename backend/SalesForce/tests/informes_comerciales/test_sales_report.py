@@ -0,0 +1,153 @@
+"""Tests for the daily sales fact table and the sales report queries."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.modules.orders.crud import create_order_with_items, update_order_status
+from app.modules.reports.crud import query_sales_report, rebuild_daily_sales_facts
+from app.modules.reports.models import DailySalesFact
+from app.modules.salespeople.models.salespeople_model import Salespeople
+from app.modules.territories.models.territories_model import TerritorioClosure
+
+
+@pytest.fixture()
+def sales(db_session, institutional_client_factory):
+    """Two clients in sub-territories of ``T-1`` (``T-2``) and ``T-3``, and a few orders."""
+    db_session.add_all(
+        [
+            TerritorioClosure(ancestor_id="T-1", descendant_id="T-1", depth=0),
+            TerritorioClosure(ancestor_id="T-1", descendant_id="T-2", depth=1),
+            TerritorioClosure(ancestor_id="T-2", descendant_id="T-2", depth=0),
+            TerritorioClosure(ancestor_id="T-3", descendant_id="T-3", depth=0),
+        ]
+    )
+    salesperson = Salespeople(
+        full_name="Ana", email="ana@example.com", hire_date=date(2024, 1, 1), status="active"
+    )
+    db_session.add(salesperson)
+    db_session.commit()
+    north = institutional_client_factory(territory_id="T-2")
+    south = institutional_client_factory(territory_id="T-3")
+
+    def order(client, day, lines, salespeople_id=salesperson.id):
+        items = [
+            {
+                "product_id": product_id,
+                "product_name": f"Producto {product_id}",
+                "quantity": quantity,
+                "unit_price": Decimal("10.00"),
+                "subtotal": Decimal("10.00") * quantity,
+            }
+            for product_id, quantity in lines
+        ]
+        subtotal = sum(item["subtotal"] for item in items)
+        return create_order_with_items(
+            db_session,
+            institutional_client_id=client.id,
+            order_date=day,
+            subtotal=subtotal,
+            tax_amount=Decimal("0"),
+            total_amount=subtotal,
+            status="pending",
+            items=items,
+            salespeople_id=salespeople_id,
+        )
+
+    orders = [
+        order(north, date(2025, 1, 5), [(1, 2), (2, 1)]),
+        order(north, date(2025, 1, 5), [(1, 3)]),
+        order(south, date(2025, 2, 7), [(1, 4)], salespeople_id=None),
+        order(south, date(2025, 2, 8), [(2, 5)]),
+    ]
+    return {"salesperson": salesperson, "north": north, "south": south, "orders": orders}
+
+
+def test_orders_are_folded_into_daily_buckets(db_session, sales):
+    # The two orders of the same day, product and client share a bucket
+    assert db_session.query(DailySalesFact).count() == 4
+
+    by_product = query_sales_report(db_session, ["producto"], date(2025, 1, 1), date(2025, 12, 31))
+    assert by_product == [
+        {"producto": 1, "unidades": 9.0, "monto": 90.0},
+        {"producto": 2, "unidades": 6.0, "monto": 60.0},
+    ]
+
+    by_month_and_seller = query_sales_report(
+        db_session, ["mes", "vendedor"], date(2025, 1, 1), date(2025, 12, 31)
+    )
+    assert [(row["mes"], row["vendedor"], row["unidades"]) for row in by_month_and_seller] == [
+        (date(2025, 1, 1), sales["salesperson"].id, 6.0),
+        (date(2025, 2, 1), None, 4.0),
+        (date(2025, 2, 1), sales["salesperson"].id, 5.0),
+    ]
+
+    january = query_sales_report(db_session, [], date(2025, 1, 1), date(2025, 1, 31))
+    assert january == [{"unidades": 6.0, "monto": 60.0}]
+
+
+def test_territory_filter_includes_sub_territories(db_session, sales):
+    rows = query_sales_report(
+        db_session, ["cliente"], date(2025, 1, 1), date(2025, 12, 31), territory_id="T-1"
+    )
+    assert rows == [{"cliente": sales["north"].id, "unidades": 6.0, "monto": 60.0}]
+
+
+def test_cancelled_orders_leave_the_report(db_session, sales):
+    update_order_status(db_session, sales["orders"][3].id, "cancelled")
+
+    rows = query_sales_report(db_session, ["producto"], date(2025, 2, 1), date(2025, 2, 28))
+    assert rows == [{"producto": 1, "unidades": 4.0, "monto": 40.0}]
+    emptied = db_session.query(DailySalesFact).filter(DailySalesFact.product_id == 2).all()
+    assert [fact.monto for fact in emptied if fact.day == date(2025, 2, 8)] == [Decimal("0.00")]
+
+
+def test_cancellation_reverses_the_original_territory(db_session, sales):
+    sales["south"].territory_id = "T-2"  # the client moves after ordering
+    db_session.commit()
+    update_order_status(db_session, sales["orders"][3].id, "cancelled")
+
+    rows = query_sales_report(
+        db_session, ["territorio"], date(2025, 2, 1), date(2025, 2, 28)
+    )
+    assert rows == [{"territorio": "T-3", "unidades": 4.0, "monto": 40.0}]
+
+
+def test_rebuild_matches_the_incremental_buckets(db_session, sales):
+    update_order_status(db_session, sales["orders"][0].id, "cancelled")
+    dimensions = ["dia", "producto", "vendedor", "cliente", "territorio"]
+    incremental = query_sales_report(db_session, dimensions, date(2025, 1, 1), date(2025, 12, 31))
+
+    assert rebuild_daily_sales_facts(db_session, date(2025, 1, 1), date(2025, 12, 31)) == 3
+    db_session.commit()
+
+    assert query_sales_report(db_session, dimensions, date(2025, 1, 1), date(2025, 12, 31)) == incremental
+
+
+def test_sales_report_endpoint(client, sales):
+    response = client.get(
+        "/informes-comerciales/ventas",
+        params={"from": "2025-01-01", "to": "2025-03-31", "group_by": ["territorio", "producto"]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["groupBy"] == ["territorio", "producto"]
+    assert [(row["territorio"], row["producto"], row["unidades"]) for row in body["data"]] == [
+        ("T-2", 1, 5.0),
+        ("T-2", 2, 1.0),
+        ("T-3", 1, 4.0),
+        ("T-3", 2, 5.0),
+    ]
+
+    invalid = client.get(
+        "/informes-comerciales/ventas",
+        params={"from": "2025-03-01", "to": "2025-01-01"},
+    )
+    assert invalid.status_code == 400
+    unknown = client.get(
+        "/informes-comerciales/ventas",
+        params={"from": "2025-01-01", "to": "2025-03-01", "group_by": "color"},
+    )
+    assert unknown.status_code == 422
@@ -0,0 +1,134 @@
+"""Tests for client geocoding and the offline day-route distance fallback."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import date
+
+import googlemaps
+import pytest
+
+from app.core.geo import haversine_distances, normalize_address
+from app.modules.institutional_clients.crud import update_institutional_client
+from app.modules.institutional_clients.models import GeocodeCache, InstitutionalClient
+from app.modules.institutional_clients.schemas import InstitutionalClientUpdate
+from app.modules.institutional_clients.services.geocoding_service import (
+    StubGeocodingProvider,
+    geocode_pending_clients,
+)
+from app.modules.salespeople.models.salespeople_model import Route
+from app.modules.salespeople.services import dayroute_service
+from app.modules.territories.models.territories_model import Territorio
+from app.modules.territories.schemas.territories_schemas import TerritoryType
+
+ORIGIN = (4.6486, -74.0636)
+
+
+@pytest.fixture()
+def bogota(db_session):
+    country = Territorio(name="Colombia", type=TerritoryType.COUNTRY)
+    city = Territorio(name="Bogotá", type=TerritoryType.CITY, parent=country)
+    db_session.add_all([country, city])
+    db_session.commit()
+    return city
+
+
+def test_haversine_distances_match_known_values():
+    one_degree, same_point = haversine_distances((0.0, 0.0), [(1.0, 0.0), (0.0, 0.0)])
+
+    assert one_degree == pytest.approx(111_195, rel=1e-3)
+    assert same_point == 0
+
+
+def test_geocode_pending_clients_uses_city_country_and_cache(
+    db_session, institutional_client_factory, bogota
+):
+    provider = StubGeocodingProvider(
+        locations={
+            "Calle 100 # 15-20, Bogotá, Colombia": (4.6867, -74.0490),
+            "Dirección inexistente, Bogotá, Colombia": None,
+        }
+    )
+    territory_id = str(bogota.id)
+    first = institutional_client_factory(direccion="Calle 100 # 15-20", territory_id=territory_id)
+    twin = institutional_client_factory(direccion="CALLE 100  # 15-20", territory_id=territory_id)
+    lost = institutional_client_factory(direccion="Dirección inexistente", territory_id=territory_id)
+
+    stats = geocode_pending_clients(db_session, provider=provider, batch_size=2)
+
+    requested = [normalize_address(address) for address in provider.calls]
+    assert requested.count(normalize_address("Calle 100 # 15-20, Bogotá, Colombia")) == 1
+    assert stats["clients"] == 3
+    assert stats["geocoded"] == 2
+    assert stats["not_found"] == 1
+    db_session.expire_all()
+    assert (first.latitude, first.longitude) == (4.6867, -74.0490)
+    assert (twin.latitude, twin.longitude) == (4.6867, -74.0490)
+    assert lost.latitude is None
+    assert db_session.query(GeocodeCache).count() == 2
+
+    # Unresolvable addresses are cached as misses, so re-runs cost nothing
+    calls_before = len(provider.calls)
+    geocode_pending_clients(db_session, provider=provider)
+    assert len(provider.calls) == calls_before
+
+
+def test_changing_the_address_clears_stale_coordinates(db_session, institutional_client_factory):
+    client = institutional_client_factory(direccion="Calle 1")
+    geocode_pending_clients(db_session, provider=StubGeocodingProvider())
+    db_session.refresh(client)
+    assert client.latitude is not None
+
+    update_institutional_client(
+        db_session, client.id, InstitutionalClientUpdate(direccion="Carrera 2")
+    )
+
+    assert client.latitude is None and client.longitude is None
+
+
+class _FailingProvider:
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+
+    def fetch(self, origin, destinations):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [None for _ in destinations]
+
+
+@pytest.mark.parametrize(
+    "provider",
+    [
+        _FailingProvider(error=googlemaps.exceptions.ApiError("OVER_QUERY_LIMIT")),
+        _FailingProvider(delay=0.5),
+    ],
+    ids=["unavailable", "slow"],
+)
+def test_get_dayroute_falls_back_to_haversine(
+    db_session, institutional_client_factory, monkeypatch, provider
+):
+    client = institutional_client_factory(direccion="Calle 100 # 15-20")
+    db_session.query(InstitutionalClient).filter_by(id=client.id).update(
+        {"latitude": 4.6867, "longitude": -74.0490}
+    )
+    db_session.add(
+        Route(salespeople_id="sp-1", institution_id=client.id, day=date(2025, 1, 15), done=0)
+    )
+    db_session.commit()
+    monkeypatch.setattr(dayroute_service.distance_matrix_cache, "provider", provider)
+    monkeypatch.setattr(dayroute_service, "DISTANCE_LOOKUP_TIMEOUT_SECONDS", 0.1)
+
+    async def plan():
+        started = time.perf_counter()
+        routes = await dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=date(2025, 1, 15))
+        return routes, time.perf_counter() - started
+
+    routes, elapsed = asyncio.run(plan())
+
+    assert elapsed < 0.4
+    assert len(routes) == 1
+    assert routes[0].distancia.startswith("~") and routes[0].distancia.endswith("km")
+    assert routes[0].tiempo.startswith("~")
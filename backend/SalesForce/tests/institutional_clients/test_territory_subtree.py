@@ -0,0 +1,191 @@
+"""Tests for the territory-subtree client listing."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from faker import Faker
+
+from app.modules.institutional_clients.models import InstitutionalClient
+from app.modules.territories.crud.territories_crud import (
+    create_territorio,
+    ensure_territorios_closure,
+    rebuild_territorios_closure,
+    update_territorio,
+)
+from app.modules.territories.models.territories_model import TerritorioClosure
+from app.modules.territories.schemas.territories_schemas import (
+    TerritoryCreate,
+    TerritoryType,
+    TerritoryUpdate,
+)
+
+
+@pytest.fixture()
+def territory_tree(db_session):
+    """Colombia > {Antioquia > {Medellín, Envigado}, Cundinamarca > Bogotá}; Perú > Lima."""
+
+    def create(name, type_, parent=None):
+        return create_territorio(
+            db_session,
+            TerritoryCreate(
+                name=name, type=type_, id_parent=parent.id if parent else None
+            ),
+        )
+
+    colombia = create("Colombia", TerritoryType.COUNTRY)
+    antioquia = create("Antioquia", TerritoryType.STATE, colombia)
+    cundinamarca = create("Cundinamarca", TerritoryType.STATE, colombia)
+    peru = create("Perú", TerritoryType.COUNTRY)
+    return {
+        "colombia": colombia,
+        "antioquia": antioquia,
+        "cundinamarca": cundinamarca,
+        "medellin": create("Medellín", TerritoryType.CITY, antioquia),
+        "envigado": create("Envigado", TerritoryType.CITY, antioquia),
+        "bogota": create("Bogotá", TerritoryType.CITY, cundinamarca),
+        "peru": peru,
+        "lima": create("Lima", TerritoryType.STATE, peru),
+    }
+
+
+@pytest.fixture()
+def client_factory(db_session, fake: Faker):
+    base_time = datetime(2025, 1, 1, 8, 0, 0)
+
+    def _create(territory, minutes: int) -> InstitutionalClient:
+        client = InstitutionalClient(
+            nombre_institucion=fake.company(),
+            direccion=fake.street_address(),
+            direccion_institucional=fake.unique.company_email(),
+            identificacion_tributaria=fake.unique.bothify(text="NIT##########"),
+            representante_legal=fake.name(),
+            telefono=fake.msisdn(),
+            territory_id=str(territory.id),
+            created_at=base_time + timedelta(minutes=minutes),
+        )
+        db_session.add(client)
+        db_session.commit()
+        return client
+
+    return _create
+
+
+def test_subtree_endpoint_returns_descendant_clients_with_child_counts(
+    client, territory_tree, client_factory
+):
+    medellin_1 = client_factory(territory_tree["medellin"], 1)
+    envigado = client_factory(territory_tree["envigado"], 2)
+    bogota = client_factory(territory_tree["bogota"], 3)
+    client_factory(territory_tree["lima"], 4)
+
+    response = client.get(
+        "/institutional-clients/",
+        params={"territory_subtree": str(territory_tree["colombia"].id), "limit": 10},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 3
+    assert payload["next_cursor"] is None
+    assert [item["id"] for item in payload["data"]] == [
+        bogota.id,
+        envigado.id,
+        medellin_1.id,
+    ]
+    counts = {item["name"]: item["total"] for item in payload["territory_counts"]}
+    assert counts == {"Antioquia": 2, "Cundinamarca": 1}
+
+
+def test_subtree_endpoint_paginates_with_cursor(client, territory_tree, client_factory):
+    created = [client_factory(territory_tree["medellin"], minute) for minute in range(5)]
+
+    seen: list[str] = []
+    params = {"territory_subtree": str(territory_tree["antioquia"].id), "limit": 2}
+    while True:
+        response = client.get("/institutional-clients/", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["total"] == 5
+        seen.extend(item["id"] for item in payload["data"])
+        if not payload["next_cursor"]:
+            break
+        params["cursor"] = payload["next_cursor"]
+
+    assert seen == [item.id for item in reversed(created)]
+
+
+def test_moving_a_territory_moves_its_clients(
+    db_session, client, territory_tree, client_factory
+):
+    client_factory(territory_tree["lima"], 1)
+
+    update_territorio(
+        db_session,
+        territory_tree["lima"],
+        TerritoryUpdate(id_parent=territory_tree["colombia"].id),
+    )
+
+    colombia = client.get(
+        "/institutional-clients/",
+        params={"territory_subtree": str(territory_tree["colombia"].id)},
+    ).json()
+    peru = client.get(
+        "/institutional-clients/",
+        params={"territory_subtree": str(territory_tree["peru"].id)},
+    ).json()
+
+    assert colombia["total"] == 1
+    assert peru["total"] == 0
+
+
+def test_rebuild_matches_incrementally_maintained_closure(db_session, territory_tree):
+    def snapshot():
+        return sorted(
+            (row.ancestor_id, row.descendant_id, row.depth)
+            for row in db_session.query(TerritorioClosure).all()
+        )
+
+    before = snapshot()
+    rebuild_territorios_closure(db_session)
+
+    assert snapshot() == before
+    assert (
+        str(territory_tree["colombia"].id),
+        str(territory_tree["bogota"].id),
+        2,
+    ) in before
+
+
+def test_startup_populates_the_closure_only_when_empty(db_session, territory_tree):
+    closure = TerritorioClosure.__table__
+    rows = db_session.query(TerritorioClosure).count()
+    # A stray row proves the populated table is left untouched
+    db_session.execute(closure.insert().values(ancestor_id="x", descendant_id="y", depth=9))
+    db_session.commit()
+
+    assert ensure_territorios_closure(db_session) == 0
+    assert db_session.query(TerritorioClosure).count() == rows + 1
+
+    db_session.execute(closure.delete())
+    db_session.commit()
+    assert ensure_territorios_closure(db_session) == rows
+    assert db_session.query(TerritorioClosure).count() == rows
+
+
+def test_subtree_endpoint_validates_territory_and_cursor(client, territory_tree):
+    missing = client.get(
+        "/institutional-clients/",
+        params={"territory_subtree": "00000000-0000-0000-0000-000000000000"},
+    )
+    assert missing.status_code == 404
+
+    bad_cursor = client.get(
+        "/institutional-clients/",
+        params={
+            "territory_subtree": str(territory_tree["colombia"].id),
+            "cursor": "not-a-cursor",
+        },
+    )
+    assert bad_cursor.status_code == 400
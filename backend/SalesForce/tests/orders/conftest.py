@@ -5,44 +5,11 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 import pytest
-from faker import Faker
 
-from app.modules.institutional_clients.models import InstitutionalClient
 from app.modules.orders.services import order_service
 import httpx
 
 
-@pytest.fixture()
-def institutional_client_factory(db_session, fake: Faker):
-    """Persist an institutional client with sensible defaults."""
-
-    def _create(**overrides) -> InstitutionalClient:
-        payload = {
-            "nombre_institucion": overrides.get("nombre_institucion", fake.company()),
-            "direccion": overrides.get("direccion", fake.street_address().replace("\n", " ")),
-            "direccion_institucional": overrides.get(
-                "direccion_institucional", fake.unique.company_email()
-            ),
-            "identificacion_tributaria": overrides.get(
-                "identificacion_tributaria", fake.unique.bothify(text="NIT##########")
-            ),
-            "representante_legal": overrides.get("representante_legal", fake.name()),
-            "telefono": overrides.get("telefono", fake.msisdn()),
-            "justificacion_acceso": overrides.get(
-                "justificacion_acceso", "Abastecimiento de insumos médicos"
-            ),
-            "certificado_camara": overrides.get("certificado_camara", "ZmFrZS1jZXJ0"),
-            "territory_id": overrides.get("territory_id"),
-        }
-        client = InstitutionalClient(**payload)
-        db_session.add(client)
-        db_session.commit()
-        db_session.refresh(client)
-        return client
-
-    return _create
-
-
 @pytest.fixture()
 def mock_order_integrations(monkeypatch):
     """
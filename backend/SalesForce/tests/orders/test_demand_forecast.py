@@ -0,0 +1,85 @@
+"""Tests for the product demand forecasting job and its endpoint."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.modules.orders.crud import create_order_with_items
+from app.modules.orders.models import ProductDemandForecast
+from app.modules.orders.services.demand_forecast import (
+    forecast_series,
+    refresh_product_forecasts,
+    seasonal_profile,
+)
+
+TODAY = date(2025, 3, 3)  # a Monday
+
+
+def test_seasonal_profile_is_relative_to_the_mean():
+    # Two weeks starting on a Wednesday: weekdays sell 6, weekends nothing
+    series = [6.0 if (2 + day) % 7 < 5 else 0.0 for day in range(14)]
+
+    profile = seasonal_profile(series, first_weekday=2)
+
+    assert profile == pytest.approx([1.4] * 5 + [0.0, 0.0])
+
+
+def test_forecast_follows_level_and_weekly_pattern():
+    series = [10.0 if day % 7 < 5 else 2.0 for day in range(56)]
+    series += [20.0 if day % 7 < 5 else 4.0 for day in range(56)]
+
+    daily, alpha = forecast_series(series, first_weekday=0, horizon_days=7)
+
+    # The level moved up; the fastest factor tracks it best
+    assert alpha == 0.5
+    assert daily[:5] == pytest.approx([20.0] * 5, rel=0.05)
+    assert daily[5:] == pytest.approx([4.0] * 2, rel=0.05)
+    assert forecast_series([0.0] * 14, 0, 3) == ([0.0, 0.0, 0.0], 0.1)
+
+
+def test_refresh_stores_forecasts_and_endpoint_serves_them(
+    client, db_session, institutional_client_factory
+):
+    institution = institutional_client_factory()
+
+    def order(day: date, product_id: int, quantity: int, status: str = "pending"):
+        create_order_with_items(
+            db_session,
+            institutional_client_id=institution.id,
+            order_date=day,
+            subtotal=Decimal(quantity),
+            tax_amount=Decimal("0"),
+            total_amount=Decimal(quantity),
+            status=status,
+            items=[
+                {
+                    "product_id": product_id,
+                    "product_name": f"Producto {product_id}",
+                    "quantity": quantity,
+                    "unit_price": Decimal("1"),
+                    "subtotal": Decimal(quantity),
+                }
+            ],
+        )
+
+    for offset in range(1, 29):
+        order(TODAY - timedelta(days=offset), 1, 3)
+    order(TODAY - timedelta(days=2), 1, 50, status="cancelled")
+    order(TODAY - timedelta(days=5), 2, 7)
+    order(TODAY - timedelta(days=400), 3, 7)  # outside the history window
+
+    assert refresh_product_forecasts(db_session, today=TODAY, history_days=28, horizon_days=14) == 2
+    assert {row.product_id for row in db_session.query(ProductDemandForecast)} == {1, 2}
+
+    response = client.get("/pedidos/productos/1/pronostico")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["history_days"] == 28
+    assert len(body["daily"]) == 14
+    assert body["daily"][0] == {"fecha": "2025-03-03", "cantidad": 3.0}
+    assert body["total"] == pytest.approx(42.0)
+
+    assert client.get("/pedidos/productos/3/pronostico").status_code == 404
@@ -0,0 +1,253 @@
+"""Tests for the order events outbox and its SSE feed."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.core.database import database_now
+from app.modules.orders.crud import (
+    create_order_with_items,
+    get_order_event_resume_cursor,
+    update_order_status,
+)
+from app.modules.orders.models import OrderEvent
+from app.modules.orders.services.order_event_feed import (
+    OrderEventBroadcaster,
+    stream_order_events,
+)
+
+AUTHORIZED_HEADERS = {"X-User-Role": "admin"}
+
+
+@pytest.fixture()
+def order_factory(db_session, institutional_client_factory):
+    client = institutional_client_factory()
+
+    def _create(status: str = "pending"):
+        return create_order_with_items(
+            db_session,
+            institutional_client_id=client.id,
+            order_date=date(2025, 1, 15),
+            subtotal=Decimal("100.00"),
+            tax_amount=Decimal("19.00"),
+            total_amount=Decimal("119.00"),
+            status=status,
+            items=[
+                {
+                    "product_id": 1,
+                    "product_name": "Guantes",
+                    "quantity": 1,
+                    "unit_price": Decimal("100.00"),
+                    "subtotal": Decimal("100.00"),
+                }
+            ],
+        )
+
+    return _create
+
+
+def _parse_frame(frame: str) -> dict:
+    data_line = next(line for line in frame.splitlines() if line.startswith("data: "))
+    return json.loads(data_line[len("data: "):])
+
+
+def test_order_changes_are_recorded_in_the_outbox(db_session, order_factory):
+    order = order_factory()
+    update_order_status(db_session, order.id, "in_transit")
+    update_order_status(db_session, order.id, "in_transit")
+
+    events = db_session.query(OrderEvent).order_by(OrderEvent.id).all()
+
+    assert [(e.event_type, e.status, e.previous_status) for e in events] == [
+        ("order_created", "pending", None),
+        ("status_changed", "in_transit", "pending"),
+    ]
+    assert all(e.order_id == order.id for e in events)
+
+
+def test_catch_up_endpoint_pages_through_events(client, db_session, order_factory):
+    first = order_factory()
+    second = order_factory()
+    update_order_status(db_session, first.id, "delivered")
+
+    response = client.request(
+        "GET", "/pedidos/eventos", params={"limit": 2}, headers=AUTHORIZED_HEADERS
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert [e["order_id"] for e in page["data"]] == [first.id, second.id]
+    assert page["has_more"] is True
+
+    response = client.request(
+        "GET",
+        "/pedidos/eventos",
+        params={"since": page["next_cursor"], "limit": 2},
+        headers=AUTHORIZED_HEADERS,
+    )
+    page = response.json()
+    assert [(e["order_id"], e["status"]) for e in page["data"]] == [(first.id, "delivered")]
+    assert page["has_more"] is False
+
+    filtered = client.request(
+        "GET",
+        "/pedidos/eventos",
+        params={"order_id": second.id},
+        headers=AUTHORIZED_HEADERS,
+    ).json()
+    assert [e["order_id"] for e in filtered["data"]] == [second.id]
+
+
+def test_events_feed_requires_authorized_role(client, monkeypatch):
+    from app.modules.orders.routes import orders as orders_routes
+
+    reported = []
+    monkeypatch.setattr(
+        orders_routes,
+        "report_unauthorized_order_status_attempt",
+        lambda **kwargs: reported.append(kwargs),
+    )
+
+    response = client.get("/pedidos/eventos")
+
+    assert response.status_code == 403
+    assert reported[0]["order_id"] == "*"
+
+
+def test_stream_replays_backlog_then_delivers_live_events(db_session, order_factory):
+    order = order_factory()
+    broadcaster = OrderEventBroadcaster(poll_interval=0.01)
+
+    async def scenario():
+        stream = stream_order_events(broadcaster, since=0, heartbeat_interval=1)
+        other = stream_order_events(broadcaster, since=0, heartbeat_interval=1)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        assert await other.__anext__() == "retry: 3000\n\n"
+
+        backlog = _parse_frame(await stream.__anext__())
+        assert (backlog["order_id"], backlog["event_type"]) == (order.id, "order_created")
+        await other.__anext__()
+
+        await asyncio.to_thread(update_order_status, db_session, order.id, "delivered")
+
+        live = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert live.startswith(f"id: {backlog['id'] + 1}\nevent: status_changed\n")
+        assert _parse_frame(live)["status"] == "delivered"
+        shared = await asyncio.wait_for(other.__anext__(), timeout=2)
+        assert _parse_frame(shared) == _parse_frame(live)
+        assert broadcaster.stats()["subscribers"] == 2
+
+        await stream.aclose()
+        await other.aclose()
+        assert broadcaster.stats()["subscribers"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_lagging_subscriber_recovers_missed_events_from_outbox(db_session, order_factory):
+    order = order_factory()
+    broadcaster = OrderEventBroadcaster(poll_interval=0.01, max_queue_size=1)
+
+    async def scenario():
+        stream = stream_order_events(broadcaster, since=0, heartbeat_interval=1)
+        await stream.__anext__()
+        await stream.__anext__()  # backlog: order_created
+
+        def change_statuses():
+            for status in ("confirmed", "in_transit", "delivered"):
+                update_order_status(db_session, order.id, status)
+
+        await asyncio.to_thread(change_statuses)
+        await asyncio.sleep(0.1)  # let the tail overflow the 1-slot queue
+
+        received = [
+            _parse_frame(await asyncio.wait_for(stream.__anext__(), timeout=2))["status"]
+            for _ in range(3)
+        ]
+        await stream.aclose()
+        return received
+
+    assert asyncio.run(scenario()) == ["confirmed", "in_transit", "delivered"]
+
+
+def _record_event(db_session, event_id: int, order_id: int, status: str) -> None:
+    """Commit an event with a given id, as a transaction that got it earlier would."""
+    db_session.add(
+        OrderEvent(id=event_id, order_id=order_id, event_type="status_changed", status=status)
+    )
+    db_session.commit()
+
+
+def _frame_cursor(frame: str) -> int:
+    return int(frame.split("\n", 1)[0][len("id: "):])
+
+
+def test_events_committed_out_of_order_are_not_skipped(db_session, order_factory):
+    order = order_factory()
+    created_id = db_session.query(OrderEvent.id).scalar()
+    broadcaster = OrderEventBroadcaster(poll_interval=0.01)
+
+    async def scenario():
+        stream = stream_order_events(broadcaster, since=0, heartbeat_interval=1)
+        await stream.__anext__()
+        assert _frame_cursor(await stream.__anext__()) == created_id
+
+        # The transaction holding the next id commits after a later one
+        await asyncio.to_thread(_record_event, db_session, created_id + 2, order.id, "delivered")
+        later = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert _parse_frame(later)["id"] == created_id + 2
+        # Resuming must not skip the id still pending
+        assert _frame_cursor(later) == created_id
+
+        await asyncio.to_thread(_record_event, db_session, created_id + 1, order.id, "in_transit")
+        late = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert _parse_frame(late)["id"] == created_id + 1
+        assert _frame_cursor(late) == created_id + 2
+        await stream.aclose()
+
+        # A client that dropped after the first live frame resumes without gaps
+        resumed = stream_order_events(broadcaster, since=_frame_cursor(later), heartbeat_interval=1)
+        await resumed.__anext__()
+        replayed = [_parse_frame(await resumed.__anext__())["id"] for _ in range(2)]
+        await resumed.aclose()
+        return replayed
+
+    assert asyncio.run(scenario()) == [created_id + 1, created_id + 2]
+
+
+def test_catch_up_cursor_stops_before_a_pending_id(client, db_session, order_factory):
+    order = order_factory()
+    created_id = db_session.query(OrderEvent.id).scalar()
+    _record_event(db_session, created_id + 2, order.id, "delivered")
+
+    page = client.request("GET", "/pedidos/eventos", headers=AUTHORIZED_HEADERS).json()
+    assert [e["id"] for e in page["data"]] == [created_id, created_id + 2]
+    assert page["next_cursor"] == created_id
+
+    _record_event(db_session, created_id + 1, order.id, "in_transit")
+    page = client.request(
+        "GET",
+        "/pedidos/eventos",
+        params={"since": page["next_cursor"]},
+        headers=AUTHORIZED_HEADERS,
+    ).json()
+    assert [e["id"] for e in page["data"]] == [created_id + 1, created_id + 2]
+    assert page["next_cursor"] == created_id + 2
+
+
+def test_gap_settles_against_the_database_clock(db_session, order_factory):
+    order = order_factory()
+    created_id = db_session.query(OrderEvent.id).scalar()
+    _record_event(db_session, created_id + 2, order.id, "delivered")
+    until = created_id + 2
+
+    assert get_order_event_resume_cursor(db_session, created_id, until, 60) == created_id
+
+    later = db_session.get(OrderEvent, created_id + 2)
+    later.created_at = database_now(db_session) - timedelta(minutes=5)
+    db_session.commit()
+    assert get_order_event_resume_cursor(db_session, created_id, until, 60) == until
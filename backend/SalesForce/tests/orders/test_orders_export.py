@@ -0,0 +1,99 @@
+"""Tests for the streaming orders export."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.modules.orders.crud import create_order_with_items
+from app.modules.orders.services.order_export import CSV_COLUMNS, stream_orders_export
+
+
+@pytest.fixture()
+def seeded_orders(db_session, institutional_client_factory):
+    client = institutional_client_factory(nombre_institucion="Hospital Norte")
+
+    def _order(order_date: date, items: list):
+        return create_order_with_items(
+            db_session,
+            institutional_client_id=client.id,
+            order_date=order_date,
+            subtotal=Decimal("30.00"),
+            tax_amount=Decimal("5.70"),
+            total_amount=Decimal("35.70"),
+            status="pending",
+            items=items,
+        )
+
+    item = lambda product_id, quantity: {  # noqa: E731
+        "product_id": product_id,
+        "product_name": f"Producto {product_id}",
+        "quantity": quantity,
+        "unit_price": Decimal("10.00"),
+        "subtotal": Decimal("10.00") * quantity,
+    }
+
+    return {
+        "client": client,
+        "before": _order(date(2025, 1, 31), [item(1, 1)]),
+        "first": _order(date(2025, 2, 1), [item(1, 1), item(2, 2)]),
+        "second": _order(date(2025, 2, 28), [item(3, 3)]),
+        "after": _order(date(2025, 3, 1), [item(4, 1)]),
+    }
+
+
+def test_ndjson_export_streams_one_order_per_line(client, seeded_orders):
+    response = client.get(
+        "/pedidos/export", params={"from": "2025-02-01", "to": "2025-02-28"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [
+        seeded_orders["first"].id,
+        seeded_orders["second"].id,
+    ]
+    first = lines[0]
+    assert first["client_name"] == "Hospital Norte"
+    assert first["total_amount"] == "35.70"
+    assert [(i["product_id"], i["quantity"]) for i in first["items"]] == [(1, 1), (2, 2)]
+
+
+def test_csv_export_writes_one_row_per_item(client, seeded_orders):
+    response = client.get(
+        "/pedidos/export",
+        params={"from": "2025-02-01", "to": "2025-02-28", "format": "csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "pedidos_2025-02-01_2025-02-28.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(int(r["order_id"]), int(r["product_id"])) for r in rows] == [
+        (seeded_orders["first"].id, 1),
+        (seeded_orders["first"].id, 2),
+        (seeded_orders["second"].id, 3),
+    ]
+    assert rows[1]["item_subtotal"] == "20.00"
+
+
+def test_export_sends_csv_header_before_reading_rows(seeded_orders):
+    chunks = stream_orders_export(date(2025, 1, 1), date(2025, 12, 31), "csv")
+
+    assert next(chunks).decode() == ",".join(CSV_COLUMNS) + "\r\n"
+    assert len(b"".join(chunks).decode().splitlines()) == 5
+    chunks.close()
+
+
+def test_export_rejects_inverted_range(client):
+    response = client.get(
+        "/pedidos/export", params={"from": "2025-03-01", "to": "2025-02-01"}
+    )
+
+    assert response.status_code == 400
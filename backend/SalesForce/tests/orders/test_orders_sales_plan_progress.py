@@ -0,0 +1,146 @@
+"""Avance de los planes de venta actualizado por los pedidos."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.modules.orders.crud import create_order_with_items, update_order_status
+from app.modules.reports.crud.informe_comercial_crud import calculate_sales_indicators
+from app.modules.sales.crud.sales_plan import sales_plan_periods
+from app.modules.salespeople.models.salespeople_model import SalesPlan, Salespeople
+
+
+@pytest.fixture()
+def salesperson(db_session):
+    salesperson = Salespeople(
+        full_name="Ana", email="ana@example.com", hire_date=date(2024, 1, 1), status="active"
+    )
+    db_session.add(salesperson)
+    db_session.commit()
+    return salesperson
+
+
+def _plan(db_session, salesperson, periodo: str) -> SalesPlan:
+    plan = SalesPlan(
+        identificador=f"PV-{periodo}",
+        nombre="Plan",
+        descripcion="Plan de prueba",
+        periodo=periodo,
+        meta=1000,
+        vendedor_id=salesperson.id,
+        unidades_vendidas=0,
+    )
+    db_session.add(plan)
+    db_session.commit()
+    return plan
+
+
+def _order(db_session, client_id, salespeople_id, quantity=3, status="pending"):
+    return create_order_with_items(
+        db_session,
+        institutional_client_id=client_id,
+        order_date=date(2025, 2, 10),
+        subtotal=Decimal("150.00"),
+        tax_amount=Decimal("28.50"),
+        total_amount=Decimal("178.50"),
+        status=status,
+        items=[
+            {
+                "product_id": 1,
+                "product_name": "Guantes",
+                "quantity": quantity,
+                "unit_price": Decimal("50.00"),
+                "subtotal": Decimal("150.00"),
+            }
+        ],
+        salespeople_id=salespeople_id,
+    )
+
+
+def test_sales_plan_periods_cover_year_quarter_and_month():
+    assert sales_plan_periods(date(2025, 2, 10)) == ["2025", "2025-Q1", "2025-02"]
+    assert sales_plan_periods(date(2025, 12, 31)) == ["2025", "2025-Q4", "2025-12"]
+
+
+def test_orders_update_the_plans_of_their_period(
+    db_session, institutional_client_factory, salesperson
+):
+    client = institutional_client_factory()
+    quarter = _plan(db_session, salesperson, "2025-Q1")
+    other_quarter = _plan(db_session, salesperson, "2025-Q2")
+
+    _order(db_session, client.id, salesperson.id, quantity=3)
+    _order(db_session, client.id, salesperson.id, quantity=2)
+    _order(db_session, client.id, None, quantity=7)
+
+    db_session.refresh(quarter)
+    db_session.refresh(other_quarter)
+    assert quarter.unidades_vendidas == 5
+    assert quarter.monto_vendido == 300.0
+    assert other_quarter.unidades_vendidas == 0
+    assert calculate_sales_indicators(db_session)["unidades_vendidas"] == 5
+
+
+def test_status_changes_add_and_remove_the_order(
+    db_session, institutional_client_factory, salesperson
+):
+    client = institutional_client_factory()
+    plan = _plan(db_session, salesperson, "2025")
+    order = _order(db_session, client.id, salesperson.id, quantity=4)
+    _order(db_session, client.id, salesperson.id, quantity=9, status="cancelled")
+
+    update_order_status(db_session, order.id, "in_transit")
+    db_session.refresh(plan)
+    assert plan.unidades_vendidas == 4
+
+    update_order_status(db_session, order.id, "cancelled")
+    update_order_status(db_session, order.id, "cancelled")
+    db_session.refresh(plan)
+    assert (plan.unidades_vendidas, plan.monto_vendido) == (0, 0)
+
+    update_order_status(db_session, order.id, "pending")
+    db_session.refresh(plan)
+    assert (plan.unidades_vendidas, plan.monto_vendido) == (4, 150.0)
+
+
+def test_order_endpoint_links_the_salesperson(
+    client, db_session, institutional_client_factory, salesperson, mock_order_integrations
+):
+    mock_order_integrations[1] = {"nombre": "Guantes", "precio": Decimal("50.00")}
+    institution = institutional_client_factory()
+    today = date.today()
+    _plan(db_session, salesperson, f"{today.year}-{today.month:02d}")
+
+    response = client.post(
+        "/pedidos/",
+        json={
+            "institutional_client_id": institution.id,
+            "salespeople_id": salesperson.id,
+            "items": [
+                {
+                    "product_id": 1,
+                    "product_name": "Guantes",
+                    "quantity": 2,
+                    "unit_price": "50.00",
+                    "subtotal": "100.00",
+                }
+            ],
+        },
+    )
+    assert response.status_code == 201
+    assert response.json()["salespeople_id"] == salesperson.id
+
+    detail = client.get(f"/vendedores/{salesperson.id}").json()
+    assert detail["sales_plans"][0]["unidadesVendidas"] == 2
+    assert detail["sales_plans"][0]["montoVendido"] == 100.0
+
+    missing = client.post(
+        "/pedidos/",
+        json={
+            "institutional_client_id": institution.id,
+            "salespeople_id": "missing",
+            "items": [],
+        },
+    )
+    assert missing.status_code == 404
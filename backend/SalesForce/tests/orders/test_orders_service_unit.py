@@ -113,10 +113,12 @@ async def test_create_order_service_calculates_totals(monkeypatch, multi_item_pa
         total_amount,
         status,
         items,
+        salespeople_id=None,
     ):
         captured.update(
             {
                 "institutional_client_id": institutional_client_id,
+                "salespeople_id": salespeople_id,
                 "order_date": order_date,
                 "subtotal": subtotal,
                 "tax_amount": tax_amount,
@@ -146,6 +148,7 @@ async def test_create_order_service_calculates_totals(monkeypatch, multi_item_pa
     assert captured["institutional_client_id"] == multi_item_payload.institutional_client_id
     assert captured["status"] == "pending"
     assert captured["order_date"] == date.today()
+    assert captured["salespeople_id"] is None
 
     expected_subtotal = Decimal("320000.00")
     expected_tax = Decimal("60800.00")
@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import date
 
 import pytest
+from sqlalchemy import event
 
 from app.modules.orders.models import Order, OrderItem
 from app.modules.orders.services.order_service import get_scheduled_deliveries_service
@@ -112,3 +113,73 @@ def test_get_scheduled_deliveries_service_filters_by_status_and_date(
     assert delivery.client_name == client.nombre_institucion
     assert delivery.country == "Colombia"
     assert delivery.city == "Bogotá"
+
+
+def test_get_scheduled_deliveries_service_uses_a_single_query(
+    db_session, institutional_client_factory, territory_hierarchy
+):
+    """The page, its enrichment and the total come from one SQL statement."""
+
+    _, _, city = territory_hierarchy
+    client = institutional_client_factory(territory_id=str(city.id))
+    target_date = date(2024, 12, 5)
+    for product_id in range(30, 35):
+        _persist_order(db_session, client.id, target_date, product_id=product_id)
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):  # noqa: ANN001
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        response = get_scheduled_deliveries_service(
+            db_session, delivery_date=target_date, page=2, limit=2
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    assert response.total == 5
+    assert response.total_pages == 3
+    assert len(response.data) == 2
+    assert {(d.country, d.city) for d in response.data} == {("Colombia", "Bogotá")}
+
+
+def test_get_scheduled_deliveries_service_reflects_renamed_territories(
+    db_session, institutional_client_factory, territory_hierarchy
+):
+    """Territory renames propagate to the precomputed ancestry."""
+
+    country, _, city = territory_hierarchy
+    client = institutional_client_factory(territory_id=str(city.id))
+    target_date = date(2024, 12, 6)
+    _persist_order(db_session, client.id, target_date)
+
+    country.name = "República de Colombia"
+    db_session.commit()
+
+    response = get_scheduled_deliveries_service(
+        db_session, delivery_date=target_date, page=1, limit=10
+    )
+
+    assert response.data[0].country == "República de Colombia"
+
+
+def test_get_scheduled_deliveries_service_counts_past_last_page(
+    db_session, institutional_client_factory, territory_hierarchy
+):
+    """Pages beyond the last one still report the real total."""
+
+    _, _, city = territory_hierarchy
+    client = institutional_client_factory(territory_id=str(city.id))
+    target_date = date(2024, 12, 7)
+    _persist_order(db_session, client.id, target_date)
+
+    response = get_scheduled_deliveries_service(
+        db_session, delivery_date=target_date, page=3, limit=10
+    )
+
+    assert response.data == []
+    assert response.total == 1
@@ -0,0 +1,158 @@
+"""Unit tests for the background security alert dispatcher (ASR-12)."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.modules.orders.models import SecurityAlertOutbox
+from app.modules.orders.services.security_alert_dispatcher import (
+    ALERT_BATCH_PATH,
+    SecurityAlertDispatcher,
+)
+
+
+def _alert(order_id: int) -> dict:
+    return {
+        "order_id": str(order_id),
+        "user_id": None,
+        "user_role": None,
+        "source_ip": "127.0.0.1",
+        "reason": "Rol de usuario no proporcionado",
+    }
+
+
+@pytest.fixture()
+def audit_service():
+    """Fake SecurityAndAudit that records batches and can be switched off."""
+
+    state = {"up": True, "delay": 0.0, "batches": []}
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == ALERT_BATCH_PATH
+        time.sleep(state["delay"])
+        if not state["up"]:
+            return httpx.Response(503)
+        with lock:
+            state["batches"].append(json.loads(request.content)["alerts"])
+        return httpx.Response(201, json={"alert_ids": [], "processing_time_ms": 1})
+
+    state["transport"] = httpx.MockTransport(handler)
+    return state
+
+
+@pytest.fixture()
+def dispatcher_factory(audit_service):
+    created = []
+
+    def _create(**overrides) -> SecurityAlertDispatcher:
+        options = {"transport": audit_service["transport"], "retry_backoff": 0.01}
+        options.update(overrides)
+        dispatcher = SecurityAlertDispatcher(lambda: "http://audit.test", **options)
+        created.append(dispatcher)
+        return dispatcher
+
+    yield _create
+    for dispatcher in created:
+        dispatcher.close()
+
+
+def test_alerts_are_batched_and_delivered_within_budget(audit_service, dispatcher_factory):
+    dispatcher = dispatcher_factory(batch_window=0.2)
+
+    start = time.perf_counter()
+    for order_id in range(5):
+        dispatcher.submit(_alert(order_id))
+
+    assert dispatcher.flush(timeout=2)
+    assert time.perf_counter() - start < 2
+    assert len(audit_service["batches"]) == 1
+    assert [alert["order_id"] for alert in audit_service["batches"][0]] == [
+        "0", "1", "2", "3", "4"
+    ]
+    assert dispatcher.stats()["delivered"] == 5
+
+
+def test_submit_does_not_wait_for_a_slow_audit_service(audit_service, dispatcher_factory):
+    audit_service["delay"] = 0.5
+    dispatcher = dispatcher_factory()
+
+    start = time.perf_counter()
+    dispatcher.submit(_alert(1))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.05
+    assert dispatcher.flush(timeout=2)
+
+
+def test_undeliverable_alerts_spill_to_outbox_and_are_retried(
+    db_session, audit_service, dispatcher_factory
+):
+    audit_service["up"] = False
+    dispatcher = dispatcher_factory(outbox_retry_interval=0.1)
+
+    dispatcher.submit(_alert(7))
+    dispatcher.submit(_alert(8))
+    assert dispatcher.flush(timeout=2)
+
+    assert db_session.query(SecurityAlertOutbox).count() == 2
+    spilled_ids = [
+        json.loads(row.payload)["alert_id"]
+        for row in db_session.query(SecurityAlertOutbox).order_by(SecurityAlertOutbox.id)
+    ]
+    assert dispatcher.stats()["outbox_depth"] == 2
+
+    audit_service["up"] = True
+    deadline = time.monotonic() + 2
+    while dispatcher.stats()["outbox_depth"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert dispatcher.stats()["outbox_depth"] == 0
+    delivered = [alert for batch in audit_service["batches"] for alert in batch]
+    assert [alert["order_id"] for alert in delivered] == ["7", "8"]
+    # The retried alerts keep the id assigned on submit, so the audit service dedupes them
+    assert [alert["alert_id"] for alert in delivered] == spilled_ids
+    assert len(set(spilled_ids)) == 2
+
+
+def test_stats_report_queue_depth(dispatcher_factory):
+    dispatcher = dispatcher_factory(max_queue_size=10)
+
+    stats = dispatcher.stats()
+
+    assert stats["queue_depth"] == 0
+    assert stats["queue_capacity"] == 10
+
+
+def test_queue_overflow_is_spilled_by_the_worker(
+    db_session, audit_service, dispatcher_factory, monkeypatch
+):
+    audit_service["up"] = False
+    audit_service["delay"] = 0.1
+    dispatcher = dispatcher_factory(max_queue_size=1, max_overflow_size=3)
+    spill, spilled_from = dispatcher._spill, []
+
+    def record_thread(batch):
+        spilled_from.append(threading.current_thread().name)
+        spill(batch)
+
+    monkeypatch.setattr(dispatcher, "_spill", record_thread)
+
+    start = time.perf_counter()
+    for order_id in range(6):
+        dispatcher.submit(_alert(order_id))
+    assert time.perf_counter() - start < 0.05
+
+    assert dispatcher.flush(timeout=3)
+    stats = dispatcher.stats()
+    assert set(spilled_from) == {"security-alert-dispatcher"}
+    assert stats["submitted"] == 6
+    assert stats["spilled"] + stats["dropped"] == 6
+    assert stats["dropped"] >= 1  # one queued, one in flight, three in the overflow
+    assert stats["overflow_depth"] == 0
+    assert db_session.query(SecurityAlertOutbox).count() == stats["spilled"]
@@ -101,3 +101,25 @@ def test_list_sales_plan_endpoint_validates_query_params(client):
 
     assert response.status_code == 400
     assert response.json()["detail"] == "page and limit must be greater than zero"
+
+
+def test_create_sales_plan_endpoint_rejects_periods_progress_cannot_reach(client, fake: Faker):
+    salesperson = create_salesperson(client, fake)
+    payload = {
+        "identificador": fake.unique.bothify(text="PV-####-Q#"),
+        "nombre": fake.catch_phrase(),
+        "descripcion": fake.text(max_nb_chars=60),
+        "meta": 100.0,
+        "vendedorId": salesperson["id"],
+    }
+
+    for periodo in ("Enero 2025", "2025-13", "2025-Q5", "25-01"):
+        response = client.post("/planes-venta/", json={**payload, "periodo": periodo})
+        assert response.status_code == 422, periodo
+
+    for periodo in ("2025", "2025-Q4", "2025-01"):
+        identificador = fake.unique.bothify(text="PV-####-Q#")
+        response = client.post(
+            "/planes-venta/", json={**payload, "identificador": identificador, "periodo": periodo}
+        )
+        assert response.status_code == 200, periodo
@@ -0,0 +1,159 @@
+"""Tests for day-route visit sequencing and the stored daily plan."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.geo import format_distance, format_duration, haversine_distances
+from app.modules.salespeople.models.salespeople_model import DayRoutePlan, Route
+from app.modules.salespeople.services import dayroute_service
+from app.modules.salespeople.services.distance_matrix import (
+    DistanceMatrixCache,
+    StubDistanceMatrixProvider,
+)
+from app.modules.salespeople.services.route_sequencing import (
+    nearest_neighbour_order,
+    path_cost,
+    solve_visit_order,
+    two_opt,
+)
+
+DAY = date(2025, 1, 15)
+ORIGIN = (4.60, -74.08)
+
+
+def _line_matrix(positions):
+    return [[abs(a - b) for b in positions] for a in positions]
+
+
+def test_two_opt_fixes_the_nearest_neighbour_detour():
+    # Origin at 0: nearest neighbour goes 1 -> -2 -> 4 (10), optimum is -2 -> 1 -> 4 (8)
+    matrix = _line_matrix([0, 1, -2, 4])
+
+    greedy = nearest_neighbour_order(matrix)
+
+    assert greedy == [0, 1, 2, 3]
+    assert path_cost(matrix, greedy) == 10
+    assert solve_visit_order(matrix) == [2, 1, 3]
+
+
+def test_solver_never_worsens_the_greedy_route_and_respects_the_budget():
+    rng = random.Random(7)
+    points = [(rng.random(), rng.random()) for _ in range(250)]
+    matrix = [[((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 for bx, by in points] for ax, ay in points]
+    greedy = nearest_neighbour_order(matrix)
+
+    started = time.perf_counter()
+    order = two_opt(matrix, greedy, deadline=time.monotonic() + 0.05)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3
+    assert sorted(order) == list(range(250)) and order[0] == 0
+    assert path_cost(matrix, order) <= path_cost(matrix, greedy)
+
+
+class _GeoProvider(StubDistanceMatrixProvider):
+    """Stub whose distances follow the "lat,lon" destinations."""
+
+    def fetch(self, origin, destinations):
+        self.calls.append(list(destinations))
+        points = [tuple(map(float, destination.split(","))) for destination in destinations]
+        results = []
+        for meters in haversine_distances(origin, points):
+            meters = round(meters * 1.3)
+            seconds = meters * 60 // 500
+            results.append(
+                {
+                    "distance_meters": meters,
+                    "duration_seconds": seconds,
+                    "distance_text": format_distance(meters),
+                    "duration_text": format_duration(seconds),
+                }
+            )
+        return results
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    provider = _GeoProvider()
+    cache = DistanceMatrixCache(provider=provider, ttl=timedelta(hours=1))
+    monkeypatch.setattr(dayroute_service, "distance_matrix_cache", cache)
+    return cache
+
+
+def _located_client(factory, db_session, name, latitude):
+    client = factory(nombre_institucion=name, direccion=f"Calle {name}")
+    client.latitude, client.longitude = latitude, ORIGIN[1]
+    db_session.commit()
+    return client
+
+
+def test_get_dayroute_sequences_todays_pending_visits_with_etas(
+    db_session, institutional_client_factory, cache, monkeypatch
+):
+    # Clients north of the origin, created out of visiting order
+    far = _located_client(institutional_client_factory, db_session, "far", 4.66)
+    near = _located_client(institutional_client_factory, db_session, "near", 4.61)
+    middle = _located_client(institutional_client_factory, db_session, "middle", 4.63)
+    other = _located_client(institutional_client_factory, db_session, "other", 4.62)
+    db_session.add_all(
+        [Route(salespeople_id="sp-1", institution_id=c.id, day=DAY, done=0) for c in (far, near, middle)]
+        + [
+            Route(salespeople_id="sp-1", institution_id=other.id, day=DAY, done=1),
+            Route(salespeople_id="sp-1", institution_id=other.id, day=DAY + timedelta(days=1), done=0),
+            Route(salespeople_id="sp-2", institution_id=other.id, day=DAY, done=0),
+        ]
+    )
+    db_session.commit()
+    monkeypatch.setattr(dayroute_service, "VISIT_DURATION_SECONDS", 1800)
+
+    routes = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+
+    assert [route.nombreEntidad for route in routes] == ["near", "middle", "far"]
+    assert [route.orden for route in routes] == [1, 2, 3]
+    arrivals = [route.llegadaEstimada for route in routes]
+    assert arrivals[1] - arrivals[0] > timedelta(minutes=30)
+    assert arrivals[2] - arrivals[1] > timedelta(minutes=30)
+    assert all(route.tiempoAcumulado for route in routes)
+    assert db_session.query(DayRoutePlan).count() == 1
+
+
+def test_reloads_are_served_from_the_stored_plan(
+    db_session, institutional_client_factory, cache, monkeypatch
+):
+    clients = [
+        _located_client(institutional_client_factory, db_session, name, latitude)
+        for name, latitude in (("a", 4.61), ("b", 4.62), ("c", 4.63))
+    ]
+    visits = [Route(salespeople_id="sp-1", institution_id=c.id, day=DAY, done=0) for c in clients]
+    db_session.add_all(visits)
+    db_session.commit()
+    first = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+
+    async def unavailable(*args, **kwargs):
+        raise AssertionError("stored plans must not look up clients again")
+
+    lookup = dayroute_service.ins_service.list_clients_territories
+    monkeypatch.setattr(dayroute_service.ins_service, "list_clients_territories", unavailable)
+    visits[0].done = 1
+    db_session.commit()
+
+    # Completed visits drop off; the rest keep their order and ETAs
+    reloaded = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+    assert reloaded == first[1:]
+    assert len(cache.provider.calls) == 1
+
+    # A visit that was not in the stored plan forces a new sequence
+    monkeypatch.setattr(dayroute_service.ins_service, "list_clients_territories", lookup)
+    extra = _located_client(institutional_client_factory, db_session, "d", 4.615)
+    db_session.add(Route(salespeople_id="sp-1", institution_id=extra.id, day=DAY, done=0))
+    db_session.commit()
+
+    replanned = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+    assert [route.nombreEntidad for route in replanned] == ["d", "b", "c"]
+    assert db_session.query(DayRoutePlan).count() == 1
@@ -0,0 +1,176 @@
+"""Tests for day-route input versioning and the nightly precompute job."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from app.modules.salespeople.models.salespeople_model import DayRoutePlan, Route
+from app.modules.salespeople.services import dayroute_service
+from app.modules.salespeople.services.dayroute_precompute import precompute_day_routes
+from app.modules.salespeople.services.distance_matrix import (
+    DistanceMatrixCache,
+    StubDistanceMatrixProvider,
+)
+
+DAY = date(2025, 1, 15)
+ORIGIN = (4.60, -74.08)
+
+
+@pytest.fixture()
+def provider(monkeypatch):
+    provider = StubDistanceMatrixProvider()
+    cache = DistanceMatrixCache(provider=provider, ttl=timedelta(hours=1))
+    monkeypatch.setattr(dayroute_service, "distance_matrix_cache", cache)
+    return provider
+
+
+def _visit(db_session, salespeople_id, client, day=DAY, done=0):
+    route = Route(salespeople_id=salespeople_id, institution_id=client.id, day=day, done=done)
+    db_session.add(route)
+    db_session.commit()
+    return route
+
+
+def _previous_plan(db_session, salespeople_id):
+    db_session.add(
+        DayRoutePlan(
+            salespeople_id=salespeople_id,
+            day=DAY - timedelta(days=1),
+            origin_latitude=ORIGIN[0],
+            origin_longitude=ORIGIN[1],
+            stops="[]",
+            input_version="",
+            computed_at=datetime(2025, 1, 14, 7, 0),
+        )
+    )
+    db_session.commit()
+
+
+def _dayroute(db_session, salespeople_id="sp-1"):
+    return asyncio.run(dayroute_service.get_dayroute(db_session, salespeople_id, *ORIGIN, day=DAY))
+
+
+def test_client_changes_invalidate_the_stored_plan(db_session, institutional_client_factory, provider):
+    client = institutional_client_factory(direccion="Calle 1")
+    visit = _visit(db_session, "sp-1", client)
+    _visit(db_session, "sp-1", institutional_client_factory(direccion="Calle 2"))
+    _dayroute(db_session)
+    version = db_session.query(DayRoutePlan).one().input_version
+
+    visit.done = 1
+    db_session.commit()
+    assert len(_dayroute(db_session)) == 1
+    assert db_session.query(DayRoutePlan).one().input_version == version
+    assert len(provider.calls) == 1
+
+    client.direccion = "Calle 3"
+    db_session.commit()
+    visit.done = 0
+    db_session.commit()
+    assert len(_dayroute(db_session)) == 2
+    assert db_session.query(DayRoutePlan).one().input_version != version
+    assert len(provider.calls) == 2
+
+
+def test_precompute_plans_changed_salespeople_only(db_session, institutional_client_factory, provider):
+    clients = [institutional_client_factory(direccion=f"Calle {n}") for n in range(4)]
+    for salespeople_id in ("sp-1", "sp-2"):
+        _previous_plan(db_session, salespeople_id)
+        _visit(db_session, salespeople_id, clients[0])
+        _visit(db_session, salespeople_id, clients[1])
+    _visit(db_session, "sp-3", clients[2])  # no previous route: no known origin
+    _visit(db_session, "sp-4", clients[3], done=1)  # nothing pending
+
+    stats = precompute_day_routes(day=DAY, max_workers=2)
+
+    assert stats == {
+        "salespeople": 3,
+        "computed": 2,
+        "unchanged": 0,
+        "empty": 0,
+        "no_origin": 1,
+        "failed": 0,
+    }
+    assert db_session.query(DayRoutePlan).filter_by(day=DAY).count() == 2
+
+    # Opening the app serves the precomputed plan without new provider calls
+    calls = len(provider.calls)
+    assert [route.orden for route in _dayroute(db_session, "sp-1")] == [1, 2]
+    assert len(provider.calls) == calls
+
+    _visit(db_session, "sp-2", clients[2])
+    stats = precompute_day_routes(day=DAY, max_workers=2)
+
+    assert (stats["computed"], stats["unchanged"]) == (1, 1)
+    sp2_plan = db_session.query(DayRoutePlan).filter_by(salespeople_id="sp-2", day=DAY).one()
+    db_session.refresh(sp2_plan)
+    assert sp2_plan.stops.count('"orden"') == 3
+
+
+def test_precomputed_plan_estimates_arrivals_from_the_day_start(
+    db_session, institutional_client_factory, provider, monkeypatch
+):
+    monkeypatch.setattr(dayroute_service, "DAY_START", time(8, 0))
+    tomorrow = date.today() + timedelta(days=1)
+    client = institutional_client_factory(direccion="Calle 1")
+    _previous_plan(db_session, "sp-1")
+    _visit(db_session, "sp-1", client, day=tomorrow)
+
+    assert precompute_day_routes(day=tomorrow)["computed"] == 1
+
+    served = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=tomorrow))
+    day_start = datetime.combine(tomorrow, time(8, 0), tzinfo=dayroute_service.DAYROUTE_TIMEZONE)
+    travel = timedelta(seconds=provider.fetch(ORIGIN, ["Calle 1"])[0]["duration_seconds"])
+    assert served[0].llegadaEstimada == day_start + travel
+    assert served[0].llegadaEstimada.utcoffset() == timedelta(0)
+
+    # Once the day has started, arrivals are estimated from the current time
+    now = datetime.now(timezone.utc)
+    assert dayroute_service.route_start_time(date.today() - timedelta(days=1), now) == now.replace(
+        microsecond=0
+    )
+
+
+def test_estimated_plans_are_recomputed_once_the_provider_answers(
+    db_session, institutional_client_factory, provider, monkeypatch
+):
+    for number, latitude in ((1, 4.61), (2, 4.62)):
+        client = institutional_client_factory(direccion=f"Calle {number}")
+        client.latitude, client.longitude = latitude, ORIGIN[1]
+        _visit(db_session, "sp-1", client)
+    fetch = provider.fetch
+
+    def unavailable(*args):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(provider, "fetch", unavailable)
+    assert [route.distancia[0] for route in _dayroute(db_session)] == ["~", "~"]
+    plan = db_session.query(DayRoutePlan).one()
+    assert plan.estimated
+    assert dayroute_service.get_stored_dayroute(db_session, "sp-1", DAY, ORIGIN) is None
+
+    monkeypatch.setattr(provider, "fetch", fetch)
+    assert all(not route.distancia.startswith("~") for route in _dayroute(db_session))
+    db_session.refresh(plan)
+    assert not plan.estimated
+    assert len(dayroute_service.get_stored_dayroute(db_session, "sp-1", DAY, ORIGIN)) == 2
+
+
+def test_opening_from_another_cell_recomputes_the_plan(db_session, institutional_client_factory, provider):
+    _visit(db_session, "sp-1", institutional_client_factory(direccion="Calle 1"))
+    _visit(db_session, "sp-1", institutional_client_factory(direccion="Calle 2"))
+    _dayroute(db_session)
+    nearby = (ORIGIN[0] + 0.0001, ORIGIN[1])  # same geohash cell
+    asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *nearby, day=DAY))
+    assert len(provider.calls) == 1
+
+    elsewhere = (6.25, -75.56)
+    asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *elsewhere, day=DAY))
+    assert len(provider.calls) == 2
+    plan = db_session.query(DayRoutePlan).one()
+    db_session.refresh(plan)
+    assert (plan.origin_latitude, plan.origin_longitude) == elsewhere
+    assert dayroute_service.get_stored_dayroute(db_session, "sp-1", DAY, ORIGIN) is None
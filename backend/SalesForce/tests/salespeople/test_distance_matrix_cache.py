@@ -0,0 +1,239 @@
+"""Tests for the day-route distance-matrix cache."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.geo import geohash_encode, normalize_address
+from app.modules.salespeople.crud.crud_dayroutes import save_cached_distances
+from app.modules.salespeople.models.salespeople_model import DistanceMatrixCache as CacheRow
+from app.modules.salespeople.models.salespeople_model import Route
+from app.modules.salespeople.services import dayroute_service
+from app.modules.salespeople.services.distance_matrix import (
+    DistanceMatrixCache,
+    RateLimiter,
+    StubDistanceMatrixProvider,
+)
+
+ORIGIN = (4.65350, -74.05640)
+NEARBY_ORIGIN = (4.65360, -74.05650)  # same ~150 m geohash cell
+DAY = date(2025, 1, 15)
+
+
+@pytest.fixture()
+def provider():
+    return StubDistanceMatrixProvider(
+        routes={"Calle 1 # 2-3, Bogotá, Colombia": (2500, 600)}
+    )
+
+
+@pytest.fixture()
+def cache(provider):
+    return DistanceMatrixCache(provider=provider, ttl=timedelta(hours=1))
+
+
+def test_geohash_and_destination_normalization():
+    assert geohash_encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert geohash_encode(*ORIGIN) == geohash_encode(*NEARBY_ORIGIN)
+    assert normalize_address("  Calle 1 # 2-3,  BOGOTÁ ") == "calle 1 # 2 3 bogota"
+
+
+def test_misses_are_fetched_once_and_reused_across_the_cell(db_session, cache, provider):
+    destinations = [
+        "Calle 1 # 2-3, Bogotá, Colombia",
+        "Carrera 7 # 40-62, Bogotá, Colombia",
+        "calle 1 # 2-3, bogota, colombia",
+    ]
+
+    first = cache.get_many(db_session, ORIGIN, destinations)
+
+    assert len(provider.calls) == 1
+    assert len(provider.calls[0]) == 2  # duplicates collapse to one element
+    assert first[0]["distance_meters"] == 2500
+    assert first[0] == first[2]
+
+    second = cache.get_many(db_session, NEARBY_ORIGIN, destinations)
+    assert second == first
+    assert len(provider.calls) == 1
+
+    cache.clear_memory()
+    assert cache.get_many(db_session, ORIGIN, destinations) == first
+    assert len(provider.calls) == 1
+    assert db_session.query(CacheRow).count() == 2
+
+
+def test_expired_entries_are_refreshed_from_the_provider(db_session, cache, provider):
+    cache.get_many(db_session, ORIGIN, ["Carrera 7 # 40-62"])
+    db_session.query(CacheRow).update(
+        {CacheRow.fetched_at: CacheRow.fetched_at - timedelta(hours=2)},
+        synchronize_session=False,
+    )
+    db_session.commit()
+    cache.clear_memory()
+
+    cache.get_many(db_session, ORIGIN, ["Carrera 7 # 40-62"])
+
+    assert len(provider.calls) == 2
+    assert db_session.query(CacheRow).count() == 1
+
+
+def test_saving_a_cell_another_request_already_cached_overwrites_it(db_session):
+    fetched_at = datetime(2025, 1, 15, 8, 0)
+
+    def entry(key: str, meters: int, at: datetime) -> dict:
+        return {
+            "destination_key": key,
+            "distance_meters": meters,
+            "duration_seconds": meters // 4,
+            "distance_text": f"{meters} m",
+            "duration_text": "",
+            "fetched_at": at,
+        }
+
+    save_cached_distances(db_session, "d2g6f", [entry("calle 1", 1000, fetched_at)])
+    # A concurrent request for the same cell writes the same key (twice, even)
+    later = fetched_at + timedelta(minutes=5)
+    save_cached_distances(
+        db_session,
+        "d2g6f",
+        [entry("calle 1", 1100, later), entry("calle 2", 700, later), entry("calle 1", 1200, later)],
+    )
+
+    rows = {
+        row.destination_key: row
+        for row in db_session.query(CacheRow).filter(CacheRow.origin_cell == "d2g6f")
+    }
+    assert {key: row.distance_meters for key, row in rows.items()} == {"calle 1": 1200, "calle 2": 700}
+    assert rows["calle 1"].fetched_at == later
+
+
+def test_get_dayroute_uses_the_cache(db_session, institutional_client_factory, cache, provider, monkeypatch):
+    client = institutional_client_factory(direccion="Calle 1 # 2-3")
+    db_session.add(
+        Route(salespeople_id="sp-1", institution_id=client.id, day=DAY, done=0)
+    )
+    db_session.commit()
+    monkeypatch.setattr(dayroute_service, "distance_matrix_cache", cache)
+
+    routes = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+    again = asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *NEARBY_ORIGIN, day=DAY))
+
+    assert [route.direccion for route in routes] == ["Calle 1 # 2-3"]
+    assert routes[0].distancia and routes[0].tiempo
+    assert again == routes
+    assert len(provider.calls) == 1
+
+
+class _RecordingProvider(StubDistanceMatrixProvider):
+    """Stub that can be slowed down and can fail for given destinations."""
+
+    def __init__(self, delay: float = 0.0, failing: str | None = None):
+        super().__init__()
+        self.delay = delay
+        self.failing = failing
+
+    def fetch(self, origin, destinations):
+        time.sleep(self.delay)
+        if self.failing and self.failing in destinations:
+            raise RuntimeError("provider error")
+        return super().fetch(origin, destinations)
+
+
+def test_missing_destinations_are_fetched_in_concurrent_chunks(db_session):
+    provider = _RecordingProvider(delay=0.1)
+    cache = DistanceMatrixCache(
+        provider=provider, chunk_size=2, max_workers=4, requests_per_second=100
+    )
+    destinations = [f"Calle {n}" for n in range(7)]
+
+    started = time.perf_counter()
+    results = cache.get_many(db_session, ORIGIN, destinations)
+    elapsed = time.perf_counter() - started
+
+    assert sorted(len(call) for call in provider.calls) == [1, 2, 2, 2]
+    assert elapsed < 0.3  # four 0.1 s chunks overlap
+    expected = StubDistanceMatrixProvider().fetch(ORIGIN, destinations)
+    assert results == expected
+
+
+def test_failed_chunk_leaves_gaps_but_keeps_the_rest(db_session):
+    provider = _RecordingProvider(failing="Calle 2")
+    cache = DistanceMatrixCache(provider=provider, chunk_size=2)
+
+    results = cache.get_many(db_session, ORIGIN, [f"Calle {n}" for n in range(4)])
+
+    assert [result is not None for result in results] == [True, True, False, False]
+    assert db_session.query(CacheRow).count() == 2
+
+
+def test_unexpected_provider_response_is_a_bad_gateway(
+    db_session, institutional_client_factory, monkeypatch
+):
+    client = institutional_client_factory(direccion="Calle 1 # 2-3")
+    db_session.add(Route(salespeople_id="sp-1", institution_id=client.id, day=DAY, done=0))
+    db_session.commit()
+
+    class TruncatingProvider(StubDistanceMatrixProvider):
+        def fetch(self, origin, destinations):
+            return []  # fewer results than destinations
+
+    cache = DistanceMatrixCache(provider=TruncatingProvider())
+    monkeypatch.setattr(dayroute_service, "distance_matrix_cache", cache)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY))
+
+    assert error.value.status_code == 502
+    assert "Respuesta inesperada" in error.value.detail
+
+
+def test_get_dayroute_matches_routes_by_institution_and_keeps_the_loop_free(
+    db_session, institutional_client_factory, monkeypatch
+):
+    clients = [institutional_client_factory(direccion=f"Calle {n}") for n in range(12)]
+    for client in reversed(clients):
+        db_session.add(
+            Route(salespeople_id="sp-1", institution_id=client.id, day=DAY, done=0)
+        )
+    db_session.commit()
+    cache = DistanceMatrixCache(
+        provider=_RecordingProvider(delay=0.2), chunk_size=5, requests_per_second=100
+    )
+    monkeypatch.setattr(dayroute_service, "distance_matrix_cache", cache)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        routes, _ = await asyncio.gather(
+            dayroute_service.get_dayroute(db_session, "sp-1", *ORIGIN, day=DAY), ticker()
+        )
+        return routes, ticks
+
+    routes, ticks = asyncio.run(scenario())
+
+    assert ticks == 10
+    assert len(routes) == 12
+    expected = StubDistanceMatrixProvider().fetch(ORIGIN, [f"Calle {n}" for n in range(12)])
+    by_address = {f"Calle {n}": expected[n]["distance_text"] for n in range(12)}
+    assert all(route.distancia == by_address[route.direccion] for route in routes)
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=20)
+
+    started = time.perf_counter()
+    for _ in range(4):
+        limiter.acquire()
+
+    assert time.perf_counter() - started >= 0.14
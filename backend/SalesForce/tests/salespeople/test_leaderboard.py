@@ -0,0 +1,123 @@
+"""Ranking de vendedores por avance de su plan de venta."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.modules.orders.crud import create_order_with_items, update_order_status
+from app.modules.orders.models import Order
+from app.modules.salespeople.models.salespeople_model import SalesPlan, Salespeople
+from app.modules.territories.models.territories_model import TerritorioClosure
+
+PERIODO = "2025-Q1"
+
+
+@pytest.fixture()
+def ranking(db_session, institutional_client_factory):
+    """Cuatro vendedores con meta 10; Bea y Caro empatan con 5 unidades."""
+    db_session.add_all(
+        [
+            TerritorioClosure(ancestor_id="CO", descendant_id="CO", depth=0),
+            TerritorioClosure(ancestor_id="CO", descendant_id="BOG", depth=1),
+            TerritorioClosure(ancestor_id="BOG", descendant_id="BOG", depth=0),
+            TerritorioClosure(ancestor_id="PE", descendant_id="PE", depth=0),
+        ]
+    )
+    client = institutional_client_factory()
+    salespeople = {}
+    for name, territory, units in (
+        ("Ana", "BOG", 8),
+        ("Bea", "PE", 5),
+        ("Caro", "BOG", 5),
+        ("Dani", "PE", 0),
+    ):
+        salesperson = Salespeople(
+            full_name=name,
+            email=f"{name.lower()}@example.com",
+            hire_date=date(2024, 1, 1),
+            status="active",
+            territory_id=territory,
+        )
+        db_session.add(salesperson)
+        db_session.flush()
+        db_session.add(
+            SalesPlan(
+                identificador=f"PV-{name}",
+                nombre=f"Plan {name}",
+                descripcion="Plan trimestral",
+                periodo=PERIODO,
+                meta=10,
+                vendedor_id=salesperson.id,
+                unidades_vendidas=0,
+            )
+        )
+        db_session.commit()
+        salespeople[name] = salesperson
+        if units:
+            create_order_with_items(
+                db_session,
+                institutional_client_id=client.id,
+                order_date=date(2025, 2, 1),
+                subtotal=Decimal(units),
+                tax_amount=Decimal("0"),
+                total_amount=Decimal(units),
+                status="pending",
+                items=[
+                    {
+                        "product_id": 1,
+                        "product_name": "Guantes",
+                        "quantity": units,
+                        "unit_price": Decimal("1"),
+                        "subtotal": Decimal(units),
+                    }
+                ],
+                salespeople_id=salesperson.id,
+            )
+    return salespeople
+
+
+def test_orders_keep_the_attainment_score(db_session, ranking):
+    plan = db_session.query(SalesPlan).filter_by(vendedor_id=ranking["Ana"].id).one()
+    assert plan.avance == pytest.approx(0.8)
+
+
+def test_ranking_top_n_with_ties(client, ranking):
+    response = client.get("/vendedores/ranking", params={"periodo": PERIODO, "limit": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 4
+    assert [(row["vendedorNombre"], row["posicion"]) for row in body["data"]] == [
+        ("Ana", 1),
+        ("Bea", 2) if ranking["Bea"].id < ranking["Caro"].id else ("Caro", 2),
+        ("Caro", 2) if ranking["Bea"].id < ranking["Caro"].id else ("Bea", 2),
+    ]
+    assert body["data"][0]["avance"] == pytest.approx(0.8)
+
+
+def test_ranking_by_territory_includes_sub_territories(client, ranking):
+    body = client.get(
+        "/vendedores/ranking", params={"periodo": PERIODO, "territorio_id": "CO"}
+    ).json()
+
+    assert body["total"] == 2
+    assert [row["vendedorNombre"] for row in body["data"]] == ["Ana", "Caro"]
+
+
+def test_salesperson_rank_follows_order_changes(client, db_session, ranking):
+    dani = ranking["Dani"].id
+    response = client.get(f"/vendedores/{dani}/ranking", params={"periodo": PERIODO})
+    assert response.status_code == 200
+    assert (response.json()["posicion"], response.json()["total"]) == (4, 4)
+
+    ana = ranking["Ana"].id
+    assert client.get(f"/vendedores/{ana}/ranking", params={"periodo": PERIODO}).json()["posicion"] == 1
+
+    order = db_session.query(Order).filter_by(salespeople_id=ana).one()
+    update_order_status(db_session, order.id, "cancelled")
+    body = client.get(f"/vendedores/{ana}/ranking", params={"periodo": PERIODO}).json()
+    assert (body["identificador"], body["posicion"], body["avance"]) == ("PV-Ana", 3, 0)
+
+    missing = client.get(f"/vendedores/{ana}/ranking", params={"periodo": "2030-Q1"})
+    assert missing.status_code == 404
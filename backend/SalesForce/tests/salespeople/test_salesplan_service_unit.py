@@ -1,9 +1,15 @@
-"""Unit tests for the salesplan service pagination helpers."""
+"""Unit tests for the salesplan service."""
+
+from datetime import date
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 
 from app.core.pagination import build_pagination_metadata, get_pagination_offset
+from app.modules.salespeople.crud import crud_salespeople_goal
+from app.modules.salespeople.models.salespeople_model import Salespeople, SalesPlan, SalespeopleGoal
 from app.modules.salespeople.services import salesplan_service as service
 
 
@@ -51,3 +57,85 @@ def test_helper_functions_match_service_behavior():
 
     metadata = build_pagination_metadata(total=12, page=2, limit=4)
     assert metadata == {"total": 12, "page": 2, "limit": 4, "total_pages": 3}
+
+
+def _salespeople(db_session, count):
+    people = [
+        Salespeople(
+            full_name=f"Vendedor {number}",
+            email=f"vendedor{number}@example.com",
+            hire_date=date(2024, 1, 1),
+            status="active",
+        )
+        for number in range(count)
+    ]
+    db_session.add_all(people)
+    db_session.commit()
+    return [person.id for person in people]
+
+
+@pytest.fixture()
+def plan_insert(monkeypatch):
+    # The legacy SalesPlanCreate predates the sales_plans columns, so the
+    # plan row itself is built here with the current ones
+    def create_salesplan(db, salesplan, commit=True):
+        plan = SalesPlan(
+            identificador=salesplan.plan_name,
+            nombre=salesplan.plan_name,
+            descripcion="",
+            periodo="2025-Q1",
+            meta=0,
+            vendedor_id=salesplan.owner_id,
+        )
+        db.add(plan)
+        db.flush()
+        return plan
+
+    monkeypatch.setattr(service, "get_salesplan_by_name", lambda db, plan_name: None)
+    monkeypatch.setattr(service, "create_salesplan", create_salesplan)
+
+
+class _Plan:
+    def __init__(self, owner_id):
+        self.plan_name = "Plan nacional"
+        self.owner_id = owner_id
+
+
+def test_create_validates_in_one_query_and_inserts_goals_in_bulk(db_session, plan_insert):
+    ids = _salespeople(db_session, 50)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        plan = service.create(db_session, _Plan(ids[0]), ids, [1000.0 + n for n in range(50)])
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements.count("SELECT") <= 2 and statements.count("INSERT") == 2
+    goals = db_session.query(SalespeopleGoal).filter_by(sales_plan_id=plan.id).all()
+    assert len(goals) == 50
+    assert {goal.salespeople_id for goal in goals} == set(ids)
+
+    assert crud_salespeople_goal.delete_goals_by_salespeople(db_session, ids[0]) == 1
+    assert crud_salespeople_goal.delete_goals_by_sales_plan(db_session, plan.id) == 49
+    assert db_session.query(SalespeopleGoal).count() == 0
+
+
+def test_create_reports_every_missing_vendor_and_is_atomic(db_session, plan_insert):
+    ids = _salespeople(db_session, 2)
+
+    with pytest.raises(HTTPException) as error:
+        service.create(db_session, _Plan(ids[0]), [ids[0], "missing-1", ids[1], "missing-2"], [1, 2, 3, 4])
+
+    assert error.value.status_code == 404
+    assert "missing-1" in error.value.detail and "missing-2" in error.value.detail
+
+    # A goal that cannot be stored leaves no plan behind
+    with pytest.raises(IntegrityError):
+        service.create(db_session, _Plan(ids[0]), ids, [100.0, None])
+    assert db_session.query(SalesPlan).count() == 0
+    assert db_session.query(SalespeopleGoal).count() == 0
@@ -0,0 +1,110 @@
+"""Unit tests for blind-index lookups on encrypted columns."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, insert, inspect, select, text, update
+from sqlalchemy.exc import IntegrityError, StatementError
+from sqlalchemy.orm import Session
+
+from app.core.blind_index_backfill import run_backfill
+from app.core.database import Base
+from app.core.encryption import blind_index_value, encrypt_sensitive_value, keep_blind_indexes
+from app.modules.salespeople.models.salespeople_model import Salespeople
+
+
+def _salesperson(email: str) -> Salespeople:
+    return Salespeople(full_name="Ana", email=email, hire_date=date(2024, 1, 1), status="active")
+
+
+def test_equality_uses_the_digest_column_and_enforces_uniqueness(db_session) -> None:
+    salesperson = _salesperson("ana@example.com")
+    db_session.add(salesperson)
+    db_session.commit()
+
+    query = db_session.query(Salespeople).filter(Salespeople.email == "ana@example.com")
+
+    assert "salespeople.email_digest = " in str(query.statement)
+    assert query.one() is salesperson
+    assert salesperson.email_digest == blind_index_value("ana@example.com")
+
+    salesperson.email = "ana.maria@example.com"
+    db_session.commit()
+    assert db_session.query(Salespeople).filter(Salespeople.email == "ana@example.com").count() == 0
+    assert salesperson.email_digest == blind_index_value("ana.maria@example.com")
+
+    salesperson.status = "inactive"  # a flush that leaves the email alone keeps its digest
+    db_session.commit()
+    assert salesperson.email_digest == blind_index_value("ana.maria@example.com")
+
+    db_session.add(_salesperson("ana.maria@example.com"))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+
+
+def test_backfill_adds_and_fills_digests_for_legacy_rows(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE salespeople (id VARCHAR(36) PRIMARY KEY, full_name VARCHAR(512),"
+                " email VARCHAR(512), hire_date DATE, status VARCHAR(50), territory_id VARCHAR(36),"
+                " user_id VARCHAR(36), created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+        )
+        for number in range(5):
+            connection.execute(
+                text(
+                    "INSERT INTO salespeople (id, full_name, email, hire_date, status)"
+                    " VALUES (:id, :name, :email, '2024-01-01', 'active')"
+                ),
+                {
+                    "id": f"sp-{number}",
+                    "name": encrypt_sensitive_value(f"Seller {number}"),
+                    "email": encrypt_sensitive_value(f"seller{number}@example.com"),
+                },
+            )
+
+    stats = run_backfill(engine, Base.metadata, batch_size=2)
+
+    assert stats == {"salespeople.email_digest": 5}
+    assert "ix_salespeople_email_digest" in {
+        index["name"] for index in inspect(engine).get_indexes("salespeople")
+    }
+    with Session(engine) as session:
+        found = session.query(Salespeople).filter(Salespeople.email == "seller3@example.com").one()
+        assert found.id == "sp-3"
+    assert run_backfill(engine, Base.metadata) == {"salespeople.email_digest": 0}
+
+
+def test_core_inserts_and_updates_set_the_digest(db_session) -> None:
+    table = Salespeople.__table__
+    db_session.execute(
+        insert(table).values(
+            id="sp-1", full_name="Ana", email="ana@example.com", hire_date=date(2024, 1, 1), status="active"
+        )
+    )
+    db_session.execute(update(table).where(table.c.id == "sp-1").values(email="ana.maria@example.com"))
+    db_session.commit()
+
+    assert db_session.scalar(select(table.c.email_digest)) == blind_index_value("ana.maria@example.com")
+    found = db_session.query(Salespeople).filter(Salespeople.email == "ana.maria@example.com").one()
+    assert found.id == "sp-1"
+
+    with pytest.raises(StatementError, match="must keep its digest"):
+        db_session.execute(update(table).values(status="inactive"))
+    db_session.rollback()
+    db_session.execute(update(table).values({**keep_blind_indexes(table), "status": "inactive"}))
+    assert db_session.scalar(select(table.c.email_digest)) == blind_index_value("ana.maria@example.com")
+
+
+def test_rows_without_a_digest_yet_still_match_lookups(db_session) -> None:
+    db_session.add(_salesperson("ana@example.com"))
+    db_session.commit()
+    table = Salespeople.__table__
+    db_session.execute(update(table).values(email_digest=None))  # not backfilled yet
+    db_session.commit()
+
+    found = db_session.query(Salespeople).filter(Salespeople.email == "ana@example.com").one()
+    assert found.email_digest is None
+    assert db_session.query(Salespeople).filter(Salespeople.email == "other@example.com").count() == 0
@@ -0,0 +1,105 @@
+"""Unit tests for the decryption cache and page-batched decryption."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.core import encryption
+from app.core.encryption import DecryptionCache, decrypt_many, encrypt_sensitive_value, raw_ciphertext
+from app.modules.salespeople.crud import crud_sales_people
+from app.modules.salespeople.models.salespeople_model import Salespeople
+from app.modules.salespeople.services import salespeople_service
+
+
+def _add_salespeople(db_session, count):
+    db_session.add_all(
+        Salespeople(
+            full_name=f"Seller {number}",
+            email=f"seller{number}@example.com",
+            hire_date=date(2024, 1, 1),
+            status="active",
+        )
+        for number in range(count)
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+def test_listings_load_plaintext_and_repeat_from_the_cache(db_session, monkeypatch) -> None:
+    _add_salespeople(db_session, 5)
+    encryption.get_decryption_cache().clear()
+
+    salespeople = db_session.query(Salespeople).all()
+    names = sorted(salesperson.full_name for salesperson in salespeople)
+    (email,) = db_session.query(Salespeople.email).filter(Salespeople.email == "seller1@example.com").one()
+
+    assert names == [f"Seller {number}" for number in range(5)]
+    assert type(email) is str and email == "seller1@example.com"
+
+    # A second listing is served from the cache without Fernet work
+    db_session.expunge_all()
+    monkeypatch.setattr(encryption.FieldCipher, "decrypt", lambda self, value: pytest.fail("cache miss"))
+    again = db_session.query(Salespeople).all()
+    assert sorted(salesperson.full_name for salesperson in again) == names
+
+
+def test_raw_ciphertexts_decrypt_a_page_in_one_batch(db_session, monkeypatch) -> None:
+    _add_salespeople(db_session, 3)
+    batches = []
+    monkeypatch.setattr(
+        encryption, "decrypt_many", lambda values: batches.append(len(values)) or decrypt_many(values)
+    )
+
+    page = db_session.execute(select(Salespeople.id, raw_ciphertext(Salespeople.full_name))).all()
+
+    assert not any(row.full_name.startswith("Seller") for row in page)
+    names = encryption.decrypt_many([row.full_name for row in page])
+    assert sorted(names) == [f"Seller {number}" for number in range(3)]
+    assert batches == [3]
+
+
+def test_salespeople_listing_decrypts_each_page_in_one_batch(db_session, monkeypatch) -> None:
+    _add_salespeople(db_session, 3)
+    batches = []
+    monkeypatch.setattr(
+        crud_sales_people,
+        "decrypt_many",
+        lambda values: batches.append(len(values)) or decrypt_many(values),
+    )
+
+    listed = salespeople_service.read(db_session, page=1, limit=10)["data"]
+
+    names = sorted((row["full_name"], row["email"]) for row in listed)
+    assert names == [(f"Seller {n}", f"seller{n}@example.com") for n in range(3)]
+    assert batches == [6]
+
+
+def test_decrypt_many_keeps_order_and_decrypts_duplicates_once(monkeypatch) -> None:
+    encryption.get_decryption_cache().clear()
+    tokens = [encrypt_sensitive_value(f"value {number}") for number in range(150)]
+    decrypted = []
+    original = encryption.FieldCipher.decrypt
+    monkeypatch.setattr(
+        encryption.FieldCipher, "decrypt", lambda self, value: decrypted.append(value) or original(self, value)
+    )
+
+    result = decrypt_many(tokens + [None] + tokens[:10])
+
+    assert result == [f"value {number}" for number in range(150)] + [None] + [f"value {n}" for n in range(10)]
+    assert len(decrypted) == 150
+
+
+def test_decryption_cache_is_bounded_and_expires(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(encryption.time, "monotonic", lambda: now[0])
+    cache = DecryptionCache(max_entries=2, ttl=10)
+
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")  # evicts "b", the least recently used
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+    now[0] += 11
+    assert cache.get("a") is None
@@ -0,0 +1,93 @@
+"""Unit tests for versioned field-encryption keys and the re-encryption job."""
+
+from datetime import date
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import String, create_engine, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core import encryption, key_rotation
+from app.core.database import Base
+from app.core.encryption import blind_index_value
+from app.core.key_rotation import rotation_progress, run_rotation
+from app.modules.salespeople.models.salespeople_model import Salespeople
+
+OLD_KEY = encryption.settings.field_encryption_key
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture()
+def use_keys(monkeypatch):
+    def configure(primary, previous="", digest=""):
+        monkeypatch.setattr(encryption.settings, "field_encryption_key", primary)
+        monkeypatch.setattr(encryption.settings, "field_encryption_previous_keys", previous)
+        monkeypatch.setattr(encryption.settings, "field_digest_key", digest)
+        encryption._get_field_cipher.cache_clear()
+        encryption.get_decryption_cache().clear()
+
+    yield configure
+    encryption._get_field_cipher.cache_clear()
+    encryption.get_decryption_cache().clear()
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rotation.db'}")
+    Base.metadata.create_all(engine, tables=[Salespeople.__table__])
+    with Session(engine) as session:
+        session.add_all(
+            Salespeople(
+                full_name=f"Seller {number}",
+                email=f"seller{number}@example.com",
+                hire_date=date(2024, 1, 1),
+                status="active",
+            )
+            for number in range(5)
+        )
+        session.commit()
+    return engine
+
+
+def _stored_emails(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(type_coerce(Salespeople.email, String()))).scalars().all()
+
+
+def test_rotation_resumes_and_keeps_digests(engine, use_keys, monkeypatch) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY, digest=OLD_KEY)
+    with Session(engine) as session:  # old values stay readable before the job runs
+        assert session.query(Salespeople).filter(Salespeople.email == "seller3@example.com").one()
+
+    rotate_rows, calls = key_rotation._rotate_rows, []
+
+    def interrupted(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("connection lost")
+        return rotate_rows(*args)
+
+    monkeypatch.setattr(key_rotation, "_rotate_rows", interrupted)
+    with pytest.raises(RuntimeError):
+        run_rotation(engine, Base.metadata, batch_size=2, workers=1)
+    monkeypatch.setattr(key_rotation, "_rotate_rows", rotate_rows)
+
+    assert run_rotation(engine, Base.metadata, batch_size=2, workers=2) == {"salespeople": 10}
+    assert run_rotation(engine, Base.metadata) == {"salespeople": 10}  # finished, nothing redone
+    with engine.connect() as connection:
+        assert connection.execute(select(rotation_progress.c.finished_at)).scalar_one() is not None
+
+    # Only the new key is needed from now on; digests still match
+    use_keys(NEW_KEY, digest=OLD_KEY)
+    assert all(encryption._get_field_cipher().rotate(value) is None for value in _stored_emails(engine))
+    with Session(engine) as session:
+        found = session.query(Salespeople).filter(Salespeople.email == "seller3@example.com").one()
+        assert (found.full_name, found.email_digest) == ("Seller 3", blind_index_value("seller3@example.com"))
+    assert run_rotation(engine, Base.metadata, restart=True) == {"salespeople": 0}
+
+
+def test_previous_keys_require_a_pinned_digest_key(use_keys) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY)
+
+    with pytest.raises(ValueError, match="FIELD_DIGEST_KEY"):
+        encryption.encrypt_sensitive_value("value")
@@ -108,3 +108,16 @@ def multimedia_files_factory(fake: Faker) -> Callable[..., list[dict[str, Any]]]
         return files
 
     return factory
+
+
+@pytest.fixture(autouse=True)
+def media_store(tmp_path, monkeypatch):
+    """Point the media store at a fresh directory for each test."""
+
+    from app.core.config import settings
+    from app.modules.media.services import get_blob_store
+
+    monkeypatch.setattr(settings, "media_storage_path", str(tmp_path / "media"))
+    get_blob_store.cache_clear()
+    yield get_blob_store()
+    get_blob_store.cache_clear()
@@ -0,0 +1,102 @@
+"""Tests for streaming visit media with byte ranges and ETags."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from app.modules.media.services import parse_byte_range
+from app.modules.media.services.streaming import RangeNotSatisfiable
+from app.modules.visits.crud import list_visits_paginated
+from app.modules.visits.models import Visit, VisitMultimedia
+
+
+def test_parse_byte_range():
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert parse_byte_range("bytes=50-500", 100) == (50, 99)
+    assert parse_byte_range("bytes=-500", 100) == (0, 99)
+    # Multiple or malformed ranges are ignored and the whole file is sent
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    assert parse_byte_range("bytes=9-1", 100) is None
+    assert parse_byte_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_byte_range("bytes=100-", 100)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_byte_range("bytes=-0", 100)
+
+
+def test_media_is_streamed_with_ranges_and_etag(client, media_store, visit_payload_factory):
+    content = bytes(range(256)) * 5000
+    created = client.post(
+        "/visitas/",
+        data=visit_payload_factory(),
+        files=[("files", ("clip.mp4", content, "video/mp4"))],
+    ).json()
+    media = created["multimedia"][0]
+    url = f"/visitas/{created['id']}/media/{media['id']}"
+    etag = f'"{hashlib.sha256(content).hexdigest()}"'
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == content
+    assert full.headers["etag"] == etag
+    assert full.headers["content-length"] == str(len(content))
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["content-type"] == "video/mp4"
+
+    partial = client.get(url, headers={"Range": "bytes=1000-1999"})
+    assert partial.status_code == 206
+    assert partial.content == content[1000:2000]
+    assert partial.headers["content-range"] == f"bytes 1000-1999/{len(content)}"
+    assert partial.headers["content-length"] == "1000"
+
+    tail = client.get(url, headers={"Range": "bytes=-10", "If-Range": etag})
+    assert tail.status_code == 206
+    assert tail.content == content[-10:]
+
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == len(content)
+
+    outside = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+    assert outside.status_code == 416
+    assert outside.headers["content-range"] == f"bytes */{len(content)}"
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/visitas/{created['id']}/media/missing").status_code == 404
+
+
+def test_legacy_inline_media_is_served_and_listings_skip_the_bytes(client, db_session):
+    visit = Visit(
+        nombre_institucion="Clínica Norte",
+        direccion="Calle 1",
+        hora=datetime(2025, 1, 1, 9, 0),
+        estado="programada",
+    )
+    db_session.add(visit)
+    db_session.flush()
+    payload = b"legacy photo bytes"
+    media = VisitMultimedia(
+        visit_id=visit.id,
+        file_name="legacy.jpg",
+        file_type="image/jpeg",
+        file_size=len(payload),
+        file_data=payload,
+    )
+    db_session.add(media)
+    db_session.commit()
+    db_session.expire_all()
+
+    listed = list_visits_paginated(db_session, skip=0, limit=10)["items"][0].multimedia[0]
+    assert "inline_data" in inspect(listed).unloaded
+
+    response = client.get(f"/visitas/{visit.id}/media/{media.id}", headers={"Range": "bytes=0-5"})
+    assert response.status_code == 206
+    assert response.content == payload[:6]
+    assert response.headers["etag"] == f'"{hashlib.sha256(payload).hexdigest()}"'
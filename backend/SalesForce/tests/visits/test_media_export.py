@@ -0,0 +1,97 @@
+"""Tests for the bulk export of visit media."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import zipfile
+from datetime import date, datetime
+
+import pytest
+
+from app.modules.media.services.media_export import (
+    export_media_to_directory,
+    export_media_to_zip,
+)
+from app.modules.visits.models import Visit, VisitMultimedia
+
+
+@pytest.fixture()
+def visit_media(db_session, media_store):
+    """Media of three visits: two inside the audited range, one outside."""
+
+    def add_visit(day: int) -> Visit:
+        visit = Visit(
+            nombre_institucion="Clínica Norte",
+            direccion="Calle 1",
+            hora=datetime(2025, 3, day, 10, 0),
+            estado="realizada",
+        )
+        db_session.add(visit)
+        db_session.flush()
+        return visit
+
+    def add_media(visit: Visit, name: str, data: bytes, stored: bool = True) -> VisitMultimedia:
+        media = VisitMultimedia(visit_id=visit.id, file_name=name, file_type="image/jpeg", file_size=len(data))
+        if stored:
+            media.content_hash = media_store.put_bytes(data).content_hash
+        else:
+            media.file_data = data  # legacy row, bytes still in the database
+        db_session.add(media)
+        return media
+
+    first, second, outside = add_visit(3), add_visit(10), add_visit(25)
+    files = {
+        "foto 1.jpg": add_media(first, "foto 1.jpg", b"one" * 5000),
+        "../foto2.jpg": add_media(first, "../foto2.jpg", b"two" * 5000),
+        "legacy.jpg": add_media(second, "legacy.jpg", b"legacy", stored=False),
+        "gone.jpg": add_media(second, "gone.jpg", b"deleted from the store"),
+    }
+    add_media(outside, "late.jpg", b"late")
+    db_session.commit()
+    media_store.delete(files["gone.jpg"].content_hash)
+    return files
+
+
+def _manifest(text: str) -> dict:
+    return {line["file_name"]: line for line in csv.DictReader(io.StringIO(text))}
+
+
+def test_export_to_directory_skips_files_already_exported(db_session, media_store, visit_media, tmp_path):
+    output = tmp_path / "auditoria"
+
+    totals = export_media_to_directory(db_session, output, date(2025, 3, 1), date(2025, 3, 10), workers=2)
+
+    assert totals == {"exported": 3, "missing": 1}
+    manifest = _manifest((output / "manifest.csv").read_text(encoding="utf-8"))
+    assert set(manifest) == {"foto 1.jpg", "../foto2.jpg", "legacy.jpg", "gone.jpg"}
+    legacy = manifest["legacy.jpg"]
+    assert (output / legacy["path"]).read_bytes() == b"legacy"
+    assert legacy["sha256"] == hashlib.sha256(b"legacy").hexdigest()
+    assert legacy["path"].startswith("2025-03-10/")
+    assert manifest["../foto2.jpg"]["path"].endswith("-foto2.jpg")
+    assert (output / manifest["foto 1.jpg"]["path"]).read_bytes() == b"one" * 5000
+
+    # A file tampered with is exported again, the rest are skipped
+    (output / manifest["foto 1.jpg"]["path"]).write_bytes(b"tampered")
+    (output / "manifest.csv").unlink()
+    totals = export_media_to_directory(db_session, output, date(2025, 3, 1), date(2025, 3, 10), workers=2)
+
+    assert totals == {"exported": 1, "skipped": 2, "missing": 1}
+    assert (output / manifest["foto 1.jpg"]["path"]).read_bytes() == b"one" * 5000
+    assert not list(output.rglob("tmp*"))
+
+
+def test_export_to_zip(db_session, media_store, visit_media, tmp_path):
+    zip_path = tmp_path / "auditoria.zip"
+
+    totals = export_media_to_zip(db_session, zip_path, date(2025, 3, 1), date(2025, 3, 31))
+
+    assert totals == {"exported": 4, "missing": 1}
+    with zipfile.ZipFile(zip_path) as archive:
+        manifest = _manifest(archive.read("manifest.csv").decode("utf-8"))
+        assert archive.read(manifest["late.jpg"]["path"]) == b"late"
+        assert archive.read(manifest["legacy.jpg"]["path"]) == b"legacy"
+        assert manifest["gone.jpg"]["path"] not in archive.namelist()
+        assert len(archive.namelist()) == 5
@@ -0,0 +1,89 @@
+"""Tests for the background rendering of visit media previews."""
+
+from __future__ import annotations
+
+import io
+from datetime import datetime
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from app.modules.media.models import MediaDerivative  # noqa: E402
+from app.modules.media.services import previews  # noqa: E402
+from app.modules.visits.models import Visit, VisitMultimedia  # noqa: E402
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def no_video_decoder(monkeypatch):
+    monkeypatch.setattr(previews, "video_decoder_available", lambda: False)
+
+
+def test_previews_are_rendered_after_the_visit_is_created(
+    client, db_session, media_store, visit_payload_factory
+):
+    photo = _jpeg(2000, 1500)
+    created = client.post(
+        "/visitas/",
+        data=visit_payload_factory(),
+        files=[
+            ("files", ("a.jpg", photo, "image/jpeg")),
+            ("files", ("b.jpg", photo, "image/jpeg")),
+            ("files", ("clip.mp4", b"not decoded", "video/mp4")),
+            ("files", ("broken.png", b"not an image", "image/png")),
+        ],
+    ).json()
+    assert [item["preview_status"] for item in created["multimedia"]] == ["pending"] * 4
+
+    statuses = {row.file_name: row.preview_status for row in db_session.query(VisitMultimedia)}
+    assert statuses == {"a.jpg": "ready", "b.jpg": "ready", "clip.mp4": "unsupported", "broken.png": "failed"}
+    # Both uploads share the same content, so their previews were rendered once
+    assert db_session.query(MediaDerivative).count() == 2
+
+    media = {item["file_name"]: item["id"] for item in created["multimedia"]}
+    url = f"/visitas/{created['id']}/media/{media['b.jpg']}"
+    for variant, size in (("thumb", (320, 240)), ("web", (1280, 960))):
+        response = client.get(url, params={"variant": variant})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert Image.open(io.BytesIO(response.content)).size == size
+
+    assert client.get(url, params={"variant": "huge"}).status_code == 400
+    broken = f"/visitas/{created['id']}/media/{media['broken.png']}"
+    assert client.get(broken, params={"variant": "thumb"}).status_code == 404
+
+
+def test_pending_media_is_backfilled(db_session, media_store):
+    visit = Visit(
+        nombre_institucion="Clínica Norte",
+        direccion="Calle 1",
+        hora=datetime(2025, 1, 1, 9, 0),
+        estado="programada",
+    )
+    db_session.add(visit)
+    db_session.flush()
+    for number in range(3):
+        blob = media_store.put_bytes(_jpeg(100 + number, 400))
+        db_session.add(
+            VisitMultimedia(
+                visit_id=visit.id,
+                file_name=f"portrait-{number}.jpg",
+                file_type="image/jpeg",
+                file_size=blob.size,
+                content_hash=blob.content_hash,
+            )
+        )
+    db_session.commit()
+
+    assert previews.backfill_previews(db_session, media_store, batch_size=2) == 3
+    assert {row.preview_status for row in db_session.query(VisitMultimedia)} == {"ready"}
+    thumb = db_session.query(MediaDerivative).filter_by(variant="thumb").first()
+    assert Image.open(io.BytesIO(media_store.read_bytes(thumb.content_hash))).height == 320
+    assert previews.backfill_previews(db_session, media_store) == 0
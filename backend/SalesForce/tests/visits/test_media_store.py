@@ -0,0 +1,96 @@
+"""Tests for the content-addressed media store of visit multimedia."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from app.modules.media.services import LocalBlobStore
+from app.modules.media.services.media_migration import migrate_inline_media
+from app.modules.visits.models import Visit, VisitMultimedia
+
+
+def _visit(db_session) -> Visit:
+    visit = Visit(
+        nombre_institucion="Clínica Norte",
+        direccion="Calle 1",
+        hora=datetime(2025, 1, 1, 9, 0),
+        estado="programada",
+    )
+    db_session.add(visit)
+    db_session.flush()
+    return visit
+
+
+def test_blobs_are_addressed_by_content_and_deduplicated(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    data = b"photo bytes" * 1000
+
+    with store.writer() as writer:
+        for start in range(0, len(data), 4096):
+            writer.write(data[start:start + 4096])
+        blob = writer.commit()
+    again = store.put_bytes(data)
+
+    assert blob == again
+    assert blob.content_hash == hashlib.sha256(data).hexdigest()
+    assert blob.size == len(data)
+    assert store.read_bytes(blob.content_hash) == data
+    assert store.path(blob.content_hash).parent.parent.name == blob.content_hash[:2]
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    with store.writer() as writer:
+        writer.write(b"never committed")
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+
+
+def test_uploads_are_streamed_into_the_store(client, db_session, media_store, visit_payload_factory):
+    content = b"\xFF\xD8\xFF\xE0" + b"x" * 3_000_000
+
+    response = client.post(
+        "/visitas/",
+        data=visit_payload_factory(),
+        files=[
+            ("files", ("a.jpg", content, "image/jpeg")),
+            ("files", ("b.jpg", content, "image/jpeg")),
+        ],
+    )
+
+    assert response.status_code == 200
+    multimedia = response.json()["multimedia"]
+    digest = hashlib.sha256(content).hexdigest()
+    assert [(item["file_size"], item["content_hash"]) for item in multimedia] == [(len(content), digest)] * 2
+
+    rows = db_session.query(VisitMultimedia).all()
+    assert all(row.inline_data is None for row in rows)
+    assert rows[0].file_data == content
+    assert media_store.exists(digest)
+
+
+def test_inline_media_is_migrated_in_batches(db_session, media_store):
+    visit = _visit(db_session)
+    payloads = [f"legacy file {number}".encode() for number in range(5)]
+    for number, payload in enumerate(payloads):
+        db_session.add(
+            VisitMultimedia(
+                visit_id=visit.id,
+                file_name=f"legacy-{number}.jpg",
+                file_type="image/jpeg",
+                file_size=len(payload),
+                file_data=payload,
+            )
+        )
+    db_session.commit()
+
+    assert migrate_inline_media(db_session, media_store, batch_size=2) == 5
+    db_session.expire_all()
+
+    rows = db_session.query(VisitMultimedia).order_by(VisitMultimedia.file_name).all()
+    assert [row.inline_data for row in rows] == [None] * 5
+    assert [row.file_data for row in rows] == payloads
+    assert migrate_inline_media(db_session, media_store) == 0
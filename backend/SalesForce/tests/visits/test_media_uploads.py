@@ -0,0 +1,179 @@
+"""Tests for the resumable upload of visit media."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+
+import pytest
+
+from app.core.database import database_now
+from app.modules.visits.models import UPLOAD_OPEN, VisitMediaUpload, VisitMultimedia
+from app.modules.visits.services import upload_service
+from app.modules.visits.services.upload_service import staging_path
+
+
+def _create_visit(client, visit_payload_factory) -> str:
+    return client.post("/visitas/", data=visit_payload_factory()).json()["id"]
+
+
+def _put(client, url: str, data: bytes, start: int, end: int, size: int):
+    return client.put(url, data=data, headers={"Content-Range": f"bytes {start}-{end}/{size}"})
+
+
+def test_upload_resumes_after_a_dropped_chunk(client, db_session, media_store, visit_payload_factory):
+    visit_id = _create_visit(client, visit_payload_factory)
+    content = bytes(range(256)) * 12_000  # ~3 MB
+    size = len(content)
+    created = client.post(
+        f"/visitas/{visit_id}/uploads",
+        json={
+            "file_name": "clip.mp4",
+            "file_type": "video/mp4",
+            "file_size": size,
+            "sha256": hashlib.sha256(content).hexdigest(),
+        },
+    )
+    assert created.status_code == 201
+    url = f"/visitas/{visit_id}/uploads/{created.json()['id']}"
+
+    first = _put(client, url, content[:1_500_000], 0, 1_499_999, size)
+    assert first.status_code == 200
+    assert first.headers["upload-offset"] == "1500000"
+
+    # The connection drops half-way through the next chunk: what arrived is kept
+    dropped = _put(client, url, content[1_500_000:2_000_000], 1_500_000, size - 1, size)
+    assert dropped.json()["received_bytes"] == 2_000_000
+
+    retried = _put(client, url, content[1_500_000:], 1_500_000, size - 1, size)
+    assert retried.status_code == 409
+    assert retried.headers["upload-offset"] == "2000000"
+    assert client.post(f"{url}/complete").status_code == 409
+
+    assert client.get(url).json()["received_bytes"] == 2_000_000
+    assert _put(client, url, content[2_000_000:], 2_000_000, size - 1, size).status_code == 200
+
+    completed = client.post(f"{url}/complete")
+    assert completed.status_code == 200
+    media = completed.json()
+    assert media["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert media["file_size"] == size
+    assert client.post(f"{url}/complete").json()["id"] == media["id"]
+
+    assert db_session.query(VisitMultimedia).filter_by(visit_id=visit_id).count() == 1
+    assert not staging_path(created.json()["id"]).exists()
+    download = client.get(f"/visitas/{visit_id}/media/{media['id']}")
+    assert download.content == content
+
+
+def test_corrupted_upload_is_restarted(client, db_session, media_store, visit_payload_factory):
+    visit_id = _create_visit(client, visit_payload_factory)
+    content = b"photo" * 1000
+    upload = client.post(
+        f"/visitas/{visit_id}/uploads",
+        json={
+            "file_name": "a.jpg",
+            "file_type": "image/jpeg",
+            "file_size": len(content),
+            "sha256": hashlib.sha256(b"something else").hexdigest(),
+        },
+    ).json()
+    url = f"/visitas/{visit_id}/uploads/{upload['id']}"
+    _put(client, url, content, 0, len(content) - 1, len(content))
+
+    response = client.post(f"{url}/complete")
+
+    assert response.status_code == 422
+    assert response.headers["upload-offset"] == "0"
+    assert db_session.get(VisitMediaUpload, upload["id"]).received_bytes == 0
+    assert staging_path(upload["id"]).stat().st_size == 0
+
+
+def test_upload_requests_are_validated(client, media_store, visit_payload_factory, monkeypatch):
+    from app.core.config import settings
+
+    payload = {"file_name": "a.jpg", "file_type": "image/jpeg", "file_size": 10, "sha256": "0" * 64}
+    assert client.post("/visitas/missing/uploads", json=payload).status_code == 404
+
+    visit_id = _create_visit(client, visit_payload_factory)
+    monkeypatch.setattr(settings, "media_upload_max_bytes", 5)
+    assert client.post(f"/visitas/{visit_id}/uploads", json=payload).status_code == 413
+    monkeypatch.setattr(settings, "media_upload_max_bytes", 100)
+
+    url = f"/visitas/{visit_id}/uploads/" + client.post(f"/visitas/{visit_id}/uploads", json=payload).json()["id"]
+    assert _put(client, url, b"x" * 5, 0, 4, 99).status_code == 400
+    assert client.put(url, data=b"x", headers={"Content-Range": "bytes=0-0"}).status_code == 400
+    assert _put(client, url, b"x" * 8, 0, 4, 10).status_code == 400
+    assert client.get(f"/visitas/{visit_id}/uploads/unknown").status_code == 404
+
+
+def _uploaded(client, visit_id: str, content: bytes) -> str:
+    upload = client.post(
+        f"/visitas/{visit_id}/uploads",
+        json={
+            "file_name": "clip.mp4",
+            "file_type": "video/mp4",
+            "file_size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        },
+    ).json()
+    url = f"/visitas/{visit_id}/uploads/{upload['id']}"
+    _put(client, url, content, 0, len(content) - 1, len(content))
+    return url
+
+
+def test_concurrent_completions_attach_the_file_once(
+    client, db_session, media_store, visit_payload_factory, monkeypatch
+):
+    visit_id = _create_visit(client, visit_payload_factory)
+    url = _uploaded(client, visit_id, b"video" * 1000)
+    file_sha256, retried = upload_service._file_sha256, []
+
+    def slow_hash(path):
+        # The client times out and retries while the file is still being hashed
+        if not retried:
+            retried.append(client.post(f"{url}/complete"))
+        return file_sha256(path)
+
+    monkeypatch.setattr(upload_service, "_file_sha256", slow_hash)
+
+    completed = client.post(f"{url}/complete")
+
+    assert completed.status_code == 200
+    assert retried[0].status_code == 409
+    assert client.post(f"{url}/complete").json()["id"] == completed.json()["id"]
+    assert db_session.query(VisitMultimedia).filter_by(visit_id=visit_id).count() == 1
+
+
+def test_failed_completion_can_be_retried(
+    client, db_session, media_store, visit_payload_factory, monkeypatch
+):
+    visit_id = _create_visit(client, visit_payload_factory)
+    url = _uploaded(client, visit_id, b"photo" * 1000)
+
+    def store_unavailable(path):
+        raise OSError("media store unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(upload_service, "_store_file", store_unavailable)
+        with pytest.raises(OSError):
+            client.post(f"{url}/complete")
+
+    assert db_session.get(VisitMediaUpload, url.rsplit("/", 1)[1]).status == UPLOAD_OPEN
+    assert client.post(f"{url}/complete").status_code == 200
+
+
+def test_purge_removes_only_stale_uploads(client, db_session, media_store, visit_payload_factory):
+    visit_id = _create_visit(client, visit_payload_factory)
+    stale_id = _uploaded(client, visit_id, b"old" * 100).rsplit("/", 1)[1]
+    fresh_id = _uploaded(client, visit_id, b"new" * 100).rsplit("/", 1)[1]
+    stale = db_session.get(VisitMediaUpload, stale_id)
+    stale.updated_at = database_now(db_session) - timedelta(hours=3)
+    db_session.commit()
+
+    assert upload_service.purge_stale_uploads(db_session, timedelta(hours=1)) == 1
+
+    db_session.expire_all()
+    assert db_session.get(VisitMediaUpload, stale_id) is None
+    assert not staging_path(stale_id).exists()
+    assert staging_path(fresh_id).exists()
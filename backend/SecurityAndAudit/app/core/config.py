@@ -20,6 +20,16 @@ class Settings(BaseSettings):
         "AAgM6AyfPJuvK2pFJu8KLd43NcSixmzKBf2eMS8kynk=",
         alias="FIELD_ENCRYPTION_KEY",
     )
+    # Comma separated keys being rotated out, still accepted for decryption
+    field_encryption_previous_keys: str = Field("", alias="FIELD_ENCRYPTION_PREVIOUS_KEYS")
+    # Key the digests and blind indexes derive from; pinned once keys rotate
+    field_digest_key: str = Field("", alias="FIELD_DIGEST_KEY")
+    # Plaintext cache shared by every request of the process: up to SIZE
+    # decrypted values (PII) stay in memory, and in any heap dump, for TTL
+    # seconds. Size it to a few listing pages; 0 disables it.
+    field_decryption_cache_size: int = Field(2000, alias="FIELD_DECRYPTION_CACHE_SIZE")
+    field_decryption_cache_ttl: float = Field(60.0, alias="FIELD_DECRYPTION_CACHE_TTL")
+    field_decryption_workers: int = Field(0, alias="FIELD_DECRYPTION_WORKERS")
 
     smtp_host: str = Field("localhost", alias="SMTP_HOST")
     smtp_port: int = Field(1025, alias="SMTP_PORT")
@@ -0,0 +1,271 @@
+"""Online re-encryption of the encrypted columns after a key rotation.
+
+A rotation never needs downtime:
+
+1. Deploy with ``FIELD_ENCRYPTION_KEY=<new key>``,
+   ``FIELD_ENCRYPTION_PREVIOUS_KEYS=<old key>`` and ``FIELD_DIGEST_KEY``
+   pinned to the key the digests were derived from (the original key).
+   New writes use the new key and every stored value stays readable.
+2. Once every instance runs with the new key, re-encrypt the stored rows::
+
+       python -m app.core.key_rotation --workers 4 --max-load 0.5
+
+   Rows are read in primary-key ordered batches; each worker rewrites its
+   slice of a batch in its own short transaction, and progress is
+   checkpointed per table and key so an interrupted run resumes where it
+   stopped. ``--max-load`` caps the fraction of wall time spent working.
+3. When every table is finished, drop the old key from
+   ``FIELD_ENCRYPTION_PREVIOUS_KEYS``.
+
+Digests do not change, so blind indexes stay valid throughout. Updates are
+guarded by the old ciphertext: a row the application rewrote meanwhile is
+left alone, as it already uses the new key.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    inspect,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.engine import Engine
+
+from app.core import database
+from app.core.encryption import (
+    _get_field_cipher,
+    configured_encryption_keys,
+    iter_encrypted_columns,
+    keep_blind_indexes,
+)
+
+logger = logging.getLogger(__name__)
+
+rotation_progress = Table(
+    "field_key_rotation_progress",
+    MetaData(),
+    Column("key_id", String(16), primary_key=True),
+    Column("table_name", String(128), primary_key=True),
+    Column("last_key", String(255), nullable=True),
+    Column("values_rotated", Integer, nullable=False, default=0),
+    Column("finished_at", DateTime, nullable=True),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def primary_key_id() -> str:
+    """Short fingerprint of the primary key, so each rotation tracks its own progress."""
+
+    return hashlib.sha256(configured_encryption_keys()[0].encode("utf-8")).hexdigest()[:16]
+
+
+def _load_progress(engine: Engine, key_id: str, table_name: str):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(
+                rotation_progress.c.last_key,
+                rotation_progress.c.values_rotated,
+                rotation_progress.c.finished_at,
+            ).where(
+                rotation_progress.c.key_id == key_id,
+                rotation_progress.c.table_name == table_name,
+            )
+        ).first()
+
+
+def _save_progress(
+    engine: Engine, key_id: str, table_name: str, last_key, values_rotated: int, finished: bool
+) -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    values = {
+        "last_key": None if last_key is None else str(last_key),
+        "values_rotated": values_rotated,
+        "finished_at": now if finished else None,
+        "updated_at": now,
+    }
+    with engine.begin() as connection:
+        updated = connection.execute(
+            update(rotation_progress)
+            .where(
+                rotation_progress.c.key_id == key_id,
+                rotation_progress.c.table_name == table_name,
+            )
+            .values(values)
+        )
+        if not updated.rowcount:
+            connection.execute(
+                rotation_progress.insert().values(key_id=key_id, table_name=table_name, **values)
+            )
+
+
+def _rotate_rows(engine: Engine, table: Table, columns, rows) -> int:
+    """Re-encrypt one slice of a batch in a single transaction."""
+
+    cipher = _get_field_cipher()
+    (primary_key,) = table.primary_key.columns
+    rotated = 0
+    with engine.begin() as connection:
+        for position, column in enumerate(columns, start=1):
+            params = []
+            for row in rows:
+                stored = row[position]
+                new_value = None if stored is None else cipher.rotate(stored)
+                if new_value is not None:
+                    params.append({"_pk": row[0], "_old": stored, "_new": new_value})
+            if not params:
+                continue
+            statement = (
+                update(table)
+                .where(
+                    primary_key == bindparam("_pk"),
+                    type_coerce(column, String()) == bindparam("_old", type_=String()),
+                )
+                # The digest prefix is kept, so the digest columns stay as stored
+                .values(
+                    {**keep_blind_indexes(table), column.name: bindparam("_new", type_=String())}
+                )
+            )
+            result = connection.execute(statement, params)
+            rotated += result.rowcount if result.rowcount >= 0 else len(params)
+    return rotated
+
+
+def _throttle(elapsed: float, max_load: float) -> None:
+    # Sleep so that work takes at most ``max_load`` of the wall time
+    if 0 < max_load < 1:
+        time.sleep(elapsed * (1 - max_load) / max_load)
+
+
+def _primary_key_value(column, stored: str):
+    """Checkpointed key (stored as text) converted back to the column's type."""
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:  # types without one, e.g. sqlmodel's AutoString
+        return stored
+    return python_type(stored)
+
+
+def rotate_table(
+    engine: Engine,
+    table: Table,
+    columns,
+    key_id: str,
+    pool: ThreadPoolExecutor,
+    workers: int,
+    batch_size: int = 500,
+    max_load: float = 1.0,
+) -> int:
+    """Re-encrypt ``columns`` of ``table`` from its last checkpoint; return values rotated."""
+
+    (primary_key,) = table.primary_key.columns
+    progress = _load_progress(engine, key_id, table.name)
+    last_key, rotated = None, 0
+    if progress is not None:
+        if progress.finished_at is not None:
+            return progress.values_rotated
+        rotated = progress.values_rotated
+        if progress.last_key is not None:
+            last_key = _primary_key_value(primary_key, progress.last_key)
+
+    raw_values = [type_coerce(column, String()) for column in columns]  # undecrypted
+    slice_size = max(1, -(-batch_size // workers))
+    while True:
+        started = time.monotonic()
+        query = select(primary_key, *raw_values).order_by(primary_key).limit(batch_size)
+        if last_key is not None:
+            query = query.where(primary_key > last_key)
+        with engine.connect() as connection:
+            rows = connection.execute(query).all()
+        if not rows:
+            _save_progress(engine, key_id, table.name, last_key, rotated, finished=True)
+            return rotated
+
+        slices = [rows[start:start + slice_size] for start in range(0, len(rows), slice_size)]
+        rotated += sum(pool.map(lambda part: _rotate_rows(engine, table, columns, part), slices))
+        last_key = rows[-1][0]
+        _save_progress(engine, key_id, table.name, last_key, rotated, finished=False)
+        _throttle(time.monotonic() - started, max_load)
+
+
+def run_rotation(
+    engine: Engine,
+    metadata,
+    batch_size: int = 500,
+    workers: int = 4,
+    max_load: float = 1.0,
+    restart: bool = False,
+) -> Dict[str, int]:
+    """Re-encrypt every encrypted column of ``metadata`` with the primary key."""
+
+    rotation_progress.create(engine, checkfirst=True)
+    key_id = primary_key_id()
+    if restart:
+        with engine.begin() as connection:
+            connection.execute(rotation_progress.delete().where(rotation_progress.c.key_id == key_id))
+
+    inspector = inspect(engine)
+    stats: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="key-rotation") as pool:
+        for table, columns in iter_encrypted_columns(metadata):
+            if not inspector.has_table(table.name):
+                continue
+            stats[table.name] = rotate_table(
+                engine,
+                table,
+                columns,
+                key_id,
+                pool,
+                workers,
+                batch_size=batch_size,
+                max_load=max_load,
+            )
+            logger.info("Re-encrypted %s: %s values", table.name, stats[table.name])
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-encrypt encrypted columns with the primary key")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--max-load", type=float, default=1.0, help="fraction of wall time spent working (0-1]"
+    )
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress for this key")
+    args = parser.parse_args()
+
+    # Registers the tables that have encrypted columns
+    from sqlmodel import SQLModel
+
+    import app.core.init_db  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    stats = run_rotation(
+        database.engine,
+        SQLModel.metadata,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        max_load=args.max_load,
+        restart=args.restart,
+    )
+    logger.info("Key rotation finished: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
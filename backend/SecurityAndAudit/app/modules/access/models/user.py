@@ -38,7 +38,7 @@ class User(SQLModel, table=True):
     email: str = Field(
         sa_column=Column(
             "email",
-            EncryptedString(512),
+            EncryptedString(512, searchable=True),
             nullable=False,
             unique=True,
             index=True,
@@ -26,7 +26,7 @@ class Customer(SQLModel, table=True):
     customer_name: str = Field(
         sa_column=Column(
             "customer_name",
-            EncryptedString(512),
+            EncryptedString(512, searchable=True),
             nullable=False,
             index=True,
         ),
@@ -48,7 +48,7 @@ class Customer(SQLModel, table=True):
     email: str = Field(
         sa_column=Column(
             "email",
-            EncryptedString(512),
+            EncryptedString(512, searchable=True),
             nullable=False,
             unique=True,
             index=True,
@@ -1,11 +1,16 @@
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.modules.audit.schemas import AlertResponse, UnauthorizedOrderStatusAttempt
-from app.modules.audit.services import AlertService
+from app.modules.audit.schemas import (
+    AlertBatchResponse,
+    AlertResponse,
+    UnauthorizedOrderStatusAttempt,
+    UnauthorizedOrderStatusAttemptBatch,
+)
+from app.modules.audit.services import AlertService, send_alert_emails
 
 router = APIRouter(prefix="/alerts", tags=["Audit Alerts"])
 
@@ -34,3 +39,27 @@ def report_unauthorized_order_status(
         acknowledged=alert.acknowledged,
         processing_time_ms=total_processing_ms,
     )
+
+
+@router.post(
+    "/unauthorized-order-status/batch",
+    response_model=AlertBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def report_unauthorized_order_status_batch(
+    payload: UnauthorizedOrderStatusAttemptBatch,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    service = AlertService(db)
+    alerts, created, processing_ms = service.record_unauthorized_order_status_attempts(
+        payload.alerts
+    )
+    # Emails go out after the response, so the sender does not wait on SMTP
+    if created:
+        background_tasks.add_task(send_alert_emails, [alert.id for alert in created])
+
+    return AlertBatchResponse(
+        alert_ids=[alert.id for alert in alerts],
+        processing_time_ms=processing_ms,
+    )
@@ -1,9 +1,16 @@
-from .alert import AlertResponse, UnauthorizedOrderStatusAttempt
+from .alert import (
+    AlertBatchResponse,
+    AlertResponse,
+    UnauthorizedOrderStatusAttempt,
+    UnauthorizedOrderStatusAttemptBatch,
+)
 from .email import OutboundEmailDTO, OutboundEmailListResponse
 
 __all__ = [
+    "AlertBatchResponse",
     "AlertResponse",
     "UnauthorizedOrderStatusAttempt",
+    "UnauthorizedOrderStatusAttemptBatch",
     "OutboundEmailDTO",
     "OutboundEmailListResponse",
 ]
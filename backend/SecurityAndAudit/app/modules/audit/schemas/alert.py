@@ -1,10 +1,12 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UnauthorizedOrderStatusAttempt(BaseModel):
+    # Assigned by the sender so a retried delivery is not recorded twice
+    alert_id: Optional[str] = Field(default=None, max_length=36)
     order_id: str
     user_id: Optional[str] = None
     user_role: Optional[str] = None
@@ -12,6 +14,10 @@ class UnauthorizedOrderStatusAttempt(BaseModel):
     reason: Optional[str] = None
 
 
+class UnauthorizedOrderStatusAttemptBatch(BaseModel):
+    alerts: List[UnauthorizedOrderStatusAttempt]
+
+
 class AlertResponse(BaseModel):
     alert_id: str
     event_type: str
@@ -20,3 +26,8 @@ class AlertResponse(BaseModel):
     detected_at: datetime
     processing_time_ms: int
     acknowledged: bool
+
+
+class AlertBatchResponse(BaseModel):
+    alert_ids: List[str]
+    processing_time_ms: int
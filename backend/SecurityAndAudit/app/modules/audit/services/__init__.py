@@ -1,5 +1,5 @@
-from app.modules.audit.services.alert_service import AlertService
+from app.modules.audit.services.alert_service import AlertService, send_alert_emails
 from app.modules.audit.services.email_service import EmailService
 from app.modules.audit.services.outbound_email_service import OutboundEmailService
 
-__all__ = ["AlertService", "EmailService", "OutboundEmailService"]
+__all__ = ["AlertService", "EmailService", "OutboundEmailService", "send_alert_emails"]
@@ -1,7 +1,9 @@
 from datetime import UTC, datetime
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core import database
 from app.modules.audit.models import SecurityAlert
 from app.modules.audit.schemas import UnauthorizedOrderStatusAttempt
 from app.modules.audit.services.email_service import EmailService
@@ -22,6 +24,64 @@ class AlertService:
     def record_unauthorized_order_status_attempt(self, payload: UnauthorizedOrderStatusAttempt):
         start_time = datetime.now(UTC)
 
+        alert = self._build_unauthorized_order_status_alert(payload)
+        self.db.add(alert)
+        self.db.commit()
+        self.db.refresh(alert)
+
+        self._send_alert_email(alert)
+
+        processing_ms = int((datetime.now(UTC) - start_time).total_seconds() * 1000)
+        return alert, processing_ms
+
+    def record_unauthorized_order_status_attempts(
+        self, payloads: list[UnauthorizedOrderStatusAttempt]
+    ):
+        """Persist a batch of attempts in one transaction, once per ``alert_id``.
+
+        A batch retried after a lost response returns the alerts already
+        stored instead of creating them again. Returns every alert of the
+        batch, the ones created by this call (the only ones to notify) and
+        the processing time.
+        """
+        start_time = datetime.now(UTC)
+
+        try:
+            alerts, created = self._store_new_alerts(payloads)
+        except IntegrityError:
+            # A concurrent retry of the same batch stored them first
+            self.db.rollback()
+            alerts, created = self._store_new_alerts(payloads)
+
+        processing_ms = int((datetime.now(UTC) - start_time).total_seconds() * 1000)
+        return alerts, created, processing_ms
+
+    def _store_new_alerts(self, payloads: list[UnauthorizedOrderStatusAttempt]):
+        alert_ids = {payload.alert_id for payload in payloads if payload.alert_id}
+        stored = {}
+        if alert_ids:
+            stored = {
+                alert.id: alert
+                for alert in self.db.query(SecurityAlert).filter(SecurityAlert.id.in_(alert_ids))
+            }
+
+        alerts, created = [], []
+        for payload in payloads:
+            alert = stored.get(payload.alert_id) if payload.alert_id else None
+            if alert is None:
+                alert = self._build_unauthorized_order_status_alert(payload)
+                created.append(alert)
+                if payload.alert_id:
+                    stored[payload.alert_id] = alert
+            alerts.append(alert)
+
+        self.db.add_all(created)
+        self.db.commit()
+        return alerts, created
+
+    def _build_unauthorized_order_status_alert(
+        self, payload: UnauthorizedOrderStatusAttempt
+    ) -> SecurityAlert:
         severity = (
             "critical" if payload.user_role not in {"admin", "operator"} else "high"
         )
@@ -31,7 +91,8 @@ class AlertService:
         if payload.reason:
             description = f"{description} Motivo: {payload.reason}"
 
-        alert = SecurityAlert(
+        return SecurityAlert(
+            **({"id": payload.alert_id} if payload.alert_id else {}),
             event_type="unauthorized_order_status_query",
             severity=severity,
             description=description,
@@ -41,14 +102,21 @@ class AlertService:
             source_ip=payload.source_ip,
         )
 
-        self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
-
+    def _send_alert_email(self, alert: SecurityAlert) -> None:
         try:
             self.email_service.send_alert_email(alert)
         except Exception:
             pass
 
-        processing_ms = int((datetime.now(UTC) - start_time).total_seconds() * 1000)
-        return alert, processing_ms
+
+def send_alert_emails(alert_ids: list[str]) -> None:
+    """Notify the given alerts by email.
+
+    Runs as a background task after the response is sent, so it opens its
+    own session instead of using the request one.
+    """
+    with database.SessionLocal() as db:
+        service = AlertService(db)
+        alerts = db.query(SecurityAlert).filter(SecurityAlert.id.in_(alert_ids)).all()
+        for alert in alerts:
+            service._send_alert_email(alert)
@@ -0,0 +1,106 @@
+"""Blind-index lookups on the encrypted ``user.email`` column."""
+
+from sqlalchemy import bindparam, create_engine, insert, inspect, select, text, update
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+import app.core.init_db  # noqa: F401  registers every table, as blind_index_backfill.main does
+from app.core.blind_index_backfill import run_backfill
+from app.core.encryption import blind_index_value, encrypt_sensitive_value
+from app.modules.access.models import Profile, User
+
+USERS = User.__table__
+
+
+def _profile(session) -> Profile:
+    profile = Profile(profile_name="Auditor")
+    session.add(profile)
+    session.commit()
+    return profile
+
+
+def test_email_lookups_use_the_digest(db_session) -> None:
+    profile = _profile(db_session)
+    user = User(username="ana", email="ana@example.com", password_hash="x", profile_id=profile.id)
+    db_session.add(user)
+    db_session.commit()
+
+    statement = select(User).where(User.email == "ana@example.com")
+
+    assert '"user".email_digest = ' in str(statement)
+    assert db_session.scalars(statement).one() is user
+    assert user.email_digest == blind_index_value("ana@example.com")
+
+
+def test_core_writes_set_the_digest(db_session) -> None:
+    profile = _profile(db_session)
+    db_session.execute(
+        insert(USERS).values(
+            id="u-1", username="ana", email="ana@example.com", password_hash="x", profile_id=profile.id
+        )
+    )
+    db_session.execute(
+        insert(USERS),
+        [
+            {
+                "id": f"u-{number}",
+                "username": f"user{number}",
+                "email": f"user{number}@example.com",
+                "password_hash": "x",
+                "profile_id": profile.id,
+            }
+            for number in (2, 3)
+        ],
+    )
+    db_session.execute(update(USERS).where(USERS.c.id == "u-1").values(email="ana.maria@example.com"))
+    db_session.execute(
+        update(USERS).where(USERS.c.id == bindparam("user_id")),
+        [
+            {"user_id": "u-2", "email": "second@example.com"},
+            {"user_id": "u-3", "email": "third@example.com"},
+        ],
+    )
+    db_session.commit()
+
+    digests = dict(db_session.execute(select(USERS.c.id, USERS.c.email_digest)).all())
+    assert digests == {
+        "u-1": blind_index_value("ana.maria@example.com"),
+        "u-2": blind_index_value("second@example.com"),
+        "u-3": blind_index_value("third@example.com"),
+    }
+    assert db_session.scalars(select(User.id).where(User.email == "third@example.com")).one() == "u-3"
+
+
+def test_backfill_fills_digests_for_existing_users(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_user_email_digest"))
+        connection.execute(
+            text(
+                "INSERT INTO profile (id, profile_name, created_at, updated_at)"
+                " VALUES ('p-1', 'Auditor', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+            )
+        )
+        for number in range(3):
+            connection.execute(
+                text(
+                    "INSERT INTO user (id, username, password_hash, email, profile_id, is_active,"
+                    " created_at, updated_at) VALUES (:id, :username, 'x', :email, 'p-1', 1,"
+                    " CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+                ),
+                {
+                    "id": f"u-{number}",
+                    "username": f"user{number}",
+                    "email": encrypt_sensitive_value(f"user{number}@example.com"),
+                },
+            )
+
+    assert run_backfill(engine, SQLModel.metadata, batch_size=2) == {
+        "customer.customer_name_digest": 0,
+        "customer.email_digest": 0,
+        "user.email_digest": 3,
+    }
+    assert "ix_user_email_digest" in {index["name"] for index in inspect(engine).get_indexes("user")}
+    with Session(engine) as session:
+        assert session.scalars(select(User.id).where(User.email == "user2@example.com")).one() == "u-2"
@@ -0,0 +1,105 @@
+"""Re-encryption of the ``user.email`` column with a new key."""
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import String, create_engine, select, type_coerce
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+import app.core.init_db  # noqa: F401  registers every table, as key_rotation.main does
+from app.core import encryption, key_rotation
+from app.core.encryption import blind_index_value
+from app.core.key_rotation import rotation_progress, run_rotation
+from app.modules.access.models import User
+
+OLD_KEY = encryption.settings.field_encryption_key
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture()
+def use_keys(monkeypatch):
+    def configure(primary, previous="", digest=""):
+        monkeypatch.setattr(encryption.settings, "field_encryption_key", primary)
+        monkeypatch.setattr(encryption.settings, "field_encryption_previous_keys", previous)
+        monkeypatch.setattr(encryption.settings, "field_digest_key", digest)
+        encryption._get_field_cipher.cache_clear()
+        encryption.get_decryption_cache().clear()
+
+    yield configure
+    encryption._get_field_cipher.cache_clear()
+    encryption.get_decryption_cache().clear()
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rotation.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            User(
+                id=f"u-{number}",
+                username=f"user{number}",
+                email=f"user{number}@example.com",
+                password_hash="x",
+                profile_id="p-1",
+            )
+            for number in range(1, 6)
+        )
+        session.commit()
+    return engine
+
+
+def _stored_emails(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(type_coerce(User.email, String()))).scalars().all()
+
+
+def test_rotation_resumes_and_keeps_email_digests(engine, use_keys, monkeypatch) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY, digest=OLD_KEY)
+    rotate_rows, calls = key_rotation._rotate_rows, []
+
+    def interrupted(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return rotate_rows(*args)
+
+    monkeypatch.setattr(key_rotation, "_rotate_rows", interrupted)
+    with pytest.raises(RuntimeError):
+        run_rotation(engine, SQLModel.metadata, batch_size=2, workers=1)
+    monkeypatch.setattr(key_rotation, "_rotate_rows", rotate_rows)
+
+    resumed = []
+    monkeypatch.setattr(
+        key_rotation, "_rotate_rows", lambda *args: resumed.append(args[3]) or rotate_rows(*args)
+    )
+    assert run_rotation(engine, SQLModel.metadata, batch_size=2, workers=1) == {"customer": 0, "user": 5}
+    assert [row[0] for rows in resumed for row in rows] == ["u-3", "u-4", "u-5"]
+    with engine.connect() as connection:
+        assert None not in connection.execute(select(rotation_progress.c.finished_at)).scalars().all()
+
+    use_keys(NEW_KEY, digest=OLD_KEY)
+    assert all(encryption._get_field_cipher().rotate(value) is None for value in _stored_emails(engine))
+    with Session(engine) as session:
+        found = session.scalars(select(User).where(User.email == "user4@example.com")).one()
+        assert (found.id, found.email_digest) == ("u-4", blind_index_value("user4@example.com"))
+
+
+def test_rotation_skips_emails_changed_after_they_were_read(engine, use_keys, monkeypatch) -> None:
+    use_keys(NEW_KEY, previous=OLD_KEY, digest=OLD_KEY)
+    rotate_rows = key_rotation._rotate_rows
+
+    def edited_meanwhile(*args):
+        with Session(engine) as session:  # the user changes their email under the new key
+            session.get(User, "u-2").email = "renamed@example.com"
+            session.commit()
+        return rotate_rows(*args)
+
+    monkeypatch.setattr(key_rotation, "_rotate_rows", edited_meanwhile)
+
+    assert run_rotation(engine, SQLModel.metadata, batch_size=10, workers=1)["user"] == 4
+    encryption.get_decryption_cache().clear()
+    with Session(engine) as session:
+        user = session.get(User, "u-2")
+        assert user.email == "renamed@example.com"
+        assert user.email_digest == blind_index_value("renamed@example.com")
@@ -98,3 +98,63 @@ def test_security_alert_is_recorded_and_email_sent(smtp_server):
     message = smtp_server.messages[0]["data"]
     assert payload["order_id"] in message
     assert payload["user_id"] in message
+
+
+@pytest.mark.usefixtures("setup_database")
+def test_security_alert_batch_is_recorded_and_emails_sent(smtp_server):
+    audit_module = reload_main(package_root="backend/SecurityAndAudit")
+    client = TestClient(audit_module.app)
+
+    payload = {
+        "alerts": [
+            {"order_id": "B-1", "user_role": None, "reason": "Rol no provisto"},
+            {"order_id": "B-2", "user_role": "guest", "reason": "Rol sin permiso"},
+        ]
+    }
+
+    response = client.post("/audit/alerts/unauthorized-order-status/batch", json=payload)
+    body = response.json()
+
+    assert response.status_code == 201
+    assert len(body["alert_ids"]) == 2
+    assert body["processing_time_ms"] < 2000
+
+    from app.core.database import SessionLocal
+    from app.modules.audit.models import SecurityAlert
+
+    with SessionLocal() as session:
+        stored = session.execute(select(SecurityAlert)).scalars().all()
+        assert sorted(alert.order_id for alert in stored) == ["B-1", "B-2"]
+
+    assert len(smtp_server.messages) == 2
+
+
+@pytest.mark.usefixtures("setup_database")
+def test_retried_alert_batch_is_recorded_and_emailed_once(smtp_server):
+    audit_module = reload_main(package_root="backend/SecurityAndAudit")
+    client = TestClient(audit_module.app)
+
+    payload = {
+        "alerts": [
+            {"alert_id": "6f1c7a52-1111-4d7e-9a55-000000000001", "order_id": "C-1"},
+            {"alert_id": "6f1c7a52-1111-4d7e-9a55-000000000002", "order_id": "C-2"},
+        ]
+    }
+
+    first = client.post("/audit/alerts/unauthorized-order-status/batch", json=payload)
+    # The sender timed out waiting for the first response and retries
+    payload["alerts"].append({"alert_id": "6f1c7a52-1111-4d7e-9a55-000000000003", "order_id": "C-3"})
+    retried = client.post("/audit/alerts/unauthorized-order-status/batch", json=payload)
+
+    assert first.status_code == retried.status_code == 201
+    assert first.json()["alert_ids"] == [alert["alert_id"] for alert in payload["alerts"][:2]]
+    assert retried.json()["alert_ids"] == [alert["alert_id"] for alert in payload["alerts"]]
+
+    from app.core.database import SessionLocal
+    from app.modules.audit.models import SecurityAlert
+
+    with SessionLocal() as session:
+        stored = session.execute(select(SecurityAlert)).scalars().all()
+        assert sorted(alert.order_id for alert in stored) == ["C-1", "C-2", "C-3"]
+
+    assert len(smtp_server.messages) == 3
@@ -57,8 +57,14 @@ class TestClient:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def get(self, url: str, *, params: Optional[Mapping[str, Any]] = None) -> Response:
-        return self.request("GET", url, params=params)
+    def get(
+        self,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        return self.request("GET", url, params=params, headers=headers)
 
     def post(
         self,
@@ -228,12 +234,16 @@ class TestClient:
         body_chunks: list[bytes] = []
 
         body_sent = False
+        response_complete = asyncio.Event()
 
         async def receive() -> Mapping[str, Any]:
             nonlocal body_sent
             if not body_sent:
                 body_sent = True
                 return {"type": "http.request", "body": body, "more_body": False}
+            # Like a real server, only report the disconnect once the response
+            # is finished; otherwise streaming responses get cancelled.
+            await response_complete.wait()
             return {"type": "http.disconnect"}
 
         async def send(message: Mapping[str, Any]) -> None:
@@ -242,6 +252,8 @@ class TestClient:
                 response_start = message
             elif message["type"] == "http.response.body":
                 body_chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
 
         await self.app(scope, receive, send)
 
@@ -125,15 +125,33 @@ def test_unauthorized_order_status_sends_email_end_to_end(
 
     order_service.SECURITY_AUDIT_URL = "http://security-audit.test"
 
-    def forward_alert(url: str, *args: Any, **kwargs: Any):
-        assert url.startswith("http://security-audit.test")
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(audit_client.post(url, *args, **kwargs))
-        finally:
-            loop.close()
+    from app.modules.orders.services.security_alert_dispatcher import (
+        SecurityAlertDispatcher,
+    )
 
-    monkeypatch.setattr(order_service.httpx, "post", forward_alert)
+    class ForwardToAuditTransport(httpx.BaseTransport):
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            assert str(request.url).startswith("http://security-audit.test")
+            loop = asyncio.new_event_loop()
+            try:
+                response = loop.run_until_complete(
+                    audit_client.request(
+                        request.method,
+                        str(request.url),
+                        content=request.read(),
+                        headers={"content-type": request.headers["content-type"]},
+                    )
+                )
+            finally:
+                loop.close()
+            return httpx.Response(
+                response.status_code, headers=response.headers, content=response.content
+            )
+
+    dispatcher = SecurityAlertDispatcher(
+        lambda: order_service.SECURITY_AUDIT_URL, transport=ForwardToAuditTransport()
+    )
+    monkeypatch.setattr(order_service, "alert_dispatcher", dispatcher)
 
     product_catalog: Dict[int, Dict[str, Any]] = {1001: {"nombre": "Guantes", "precio": "10000.00"}}
 
@@ -176,6 +194,10 @@ def test_unauthorized_order_status_sends_email_end_to_end(
     unauthorized_response = sales_client.get(f"/pedidos/{created_order.id}")
     assert unauthorized_response.status_code == 403
 
+    # Alerts are delivered in the background; ASR-12 allows up to 2 seconds
+    assert dispatcher.flush(timeout=2)
+    dispatcher.close()
+
     assert len(smtp_controller.messages) == 1
     message = smtp_controller.messages[0]["data"]
     assert str(created_order.id) in message
@@ -13,7 +13,7 @@ export interface PlanVenta {
   // Campos mínimos requeridos
   nombre: string;
   descripcion: string;
-  periodo: string; // e.g., "2025-Q1", "Enero 2025", etc.
+  periodo: string; // "2025", "2025-Q1" or "2025-01"
   meta: number; // Sales target/goal
   // Vendedor asignado
   vendedorId: string;